@@ -1,4 +1,4 @@
-from users.models import Lawyer
+from users.models import Escritorio, Lawyer
 from django.contrib.auth.hashers import make_password
 
 username = 'testuser'
@@ -13,6 +13,7 @@ try:
     user.is_staff = True
     user.is_active = True
     user.enable_login = True # Ensure this is True
+    user.escritorio = user.escritorio or Escritorio.objects.order_by('pk').first()
     user.save()
 except Lawyer.DoesNotExist:
     print(f"Creating new superuser '{username}'.")
@@ -23,7 +24,8 @@ except Lawyer.DoesNotExist:
         is_superuser=True,
         is_staff=True,
         is_active=True,
-        enable_login=True # Ensure this is True
+        enable_login=True, # Ensure this is True
+        escritorio=Escritorio.objects.order_by('pk').first(),
     )
     user.save()
 
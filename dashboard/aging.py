@@ -0,0 +1,101 @@
+from datetime import timedelta
+from decimal import Decimal
+
+from django.db.models import Case, DecimalField, ExpressionWrapper, F, Q, Sum, Value, When
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from .models import Receita
+
+VALOR = DecimalField(max_digits=14, decimal_places=2)
+ZERO = Value(Decimal('0.00'), output_field=VALOR)
+CENTAVO = Decimal('0.01')
+
+# Dimensões de agrupamento: chave -> (campo id, campo de rótulo)
+DIMENSOES = {
+    'cliente': ('cliente_id', 'cliente__nome'),
+    'advogado': ('advogado_id', 'advogado__username'),
+    'tipo': ('tipo_id', 'tipo__nome'),
+}
+
+FAIXAS = [
+    ('a_vencer', 'A vencer'),
+    ('dias_1_30', '1-30 dias'),
+    ('dias_31_60', '31-60 dias'),
+    ('dias_61_90', '61-90 dias'),
+    ('dias_90_mais', '+90 dias'),
+]
+
+
+def filtros_faixas(hoje):
+    """Condições de cada faixa de atraso comparando a data de vencimento com datas fixas"""
+    limite_30 = hoje - timedelta(days=30)
+    limite_60 = hoje - timedelta(days=60)
+    limite_90 = hoje - timedelta(days=90)
+    return {
+        'a_vencer': Q(data_vencimento__gte=hoje),
+        'dias_1_30': Q(data_vencimento__lt=hoje, data_vencimento__gte=limite_30),
+        'dias_31_60': Q(data_vencimento__lt=limite_30, data_vencimento__gte=limite_60),
+        'dias_61_90': Q(data_vencimento__lt=limite_60, data_vencimento__gte=limite_90),
+        'dias_90_mais': Q(data_vencimento__lt=limite_90),
+    }
+
+
+def receitas_em_aberto():
+    """Receitas não quitadas anotadas com o saldo em aberto (valor - desconto - recebido)"""
+    return Receita.objects.filter(pago=False).annotate(
+        saldo=ExpressionWrapper(
+            F('valor_total') - F('desconto') - Coalesce('valor_recebido', ZERO),
+            output_field=VALOR,
+        )
+    ).filter(saldo__gt=0)
+
+
+def relatorio_aging(agrupar_por='cliente', hoje=None):
+    """
+    Saldo em aberto por faixa de atraso, agrupado por cliente, advogado ou tipo.
+
+    Cada faixa é uma soma de Case/When sobre o saldo, de modo que o relatório
+    inteiro sai de uma única consulta agrupada.
+    """
+    hoje = hoje or timezone.now().date()
+    campo_id, campo_nome = DIMENSOES[agrupar_por]
+    faixas = filtros_faixas(hoje)
+
+    somas = {
+        faixa: Coalesce(
+            Sum(Case(When(condicao, then=F('saldo')), default=ZERO, output_field=VALOR)),
+            ZERO,
+        )
+        for faixa, condicao in faixas.items()
+    }
+
+    linhas = receitas_em_aberto().values(campo_id, campo_nome).annotate(
+        total=Coalesce(Sum('saldo'), ZERO),
+        **somas,
+    ).order_by('-total')
+
+    resultado = []
+    for linha in linhas:
+        resultado.append({
+            'id': linha[campo_id],
+            'nome': linha[campo_nome] or '-',
+            # As somas do SQLite voltam sem as casas decimais (Decimal('100')); a tela e o CSV mostram centavos
+            'total': linha['total'].quantize(CENTAVO),
+            'faixas': [(faixa, linha[faixa].quantize(CENTAVO)) for faixa, _ in FAIXAS],
+        })
+    return resultado
+
+
+def detalhe_aging(agrupar_por, valor, faixa=None, hoje=None):
+    """Receitas em aberto de um cliente/advogado/tipo, opcionalmente de uma única faixa"""
+    hoje = hoje or timezone.now().date()
+    campo_id, _ = DIMENSOES[agrupar_por]
+
+    if valor is None:
+        receitas = receitas_em_aberto().filter(**{f'{campo_id}__isnull': True})
+    else:
+        receitas = receitas_em_aberto().filter(**{campo_id: valor})
+    if faixa:
+        receitas = receitas.filter(filtros_faixas(hoje)[faixa])
+    return receitas.select_related('cliente', 'advogado', 'tipo').order_by('data_vencimento', 'pk')
@@ -4,3 +4,10 @@ from django.apps import AppConfig
 class DashboardConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'dashboard'
+
+    def ready(self):
+        from . import signals  # noqa: F401
+        from .fila import carregar_jobs
+
+        # Registra os jobs de todos os apps também nos processos web (enfileirar)
+        carregar_jobs()
@@ -0,0 +1,212 @@
+"""
+Arquivo frio dos processos encerrados.
+
+Processos arquivados ou finalizados há mais de ARQUIVO_DIAS dias (pela data de
+fim), sem tarefas em aberto nem audiências futuras, têm as tarefas,
+audiências, publicações e atividades movidas para RegistroArquivado pelo job
+diário processos.arquivar, em blocos de ARQUIVO_LOTE processos, um bloco por
+transação. As tabelas de origem ficam só com o que ainda está em uso, e as
+listas, o calendário e os widgets do dashboard deixam de percorrer o
+histórico.
+
+- O processo continua na tabela de origem (com data_arquivamento preenchida),
+  assim como as receitas e despesas dele: os totais dos clientes, as comissões
+  e os relatórios financeiros são calculados a partir delas.
+- Leitura: obter_ou_404() procura na tabela de origem e depois no arquivo, e
+  do_processo() junta as duas; as linhas arquivadas voltam como instâncias não
+  gravadas com `arquivado = True`, só para exibição.
+- Reabrir o processo (status diferente de arquivado/finalizado, pelo
+  formulário ou em lote) devolve as linhas às tabelas de origem com as mesmas
+  chaves primárias (desarquivar()).
+- As chaves estrangeiras guardadas no arquivo não são conferidas pelo banco:
+  quem remove ou mescla cadastros reaponta o arquivo (reapontar()), e a
+  leitura e a devolução aplicam a regra on_delete às chaves cujo alvo não
+  existe mais (referencias()), como o banco teria feito com a linha viva.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.core import serializers
+from django.db import models, transaction
+from django.db.models import Exists, OuterRef, Q
+from django.http import Http404
+from django.utils import timezone
+
+from . import eventos, versoes
+from .models import AtividadeRecente, Audiencia, Processo, Publicacao, RegistroArquivado, Task
+
+DIAS = getattr(settings, 'ARQUIVO_DIAS', 365)
+LOTE = getattr(settings, 'ARQUIVO_LOTE', 100)
+ENCERRADOS = ('arquivado', 'finalizado')
+# Ordem de arquivamento: as atividades apontam para as tarefas e saem antes delas
+MODELOS = (AtividadeRecente, Task, Audiencia, Publicacao)
+# Linhas por INSERT na devolução
+BLOCO_INSERCAO = 500
+
+
+def rotulo(modelo):
+    return modelo._meta.label_lower
+
+
+def elegiveis(dias=DIAS):
+    """Processos encerrados há mais de `dias` dias que ainda não foram arquivados"""
+    limite = timezone.localdate() - timedelta(days=dias)
+    return Processo.objects.filter(
+        status__in=ENCERRADOS, data_fim__lte=limite, data_arquivamento__isnull=True,
+    ).exclude(
+        Exists(Task.objects.filter(processo=OuterRef('pk'), status__in=('pendente', 'em_andamento')))
+    ).exclude(
+        Exists(Audiencia.objects.filter(processo=OuterRef('pk'), data_hora__gte=timezone.now()))
+    )
+
+
+def dependentes(modelo, processo_ids):
+    if modelo is AtividadeRecente:
+        # As atividades de tarefas do processo vão junto com as tarefas
+        return AtividadeRecente.objects.filter(
+            Q(task__processo_id__in=processo_ids) | Q(task__isnull=True, processo_id__in=processo_ids)
+        )
+    return modelo._base_manager.filter(processo_id__in=processo_ids)
+
+
+def arquivar_processos(processo_ids):
+    """Move para o arquivo as linhas dependentes dos processos; retorna {rótulo: quantidade}"""
+    quantidades = {}
+    with transaction.atomic():
+        tarefas = dict(Task.objects.filter(processo_id__in=processo_ids).values_list('pk', 'processo_id'))
+        for modelo in MODELOS:
+            linhas = dependentes(modelo, processo_ids)
+            registros = [
+                RegistroArquivado(
+                    modelo=linha['model'], objeto_id=linha['pk'], dados=linha['fields'],
+                    processo_id=tarefas.get(linha['fields'].get('task')) or linha['fields']['processo'],
+                )
+                for linha in serializers.serialize('python', linhas.order_by().iterator())
+            ]
+            RegistroArquivado.objects.bulk_create(registros, batch_size=BLOCO_INSERCAO)
+            # Sem o Collector: as únicas referências (atividade -> tarefa) saem no mesmo bloco
+            linhas._raw_delete(linhas.db)
+            quantidades[rotulo(modelo)] = len(registros)
+        Processo.objects.filter(pk__in=processo_ids).update(data_arquivamento=timezone.now())
+        atualizar(quantidades)
+    return quantidades
+
+
+def arquivar(dias=DIAS, lote=LOTE, progresso=None):
+    """
+    Arquiva todos os processos elegíveis, `lote` processos por transação.
+    Interrompido, continua de onde parou na próxima execução.
+    """
+    informar = progresso or (lambda processados, total: None)
+    total = elegiveis(dias).count()
+    resumo = {'processos': 0, **{rotulo(modelo): 0 for modelo in MODELOS}}
+    informar(0, total)
+    while (ids := list(elegiveis(dias).order_by('pk').values_list('pk', flat=True)[:lote])):
+        for chave, quantidade in arquivar_processos(ids).items():
+            resumo[chave] += quantidade
+        resumo['processos'] += len(ids)
+        informar(resumo['processos'], total)
+    return resumo
+
+
+def desarquivar(*processo_ids):
+    """Devolve às tabelas de origem as linhas arquivadas dos processos; retorna quantas"""
+    with transaction.atomic():
+        # Pelos registros, não por data_arquivamento: um save() de instância antiga pode ter limpado a data
+        registros = RegistroArquivado.objects.filter(processo_id__in=processo_ids)
+        if not registros.exists():
+            return 0
+        quantidades = {}
+        for modelo in reversed(MODELOS):
+            objetos = referencias(modelo, [instancia(registro) for registro in registros.filter(modelo=rotulo(modelo)).iterator()])
+            campos = modelo._meta.local_concrete_fields
+            for inicio in range(0, len(objetos), BLOCO_INSERCAO):
+                # raw=True: grava os valores arquivados, inclusive data_criacao (auto_now_add)
+                modelo._base_manager._insert(objetos[inicio:inicio + BLOCO_INSERCAO], fields=campos, raw=True)
+            quantidades[rotulo(modelo)] = len(objetos)
+        registros._raw_delete(registros.db)
+        Processo.objects.filter(pk__in=processo_ids).update(data_arquivamento=None)
+        atualizar(quantidades)
+    return sum(quantidades.values())
+
+
+def atualizar(quantidades):
+    """O que os sinais fariam para as linhas movidas em bloco"""
+    versoes.incrementar(Processo, *(
+        modelo for modelo in MODELOS if quantidades.get(rotulo(modelo)) and modelo._meta.label in versoes.MODELOS
+    ))
+    if quantidades.get(rotulo(Publicacao)):
+        eventos.publicar_nao_lidas()
+
+
+def instancia(registro):
+    """Instância não gravada do modelo de origem, montada a partir do registro arquivado"""
+    objeto = next(serializers.deserialize(
+        'python', [{'model': registro.modelo, 'pk': registro.objeto_id, 'fields': registro.dados}],
+        ignorenonexistent=True,
+    )).object
+    if objeto.escritorio_id is None:
+        # Arquivado antes dos escritórios (users.tenancy): é o do registro
+        objeto.escritorio_id = registro.escritorio_id
+    objeto.arquivado = True
+    return objeto
+
+
+def referencias(modelo, objetos):
+    """
+    Aplica às linhas arquivadas a regra on_delete das chaves estrangeiras cujo
+    alvo foi excluído depois do arquivamento: CASCADE (ou chave obrigatória)
+    descarta a linha, as demais regras anulam a chave. Uma consulta por chave.
+    """
+    for campo in modelo._meta.concrete_fields:
+        if not campo.many_to_one or not objetos:
+            continue
+        ids = {getattr(objeto, campo.attname) for objeto in objetos} - {None}
+        ausentes = ids - set(campo.related_model._base_manager.filter(pk__in=ids).values_list('pk', flat=True))
+        if not ausentes:
+            continue
+        descartar = campo.remote_field.on_delete is models.CASCADE or not campo.null
+        mantidos = []
+        for objeto in objetos:
+            if getattr(objeto, campo.attname) in ausentes:
+                if descartar:
+                    continue
+                setattr(objeto, campo.attname, None)
+            mantidos.append(objeto)
+        objetos = mantidos
+    return objetos
+
+
+def reapontar(alvo, ids, destino_id):
+    """Troca, nas linhas arquivadas, as referências aos `ids` do modelo `alvo` por `destino_id` (mesclagens)"""
+    for modelo in MODELOS:
+        for campo in modelo._meta.concrete_fields:
+            if campo.many_to_one and campo.related_model is alvo:
+                registros = list(RegistroArquivado._base_manager.filter(
+                    modelo=rotulo(modelo), **{f'dados__{campo.name}__in': list(ids)},
+                ))
+                for registro in registros:
+                    registro.dados[campo.name] = destino_id
+                RegistroArquivado._base_manager.bulk_update(registros, ['dados'], batch_size=BLOCO_INSERCAO)
+
+
+def obter(modelo, pk):
+    """Linha arquivada do modelo com a chave primária, ou None"""
+    registro = RegistroArquivado.objects.filter(modelo=rotulo(modelo), objeto_id=pk).first()
+    objetos = referencias(modelo, [instancia(registro)]) if registro else []
+    return objetos[0] if objetos else None
+
+
+def obter_ou_404(modelo, pk):
+    """Como get_object_or_404, procurando também no arquivo"""
+    objeto = modelo._default_manager.filter(pk=pk).first() or obter(modelo, pk)
+    if objeto is None:
+        raise Http404(f'{modelo._meta.verbose_name} não encontrado(a).')
+    return objeto
+
+
+def do_processo(processo, modelo):
+    """Linhas do modelo ligadas ao processo, da tabela de origem e do arquivo"""
+    return list(modelo._default_manager.filter(processo=processo)) + referencias(modelo, [
+        instancia(registro) for registro in processo.arquivados.filter(modelo=rotulo(modelo))
+    ])
@@ -0,0 +1,180 @@
+"""
+Busca de texto completo nas publicações e alertas de termos salvos.
+
+No SQLite a busca usa a tabela FTS5 dashboard_publicacao_fts (título e conteúdo,
+sem acentos, mantida por gatilhos); em outros bancos cai para filtros
+icontains. Os termos do usuário nunca vão direto para o MATCH: cada palavra é
+colocada entre aspas, de modo que pontuação e operadores do FTS5 não quebram a
+consulta. Sintaxe aceita:
+
+- palavras soltas: todas precisam aparecer;
+- "frase exata" entre aspas;
+- prefixo*: palavras que começam com o prefixo;
+- OU entre dois termos: qualquer um deles;
+- -palavra: exclui as publicações com a palavra.
+"""
+import re
+from collections import Counter
+
+from django.db import connection, transaction
+from django.db.models import F, Max, Q
+from django.db.models.expressions import RawSQL
+from django.utils.html import escape
+
+from . import eventos, versoes
+from .models import AlertaPublicacao, AtividadeRecente, Publicacao
+
+TABELA_FTS = 'dashboard_publicacao_fts'
+TERMO = re.compile(r'(-?)"([^"]+)"|(\S+)')
+INICIO_DESTAQUE, FIM_DESTAQUE = '\x02', '\x03'
+TAMANHO_TRECHO = 32
+
+
+def usa_fts():
+    return connection.vendor == 'sqlite'
+
+
+def interpretar_termos(termos):
+    """Lista de (operador, texto, prefixo) com operador em '', 'OR' ou 'NOT'"""
+    resultado = []
+    operador = ''
+    for encontrado in TERMO.finditer(termos or ''):
+        negado, frase, palavra = encontrado.groups()
+        if palavra is not None:
+            if palavra.upper() in ('OU', 'OR'):
+                operador = 'OR' if resultado else ''
+                continue
+            negado = '-' if palavra.startswith('-') and len(palavra) > 1 else ''
+            palavra = palavra[1:] if negado else palavra
+        texto = (frase if frase is not None else palavra).replace('"', ' ').strip()
+        prefixo = texto.endswith('*') and frase is None
+        texto = texto.rstrip('*').strip()
+        if not re.search(r'\w', texto):
+            continue
+        resultado.append(('NOT' if negado else operador, texto, prefixo))
+        operador = ''
+    return resultado
+
+
+def consulta_fts(termos):
+    """Expressão MATCH do FTS5 para os termos do usuário, ou None se não houver termos"""
+    positivos, negativos = [], []
+    for operador, texto, prefixo in interpretar_termos(termos):
+        termo = f'"{texto}"' + ('*' if prefixo else '')
+        if operador == 'NOT':
+            negativos.append(termo)
+        elif operador == 'OR' and positivos:
+            positivos[-1] = f'{positivos[-1]} OR {termo}'
+        else:
+            positivos.append(termo)
+    if not positivos:
+        return None
+    expressao = ' AND '.join(f'({termo})' for termo in positivos)
+    for termo in negativos:
+        expressao = f'({expressao}) NOT {termo}'
+    return expressao
+
+
+def filtrar(queryset, termos):
+    """Restringe um queryset de Publicacao às publicações que casam com os termos"""
+    if usa_fts():
+        expressao = consulta_fts(termos)
+        if expressao is not None:
+            return queryset.filter(pk__in=RawSQL(
+                f'SELECT rowid FROM {TABELA_FTS} WHERE {TABELA_FTS} MATCH %s', (expressao,)
+            ))
+        # O FTS5 não aceita uma consulta só de negações: exclui o que casa com qualquer uma delas
+        negativos = [termo for operador, *termo in interpretar_termos(termos) if operador == 'NOT']
+        if not negativos:
+            return queryset
+        expressao = ' OR '.join(f'"{texto}"' + ('*' if prefixo else '') for texto, prefixo in negativos)
+        return queryset.exclude(pk__in=RawSQL(
+            f'SELECT rowid FROM {TABELA_FTS} WHERE {TABELA_FTS} MATCH %s', (expressao,)
+        ))
+
+    filtro = None
+    for operador, texto, _ in interpretar_termos(termos):
+        condicao = Q(titulo__icontains=texto) | Q(conteudo__icontains=texto)
+        if operador == 'NOT':
+            queryset = queryset.exclude(condicao)
+        elif operador == 'OR' and filtro is not None:
+            filtro |= condicao
+        else:
+            filtro = condicao if filtro is None else filtro & condicao
+    return queryset.filter(filtro) if filtro is not None else queryset
+
+
+def destacar(trecho):
+    """Escapa o trecho e troca os marcadores de destaque por <mark>"""
+    return escape(trecho).replace(INICIO_DESTAQUE, '<mark>').replace(FIM_DESTAQUE, '</mark>')
+
+
+def trechos(ids, termos):
+    """
+    Trechos com os termos destacados para as publicações informadas.
+
+    Retorna {id: html}; o HTML já vem escapado, só com as marcações <mark>.
+    """
+    ids = list(ids)
+    if not ids:
+        return {}
+    if usa_fts():
+        expressao = consulta_fts(termos)
+        if expressao is None:
+            return {}
+        marcadores = ', '.join(['%s'] * len(ids))
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"SELECT rowid, snippet({TABELA_FTS}, -1, %s, %s, '…', %s) FROM {TABELA_FTS} "
+                f"WHERE {TABELA_FTS} MATCH %s AND rowid IN ({marcadores})",
+                [INICIO_DESTAQUE, FIM_DESTAQUE, TAMANHO_TRECHO, expressao, *ids],
+            )
+            return {pk: destacar(trecho) for pk, trecho in cursor.fetchall()}
+
+    palavras = [texto for operador, texto, _ in interpretar_termos(termos) if operador != 'NOT']
+    padrao = re.compile('|'.join(re.escape(palavra) for palavra in palavras), re.IGNORECASE) if palavras else None
+    resultado = {}
+    for pk, conteudo in Publicacao.objects.filter(pk__in=ids).values_list('pk', 'conteudo'):
+        encontrado = padrao.search(conteudo) if padrao else None
+        inicio = max(encontrado.start() - 120, 0) if encontrado else 0
+        trecho = conteudo[inicio:inicio + 300]
+        if padrao:
+            trecho = padrao.sub(lambda m: f'{INICIO_DESTAQUE}{m.group(0)}{FIM_DESTAQUE}', trecho)
+        resultado[pk] = destacar(('…' if inicio else '') + trecho + ('…' if len(conteudo) > inicio + 300 else ''))
+    return resultado
+
+
+def verificar_alertas(alertas=None):
+    """
+    Procura, para cada alerta ativo, as publicações novas (id maior que o último
+    verificado) do escritório do alerta que casam com os termos e registra uma
+    atividade por alerta com ocorrências. Retorna {alerta_id: quantidade}.
+    """
+    ultima = Publicacao.objects.aggregate(ultima=Max('id'))['ultima'] or 0
+    alertas = alertas if alertas is not None else AlertaPublicacao.objects.filter(ativo=True)
+    ocorrencias = Counter()
+    atividades = []
+
+    for alerta in alertas.filter(ultima_publicacao__lt=ultima):
+        novas = filtrar(Publicacao.objects.filter(
+            escritorio_id=alerta.escritorio_id, id__gt=alerta.ultima_publicacao, id__lte=ultima,
+        ), alerta.termos)
+        quantidade = novas.count()
+        if quantidade:
+            ocorrencias[alerta.pk] = quantidade
+            atividades.append(AtividadeRecente(
+                tipo='alerta_publicacao',
+                descricao=f'Alerta "{alerta.nome}": {quantidade} nova(s) publicação(ões) com "{alerta.termos}"'[:300],
+                usuario_id=alerta.advogado_id,
+                escritorio_id=alerta.escritorio_id,
+            ))
+
+    with transaction.atomic():
+        AtividadeRecente.objects.bulk_create(atividades)
+        if atividades:
+            versoes.incrementar(AtividadeRecente)
+            eventos.atividades_criadas(atividades)
+        for alerta_id, quantidade in ocorrencias.items():
+            AlertaPublicacao.objects.filter(pk=alerta_id).update(total_ocorrencias=F('total_ocorrencias') + quantidade)
+        alertas.filter(ultima_publicacao__lt=ultima).update(ultima_publicacao=ultima)
+    return dict(ocorrencias)
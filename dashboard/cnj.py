@@ -0,0 +1,116 @@
+"""
+Numeração única de processos do CNJ (Resolução 65/2008): NNNNNNN-DD.AAAA.J.TR.OOOO.
+
+- NNNNNNN: número sequencial do processo no ano e na origem;
+- DD: dígito verificador (módulo 97, ISO 7064);
+- AAAA: ano de ajuizamento;
+- J: segmento do Judiciário;
+- TR: tribunal;
+- OOOO: unidade de origem.
+
+Os componentes ficam em colunas indexadas de Processo (cnj_ano, cnj_segmento,
+cnj_tribunal, cnj_origem) e o número só com dígitos em numero_normalizado, de
+modo que buscas e relatórios usam igualdade em índice em vez de LIKE.
+"""
+import re
+from collections import namedtuple
+
+FORMATO = '{sequencial}-{digito}.{ano}.{segmento}.{tribunal}.{origem}'
+PADRAO = re.compile(r'\b(\d{7})-?(\d{2})\.?(\d{4})\.?(\d)\.?(\d{2})\.?(\d{4})\b')
+
+SEGMENTOS = {
+    1: 'Supremo Tribunal Federal',
+    2: 'Conselho Nacional de Justiça',
+    3: 'Superior Tribunal de Justiça',
+    4: 'Justiça Federal',
+    5: 'Justiça do Trabalho',
+    6: 'Justiça Eleitoral',
+    7: 'Justiça Militar da União',
+    8: 'Justiça Estadual',
+    9: 'Justiça Militar Estadual',
+}
+
+CAMPOS = ('cnj_ano', 'cnj_segmento', 'cnj_tribunal', 'cnj_origem')
+
+NumeroCNJ = namedtuple('NumeroCNJ', 'sequencial digito ano segmento tribunal origem')
+
+
+def somente_digitos(numero):
+    return re.sub(r'\D', '', numero or '')
+
+
+def calcular_digito(sequencial, ano, segmento, tribunal, origem):
+    """Dígito verificador: 98 - (NNNNNNN AAAA J TR OOOO 00 mod 97)"""
+    base = f'{sequencial}{ano}{segmento}{tribunal}{origem}00'
+    return f'{98 - int(base) % 97:02d}'
+
+
+def interpretar(numero):
+    """
+    Decompõe um número CNJ, formatado ou só com dígitos.
+
+    Retorna NumeroCNJ (com os componentes como texto) ou None se o número não
+    tiver 20 dígitos ou se o dígito verificador não conferir.
+    """
+    digitos = somente_digitos(numero)
+    if len(digitos) != 20:
+        return None
+    partes = NumeroCNJ(
+        sequencial=digitos[0:7],
+        digito=digitos[7:9],
+        ano=digitos[9:13],
+        segmento=digitos[13],
+        tribunal=digitos[14:16],
+        origem=digitos[16:20],
+    )
+    if calcular_digito(partes.sequencial, partes.ano, partes.segmento, partes.tribunal, partes.origem) != partes.digito:
+        return None
+    return partes
+
+
+def validar(numero):
+    return interpretar(numero) is not None
+
+
+def formatar(numero):
+    """Número no formato NNNNNNN-DD.AAAA.J.TR.OOOO, ou None se não for um CNJ válido"""
+    partes = interpretar(numero)
+    return FORMATO.format(**partes._asdict()) if partes else None
+
+
+def normalizar(numero):
+    """Chave de busca: os 20 dígitos de um número CNJ ou, para outros formatos, os dígitos existentes"""
+    return somente_digitos(numero)
+
+
+def componentes(numero):
+    """Valores das colunas cnj_* de Processo (todos None para números fora do padrão)"""
+    partes = interpretar(numero)
+    if partes is None:
+        return dict.fromkeys(CAMPOS)
+    return {
+        'cnj_ano': int(partes.ano),
+        'cnj_segmento': int(partes.segmento),
+        'cnj_tribunal': int(partes.tribunal),
+        'cnj_origem': int(partes.origem),
+    }
+
+
+def encontrar(texto):
+    """Primeiro número CNJ válido citado em um texto, só com dígitos"""
+    for encontrado in PADRAO.finditer(texto or ''):
+        digitos = ''.join(encontrado.groups())
+        if validar(digitos):
+            return digitos
+    return None
+
+
+def buscar_processo(numero, queryset=None):
+    """Processo com o número informado (em qualquer formatação), por igualdade no índice"""
+    from .models import Processo
+
+    chave = normalizar(numero)
+    if not chave:
+        return None
+    queryset = queryset if queryset is not None else Processo.objects.all()
+    return queryset.filter(numero_normalizado=chave).first()
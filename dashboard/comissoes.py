@@ -0,0 +1,63 @@
+from decimal import Decimal
+
+from django.db.models import Count, DecimalField, ExpressionWrapper, F, Q, Sum, Value
+from django.db.models.functions import Coalesce
+
+from .models import Receita
+from users.models import Lawyer
+
+VALOR = DecimalField(max_digits=14, decimal_places=2)
+CEM = Value(Decimal('100.00'), output_field=VALOR)
+CENTESIMO = Value(Decimal('0.01'), output_field=VALOR)
+
+
+def parcela(valor):
+    """Parte do valor que cabe ao beneficiário, em aritmética decimal"""
+    # Multiplica por 0.01 em vez de dividir por 100: no SQLite o Decimal vai como texto e
+    # CAST('100.00' AS NUMERIC) vira inteiro, o que truncaria a divisão
+    percentual = Coalesce('participacoes__percentual', CEM, output_field=VALOR)
+    return ExpressionWrapper(valor * percentual * CENTESIMO, output_field=VALOR)
+
+
+def relatorio_comissoes(data_inicio, data_fim):
+    """
+    Calcula, por advogado, os honorários faturados e recebidos no período.
+
+    Receitas com rateio são distribuídas conforme RateioParticipacao; receitas sem
+    rateio contam 100% para o advogado da receita. Tudo é resolvido em uma única
+    consulta agrupada: o LEFT JOIN com as participações gera uma linha por
+    participante e o Coalesce cai para o advogado da receita quando não há rateio.
+    """
+    faturado_no_periodo = Q(data_vencimento__gte=data_inicio, data_vencimento__lte=data_fim)
+    recebido_no_periodo = Q(data_recebimento__gte=data_inicio, data_recebimento__lte=data_fim)
+
+    linhas = Receita.objects.filter(
+        faturado_no_periodo | recebido_no_periodo
+    ).annotate(
+        beneficiario=Coalesce('participacoes__advogado', 'advogado'),
+    ).filter(
+        beneficiario__isnull=False
+    ).values('beneficiario').annotate(
+        faturado=Coalesce(Sum(
+            parcela(F('valor_total') - F('desconto')),
+            filter=faturado_no_periodo,
+        ), Value(Decimal('0.00')), output_field=VALOR),
+        recebido=Coalesce(Sum(
+            parcela(Coalesce('valor_recebido', Value(Decimal('0.00')), output_field=VALOR)),
+            filter=recebido_no_periodo,
+        ), Value(Decimal('0.00')), output_field=VALOR),
+        receitas=Count('id', distinct=True),
+    ).order_by('-faturado')
+
+    linhas = list(linhas)
+    advogados = Lawyer.objects.in_bulk([linha['beneficiario'] for linha in linhas])
+
+    resultado = []
+    for linha in linhas:
+        resultado.append({
+            'advogado': advogados.get(linha['beneficiario']),
+            'faturado': linha['faturado'].quantize(Decimal('0.01')),
+            'recebido': linha['recebido'].quantize(Decimal('0.01')),
+            'receitas': linha['receitas'],
+        })
+    return resultado
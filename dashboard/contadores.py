@@ -0,0 +1,103 @@
+"""
+Contadores desnormalizados de Cliente (total faturado, total recebido, saldo em
+aberto, total bruto, número de processos e última movimentação).
+
+O total faturado é líquido dos descontos; o total bruto soma os valores cheios
+das receitas e é o que ordena o ranking de clientes do dashboard.
+
+As gravações de Receita e Processo aplicam apenas a diferença de cada contador
+com um UPDATE baseado em F(), na mesma transação da gravação; recalcular_clientes
+refaz os valores a partir das tabelas de origem e é usado pelo comando
+recalcular_contadores_clientes.
+"""
+from decimal import Decimal
+
+from django.db.models import Count, DecimalField, ExpressionWrapper, F, Max, Q, Sum, Value
+from django.db.models.functions import Coalesce, Greatest
+from django.utils import timezone
+
+from . import versoes
+from .models import Cliente, Processo, Receita
+
+VALOR = DecimalField(max_digits=14, decimal_places=2)
+ZERO = Decimal('0.00')
+
+
+def valor_decimal(valor):
+    """Converte o valor do campo (que pode vir como texto do formulário) em Decimal"""
+    if valor in (None, ''):
+        return ZERO
+    return Decimal(str(valor))
+
+
+def contribuicao_receita(valor_total, desconto, valor_recebido, pago):
+    """Quanto uma receita soma em (faturado, recebido, saldo em aberto, bruto) do cliente"""
+    bruto = valor_decimal(valor_total)
+    faturado = bruto - valor_decimal(desconto)
+    recebido = valor_decimal(valor_recebido)
+    aberto = ZERO if pago else max(faturado - recebido, ZERO)
+    return faturado, recebido, aberto, bruto
+
+
+def contribuicao_de(receita):
+    return contribuicao_receita(receita.valor_total, receita.desconto, receita.valor_recebido, receita.pago)
+
+
+def movimentar_cliente(cliente_id, faturado=ZERO, recebido=ZERO, aberto=ZERO, bruto=ZERO, processos=0):
+    """Aplica as diferenças nos contadores do cliente com um único UPDATE atômico"""
+    if not cliente_id:
+        return
+    alteracoes = {'ultima_movimentacao': timezone.now()}
+    if faturado:
+        alteracoes['total_faturado'] = F('total_faturado') + faturado
+    if recebido:
+        alteracoes['total_recebido'] = F('total_recebido') + recebido
+    if aberto:
+        alteracoes['saldo_aberto'] = Greatest(F('saldo_aberto') + aberto, Value(ZERO), output_field=VALOR)
+    if bruto:
+        alteracoes['total_bruto'] = F('total_bruto') + bruto
+    if processos:
+        alteracoes['numero_processos'] = Greatest(F('numero_processos') + processos, Value(0))
+    Cliente.objects.filter(pk=cliente_id).update(**alteracoes)
+
+
+def recalcular_clientes(ids):
+    """Recalcula os contadores dos clientes informados a partir de receitas e processos"""
+    ids = list(ids)
+    saldo = ExpressionWrapper(
+        F('valor_total') - F('desconto') - Coalesce('valor_recebido', Value(ZERO)),
+        output_field=VALOR,
+    )
+    receitas = {
+        linha['cliente_id']: linha
+        for linha in Receita.objects.filter(cliente_id__in=ids).annotate(saldo=saldo).values('cliente_id').annotate(
+            faturado=Coalesce(Sum(F('valor_total') - F('desconto'), output_field=VALOR), Value(ZERO), output_field=VALOR),
+            recebido=Coalesce(Sum('valor_recebido'), Value(ZERO), output_field=VALOR),
+            aberto=Coalesce(Sum('saldo', filter=Q(pago=False, saldo__gt=0)), Value(ZERO), output_field=VALOR),
+            bruto=Coalesce(Sum('valor_total'), Value(ZERO), output_field=VALOR),
+            ultima=Max('data_atualizacao'),
+        ).order_by()
+    }
+    processos = dict(
+        Processo.objects.filter(cliente_id__in=ids).values('cliente_id').annotate(
+            quantidade=Count('id')
+        ).order_by().values_list('cliente_id', 'quantidade')
+    )
+
+    clientes = list(Cliente.objects.filter(pk__in=ids).only('pk', 'ultima_movimentacao'))
+    for cliente in clientes:
+        linha = receitas.get(cliente.pk, {})
+        cliente.total_faturado = linha.get('faturado', ZERO)
+        cliente.total_recebido = linha.get('recebido', ZERO)
+        cliente.saldo_aberto = linha.get('aberto', ZERO)
+        cliente.total_bruto = linha.get('bruto', ZERO)
+        cliente.numero_processos = processos.get(cliente.pk, 0)
+        if linha.get('ultima') and (not cliente.ultima_movimentacao or linha['ultima'] > cliente.ultima_movimentacao):
+            cliente.ultima_movimentacao = linha['ultima']
+
+    Cliente.objects.bulk_update(
+        clientes,
+        ['total_faturado', 'total_recebido', 'saldo_aberto', 'total_bruto', 'numero_processos', 'ultima_movimentacao'],
+    )
+    versoes.incrementar(Cliente)
+    return len(clientes)
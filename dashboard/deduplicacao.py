@@ -0,0 +1,347 @@
+"""
+Detecção e mesclagem de clientes duplicados (dashboard.Cliente e finance.Client).
+
+Em vez de comparar todos os pares, cada cadastro recebe chaves de bloqueio
+(CPF/CNPJ só com dígitos, e-mail normalizado e código fonético de primeiro e
+último nome + cidade) e só são pontuados os pares que compartilham uma chave.
+Blocos muito grandes (nomes comuns em cidades grandes) são ignorados para a
+chave de nome, mantendo o custo próximo de linear no número de cadastros.
+"""
+import re
+import unicodedata
+from difflib import SequenceMatcher
+from itertools import combinations
+
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from finance.models import Client, FinancialCase
+from users import tenancy
+
+from . import arquivo, expurgo, extratos, versoes
+from .contadores import recalcular_clientes
+from .models import Cliente, DuplicidadeCliente
+
+LIMIAR = 55
+MAX_BLOCO = 100
+TAMANHO_LOTE = 5000
+
+PREPOSICOES = {'DA', 'DAS', 'DE', 'DI', 'DO', 'DOS', 'E'}
+
+# Regras fonéticas simplificadas para nomes em português, aplicadas em ordem
+REGRAS_FONETICAS = [
+    (re.compile(r'PH'), 'F'),
+    (re.compile(r'TH'), 'T'),
+    (re.compile(r'[CS]H'), 'X'),
+    (re.compile(r'LH'), 'L'),
+    (re.compile(r'NH'), 'N'),
+    (re.compile(r'GU(?=[EI])'), 'G'),
+    (re.compile(r'G(?=[EI])'), 'J'),
+    (re.compile(r'C(?=[EI])'), 'S'),
+    (re.compile(r'QU?|C'), 'K'),
+    (re.compile(r'Y'), 'I'),
+    (re.compile(r'W'), 'V'),
+    (re.compile(r'Z'), 'S'),
+    (re.compile(r'H'), ''),
+    (re.compile(r'(?<=.)[AEIOU]'), ''),
+    (re.compile(r'(.)\1+'), r'\1'),
+]
+
+
+def normalizar_texto(valor):
+    """Maiúsculas, sem acentos e sem pontuação"""
+    if not valor:
+        return ''
+    valor = unicodedata.normalize('NFKD', valor).encode('ascii', 'ignore').decode('ascii')
+    return ' '.join(re.sub(r'[^A-Z0-9 ]', ' ', valor.upper()).split())
+
+
+def somente_digitos(valor):
+    return re.sub(r'\D', '', valor or '')
+
+
+def normalizar_documento(valor):
+    """CPF/CNPJ só com dígitos; descarta valores curtos ou com todos os dígitos iguais"""
+    digitos = somente_digitos(valor)
+    if len(digitos) not in (11, 14) or len(set(digitos)) == 1:
+        return ''
+    return digitos
+
+
+def normalizar_email(valor):
+    return (valor or '').strip().lower()
+
+
+def codigo_fonetico(palavra):
+    for regra, substituto in REGRAS_FONETICAS:
+        palavra = regra.sub(substituto, palavra)
+    return palavra
+
+
+def chave_nome(nome, cidade):
+    """Código fonético do primeiro e do último nome, mais a cidade normalizada"""
+    partes = [parte for parte in normalizar_texto(nome).split() if parte not in PREPOSICOES]
+    if not partes:
+        return ''
+    return f'{codigo_fonetico(partes[0])}:{codigo_fonetico(partes[-1])}:{normalizar_texto(cidade)}'
+
+
+def carregar_cadastros():
+    """
+    Cadastros das duas tabelas em tuplas compactas:
+    (origem, id, nome, documento, email, telefone, cidade, nome_mae, chave_nome),
+    já normalizados.
+    """
+    consultas = [
+        ('cliente', Cliente.objects.values_list('id', 'nome', 'cpf_cnpj', 'email', 'telefone', 'cidade', 'nome_mae')),
+        ('financeiro', Client.objects.values_list('id', 'name', 'cpf', 'email', 'phone', 'city', 'mother_name')),
+    ]
+    cadastros = []
+    for origem, consulta in consultas:
+        for pk, nome, documento, email, telefone, cidade, nome_mae in consulta.order_by().iterator(chunk_size=TAMANHO_LOTE):
+            cadastros.append((
+                origem,
+                pk,
+                normalizar_texto(nome),
+                normalizar_documento(documento),
+                normalizar_email(email),
+                somente_digitos(telefone)[-8:],
+                normalizar_texto(cidade),
+                normalizar_texto(nome_mae),
+                chave_nome(nome, cidade),
+            ))
+    return cadastros
+
+
+def gerar_blocos(cadastros):
+    """Índices dos cadastros agrupados por chave de bloqueio"""
+    blocos = {}
+    for indice, cadastro in enumerate(cadastros):
+        _, _, _, documento, email, _, _, _, nome = cadastro
+        if documento:
+            blocos.setdefault(('documento', documento), []).append(indice)
+        if email:
+            blocos.setdefault(('email', email), []).append(indice)
+        if nome:
+            blocos.setdefault(('nome', nome), []).append(indice)
+    return blocos
+
+
+def pontuar(a, b):
+    """Pontuação de 0 a 100 e motivos da semelhança entre dois cadastros"""
+    _, _, nome_a, documento_a, email_a, telefone_a, cidade_a, mae_a, _ = a
+    _, _, nome_b, documento_b, email_b, telefone_b, cidade_b, mae_b, _ = b
+
+    if documento_a and documento_b and documento_a != documento_b:
+        # Documentos diferentes: pessoas diferentes, mesmo com nomes parecidos
+        return 0, []
+
+    pontuacao = 0
+    motivos = []
+    if documento_a and documento_a == documento_b:
+        pontuacao += 60
+        motivos.append('documento')
+    if email_a and email_a == email_b:
+        pontuacao += 25
+        motivos.append('email')
+    semelhanca = SequenceMatcher(None, nome_a, nome_b).ratio()
+    if semelhanca >= 0.8:
+        motivos.append('nome')
+    pontuacao += int(30 * semelhanca)
+    if telefone_a and len(telefone_a) == 8 and telefone_a == telefone_b:
+        pontuacao += 10
+        motivos.append('telefone')
+    if mae_a and mae_a == mae_b:
+        pontuacao += 10
+        motivos.append('nome_mae')
+    if cidade_a and cidade_a == cidade_b:
+        pontuacao += 5
+    return min(pontuacao, 100), motivos
+
+
+def detectar_duplicidades(limiar=LIMIAR, max_bloco=MAX_BLOCO):
+    """
+    Pontua os pares candidatos e grava na fila de revisão os que atingem o limiar.
+
+    Cada escritório é comparado só com os próprios cadastros. Pares já
+    revisados (mesclados ou descartados) não voltam para a fila.
+    Retorna (pares avaliados, pares acima do limiar).
+    """
+    avaliados = acima = 0
+    for _ in tenancy.each_escritorio():
+        escritorio_avaliados, escritorio_acima = _detectar(limiar, max_bloco)
+        avaliados += escritorio_avaliados
+        acima += escritorio_acima
+    return avaliados, acima
+
+
+def _detectar(limiar, max_bloco):
+    cadastros = carregar_cadastros()
+    blocos = gerar_blocos(cadastros)
+
+    avaliados = set()
+    novos = []
+    for (tipo, _), indices in blocos.items():
+        if len(indices) < 2 or (tipo == 'nome' and len(indices) > max_bloco):
+            continue
+        for i, j in combinations(indices, 2):
+            par = (i, j) if cadastros[i][:2] < cadastros[j][:2] else (j, i)
+            if par in avaliados:
+                continue
+            avaliados.add(par)
+            a, b = cadastros[par[0]], cadastros[par[1]]
+            pontuacao, motivos = pontuar(a, b)
+            if pontuacao >= limiar:
+                novos.append(DuplicidadeCliente(
+                    origem_a=a[0], id_a=a[1],
+                    origem_b=b[0], id_b=b[1],
+                    pontuacao=pontuacao,
+                    motivos=','.join(motivos),
+                ))
+
+    DuplicidadeCliente.objects.bulk_create(novos, batch_size=1000, ignore_conflicts=True)
+    return len(avaliados), len(novos)
+
+
+def _encerrar_pares(origem, ids_removidos, destino_id):
+    """
+    Pares pendentes que citam cadastros removidos: o par mesclado é fechado e os
+    demais são descartados (a próxima detecção reavalia o cadastro mantido).
+    """
+    citam_removidos = Q(origem_a=origem, id_a__in=ids_removidos) | Q(origem_b=origem, id_b__in=ids_removidos)
+    pendentes = DuplicidadeCliente.objects.filter(citam_removidos, status='pendente')
+    pendentes.filter(
+        Q(origem_a=origem, id_a=destino_id) | Q(origem_b=origem, id_b=destino_id)
+    ).update(status='mesclado', data_revisao=timezone.now())
+    pendentes.update(status='descartado', data_revisao=timezone.now())
+
+
+def _completar_campos(destino, origens, campos):
+    """Preenche campos vazios do cadastro mantido com os valores dos removidos"""
+    alterados = []
+    for campo in campos:
+        if getattr(destino, campo):
+            continue
+        for origem in origens:
+            if getattr(origem, campo):
+                setattr(destino, campo, getattr(origem, campo))
+                alterados.append(campo)
+                break
+    return alterados
+
+
+@transaction.atomic
+def mesclar_clientes(destino, origens):
+    """
+    Mescla clientes do dashboard em `destino`.
+
+    Tudo o que aponta para os cadastros de origem (as relações reversas de
+    Cliente: processos, receitas, tarefas, atividades, documentos...) é
+    reapontado com um UPDATE por tabela; os cadastros de origem são removidos
+    sem cascata e os contadores do destino são recalculados.
+    """
+    origens = [origem for origem in origens if origem.pk != destino.pk]
+    ids = [origem.pk for origem in origens]
+    if not ids:
+        return destino
+
+    # Lidas dos metadados, como no expurgo: um vínculo novo com Cliente não fica para trás.
+    # As um-para-um (o extrato) são do próprio cadastro e saem com ele
+    reapontados = []
+    for relacao in expurgo.dependencias(Cliente):
+        if relacao.one_to_many:
+            campo = relacao.field.name
+            if relacao.related_model._base_manager.filter(**{f'{campo}__in': ids}).update(**{campo: destino}):
+                reapontados.append(relacao.related_model)
+    # As linhas do arquivo frio guardam a chave no JSON
+    arquivo.reapontar(Cliente, ids, destino.pk)
+    # Os UPDATEs em lote não disparam sinais: invalida os validadores HTTP aqui
+    versoes.incrementar(Cliente, *(modelo for modelo in reapontados if modelo._meta.label in versoes.MODELOS))
+
+    vinculos = [origem.cliente_financeiro_id for origem in origens if origem.cliente_financeiro_id]
+    campos = _completar_campos(destino, origens, ['nome_mae', 'email', 'telefone', 'endereco', 'cidade', 'estado'])
+    Cliente.objects.filter(pk__in=ids).update(cliente_financeiro=None)
+    if vinculos:
+        if destino.cliente_financeiro_id:
+            mesclar_clients_financeiros(destino.cliente_financeiro, Client.objects.filter(pk__in=vinculos))
+        else:
+            destino.cliente_financeiro_id = vinculos[0]
+            campos.append('cliente_financeiro')
+            if len(vinculos) > 1:
+                mesclar_clients_financeiros(Client.objects.get(pk=vinculos[0]), Client.objects.filter(pk__in=vinculos[1:]))
+    if campos:
+        destino.save(update_fields=campos)
+
+    Cliente.objects.filter(pk__in=ids).delete()
+    recalcular_clientes([destino.pk])
+    extratos.marcar(destino.pk)
+    _encerrar_pares('cliente', ids, destino.pk)
+    return destino
+
+
+@transaction.atomic
+def mesclar_clients_financeiros(destino, origens):
+    """Mescla clientes do financeiro em `destino`, reapontando os casos financeiros"""
+    origens = [origem for origem in origens if origem.pk != destino.pk]
+    ids = [origem.pk for origem in origens]
+    if not ids:
+        return destino
+
+    FinancialCase.objects.filter(client_id__in=ids).update(client=destino)
+
+    vinculado = Cliente.objects.filter(cliente_financeiro=destino).exists()
+    if vinculado:
+        Cliente.objects.filter(cliente_financeiro_id__in=ids).update(cliente_financeiro=None)
+    else:
+        # Mantém um dos vínculos existentes com o dashboard, se houver
+        cliente_id = Cliente.objects.filter(cliente_financeiro_id__in=ids).values_list('pk', flat=True).first()
+        Cliente.objects.filter(cliente_financeiro_id__in=ids).update(cliente_financeiro=None)
+        if cliente_id:
+            Cliente.objects.filter(pk=cliente_id).update(cliente_financeiro=destino)
+
+    campos = _completar_campos(destino, origens, ['email', 'phone', 'address', 'mother_name', 'city', 'state'])
+    if campos:
+        destino.save(update_fields=campos)
+
+    Client.objects.filter(pk__in=ids).delete()
+    _encerrar_pares('financeiro', ids, destino.pk)
+    return destino
+
+
+def carregar_cadastro(origem, pk):
+    modelo = Cliente if origem == 'cliente' else Client
+    return modelo.objects.get(pk=pk)
+
+
+@transaction.atomic
+def resolver_duplicidade(duplicidade, acao, usuario, manter='a'):
+    """
+    Aplica a decisão da revisão: 'descartar' ou 'mesclar'.
+
+    Pares da mesma origem são mesclados no cadastro escolhido em `manter`; pares
+    entre dashboard e financeiro passam a ser vinculados pelo campo
+    Cliente.cliente_financeiro.
+    """
+    if acao == 'mesclar':
+        a = carregar_cadastro(duplicidade.origem_a, duplicidade.id_a)
+        b = carregar_cadastro(duplicidade.origem_b, duplicidade.id_b)
+        if duplicidade.origem_a == duplicidade.origem_b:
+            destino, origem = (a, b) if manter == 'a' else (b, a)
+            mesclar = mesclar_clientes if duplicidade.origem_a == 'cliente' else mesclar_clients_financeiros
+            mesclar(destino, [origem])
+        else:
+            cliente, client = (a, b) if duplicidade.origem_a == 'cliente' else (b, a)
+            if cliente.cliente_financeiro_id and cliente.cliente_financeiro_id != client.pk:
+                mesclar_clients_financeiros(cliente.cliente_financeiro, [client])
+            else:
+                Cliente.objects.filter(cliente_financeiro=client).exclude(pk=cliente.pk).update(cliente_financeiro=None)
+                cliente.cliente_financeiro = client
+                cliente.save(update_fields=['cliente_financeiro'])
+        status = 'mesclado'
+    else:
+        status = 'descartado'
+
+    DuplicidadeCliente.objects.filter(pk=duplicidade.pk).update(
+        status=status, revisado_por=usuario, data_revisao=timezone.now()
+    )
@@ -0,0 +1,456 @@
+"""
+Geração de documentos (recibos e contratos de honorários).
+
+Cada tipo de documento é registrado com @documento, com o template em
+dashboard/templates/dashboard/documentos/ e uma função que monta, com poucas
+consultas em lote, o contexto de muitos objetos de uma vez (dicionários
+simples, que podem ser enviados a outros processos).
+
+- Os templates são compilados uma vez por processo (compilado()).
+- Cada documento tem uma assinatura: o hash do template e do contexto. Se já
+  existe um DocumentoGerado com a mesma assinatura e o arquivo está no disco,
+  ele é reaproveitado sem renderizar de novo; rodar de novo o lote do mês só
+  gera os documentos cujos dados mudaram.
+- gerar() produz um documento na própria requisição; gerar_lote() distribui
+  os documentos pendentes em um pool de processos (o job documentos.gerar_lote
+  e o comando gerar_documentos), informando o andamento a cada bloco.
+- Os arquivos ficam em settings.DOCUMENTOS_ROOT, em
+  <tipo>/<aaaa>/<mm>/<tipo>-<id>-<assinatura>.html, prontos para impressão.
+"""
+import hashlib
+import json
+import multiprocessing
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import date
+from decimal import Decimal
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connections, transaction
+from django.template.loader import get_template
+from django.utils import timezone
+
+from . import eventos, processo_worker, versoes
+from users.models import Escritorio
+
+from .models import AtividadeRecente, DocumentoGerado, Processo, Receita
+
+DOCUMENTOS = {}
+TAMANHO_BLOCO = getattr(settings, 'DOCUMENTOS_TAMANHO_BLOCO', 200)
+PROCESSOS = getattr(settings, 'DOCUMENTOS_PROCESSOS', os.cpu_count() or 1)
+# Abaixo disso, iniciar o pool custa mais do que renderizar no próprio processo
+MINIMO_POOL = 2 * TAMANHO_BLOCO
+
+
+class Documento:
+    def __init__(self, nome, titulo, template, contextos, campo):
+        self.nome = nome
+        self.titulo = titulo
+        self.template = template
+        self.contextos = contextos
+        self.campo = campo
+
+
+def documento(nome, titulo, template, campo):
+    """
+    Registra a função que monta os contextos de um tipo de documento.
+
+    A função recebe uma lista de ids e retorna {id: contexto}; `campo` é o
+    vínculo de DocumentoGerado com o objeto de origem ('receita' ou 'processo').
+    """
+    def registrar(funcao):
+        DOCUMENTOS[nome] = Documento(nome, titulo, template, funcao, campo)
+        return funcao
+    return registrar
+
+
+_compilados = {}
+
+
+def versao_template(caminho):
+    """Hash do arquivo do template: documentos gerados com outra versão são refeitos"""
+    with open(caminho, 'rb') as arquivo:
+        return hashlib.sha256(arquivo.read()).hexdigest()[:16]
+
+
+def compilado(documento):
+    """
+    (template compilado, versão) do documento. O template é compilado uma vez
+    por processo; com DEBUG, é recompilado quando o arquivo muda.
+    """
+    cache = _compilados.get(documento.nome)
+    if cache is not None:
+        template, versao, caminho, modificado = cache
+        if not settings.DEBUG or os.path.getmtime(caminho) == modificado:
+            return template, versao
+    template = get_template(documento.template)
+    caminho = template.origin.name
+    _compilados[documento.nome] = (template, versao_template(caminho), caminho, os.path.getmtime(caminho))
+    return _compilados[documento.nome][:2]
+
+
+# Valor por extenso (recibos)
+
+UNIDADES = [
+    '', 'um', 'dois', 'três', 'quatro', 'cinco', 'seis', 'sete', 'oito', 'nove', 'dez', 'onze', 'doze',
+    'treze', 'quatorze', 'quinze', 'dezesseis', 'dezessete', 'dezoito', 'dezenove',
+]
+DEZENAS = ['', '', 'vinte', 'trinta', 'quarenta', 'cinquenta', 'sessenta', 'setenta', 'oitenta', 'noventa']
+CENTENAS = [
+    '', 'cento', 'duzentos', 'trezentos', 'quatrocentos', 'quinhentos', 'seiscentos', 'setecentos',
+    'oitocentos', 'novecentos',
+]
+ESCALAS = [('', ''), ('mil', 'mil'), ('milhão', 'milhões'), ('bilhão', 'bilhões')]
+
+
+def ate_mil(numero):
+    if numero == 100:
+        return 'cem'
+    partes = []
+    if numero >= 100:
+        partes.append(CENTENAS[numero // 100])
+    resto = numero % 100
+    if resto >= 20:
+        partes.append(DEZENAS[resto // 10] + (f' e {UNIDADES[resto % 10]}' if resto % 10 else ''))
+    elif resto:
+        partes.append(UNIDADES[resto])
+    return ' e '.join(partes)
+
+
+def inteiro_por_extenso(numero):
+    if numero == 0:
+        return 'zero'
+    grupos = []
+    escala = 0
+    while numero:
+        numero, grupo = divmod(numero, 1000)
+        if grupo:
+            singular, plural = ESCALAS[escala]
+            texto = 'mil' if escala == 1 and grupo == 1 else ate_mil(grupo)
+            if escala == 1 and grupo > 1:
+                texto += ' mil'
+            elif escala > 1:
+                texto += ' ' + (singular if grupo == 1 else plural)
+            grupos.append((grupo, texto))
+        escala += 1
+    grupos.reverse()
+    texto = grupos[0][1]
+    for grupo, parte in grupos[1:]:
+        texto += (' e ' if grupo < 100 or grupo % 100 == 0 else ' ') + parte
+    return texto
+
+
+def por_extenso(valor):
+    """Valor em reais por extenso: Decimal('1520.30') -> 'mil quinhentos e vinte reais e trinta centavos'"""
+    valor = Decimal(valor or 0).quantize(Decimal('0.01'))
+    reais, centavos = divmod(int(valor * 100), 100)
+    partes = []
+    if reais:
+        texto = inteiro_por_extenso(reais)
+        # "um milhão de reais", "dois bilhões de reais"
+        if reais % 1_000_000 == 0:
+            texto += ' de'
+        partes.append(f'{texto} {"real" if reais == 1 else "reais"}')
+    if centavos:
+        partes.append(f'{inteiro_por_extenso(centavos)} {"centavo" if centavos == 1 else "centavos"}')
+    return ' e '.join(partes) or 'zero real'
+
+
+# Tipos de documento
+
+CAMPOS_CLIENTE = ['nome', 'cpf_cnpj', 'email', 'telefone', 'endereco', 'cidade', 'estado']
+
+
+def prefixados(linha, prefixo, campos):
+    return {campo: linha[f'{prefixo}{campo}'] for campo in campos}
+
+
+def nome_advogado(linha, prefixo):
+    nome = f"{linha[f'{prefixo}first_name'] or ''} {linha[f'{prefixo}last_name'] or ''}".strip()
+    return {
+        'nome': nome or linha[f'{prefixo}username'],
+        'oab': linha[f'{prefixo}oab_number'],
+        'oab_seccional': linha[f'{prefixo}oab_section'],
+    }
+
+
+@documento('recibo', 'Recibo', 'dashboard/documentos/recibo.html', campo='receita')
+def contextos_recibo(ids):
+    campos_advogado = ['first_name', 'last_name', 'username', 'oab_number', 'oab_section']
+    contextos = {}
+    for linha in Receita.objects.filter(pk__in=ids).values(
+        'pk', 'escritorio_id', 'descricao', 'valor_total', 'desconto', 'valor_recebido', 'data_vencimento',
+        'data_recebimento', 'pago', 'observacoes', 'cliente_id', 'processo_id', 'processo__numero', 'processo__titulo',
+        'forma_pagamento__nome', 'tipo__nome',
+        *(f'cliente__{campo}' for campo in CAMPOS_CLIENTE),
+        *(f'advogado__{campo}' for campo in campos_advogado),
+    ).order_by():
+        valor = linha['valor_recebido'] if linha['valor_recebido'] is not None else linha['valor_total'] - linha['desconto']
+        contextos[linha['pk']] = {
+            'escritorio_id': linha['escritorio_id'],
+            'cliente_id': linha['cliente_id'],
+            'processo_id': linha['processo_id'],
+            'cliente': prefixados(linha, 'cliente__', CAMPOS_CLIENTE),
+            'processo': {'numero': linha['processo__numero'], 'titulo': linha['processo__titulo']} if linha['processo_id'] else None,
+            'advogado': nome_advogado(linha, 'advogado__') if linha['advogado__username'] else None,
+            'receita': {
+                'numero': linha['pk'],
+                'descricao': linha['descricao'],
+                'tipo': linha['tipo__nome'],
+                'valor': valor,
+                'valor_extenso': por_extenso(valor),
+                'data_vencimento': linha['data_vencimento'],
+                'data_recebimento': linha['data_recebimento'],
+                'pago': linha['pago'],
+                'forma_pagamento': linha['forma_pagamento__nome'],
+                'observacoes': linha['observacoes'],
+            },
+        }
+    return contextos
+
+
+@documento('contrato_honorarios', 'Contrato de Honorários', 'dashboard/documentos/contrato_honorarios.html', campo='processo')
+def contextos_contrato(ids):
+    campos_advogado = ['first_name', 'last_name', 'username', 'oab_number', 'oab_section']
+    contextos = {}
+    for linha in Processo.objects.filter(pk__in=ids).values(
+        'pk', 'escritorio_id', 'numero', 'titulo', 'descricao', 'tribunal', 'vara', 'valor_causa', 'data_inicio',
+        'cliente_id',
+        *(f'cliente__{campo}' for campo in CAMPOS_CLIENTE),
+        *(f'advogado_responsavel__{campo}' for campo in campos_advogado),
+    ).order_by():
+        contextos[linha['pk']] = {
+            'escritorio_id': linha['escritorio_id'],
+            'cliente_id': linha['cliente_id'],
+            'processo_id': linha['pk'],
+            'cliente': prefixados(linha, 'cliente__', CAMPOS_CLIENTE),
+            'advogado': nome_advogado(linha, 'advogado_responsavel__'),
+            'processo': {
+                campo: linha[campo]
+                for campo in ('numero', 'titulo', 'descricao', 'tribunal', 'vara', 'valor_causa', 'data_inicio')
+            },
+            'parcelas': [],
+            'valor_total': Decimal('0.00'),
+        }
+    for linha in Receita.objects.filter(processo_id__in=contextos).values(
+        'processo_id', 'descricao', 'valor_total', 'desconto', 'data_vencimento',
+    ).order_by('data_vencimento', 'pk'):
+        contexto = contextos[linha['processo_id']]
+        valor = linha['valor_total'] - linha['desconto']
+        contexto['parcelas'].append({'descricao': linha['descricao'], 'valor': valor, 'data_vencimento': linha['data_vencimento']})
+        contexto['valor_total'] += valor
+    for contexto in contextos.values():
+        contexto['valor_total_extenso'] = por_extenso(contexto['valor_total'])
+    return contextos
+
+
+# Renderização
+
+def armazenamento():
+    from django.core.files.storage import FileSystemStorage
+
+    return FileSystemStorage(location=settings.DOCUMENTOS_ROOT)
+
+
+def assinatura(versao, contexto):
+    conteudo = json.dumps([versao, contexto], cls=DjangoJSONEncoder, sort_keys=True)
+    return hashlib.sha256(conteudo.encode()).hexdigest()
+
+
+def nome_arquivo(nome, objeto_id, assinatura_documento, quando):
+    return f'{nome}/{quando:%Y}/{quando:%m}/{nome}-{objeto_id}-{assinatura_documento[:16]}.html'
+
+
+def gravar(caminho, conteudo):
+    """Grava o arquivo de forma atômica (nunca fica um documento pela metade no disco)"""
+    os.makedirs(os.path.dirname(caminho), exist_ok=True)
+    descritor, temporario = tempfile.mkstemp(dir=os.path.dirname(caminho), suffix='.tmp')
+    with os.fdopen(descritor, 'w', encoding='utf-8') as arquivo:
+        arquivo.write(conteudo)
+    os.replace(temporario, caminho)
+    return len(conteudo.encode('utf-8'))
+
+
+def renderizar(nome, itens):
+    """
+    Renderiza e grava os itens [(objeto_id, assinatura, arquivo, contexto)];
+    retorna [(objeto_id, assinatura, arquivo, tamanho)]. Roda também nos
+    processos do pool, sem acessar o banco.
+    """
+    documento = DOCUMENTOS[nome]
+    template, _ = compilado(documento)
+    extras = {'titulo': documento.titulo, 'emitido_em': timezone.localdate()}
+    local = armazenamento()
+    resultado = []
+    for objeto_id, assinatura_documento, arquivo, contexto in itens:
+        tamanho = gravar(local.path(arquivo), template.render({**extras, **contexto}))
+        resultado.append((objeto_id, assinatura_documento, arquivo, tamanho))
+    return resultado
+
+
+def cabecalhos(contextos):
+    """Papel timbrado: nome e descrição do escritório de cada objeto (settings.ESCRITORIO para os sem escritório)"""
+    escritorios = {
+        pk: {'nome': nome, 'descricao': descricao}
+        for pk, nome, descricao in Escritorio.objects.filter(
+            pk__in={contexto['escritorio_id'] for contexto in contextos.values()},
+        ).values_list('pk', 'nome', 'descricao')
+    }
+    for contexto in contextos.values():
+        contexto['escritorio'] = escritorios.get(contexto['escritorio_id'], settings.ESCRITORIO)
+
+
+def preparar(documento, ids):
+    """
+    Separa os documentos já gerados com a mesma assinatura (cache) dos que
+    precisam ser renderizados. Retorna (ids dos DocumentoGerado reaproveitados,
+    itens pendentes).
+    """
+    _, versao = compilado(documento)
+    contextos = documento.contextos(ids)
+    # Entra no contexto (e na assinatura): mudar o nome do escritório gera os documentos de novo
+    cabecalhos(contextos)
+    assinaturas = {objeto_id: assinatura(versao, contexto) for objeto_id, contexto in contextos.items()}
+    existentes = {
+        chave: (documento_id, arquivo)
+        for chave, documento_id, arquivo in DocumentoGerado.objects.filter(
+            modelo=documento.nome, objeto_id__in=list(contextos), assinatura__in=list(assinaturas.values())
+        ).values_list('assinatura', 'id', 'arquivo')
+    }
+    local = armazenamento()
+    agora = timezone.localtime()
+    reaproveitados, pendentes = [], []
+    for objeto_id, contexto in contextos.items():
+        chave = assinaturas[objeto_id]
+        if chave in existentes and local.exists(existentes[chave][1]):
+            reaproveitados.append(existentes[chave][0])
+        else:
+            pendentes.append((objeto_id, chave, nome_arquivo(documento.nome, objeto_id, chave, agora), contexto))
+    return reaproveitados, pendentes
+
+
+def registrar(documento, gravados, contextos, usuario_id=None):
+    """Cria os DocumentoGerado dos arquivos gravados"""
+    return DocumentoGerado.objects.bulk_create([
+        DocumentoGerado(
+            modelo=documento.nome,
+            objeto_id=objeto_id,
+            assinatura=assinatura_documento,
+            arquivo=arquivo,
+            tamanho=tamanho,
+            cliente_id=contextos[objeto_id]['cliente_id'],
+            processo_id=contextos[objeto_id]['processo_id'],
+            receita_id=objeto_id if documento.campo == 'receita' else None,
+            usuario_id=usuario_id,
+        )
+        for objeto_id, assinatura_documento, arquivo, tamanho in gravados
+    ])
+
+
+def registrar_atividade(documento, quantidade, usuario_id, cliente_id=None, processo_id=None):
+    if not usuario_id or not quantidade:
+        return
+    descricao = (
+        f'{documento.titulo} gerado' if quantidade == 1 else f'{quantidade} documentos "{documento.titulo}" gerados'
+    )
+    # Atividade única por lote; a gravação em lote não dispara os sinais
+    atividades = AtividadeRecente.objects.bulk_create([AtividadeRecente(
+        tipo='documento_gerado', descricao=descricao[:300], usuario_id=usuario_id,
+        cliente_id=cliente_id, processo_id=processo_id,
+    )])
+    versoes.incrementar(AtividadeRecente)
+    eventos.atividades_criadas(atividades)
+
+
+def gerar(nome, objeto_id, usuario=None):
+    """Gera (ou reaproveita) um documento na própria requisição e retorna o DocumentoGerado"""
+    documento = DOCUMENTOS[nome]
+    reaproveitados, pendentes = preparar(documento, [objeto_id])
+    if reaproveitados:
+        return DocumentoGerado.objects.get(pk=reaproveitados[0])
+    if not pendentes:
+        raise LookupError(f'{documento.titulo}: objeto {objeto_id} não encontrado')
+    contextos = {item[0]: item[3] for item in pendentes}
+    with transaction.atomic():
+        gerado, = registrar(documento, renderizar(nome, pendentes), contextos, usuario.pk if usuario else None)
+        registrar_atividade(
+            documento, 1, usuario.pk if usuario else None,
+            contextos[objeto_id]['cliente_id'], contextos[objeto_id]['processo_id'],
+        )
+    return gerado
+
+
+def ids_do_lote(nome, mes=None, ids=None):
+    """
+    Ids dos objetos de um lote: os informados ou, com `mes` ('aaaa-mm'), as
+    receitas pagas no mês (recibos) ou os processos iniciados no mês (contratos).
+    """
+    if ids:
+        return list(ids)
+    ano, numero = (int(parte) for parte in mes.split('-'))
+    inicio = date(ano, numero, 1)
+    fim = date(ano + numero // 12, numero % 12 + 1, 1)
+    if DOCUMENTOS[nome].campo == 'receita':
+        consulta = Receita.objects.filter(pago=True, data_recebimento__gte=inicio, data_recebimento__lt=fim)
+    else:
+        consulta = Processo.objects.filter(data_inicio__gte=inicio, data_inicio__lt=fim)
+    return list(consulta.order_by('pk').values_list('pk', flat=True))
+
+
+def blocos(itens, tamanho):
+    for inicio in range(0, len(itens), tamanho):
+        yield itens[inicio:inicio + tamanho]
+
+
+def gerar_lote(nome, ids, usuario_id=None, processos=None, progresso=None, tamanho_bloco=TAMANHO_BLOCO):
+    """
+    Gera os documentos de muitos objetos, reaproveitando os que não mudaram.
+
+    Os contextos são montados neste processo, em blocos, com consultas em lote;
+    a renderização e a gravação dos arquivos vão para um pool de `processos`
+    processos (1 renderiza aqui mesmo). `progresso(processados, total)` é
+    chamado a cada bloco concluído. Retorna o resumo do lote.
+    """
+    documento = DOCUMENTOS[nome]
+    ids = list(ids)
+    total = len(ids)
+    processos = PROCESSOS if processos is None else max(processos, 1)
+    resumo = {'total': total, 'gerados': 0, 'reaproveitados': 0, 'bytes': 0}
+    informar = progresso or (lambda processados, total: None)
+    informar(0, total)
+
+    reaproveitados, pendentes = [], []
+    for bloco in blocos(ids, 1000):
+        bloco_reaproveitados, bloco_pendentes = preparar(documento, bloco)
+        reaproveitados += bloco_reaproveitados
+        pendentes += bloco_pendentes
+    resumo['reaproveitados'] = len(reaproveitados)
+    processados = len(reaproveitados) + (total - len(reaproveitados) - len(pendentes))
+    informar(processados, total)
+    contextos = {item[0]: item[3] for item in pendentes}
+
+    def concluir(gravados):
+        nonlocal processados
+        registrar(documento, gravados, contextos, usuario_id)
+        resumo['gerados'] += len(gravados)
+        resumo['bytes'] += sum(item[3] for item in gravados)
+        processados += len(gravados)
+        informar(processados, total)
+
+    if processos == 1 or len(pendentes) < MINIMO_POOL:
+        for bloco in blocos(pendentes, tamanho_bloco):
+            concluir(renderizar(nome, bloco))
+    else:
+        # spawn: os processos não herdam as conexões abertas deste processo
+        connections.close_all()
+        with ProcessPoolExecutor(
+            processos, mp_context=multiprocessing.get_context('spawn'), initializer=processo_worker.iniciar,
+        ) as pool:
+            futuros = [pool.submit(processo_worker.renderizar_documentos, nome, bloco) for bloco in blocos(pendentes, tamanho_bloco)]
+            for futuro in as_completed(futuros):
+                concluir(futuro.result())
+
+    registrar_atividade(documento, resumo['gerados'], usuario_id)
+    return resumo
@@ -0,0 +1,230 @@
+"""
+Atualizações do dashboard em tempo real (Server-Sent Events).
+
+Os sinais dos modelos publicam pequenos eventos (atividade registrada,
+recebimento confirmado, audiência agendada, publicações não lidas) num canal
+em memória, depois do commit da transação. Cada conexão em
+dashboard/eventos/ recebe os eventos publicados a partir do momento em que
+entrou, um comentário de heartbeat a cada EVENTOS_HEARTBEAT segundos e é
+encerrada após EVENTOS_DURACAO_MAXIMA segundos; o EventSource do navegador
+reconecta sozinho enviando Last-Event-ID, e os eventos perdidos no intervalo
+são reenviados a partir do histórico do canal.
+
+O canal é por processo: eventos gravados em outro processo (o worker de jobs
+ou outro worker do servidor) não passam por ele. Para a contagem de
+publicações não lidas, que muda sobretudo nas importações feitas pelo
+worker, cada heartbeat confere a contagem no banco (com cache curto) e envia
+o novo valor quando ela muda. Se o histórico não cobre o Last-Event-ID (outro
+processo ou canal reiniciado), o cliente recebe 'sincronizar' e recarrega os
+widgets.
+
+Cada evento leva o escritório ativo ao ser publicado (users.tenancy), e cada
+conexão só recebe os do escritório do usuário. A contagem de não lidas
+publicada sem escritório (importações no worker) é conferida por conexão.
+"""
+import asyncio
+import json
+import threading
+import time
+import uuid
+from collections import deque
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+
+from users import tenancy
+
+from .models import Publicacao
+
+HEARTBEAT = getattr(settings, 'EVENTOS_HEARTBEAT', 15)
+DURACAO_MAXIMA = getattr(settings, 'EVENTOS_DURACAO_MAXIMA', 300)
+HISTORICO = getattr(settings, 'EVENTOS_HISTORICO', 500)
+RECONEXAO_MS = 3000
+VALIDADE_CONTAGEM = 10
+
+
+class Canal:
+    """Pub/sub em memória, seguro entre threads, com histórico para reenvio"""
+
+    def __init__(self, tamanho=HISTORICO):
+        # Identifica esta instância do canal nos ids dos eventos
+        self.epoca = uuid.uuid4().hex[:8]
+        self.historico = deque(maxlen=tamanho)
+        self.ultimo = 0
+        self.condicao = threading.Condition()
+        self.assinantes_async = set()
+
+    def publicar(self, tipo, dados, escritorio_id=None):
+        with self.condicao:
+            self.ultimo += 1
+            self.historico.append((self.ultimo, tipo, dados, escritorio_id))
+            self.condicao.notify_all()
+            assinantes = list(self.assinantes_async)
+        for loop, sinal in assinantes:
+            loop.call_soon_threadsafe(sinal.set)
+        return self.ultimo
+
+    def identificador(self, numero):
+        return f'{self.epoca}-{numero}'
+
+    def posicao(self, ultimo_id):
+        """
+        Número do último evento já recebido pelo cliente a partir do
+        Last-Event-ID, ou None se o histórico não cobre a lacuna.
+        """
+        epoca, _, numero = (ultimo_id or '').partition('-')
+        if epoca != self.epoca or not numero.isdigit():
+            return None
+        numero = int(numero)
+        with self.condicao:
+            mais_antigo = self.historico[0][0] if self.historico else self.ultimo + 1
+            if numero > self.ultimo or numero < mais_antigo - 1:
+                return None
+        return numero
+
+    def desde(self, numero):
+        with self.condicao:
+            return [evento for evento in self.historico if evento[0] > numero]
+
+    def esperar(self, numero, tempo):
+        """Bloqueia a thread até haver evento posterior a `numero` ou esgotar o tempo"""
+        with self.condicao:
+            self.condicao.wait_for(lambda: self.ultimo > numero, timeout=tempo)
+        return self.desde(numero)
+
+    async def esperar_async(self, numero, tempo):
+        sinal = asyncio.Event()
+        assinante = (asyncio.get_running_loop(), sinal)
+        with self.condicao:
+            self.assinantes_async.add(assinante)
+            pendente = self.ultimo > numero
+        try:
+            if not pendente:
+                try:
+                    await asyncio.wait_for(sinal.wait(), tempo)
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            with self.condicao:
+                self.assinantes_async.discard(assinante)
+        return self.desde(numero)
+
+
+canal = Canal()
+
+
+def publicar(tipo, dados):
+    """Publica o evento depois do commit da transação corrente (ou já, fora dela)"""
+    escritorio_id = tenancy.current_id()
+    transaction.on_commit(lambda: canal.publicar(tipo, dados, escritorio_id))
+
+
+def atividades_criadas(atividades):
+    """Publica as atividades registradas (também as gravadas com bulk_create)"""
+    for atividade in atividades:
+        publicar('atividade', {
+            'id': atividade.pk,
+            'tipo': atividade.tipo,
+            'titulo': atividade.get_tipo_display(),
+            'descricao': atividade.descricao,
+            'data': atividade.data_criacao,
+        })
+
+
+def nao_lidas(usar_cache=True):
+    """Publicações não lidas do escritório ativo"""
+    chave = f'eventos:nao_lidas:{tenancy.current_id()}'
+    contagem = cache.get(chave) if usar_cache else None
+    if contagem is None:
+        contagem = Publicacao.objects.filter(lida=False).count()
+        cache.set(chave, contagem, VALIDADE_CONTAGEM)
+    return contagem
+
+
+def publicar_nao_lidas():
+    """Recalcula a contagem de publicações não lidas e a publica após o commit"""
+    escritorio_id = tenancy.current_id()
+
+    def enviar():
+        with tenancy.activate(escritorio_id):
+            canal.publicar('publicacoes', {'nao_lidas': nao_lidas(usar_cache=False)}, escritorio_id)
+    transaction.on_commit(enviar)
+
+
+def formatar(tipo, dados, identificador=None):
+    linhas = []
+    if identificador:
+        linhas.append(f'id: {identificador}')
+    linhas.append(f'event: {tipo}')
+    linhas.append(f'data: {json.dumps(dados, cls=DjangoJSONEncoder)}')
+    return '\n'.join(linhas) + '\n\n'
+
+
+class Stream:
+    """
+    Estado de uma conexão: de onde continuar, quando mandar o heartbeat e qual
+    foi a última contagem de não lidas enviada. `sincrono()` e `assincrono()`
+    produzem o mesmo fluxo para servidores WSGI e ASGI.
+    """
+
+    def __init__(self, ultimo_id=None, heartbeat=HEARTBEAT, duracao=DURACAO_MAXIMA):
+        # O stream é lido depois que a view retorna, fora do escopo da requisição
+        self.escritorio_id = tenancy.current_id()
+        self.heartbeat = heartbeat
+        self.fim = time.monotonic() + duracao
+        self.numero = canal.posicao(ultimo_id) if ultimo_id else None
+        self.sincronizar = bool(ultimo_id) and self.numero is None
+        if self.numero is None:
+            self.numero = canal.ultimo
+        self.contagem = None
+
+    def abertura(self):
+        partes = [f'retry: {RECONEXAO_MS}\n\n']
+        if self.sincronizar:
+            partes.append(formatar('sincronizar', {}, canal.identificador(self.numero)))
+        partes.extend(self.eventos(canal.desde(self.numero)))
+        partes.append(self.conferir_contagem())
+        return ''.join(partes)
+
+    def eventos(self, novos):
+        for numero, tipo, dados, escritorio_id in novos:
+            self.numero = numero
+            if escritorio_id != self.escritorio_id:
+                if tipo == 'publicacoes':
+                    # Contagem de outro escopo: vale a do escritório da conexão
+                    yield self.conferir_contagem(usar_cache=False)
+                    continue
+                if self.escritorio_id is not None:
+                    continue
+            if tipo == 'publicacoes':
+                self.contagem = dados['nao_lidas']
+            yield formatar(tipo, dados, canal.identificador(numero))
+
+    def conferir_contagem(self, usar_cache=True):
+        with tenancy.activate(self.escritorio_id):
+            contagem = nao_lidas(usar_cache)
+        if contagem == self.contagem:
+            return ': ping\n\n'
+        self.contagem = contagem
+        return formatar('publicacoes', {'nao_lidas': contagem})
+
+    def restante(self):
+        return min(self.heartbeat, self.fim - time.monotonic())
+
+    def sincrono(self):
+        yield self.abertura()
+        while self.restante() > 0:
+            novos = canal.esperar(self.numero, self.restante())
+            yield ''.join(self.eventos(novos)) if novos else self.conferir_contagem()
+
+    async def assincrono(self):
+        yield await sync_to_async(self.abertura)()
+        while self.restante() > 0:
+            novos = await canal.esperar_async(self.numero, self.restante())
+            if novos:
+                yield ''.join(self.eventos(novos))
+            else:
+                yield await sync_to_async(self.conferir_contagem)()
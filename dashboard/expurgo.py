@@ -0,0 +1,239 @@
+"""
+Exclusão e arquivamento em blocos de clientes, processos e advogados.
+
+Apagar um cliente grande com delete() monta toda a cascata em memória (o
+Collector do Django carrega cada linha dependente) e segura o lock de escrita
+do SQLite do começo ao fim. Aqui o grafo de dependências é lido dos metadados
+dos modelos (plano()) e percorrido das folhas para a raiz: cada tabela
+dependente é apagada, ou tem a referência anulada nas relações SET_NULL, em
+blocos de EXPURGO_LOTE linhas, cada bloco na sua própria transação.
+
+- Retomável: cada passo consulta o que ainda resta, então rodar de novo depois
+  de uma interrupção continua de onde parou. O job expurgo.executar volta para
+  a fila se o worker cair no meio.
+- Com arquivar=True, cada bloco é gravado em JSON Lines em
+  EXPURGO_ROOT/<modelo>-<pk>/ antes de ser apagado, e restaurar() devolve as
+  linhas ao banco (pela chave primária, então um bloco gravado duas vezes
+  numa retomada não duplica nada). As referências anuladas não são
+  restauradas.
+- Os blocos são apagados sem passar pelos sinais; no fim, os contadores dos
+  clientes afetados são recalculados, as versões dos modelos incrementadas e
+  os extratos refeitos, como nas demais rotinas em lote. A raiz é apagada com
+  delete(), já sem dependentes, e passa pelos sinais normalmente.
+- Relações PROTECT/RESTRICT com linhas existentes interrompem o expurgo antes
+  de qualquer exclusão.
+"""
+import json
+import os
+
+from django.conf import settings
+from django.core import serializers
+from django.db import models, transaction
+
+from . import eventos, extratos, versoes
+from .contadores import recalcular_clientes
+from .models import Cliente
+
+LOTE = getattr(settings, 'EXPURGO_LOTE', 2000)
+
+
+class Passo:
+    """Uma tabela dependente: o que fazer com ela e como chegar até a raiz"""
+
+    def __init__(self, acao, modelo, filtro, campo=None):
+        self.acao = acao
+        self.modelo = modelo
+        self.filtro = filtro
+        self.campo = campo
+
+    def consulta(self, raiz_pk):
+        return self.modelo._base_manager.filter(**{self.filtro: raiz_pk})
+
+    def __repr__(self):
+        return f'<Passo {self.acao} {self.modelo._meta.label} {self.filtro}>'
+
+
+def dependencias(modelo):
+    """Relações reversas (inclusive as das tabelas intermediárias de ManyToMany) que apontam para o modelo"""
+    for relacao in modelo._meta.get_fields(include_hidden=True):
+        if relacao.auto_created and not relacao.concrete and (relacao.one_to_many or relacao.one_to_one):
+            yield relacao
+
+
+def plano(modelo, caminho='pk', cadeia=()):
+    """
+    Passos do expurgo de uma linha do modelo, na ordem de execução: os
+    dependentes de cada tabela vêm antes dela.
+    """
+    passos = []
+    for relacao in dependencias(modelo):
+        campo, filho = relacao.field, relacao.related_model
+        filtro = f'{campo.name}__{caminho}'
+        regra = campo.remote_field.on_delete
+        if regra is models.CASCADE:
+            if filho in cadeia or filho is modelo:
+                raise ValueError(f'Dependência circular em {filho._meta.label}')
+            passos += plano(filho, filtro, cadeia + (modelo,))
+            passos.append(Passo('excluir', filho, filtro))
+        elif regra is models.SET_NULL:
+            passos.append(Passo('anular', filho, filtro, campo.name))
+        elif regra in (models.PROTECT, models.RESTRICT):
+            passos.insert(0, Passo('proteger', filho, filtro))
+        elif regra is not models.DO_NOTHING:
+            raise ValueError(f'Regra on_delete não suportada em {filho._meta.label}.{campo.name}')
+    return passos
+
+
+def diretorio(raiz):
+    return os.path.join(settings.EXPURGO_ROOT, f'{raiz._meta.label_lower}-{raiz.pk}')
+
+
+def arquivar_bloco(pasta, modelo, linhas):
+    with open(os.path.join(pasta, f'{modelo._meta.label_lower}.jsonl'), 'a', encoding='utf-8') as arquivo:
+        arquivo.write(serializers.serialize('jsonl', linhas))
+
+
+class Expurgo:
+    """
+    Execução do expurgo de uma linha (cliente, processo, advogado...).
+    `progresso(processados, total)` é chamado a cada bloco.
+    """
+
+    def __init__(self, raiz, arquivar=False, lote=LOTE, progresso=None):
+        self.raiz = raiz
+        self.arquivar = arquivar
+        self.lote = lote
+        self.informar = progresso or (lambda processados, total: None)
+        self.passos = plano(type(raiz))
+        self.clientes = set()
+        self.modelos = set()
+        self.resumo = {'excluidos': 0, 'anulados': 0, 'blocos': 0}
+
+    def verificar(self):
+        for passo in self.passos:
+            if passo.acao == 'proteger':
+                protegidos = list(passo.consulta(self.raiz.pk)[:5])
+                if protegidos:
+                    raise models.ProtectedError(
+                        f'{self.raiz} é referenciado por {passo.modelo._meta.verbose_name_plural} protegidos', protegidos,
+                    )
+
+    def total(self):
+        return sum(passo.consulta(self.raiz.pk).count() for passo in self.passos if passo.acao != 'proteger')
+
+    def executar(self):
+        self.verificar()
+        total = self.total() + 1
+        processados = 0
+        self.informar(processados, total)
+        pasta = diretorio(self.raiz) if self.arquivar else None
+        if pasta:
+            os.makedirs(pasta, exist_ok=True)
+            ordem = [passo.modelo._meta.label_lower for passo in self.passos if passo.acao == 'excluir']
+            with open(os.path.join(pasta, 'plano.json'), 'w', encoding='utf-8') as arquivo:
+                json.dump({'ordem': list(dict.fromkeys(ordem + [self.raiz._meta.label_lower]))}, arquivo)
+
+        for passo in self.passos:
+            if passo.acao == 'proteger':
+                continue
+            while (quantidade := self.bloco(passo, pasta)):
+                processados += quantidade
+                self.informar(processados, total)
+
+        with transaction.atomic():
+            if pasta:
+                arquivar_bloco(pasta, type(self.raiz), [self.raiz])
+            self.raiz.delete()
+            self.finalizar()
+        self.informar(total, total)
+        return self.resumo
+
+    def bloco(self, passo, pasta):
+        """Processa um bloco do passo na sua própria transação; retorna quantas linhas foram tratadas"""
+        with transaction.atomic():
+            ids = list(passo.consulta(self.raiz.pk).order_by('pk').values_list('pk', flat=True)[:self.lote])
+            if not ids:
+                return 0
+            linhas = passo.modelo._base_manager.filter(pk__in=ids)
+            self.modelos.add(passo.modelo)
+            if passo.acao == 'anular':
+                linhas.update(**{passo.campo: None})
+                self.resumo['anulados'] += len(ids)
+            else:
+                if any(campo.attname == 'cliente_id' for campo in passo.modelo._meta.concrete_fields):
+                    self.clientes.update(linhas.exclude(cliente_id=None).values_list('cliente_id', flat=True).distinct())
+                if pasta:
+                    arquivar_bloco(pasta, passo.modelo, linhas)
+                # Sem o Collector: os dependentes já foram tratados nos passos anteriores
+                linhas._raw_delete(linhas.db)
+                self.resumo['excluidos'] += len(ids)
+            self.resumo['blocos'] += 1
+        return len(ids)
+
+    def finalizar(self):
+        """O que os sinais fariam para as linhas apagadas em bloco"""
+        if isinstance(self.raiz, Cliente):
+            self.clientes.discard(self.raiz.pk)
+        if self.clientes:
+            recalcular_clientes(self.clientes)
+            extratos.marcar(*self.clientes)
+        rotulos = {modelo._meta.label for modelo in self.modelos} & set(versoes.MODELOS)
+        if rotulos:
+            versoes.incrementar(*sorted(rotulos))
+        if 'dashboard.Publicacao' in {modelo._meta.label for modelo in self.modelos}:
+            eventos.publicar_nao_lidas()
+
+
+def expurgar(raiz, arquivar=False, lote=LOTE, progresso=None):
+    """Apaga (ou arquiva e apaga) a linha e todos os seus dependentes em blocos; retorna o resumo"""
+    return Expurgo(raiz, arquivar=arquivar, lote=lote, progresso=progresso).executar()
+
+
+def dependentes(raiz):
+    """Quantidade de linhas que o expurgo da raiz vai apagar ou alterar"""
+    return Expurgo(raiz).total()
+
+
+def restaurar(pasta, lote=LOTE):
+    """
+    Devolve ao banco as linhas arquivadas em `pasta`, da raiz para as folhas.
+    Retorna quantas linhas foram gravadas.
+    """
+    with open(os.path.join(pasta, 'plano.json'), encoding='utf-8') as arquivo:
+        ordem = json.load(arquivo)['ordem']
+    gravadas, clientes, modelos = 0, set(), set()
+    for rotulo in reversed(ordem):
+        caminho = os.path.join(pasta, f'{rotulo}.jsonl')
+        if not os.path.exists(caminho):
+            continue
+        with open(caminho, encoding='utf-8') as arquivo:
+            linhas = []
+            for linha in arquivo:
+                linhas.append(linha)
+                if len(linhas) >= lote:
+                    gravadas += gravar(linhas, clientes, modelos)
+                    linhas = []
+            gravadas += gravar(linhas, clientes, modelos)
+    if clientes:
+        recalcular_clientes(clientes)
+        extratos.marcar(*clientes)
+    rotulos = modelos & set(versoes.MODELOS)
+    if rotulos:
+        versoes.incrementar(*sorted(rotulos))
+    return gravadas
+
+
+def gravar(linhas, clientes, modelos):
+    if not linhas:
+        return 0
+    with transaction.atomic():
+        for objeto in serializers.deserialize('jsonl', linhas):
+            # DeserializedObject.save() grava com raw=True, que os sinais ignoram
+            objeto.save()
+            instancia = objeto.object
+            modelos.add(instancia._meta.label)
+            if isinstance(instancia, Cliente):
+                clientes.add(instancia.pk)
+            elif getattr(instancia, 'cliente_id', None):
+                clientes.add(instancia.cliente_id)
+    return len(linhas)
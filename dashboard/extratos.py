@@ -0,0 +1,198 @@
+"""
+Extratos pré-calculados da área do cliente.
+
+Cada cliente tem uma linha em ExtratoCliente com tudo o que o portal mostra
+(processos, audiências futuras, receitas em aberto e pagas e os totais), de
+modo que a página do cliente é uma única leitura pela chave primária, sem
+junções.
+
+Os sinais de Cliente, Processo, Audiencia e Receita marcam os clientes
+afetados com marcar(); os extratos são refeitos depois do commit, uma vez por
+cliente e por transação, independentemente de quantas linhas mudaram. As
+operações em lote que não disparam sinais chamam marcar() diretamente. O
+comando reconstruir_extratos refaz todos (ou alguns) extratos.
+
+As audiências já passadas e a situação de vencimento das receitas são
+resolvidas na leitura (ler()), para que o extrato não envelheça entre uma
+alteração e outra.
+"""
+from collections import defaultdict
+
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+from django.utils.crypto import salted_hmac
+from django.utils.dateparse import parse_date, parse_datetime
+
+from .contadores import ZERO, contribuicao_receita
+from .models import Audiencia, Cliente, ExtratoCliente, Processo, Receita
+
+RECEITAS_PAGAS = 24
+# Clientes por consulta na reconstrução em lote
+BLOCO = 500
+
+
+def chave_acesso(area_cliente_ativa, senha_area_cliente):
+    """Chave que acompanha a sessão do portal; muda com a senha ou a desativação da área"""
+    if not area_cliente_ativa or not senha_area_cliente:
+        return ''
+    return salted_hmac('dashboard.area_cliente', senha_area_cliente).hexdigest()
+
+
+def montar(clientes):
+    """
+    {cliente_id: dados do extrato} a partir das tabelas de origem, com três
+    consultas para qualquer quantidade de clientes.
+    """
+    ids = [cliente['pk'] for cliente in clientes]
+    status = dict(Processo.STATUS_CHOICES)
+    tipos = dict(Audiencia.TIPO_CHOICES)
+
+    processos = defaultdict(list)
+    for processo in Processo.objects.filter(cliente_id__in=ids).order_by('-data_inicio', '-pk').values(
+        'cliente_id', 'numero', 'titulo', 'status', 'tribunal', 'vara', 'data_inicio', 'data_fim'
+    ):
+        cliente_id = processo.pop('cliente_id')
+        processos[cliente_id].append({**processo, 'status': status.get(processo['status'], processo['status'])})
+
+    audiencias = defaultdict(list)
+    for audiencia in Audiencia.objects.filter(
+        processo__cliente_id__in=ids, data_hora__gte=timezone.now()
+    ).order_by('data_hora').values(
+        'data_hora', 'tipo', 'local', processo_numero=F('processo__numero'), cliente_id=F('processo__cliente_id')
+    ):
+        cliente_id = audiencia.pop('cliente_id')
+        audiencias[cliente_id].append({**audiencia, 'tipo': tipos.get(audiencia['tipo'], audiencia['tipo'])})
+
+    receitas = defaultdict(list)
+    for receita in Receita.objects.filter(cliente_id__in=ids).order_by('data_vencimento', 'pk').values(
+        'cliente_id', 'descricao', 'valor_total', 'desconto', 'valor_recebido', 'pago', 'data_vencimento',
+        'data_recebimento',
+    ):
+        receitas[receita['cliente_id']].append(receita)
+
+    extratos = {}
+    for cliente in clientes:
+        abertas, pagas = [], []
+        faturado = recebido = aberto = ZERO
+        for receita in receitas[cliente['pk']]:
+            contribuicao = contribuicao_receita(
+                receita['valor_total'], receita['desconto'], receita['valor_recebido'], receita['pago']
+            )
+            faturado, recebido, aberto = faturado + contribuicao[0], recebido + contribuicao[1], aberto + contribuicao[2]
+            item = {
+                'descricao': receita['descricao'],
+                'valor': contribuicao[0],
+                'recebido': contribuicao[1],
+                'em_aberto': contribuicao[2],
+                'data_vencimento': receita['data_vencimento'],
+                'data_recebimento': receita['data_recebimento'],
+            }
+            (pagas if receita['pago'] else abertas).append(item)
+        pagas.sort(key=lambda item: item['data_recebimento'] or item['data_vencimento'], reverse=True)
+
+        extratos[cliente['pk']] = {
+            'nome': cliente['nome'],
+            'processos': processos[cliente['pk']],
+            'audiencias': audiencias[cliente['pk']],
+            'receitas_abertas': abertas,
+            'receitas_pagas': pagas[:RECEITAS_PAGAS],
+            'totais': {'faturado': faturado, 'recebido': recebido, 'em_aberto': aberto},
+        }
+    return extratos
+
+
+def reconstruir(ids):
+    """Refaz os extratos dos clientes informados, em blocos; retorna quantos foram gravados"""
+    ids = sorted(ids)
+    total = 0
+    for inicio in range(0, len(ids), BLOCO):
+        clientes = list(Cliente.objects.filter(pk__in=ids[inicio:inicio + BLOCO]).values(
+            'pk', 'nome', 'area_cliente_ativa', 'senha_area_cliente'
+        ))
+        dados = montar(clientes)
+        agora = timezone.now()
+        extratos = [
+            ExtratoCliente(
+                cliente_id=cliente['pk'],
+                dados=dados[cliente['pk']],
+                chave_acesso=chave_acesso(cliente['area_cliente_ativa'], cliente['senha_area_cliente']),
+                data_atualizacao=agora,
+            )
+            for cliente in clientes
+        ]
+        ExtratoCliente.objects.bulk_create(
+            extratos, update_conflicts=True, unique_fields=['cliente'],
+            update_fields=['dados', 'chave_acesso', 'data_atualizacao'],
+        )
+        total += len(extratos)
+    return total
+
+
+class Pendentes(set):
+    """Clientes marcados na transação corrente, reconstruídos no commit"""
+
+    def __call__(self):
+        reconstruir(self)
+
+
+def marcar(*cliente_ids):
+    """Agenda a reconstrução dos extratos dos clientes para depois do commit"""
+    ids = {cliente_id for cliente_id in cliente_ids if cliente_id}
+    if not ids:
+        return
+    conexao = transaction.get_connection()
+    if not conexao.in_atomic_block:
+        reconstruir(ids)
+        return
+    # Uma única reconstrução por transação, mesmo com muitas linhas alteradas
+    pendentes = next((funcao for _, funcao, _ in conexao.run_on_commit if isinstance(funcao, Pendentes)), None)
+    if pendentes is None:
+        pendentes = Pendentes()
+        transaction.on_commit(pendentes)
+    pendentes.update(ids)
+
+
+def marcar_processos(*processo_ids):
+    marcar(*Processo.objects.filter(pk__in=[pk for pk in processo_ids if pk]).values_list('cliente_id', flat=True))
+
+
+def ler(cliente_id):
+    """
+    (dados, chave de acesso) do extrato com uma consulta, montando-o na
+    primeira leitura. Retorna None se o cliente não existe.
+    """
+    linha = ExtratoCliente.objects.filter(cliente_id=cliente_id).values_list('dados', 'chave_acesso').first()
+    if linha is None:
+        if not reconstruir([cliente_id]):
+            return None
+        linha = ExtratoCliente.objects.filter(cliente_id=cliente_id).values_list('dados', 'chave_acesso').first()
+    dados, chave = linha
+    return preparar(dados), chave
+
+
+def preparar(dados):
+    """Converte as datas gravadas em JSON e aplica o que depende do momento da leitura"""
+    agora, hoje = timezone.now(), timezone.localdate()
+
+    def converter(item, *campos, conversor=parse_date):
+        for campo in campos:
+            if item.get(campo):
+                item[campo] = conversor(item[campo])
+        return item
+
+    processos = [converter(processo, 'data_inicio', 'data_fim') for processo in dados['processos']]
+    audiencias = [
+        audiencia for audiencia in (converter(item, 'data_hora', conversor=parse_datetime) for item in dados['audiencias'])
+        if audiencia['data_hora'] >= agora
+    ]
+    abertas = [converter(receita, 'data_vencimento', 'data_recebimento') for receita in dados['receitas_abertas']]
+    for receita in abertas:
+        receita['vencida'] = receita['data_vencimento'] < hoje
+    return {
+        **dados,
+        'processos': processos,
+        'audiencias': audiencias,
+        'receitas_abertas': abertas,
+        'receitas_pagas': [converter(receita, 'data_vencimento', 'data_recebimento') for receita in dados['receitas_pagas']],
+    }
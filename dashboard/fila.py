@@ -0,0 +1,255 @@
+"""
+Fila de jobs em segundo plano gravada no próprio banco (sem broker externo).
+
+As funções executáveis são registradas com o decorador @job, nos módulos
+`jobs.py` dos apps (carregados no ready() do dashboard), e enfileiradas com enfileirar().
+Como o job é gravado na mesma transação da requisição, ele só fica visível
+para o worker depois do commit.
+
+O comando runworker reserva os jobs com um único UPDATE condicionado a
+status='fila' (dois workers nunca pegam o mesmo job), executa-os em um pool de
+threads ou processos, reagenda as falhas com espera exponencial e cria as
+execuções dos jobs periódicos.
+
+O job guarda o escritório ativo ao ser enfileirado (users.tenancy) e é
+executado com ele; os periódicos, enfileirados pelo worker, rodam sem
+escritório e passam por todos.
+"""
+import json
+import logging
+import random
+import traceback
+import uuid
+from contextvars import ContextVar
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, connection, transaction
+from django.db.models import Count, F, Max, Min, Q
+from django.utils import timezone
+from django.utils.module_loading import autodiscover_modules
+
+from users import tenancy
+
+from .models import Job
+
+logger = logging.getLogger(__name__)
+
+REGISTRO = {}
+PERIODICOS = {}
+
+ATIVOS = ('fila', 'executando')
+TENTATIVAS = getattr(settings, 'JOBS_TENTATIVAS', 3)
+ESPERA_BASE = getattr(settings, 'JOBS_ESPERA_BASE', 30)
+ESPERA_MAXIMA = getattr(settings, 'JOBS_ESPERA_MAXIMA', 3600)
+TEMPO_LIMITE = getattr(settings, 'JOBS_TEMPO_LIMITE', 3600)
+RETENCAO_DIAS = getattr(settings, 'JOBS_RETENCAO_DIAS', 30)
+
+# Job em execução nesta thread (ou processo), para fila.progresso()
+JOB_ATUAL = ContextVar('job_atual', default=None)
+
+
+def job(nome, max_tentativas=TENTATIVAS, intervalo=None):
+    """
+    Registra uma função como job.
+
+    Com `intervalo` (timedelta) o job também é periódico: o worker mantém uma
+    execução agendada para `intervalo` depois do fim da anterior.
+    """
+    def registrar(funcao):
+        REGISTRO[nome] = funcao
+        funcao.nome_job = nome
+        funcao.max_tentativas = max_tentativas
+        if intervalo is not None:
+            PERIODICOS[nome] = intervalo
+        return funcao
+    return registrar
+
+
+def carregar_jobs():
+    """Importa os módulos jobs.py dos apps instalados, que registram as funções"""
+    autodiscover_modules('jobs')
+
+
+def enfileirar(nome, *argumentos, executar_em=None, atraso=None, prioridade=0, chave=None,
+               max_tentativas=None, **parametros):
+    """
+    Grava um job na fila e o retorna.
+
+    `atraso` (timedelta) ou `executar_em` agendam a execução; com `chave`, se já
+    houver um job ativo com a mesma chave, ele é retornado em vez de criar outro.
+    Argumentos e parâmetros precisam ser serializáveis em JSON.
+    """
+    funcao = REGISTRO.get(nome)
+    if executar_em is None:
+        executar_em = timezone.now() + (atraso or timedelta())
+    escritorio_id = tenancy.current_id()
+    if chave is not None and escritorio_id is not None:
+        # A mesma ação pedida por outro escritório é outro job
+        chave = f'{chave}@{escritorio_id}'
+    novo = Job(
+        nome=nome,
+        argumentos=list(argumentos),
+        parametros=parametros,
+        executar_em=executar_em,
+        prioridade=prioridade,
+        chave=chave,
+        max_tentativas=max_tentativas or getattr(funcao, 'max_tentativas', TENTATIVAS),
+        escritorio_id=escritorio_id,
+    )
+    if chave is None:
+        novo.save()
+        return novo
+    try:
+        with transaction.atomic():
+            novo.save()
+        return novo
+    except IntegrityError:
+        return Job.objects.filter(chave=chave, status__in=ATIVOS).first()
+
+
+def reservar(worker, quantidade=1):
+    """
+    Reserva até `quantidade` jobs vencidos para o worker e retorna seus ids.
+
+    A reserva é um único UPDATE sobre os jobs ainda com status='fila'; o lote
+    gravado identifica quais linhas foram de fato reservadas por esta chamada.
+    """
+    agora = timezone.now()
+    lote = uuid.uuid4().hex
+    candidatos = Job.objects.filter(status='fila', executar_em__lte=agora).order_by(
+        '-prioridade', 'executar_em', 'id'
+    ).values('id')[:quantidade]
+    reservados = Job.objects.filter(id__in=candidatos, status='fila').update(
+        status='executando', lote=lote, worker=worker, iniciado_em=agora, tentativas=F('tentativas') + 1,
+        progresso=0, progresso_total=None,
+    )
+    if not reservados:
+        return []
+    return list(Job.objects.filter(lote=lote).order_by('-prioridade', 'executar_em', 'id').values_list('id', flat=True))
+
+
+def espera(tentativa):
+    """Espera exponencial com variação aleatória antes da próxima tentativa"""
+    segundos = min(ESPERA_BASE * 2 ** max(tentativa - 1, 0), ESPERA_MAXIMA)
+    return timedelta(seconds=segundos * random.uniform(0.8, 1.2))
+
+
+def serializavel(valor):
+    try:
+        json.dumps(valor)
+        return valor
+    except (TypeError, ValueError):
+        return str(valor)
+
+
+def executar(job_id, fechar_conexao=True):
+    """Executa um job reservado e grava o resultado ou reagenda a falha"""
+    try:
+        job = Job.objects.get(pk=job_id)
+        funcao = REGISTRO.get(job.nome)
+        try:
+            if funcao is None:
+                raise LookupError(f'Job não registrado: {job.nome}')
+            atual = JOB_ATUAL.set(job.pk)
+            try:
+                with tenancy.activate(job.escritorio_id):
+                    resultado = funcao(*job.argumentos, **job.parametros)
+            finally:
+                JOB_ATUAL.reset(atual)
+        except Exception:
+            logger.exception('Falha no job %s #%s', job.nome, job.pk)
+            falhar(job, traceback.format_exc())
+            return False
+        Job.objects.filter(pk=job.pk, lote=job.lote, status='executando').update(
+            status='concluido', resultado=serializavel(resultado), concluido_em=timezone.now(),
+        )
+        return True
+    finally:
+        if fechar_conexao:
+            connection.close()
+
+
+def progresso(processados, total=None):
+    """Registra o andamento do job em execução; fora de um job não faz nada"""
+    job_id = JOB_ATUAL.get()
+    if job_id is None:
+        return
+    alteracoes = {'progresso': processados}
+    if total is not None:
+        alteracoes['progresso_total'] = total
+    Job.objects.filter(pk=job_id, status='executando').update(**alteracoes)
+
+
+def falhar(job, erro):
+    """Volta o job para a fila com espera exponencial ou o marca como falho"""
+    agora = timezone.now()
+    ativo = Job.objects.filter(pk=job.pk, lote=job.lote, status='executando')
+    if job.tentativas < job.max_tentativas:
+        ativo.update(status='fila', ultimo_erro=erro, executar_em=agora + espera(job.tentativas), lote=None)
+    else:
+        ativo.update(status='falhou', ultimo_erro=erro, concluido_em=agora)
+
+
+def recuperar_travados(tempo_limite=TEMPO_LIMITE):
+    """Devolve à fila os jobs em execução há mais que o tempo limite (worker interrompido)"""
+    limite = timezone.now() - timedelta(seconds=tempo_limite)
+    travados = Job.objects.filter(status='executando', iniciado_em__lt=limite)
+    falhos = travados.filter(tentativas__gte=F('max_tentativas')).update(
+        status='falhou', ultimo_erro='Tempo limite de execução excedido', concluido_em=timezone.now(),
+    )
+    return falhos + travados.update(status='fila', lote=None, ultimo_erro='Tempo limite de execução excedido')
+
+
+def agendar_periodicos():
+    """Garante uma execução ativa de cada job periódico; retorna quantas foram criadas"""
+    criados = 0
+    chaves = {f'periodico:{nome}': nome for nome in PERIODICOS}
+    ativos = set(Job.objects.filter(chave__in=chaves, status__in=ATIVOS).values_list('chave', flat=True))
+    ultimas = dict(
+        Job.objects.filter(chave__in=chaves, status__in=('concluido', 'falhou')).values('chave').annotate(
+            ultima=Max('concluido_em')
+        ).order_by().values_list('chave', 'ultima')
+    )
+    agora = timezone.now()
+    for chave, nome in chaves.items():
+        if chave in ativos:
+            continue
+        ultima = ultimas.get(chave)
+        executar_em = max(agora, ultima + PERIODICOS[nome]) if ultima else agora
+        novo = enfileirar(nome, executar_em=executar_em, chave=chave)
+        # Outro worker pode ter criado a execução entre a consulta e a gravação
+        if novo is not None and novo.executar_em == executar_em:
+            criados += 1
+    return criados
+
+
+def limpar_concluidos(dias=RETENCAO_DIAS):
+    """Remove os jobs concluídos ou cancelados há mais de `dias` dias"""
+    limite = timezone.now() - timedelta(days=dias)
+    removidos, _ = Job.objects.filter(status__in=('concluido', 'cancelado'), concluido_em__lt=limite).delete()
+    return removidos
+
+
+def situacao():
+    """Resumo da fila para o endpoint de status: só os jobs do escritório ativo, se houver um"""
+    agora = timezone.now()
+    jobs = tenancy.scoped(Job.objects.all())
+    por_status = dict(jobs.values('status').annotate(total=Count('id')).order_by().values_list('status', 'total'))
+    fila = jobs.filter(status='fila').aggregate(
+        vencidos=Count('id', filter=Q(executar_em__lte=agora)),
+        mais_antigo=Min('executar_em', filter=Q(executar_em__lte=agora)),
+        proximo=Min('executar_em', filter=Q(executar_em__gt=agora)),
+    )
+    return {
+        'status': {valor: por_status.get(valor, 0) for valor, _ in Job.STATUS_CHOICES},
+        'vencidos': fila['vencidos'],
+        'atraso_segundos': round((agora - fila['mais_antigo']).total_seconds()) if fila['mais_antigo'] else 0,
+        'proximo_agendado': fila['proximo'].isoformat() if fila['proximo'] else None,
+        'workers': sorted(filter(None, jobs.filter(status='executando').values_list('worker', flat=True).distinct())),
+        'falhas_recentes': list(
+            jobs.filter(status='falhou', concluido_em__gte=agora - timedelta(days=1)).order_by('-concluido_em').values(
+                'id', 'nome', 'tentativas', 'concluido_em'
+            )[:10]
+        ),
+    }
@@ -1,11 +1,14 @@
 from django import forms
 from django.contrib.auth import get_user_model
-from .models import Task, Cliente, Processo, Audiencia, Receita, Despesa, TipoDemanda, PrazoPagamento, Banco, TipoReceita, TipoDespesa, FormaPagamento
+from decimal import Decimal
+from .models import Task, Cliente, Processo, Audiencia, Receita, Despesa, TipoDemanda, PrazoPagamento, Banco, TipoReceita, TipoDespesa, FormaPagamento, RateioParticipacao, AlertaPublicacao
 from users.models import Lawyer
+from users.tenancy import EscritorioFormMixin
+from . import busca, cnj
 
 User = get_user_model()
 
-class TaskForm(forms.ModelForm):
+class TaskForm(EscritorioFormMixin, forms.ModelForm):
     class Meta:
         model = Task
         fields = ['titulo', 'descricao', 'data_inicio', 'data_fim', 'dia_todo', 'cliente', 'processo', 'prioridade', 'status']
@@ -56,7 +59,7 @@ class ClienteForm(forms.ModelForm):
         }
 
 
-class ProcessoForm(forms.ModelForm):
+class ProcessoForm(EscritorioFormMixin, forms.ModelForm):
     class Meta:
         model = Processo
         fields = ['numero', 'cliente', 'advogado_responsavel', 'titulo', 'descricao', 'status', 
@@ -80,7 +83,19 @@ class ProcessoForm(forms.ModelForm):
         self.fields['cliente'].queryset = Cliente.objects.filter(ativo=True)
         self.fields['advogado_responsavel'].queryset = User.objects.exclude(oab_number__isnull=True).exclude(oab_number='')
 
-class AudienciaForm(forms.ModelForm):
+    def clean_numero(self):
+        numero = self.cleaned_data['numero'].strip()
+        digitos = cnj.normalizar(numero)
+        if len(digitos) == 20:
+            # Números CNJ são validados e gravados sempre no formato padrão
+            numero = cnj.formatar(digitos)
+            if not numero:
+                raise forms.ValidationError('Número CNJ inválido: o dígito verificador não confere.')
+        if digitos and Processo.objects.filter(numero_normalizado=digitos).exclude(pk=self.instance.pk).exists():
+            raise forms.ValidationError('Já existe um processo com este número.')
+        return numero
+
+class AudienciaForm(EscritorioFormMixin, forms.ModelForm):
     class Meta:
         model = Audiencia
         fields = ['processo', 'tipo', 'data_hora', 'local', 'observacoes']
@@ -92,14 +107,13 @@ class AudienciaForm(forms.ModelForm):
             'observacoes': forms.Textarea(attrs={'class': 'form-control', 'rows': 3, 'placeholder': 'Observações'}),
         }
 
-class ReceitaForm(forms.ModelForm):
+class ReceitaForm(EscritorioFormMixin, forms.ModelForm):
     class Meta:
         model = Receita
         fields = ['descricao', 'valor_total', 'data_emissao', 'data_vencimento', 'data_recebimento', 'tipo', 'cliente',
                  'advogado', 'processo', 'tipo_demanda', 'condicao_pagamento', 'numero_parcelas', 'prazo',
                  'forma_pagamento', 'banco', 'observacoes', 'pago', 'parcial', 'desconto', 'valor_recebido',
-                 'rateio_ativo', 'rateio_advogado_1', 'rateio_percentual_1', 'rateio_advogado_2', 'rateio_percentual_2',
-                 'rateio_advogado_3', 'rateio_percentual_3']
+                 'rateio_ativo']
         widgets = {
             'descricao': forms.TextInput(attrs={'class': 'form-control', 'placeholder': 'Descrição da receita'}),
             'valor_total': forms.NumberInput(attrs={'class': 'form-control', 'step': '0.01', 'placeholder': '0,00'}),
@@ -122,12 +136,6 @@ class ReceitaForm(forms.ModelForm):
             'desconto': forms.NumberInput(attrs={'class': 'form-control', 'step': '0.01', 'placeholder': '0,00'}),
             'valor_recebido': forms.NumberInput(attrs={'class': 'form-control', 'step': '0.01', 'placeholder': '0,00'}),
             'rateio_ativo': forms.CheckboxInput(attrs={'class': 'form-check-input'}),
-            'rateio_advogado_1': forms.Select(attrs={'class': 'form-control'}),
-            'rateio_percentual_1': forms.NumberInput(attrs={'class': 'form-control', 'step': '0.01', 'placeholder': 'Percentual'}),
-            'rateio_advogado_2': forms.Select(attrs={'class': 'form-control'}),
-            'rateio_percentual_2': forms.NumberInput(attrs={'class': 'form-control', 'step': '0.01', 'placeholder': 'Percentual'}),
-            'rateio_advogado_3': forms.Select(attrs={'class': 'form-control'}),
-            'rateio_percentual_3': forms.NumberInput(attrs={'class': 'form-control', 'step': '0.01', 'placeholder': 'Percentual'}),
         }
 
     def __init__(self, *args, **kwargs):
@@ -138,11 +146,53 @@ class ReceitaForm(forms.ModelForm):
         self.fields['tipo_demanda'].queryset = TipoDemanda.objects.all()
         self.fields['prazo'].queryset = PrazoPagamento.objects.all()
         self.fields['banco'].queryset = Banco.objects.filter(ativo=True)
-        self.fields['rateio_advogado_1'].queryset = Lawyer.objects.all()
-        self.fields['rateio_advogado_2'].queryset = Lawyer.objects.all()
-        self.fields['rateio_advogado_3'].queryset = Lawyer.objects.all()
 
-class DespesaForm(forms.ModelForm):
+class RateioParticipacaoForm(EscritorioFormMixin, forms.ModelForm):
+    class Meta:
+        model = RateioParticipacao
+        fields = ['advogado', 'percentual']
+        widgets = {
+            'advogado': forms.Select(attrs={'class': 'form-control'}),
+            'percentual': forms.NumberInput(attrs={'class': 'form-control', 'step': '0.01', 'placeholder': 'Percentual'}),
+        }
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.fields['advogado'].queryset = Lawyer.objects.filter(is_active=True)
+
+class BaseRateioFormSet(forms.BaseInlineFormSet):
+    """Valida que as participações do rateio somam exatamente 100%"""
+
+    def clean(self):
+        super().clean()
+        if any(self.errors):
+            return
+
+        advogados = set()
+        total = Decimal('0.00')
+        for form in self.forms:
+            if not form.cleaned_data or form.cleaned_data.get('DELETE'):
+                continue
+            advogado = form.cleaned_data.get('advogado')
+            if advogado in advogados:
+                raise forms.ValidationError('Um advogado não pode aparecer mais de uma vez no rateio.')
+            advogados.add(advogado)
+            total += form.cleaned_data.get('percentual') or Decimal('0.00')
+
+        if not advogados:
+            raise forms.ValidationError('Informe ao menos um advogado no rateio.')
+        if total != Decimal('100.00'):
+            raise forms.ValidationError(f'Os percentuais do rateio devem somar 100% (atual: {total}%).')
+
+RateioParticipacaoFormSet = forms.inlineformset_factory(
+    Receita, RateioParticipacao,
+    form=RateioParticipacaoForm,
+    formset=BaseRateioFormSet,
+    extra=3,
+    can_delete=True,
+)
+
+class DespesaForm(EscritorioFormMixin, forms.ModelForm):
     class Meta:
         model = Despesa
         fields = ['descricao', 'valor', 'data_vencimento', 'data_pagamento', 'tipo', 'fornecedor', 
@@ -184,7 +234,7 @@ class DashboardFilterForm(forms.Form):
 from users.models import Lawyer
 from django.contrib.auth.forms import UserCreationForm
 
-class AdvogadoForm(UserCreationForm):
+class AdvogadoForm(EscritorioFormMixin, UserCreationForm):
     class Meta:
         model = Lawyer
         fields = ['username', 'first_name', 'last_name', 'email', 'cpf', 'oab_number', 'oab_section',
@@ -297,3 +347,20 @@ class TipoDemandaForm(forms.ModelForm):
         widgets = {
             'nome': forms.TextInput(attrs={'class': 'form-control', 'placeholder': 'Nome do tipo de demanda'}),
         }
+
+
+class AlertaPublicacaoForm(forms.ModelForm):
+    class Meta:
+        model = AlertaPublicacao
+        fields = ['nome', 'termos', 'ativo']
+        widgets = {
+            'nome': forms.TextInput(attrs={'class': 'form-control', 'placeholder': 'Nome do alerta'}),
+            'termos': forms.TextInput(attrs={'class': 'form-control', 'placeholder': 'Ex.: "prazo de 15 dias" OU intima*'}),
+            'ativo': forms.CheckboxInput(attrs={'class': 'form-check-input'}),
+        }
+
+    def clean_termos(self):
+        termos = self.cleaned_data['termos'].strip()
+        if not any(operador != 'NOT' for operador, _, _ in busca.interpretar_termos(termos)):
+            raise forms.ValidationError('Informe ao menos um termo a ser procurado.')
+        return termos
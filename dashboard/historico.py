@@ -0,0 +1,253 @@
+"""
+Histórico de alterações de clientes, processos e receitas.
+
+Os modelos guardam os valores lidos do banco (models.ValoresCarregados); ao
+gravar, os sinais comparam a instância com eles (só os campos de
+update_fields, quando informado) e registram em Alteracao apenas o que mudou,
+como {campo: [antes, depois]}. Sem a consulta extra por gravação, o "antes" é
+o valor lido pela requisição que grava. Criações entram sem campos (os valores iniciais
+ficam no "antes" da primeira alteração) e exclusões com todos os valores
+preenchidos.
+
+As entradas são gravadas na mesma transação da alteração, e desfeitas com
+ela. Gravá-las num on_commit custaria um segundo commit (e sincronização do
+arquivo no SQLite) por transação, mais caro que o próprio INSERT. As ações em
+lote (dashboard.lote), que não disparam sinais, usam capturar() antes do
+UPDATE e registrar_lote() depois, com um único INSERT para o lote.
+
+- O usuário vem da requisição corrente (HistoricoMiddleware); nos jobs e
+  comandos fica vazio.
+- A senha da área do cliente aparece só como alterada, sem os hashes.
+- Cada entrada leva o escritório do objeto (users.tenancy): o histórico de
+  um escritório não aparece no outro, nem depois de o objeto ser excluído.
+- Retenção: o job diário historico.limpar apaga em blocos as entradas com
+  mais de HISTORICO_DIAS dias.
+"""
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import timedelta
+from functools import lru_cache
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db import connection
+from django.utils import formats, timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+from users import tenancy
+from users.models import Escritorio
+
+from .models import Alteracao, Cliente, Processo, Receita
+
+# Modelos acompanhados, pelo nome usado na URL do histórico
+MODELOS = {'cliente': Cliente, 'processo': Processo, 'receita': Receita}
+OCULTOS = {'senha_area_cliente'}
+OCULTO = '***'
+DIAS = getattr(settings, 'HISTORICO_DIAS', 5 * 365)
+# Entradas por DELETE na limpeza
+BLOCO = 1000
+
+REQUISICAO = ContextVar('historico_requisicao', default=None)
+PAUSADO = ContextVar('historico_pausado', default=False)
+
+
+@contextmanager
+def pausado():
+    """Desliga o registro no bloco (importações, medições)"""
+    token = PAUSADO.set(True)
+    try:
+        yield
+    finally:
+        PAUSADO.reset(token)
+
+
+@lru_cache(maxsize=None)
+def campos(modelo):
+    """Campos acompanhados: os editáveis, menos a chave primária e as datas automáticas"""
+    return tuple(
+        campo for campo in modelo._meta.concrete_fields
+        if campo.editable and not campo.primary_key
+        and not getattr(campo, 'auto_now', False) and not getattr(campo, 'auto_now_add', False)
+    )
+
+
+def normalizar(campo, valor):
+    try:
+        return campo.to_python(valor)
+    except ValidationError:
+        return valor
+
+
+def valor(campo, dado):
+    if campo.name in OCULTOS:
+        return OCULTO if dado else None
+    return dado
+
+
+def diferencas(modelo, antes, depois):
+    """{campo: [antes, depois]} dos campos que mudaram entre dois {attname: valor}"""
+    mudancas = {}
+    for campo in campos(modelo):
+        if campo.attname in antes and campo.attname in depois:
+            anterior, atual = antes[campo.attname], depois[campo.attname]
+            # to_python só quando difere: a instância pode ter recebido '10.5' onde o banco tem Decimal('10.50')
+            if anterior != atual and anterior != (atual := normalizar(campo, atual)):
+                mudancas[campo.name] = [valor(campo, anterior), valor(campo, atual)]
+    return mudancas
+
+
+def usuario_atual():
+    usuario = getattr(REQUISICAO.get(), 'user', None)
+    return usuario.pk if usuario is not None and usuario.is_authenticated else None
+
+
+def entrada(modelo, objeto_id, escritorio_id, acao, mudancas=None, usuario_id=None):
+    return Alteracao(
+        modelo=modelo._meta.label_lower, objeto_id=objeto_id, escritorio_id=escritorio_id, acao=acao,
+        campos=mudancas or {}, usuario_id=usuario_id, data=timezone.now(),
+    )
+
+
+@lru_cache(maxsize=None)
+def insercao():
+    """(campos, SQL) do INSERT de Alteracao"""
+    campos = [campo for campo in Alteracao._meta.concrete_fields if not campo.primary_key]
+    nome = connection.ops.quote_name
+    return campos, 'INSERT INTO {} ({}) VALUES ({})'.format(
+        nome(Alteracao._meta.db_table), ', '.join(nome(campo.column) for campo in campos), ', '.join(['%s'] * len(campos)),
+    )
+
+
+def gravar(alteracoes):
+    """
+    Grava as entradas na transação corrente. INSERT direto: no caminho de
+    cada save(), montar o bulk_create custava mais que o próprio INSERT.
+    """
+    campos, sql = insercao()
+    with connection.cursor() as cursor:
+        cursor.executemany(sql, [
+            [campo.get_db_prep_save(getattr(alteracao, campo.attname), connection) for campo in campos]
+            for alteracao in alteracoes
+        ])
+
+
+def registrar(instancia, acao, mudancas=None):
+    # Na mesma transação da alteração: entra e sai junto com ela, sem um segundo commit
+    gravar([entrada(type(instancia), instancia.pk, instancia.escritorio_id, acao, mudancas, usuario_atual())])
+
+
+def estado_gravado(instancia, update_fields=None):
+    """
+    {attname: valor} da linha antes do save(), ou None para uma linha nova.
+    Vem dos valores lidos com a instância (models.ValoresCarregados); só
+    consulta o banco pelos campos que não foram carregados.
+    """
+    if PAUSADO.get() or instancia._state.adding or instancia.pk is None:
+        return None
+    atributos = [
+        campo.attname for campo in campos(type(instancia)) if update_fields is None or campo.name in update_fields
+    ]
+    carregados = getattr(instancia, '_valores_carregados', {})
+    if all(atributo in carregados for atributo in atributos):
+        return {atributo: carregados[atributo] for atributo in atributos}
+    return type(instancia)._base_manager.filter(pk=instancia.pk).values(*atributos).first()
+
+
+def gravacao(instancia, criado, anterior, update_fields=None):
+    modelo = type(instancia)
+    adiados = instancia.get_deferred_fields()
+    # Com update_fields, os outros campos não foram gravados e continuam com o valor carregado
+    depois = {
+        campo.attname: getattr(instancia, campo.attname) for campo in campos(modelo)
+        if campo.attname not in adiados and (update_fields is None or campo.name in update_fields)
+    }
+    # O que foi gravado passa a ser o estado carregado para o próximo save() da mesma instância
+    instancia._valores_carregados = {**getattr(instancia, '_valores_carregados', {}), **depois}
+    if PAUSADO.get():
+        return
+    if criado:
+        registrar(instancia, 'criado')
+    elif anterior and (mudancas := diferencas(modelo, anterior, depois)):
+        registrar(instancia, 'alterado', mudancas)
+        for nome in mudancas:
+            campo = modelo._meta.get_field(nome)
+            instancia._valores_carregados[campo.attname] = normalizar(campo, depois[campo.attname])
+
+
+def exclusao(instancia):
+    if PAUSADO.get():
+        return
+    registrar(instancia, 'excluido', {
+        campo.name: [valor(campo, dado), None]
+        for campo in campos(type(instancia))
+        if (dado := getattr(instancia, campo.attname)) not in (None, '')
+    })
+
+
+def capturar(modelo, ids, nomes):
+    """{pk: {attname: valor}} dos campos acompanhados entre `nomes`, lido antes de um UPDATE em lote"""
+    if PAUSADO.get():
+        return {}
+    atributos = [campo.attname for campo in campos(modelo) if campo.name in nomes]
+    return {linha.pop('pk'): linha for linha in modelo._base_manager.filter(pk__in=ids).values('pk', *atributos)}
+
+
+def registrar_lote(modelo, anteriores):
+    """Registra o que mudou desde capturar(), com uma consulta para o lote todo"""
+    if not anteriores:
+        return
+    atributos = list(next(iter(anteriores.values())))
+    usuario_id = usuario_atual()
+    alteracoes = [
+        entrada(modelo, linha['pk'], linha['escritorio_id'], 'alterado', mudancas, usuario_id)
+        for linha in modelo._base_manager.filter(pk__in=list(anteriores)).values('pk', 'escritorio_id', *atributos)
+        if (mudancas := diferencas(modelo, anteriores[linha['pk']], linha))
+    ]
+    if alteracoes:
+        gravar(alteracoes)
+
+
+def consulta(modelo, objeto_id):
+    """Entradas do objeto no escritório ativo, da mais recente para a mais antiga (índice alteracao_objeto_idx)"""
+    entradas = Alteracao.objects.filter(modelo=modelo._meta.label_lower, objeto_id=objeto_id)
+    if tenancy.current_id() is None:
+        # Sem escritório ativo (administradores): uma busca no índice por escritório, em vez de varrer a tabela
+        entradas = entradas.filter(escritorio__in=Escritorio.objects.values('pk'))
+    return entradas.select_related('usuario').order_by('-data', '-id')
+
+
+def exibir(campo, dado):
+    """Valor gravado no histórico formatado para a página"""
+    if dado is None or dado == '':
+        return '-'
+    if campo.choices:
+        return dict(campo.flatchoices).get(dado, dado)
+    if isinstance(dado, bool):
+        return 'Sim' if dado else 'Não'
+    tipo = campo.get_internal_type()
+    if tipo == 'DateTimeField' and (momento := parse_datetime(str(dado))):
+        return formats.date_format(timezone.localtime(momento), 'd/m/Y H:i')
+    if tipo == 'DateField' and (dia := parse_date(str(dado))):
+        return formats.date_format(dia, 'd/m/Y')
+    return dado
+
+
+def entradas(modelo, alteracoes):
+    """Alterações prontas para o template: cada uma com a lista (rótulo, antes, depois)"""
+    nomes = {campo.name: campo for campo in modelo._meta.concrete_fields}
+    for alteracao in alteracoes:
+        alteracao.mudancas = [
+            (nomes[nome].verbose_name, exibir(nomes[nome], antes), exibir(nomes[nome], depois))
+            if nome in nomes else (nome, antes, depois)
+            for nome, (antes, depois) in alteracao.campos.items()
+        ]
+        yield alteracao
+
+
+def limpar(dias=DIAS):
+    """Apaga, em blocos, as entradas mais antigas que a retenção; retorna quantas"""
+    limite = timezone.now() - timedelta(days=dias)
+    removidas = 0
+    while (ids := list(Alteracao.objects.filter(data__lt=limite).order_by().values_list('pk', flat=True)[:BLOCO])):
+        removidas += Alteracao.objects.filter(pk__in=ids).delete()[0]
+    return removidas
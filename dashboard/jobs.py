@@ -0,0 +1,69 @@
+"""Jobs do app dashboard executados pelo comando runworker"""
+from datetime import timedelta
+from io import StringIO
+
+from django.apps import apps
+from django.core.management import call_command
+
+from .arquivo import arquivar
+from .deduplicacao import detectar_duplicidades
+from .documentos import gerar_lote, ids_do_lote
+from .expurgo import expurgar
+from .fila import job, limpar_concluidos, progresso
+from .historico import limpar as limpar_historico
+from .prazos import gerar_calendarios
+
+
+@job('publicacoes.importar', intervalo=timedelta(minutes=15))
+def importar_publicacoes():
+    """Importa os arquivos da pasta de publicações e verifica os alertas"""
+    saida = StringIO()
+    call_command('importar_publicacoes', stdout=saida, stderr=saida)
+    return saida.getvalue().strip()
+
+
+@job('clientes.detectar_duplicidades', intervalo=timedelta(days=1))
+def detectar_clientes_duplicados():
+    avaliados, encontrados = detectar_duplicidades()
+    return {'avaliados': avaliados, 'encontrados': encontrados}
+
+
+@job('jobs.limpar', intervalo=timedelta(days=1))
+def limpar_jobs():
+    return {'removidos': limpar_concluidos()}
+
+
+@job('historico.limpar', intervalo=timedelta(days=1))
+def limpar_historico_antigo():
+    """Apaga as entradas do histórico de alterações além da retenção (HISTORICO_DIAS)"""
+    return {'removidas': limpar_historico()}
+
+
+@job('prazos.gerar_calendario', intervalo=timedelta(days=7))
+def gerar_calendario_forense():
+    """Mantém o calendário forense cobrindo os próximos anos e os arquivos de feriados atualizados"""
+    return gerar_calendarios()
+
+
+@job('processos.arquivar', intervalo=timedelta(days=1))
+def arquivar_processos_encerrados():
+    """Move para o arquivo as tarefas, audiências, publicações e atividades dos processos encerrados"""
+    return arquivar(progresso=progresso)
+
+
+@job('documentos.gerar_lote', max_tentativas=1)
+def gerar_documentos(modelo, mes=None, ids=None, usuario_id=None, processos=None):
+    """Gera em lote os documentos de um mês (recibos pagos, contratos iniciados) ou dos ids informados"""
+    return gerar_lote(modelo, ids_do_lote(modelo, mes, ids), usuario_id=usuario_id, processos=processos, progresso=progresso)
+
+
+@job('expurgo.executar', max_tentativas=5)
+def executar_expurgo(modelo, pk, arquivar=False):
+    """
+    Apaga em blocos a linha e seus dependentes; uma nova tentativa continua de
+    onde a anterior parou.
+    """
+    raiz = apps.get_model(modelo)._base_manager.filter(pk=pk).first()
+    if raiz is None:
+        return {'excluidos': 0, 'anulados': 0, 'blocos': 0}
+    return expurgar(raiz, arquivar=arquivar, progresso=progresso)
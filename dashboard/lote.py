@@ -0,0 +1,149 @@
+"""
+Ações em lote sobre receitas, processos, tarefas e clientes.
+
+Cada ação é um único UPDATE sobre o conjunto selecionado, dentro de uma
+transação, e registra uma única AtividadeRecente resumindo o lote (com
+bulk_create). Como o UPDATE não dispara os sinais dos modelos, cada ação faz
+aqui o que os sinais fariam: contadores dos clientes, versões dos modelos,
+extratos da área do cliente, histórico de alterações e eventos do dashboard.
+"""
+from django.db import transaction
+from django.db.models import DecimalField, ExpressionWrapper, F, Sum, Value
+from django.db.models.functions import Coalesce, Greatest
+from django.utils import timezone
+
+from . import arquivo, eventos, extratos, historico, versoes
+from .contadores import ZERO, recalcular_clientes
+from .models import AtividadeRecente, Cliente, Processo, Receita, Task
+
+VALOR = DecimalField(max_digits=10, decimal_places=2)
+
+ACOES_RECEITAS = {'quitar': 'Quitar'}
+ACOES_PROCESSOS = {status: f'Marcar como {nome.lower()}' for status, nome in Processo.STATUS_CHOICES}
+ACOES_TAREFAS = {status: f'Marcar como {nome.lower()}' for status, nome in Task.STATUS_CHOICES}
+ACOES_CLIENTES = {'desativar': 'Desativar'}
+
+
+def registrar_atividade(tipo, descricao, usuario, **vinculos):
+    """Atividade única do lote; a gravação em lote não dispara os sinais"""
+    atividades = AtividadeRecente.objects.bulk_create([
+        AtividadeRecente(tipo=tipo, descricao=descricao[:300], usuario=usuario, **vinculos)
+    ])
+    eventos.atividades_criadas(atividades)
+
+
+def unico(ids, **vinculos):
+    """Vincula a atividade ao objeto quando o lote tem um só"""
+    return vinculos if len(ids) == 1 else {}
+
+
+def quitar_receitas(ids, usuario, data_recebimento=None, forma_pagamento=None, banco=None):
+    """
+    Quita pelo valor integral (total menos desconto) as receitas em aberto
+    entre os ids. Retorna (quantidade quitada, valor recebido no lote).
+    """
+    agora = timezone.now()
+    saldo = ExpressionWrapper(F('valor_total') - F('desconto'), output_field=VALOR)
+    alteracoes = {
+        'pago': True,
+        'parcial': False,
+        'valor_recebido': Greatest(Coalesce('valor_recebido', Value(ZERO)), saldo, output_field=VALOR),
+        'data_recebimento': data_recebimento or timezone.localdate(),
+        'data_atualizacao': agora,
+    }
+    if forma_pagamento:
+        alteracoes['forma_pagamento'] = forma_pagamento
+    if banco:
+        alteracoes['banco'] = banco
+
+    with transaction.atomic():
+        abertas = Receita.objects.filter(pk__in=ids, pago=False)
+        quitadas = list(abertas.values_list('pk', 'cliente_id'))
+        if not quitadas:
+            return 0, ZERO
+        valor = (abertas.aggregate(valor=Sum(
+            Greatest(saldo - Coalesce('valor_recebido', Value(ZERO)), Value(ZERO), output_field=VALOR)
+        ))['valor'] or ZERO).quantize(ZERO)
+        anteriores = historico.capturar(Receita, [pk for pk, _ in quitadas], alteracoes)
+        quantidade = abertas.update(**alteracoes)
+        historico.registrar_lote(Receita, anteriores)
+
+        clientes = {cliente_id for _, cliente_id in quitadas}
+        recalcular_clientes(clientes)
+        extratos.marcar(*clientes)
+        registrar_atividade(
+            'recebimento_confirmado', f'{quantidade} receita(s) quitada(s) em lote: R$ {valor:,.2f}', usuario,
+            **unico(clientes, cliente_id=next(iter(clientes))),
+        )
+        versoes.incrementar(Receita, AtividadeRecente)
+        eventos.publicar('pagamento', {
+            'id': quitadas[0][0] if quantidade == 1 else None,
+            'cliente_id': next(iter(clientes)) if len(clientes) == 1 else None,
+            'descricao': f'{quantidade} receita(s) quitada(s)',
+            'valor': valor,
+            'pago': True,
+        })
+    return quantidade, valor
+
+
+def alterar_status_processos(ids, status, usuario):
+    """
+    Muda o status dos processos; ao finalizar, preenche a data de fim dos que
+    não a têm, e ao reabrir devolve o que estava no arquivo. Retorna quantos
+    mudaram.
+    """
+    alteracoes = {'status': status}
+    if status == 'finalizado':
+        alteracoes['data_fim'] = Coalesce('data_fim', Value(timezone.localdate()))
+
+    with transaction.atomic():
+        alterados = list(Processo.objects.filter(pk__in=ids).exclude(status=status).values_list('pk', 'cliente_id'))
+        if not alterados:
+            return 0
+        anteriores = historico.capturar(Processo, [pk for pk, _ in alterados], alteracoes)
+        quantidade = Processo.objects.filter(pk__in=[pk for pk, _ in alterados]).update(**alteracoes)
+        historico.registrar_lote(Processo, anteriores)
+        if status not in arquivo.ENCERRADOS:
+            arquivo.desarquivar(*(pk for pk, _ in alterados))
+
+        extratos.marcar(*{cliente_id for _, cliente_id in alterados})
+        registrar_atividade(
+            'processo_atualizado',
+            f'{quantidade} processo(s) com status alterado para {dict(Processo.STATUS_CHOICES)[status]}', usuario,
+            **unico(alterados, processo_id=alterados[0][0], cliente_id=alterados[0][1]),
+        )
+        versoes.incrementar(Processo, AtividadeRecente)
+    return quantidade
+
+
+def alterar_status_tarefas(ids, status, usuario):
+    """Muda o status das tarefas; retorna quantas mudaram"""
+    with transaction.atomic():
+        quantidade = Task.objects.filter(pk__in=ids).exclude(status=status).update(
+            status=status, data_atualizacao=timezone.now(),
+        )
+        if not quantidade:
+            return 0
+        registrar_atividade(
+            'tarefa_atualizada',
+            f'{quantidade} tarefa(s) com status alterado para {dict(Task.STATUS_CHOICES)[status]}', usuario,
+            **unico(ids, task_id=ids[0]),
+        )
+        versoes.incrementar(Task, AtividadeRecente)
+    return quantidade
+
+
+def desativar_clientes(ids, usuario):
+    """Desativa os clientes ativos entre os ids; retorna quantos mudaram"""
+    with transaction.atomic():
+        anteriores = historico.capturar(Cliente, ids, ['ativo'])
+        quantidade = Cliente.objects.filter(pk__in=ids, ativo=True).update(ativo=False)
+        if not quantidade:
+            return 0
+        historico.registrar_lote(Cliente, anteriores)
+        registrar_atividade(
+            'cliente_desativado', f'{quantidade} cliente(s) desativado(s) em lote', usuario,
+            **unico(ids, cliente_id=ids[0]),
+        )
+        versoes.incrementar(Cliente, AtividadeRecente)
+    return quantidade
@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand
+
+from dashboard.arquivo import DIAS, LOTE, arquivar, desarquivar
+
+
+class Command(BaseCommand):
+    help = (
+        'Move para o arquivo as tarefas, audiências, publicações e atividades dos processos encerrados '
+        'há mais de --dias dias, um bloco de processos por transação.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dias', type=int, default=DIAS, help='Dias desde a data de fim do processo')
+        parser.add_argument('--lote', type=int, default=LOTE, help='Processos por transação')
+        parser.add_argument('--desarquivar', type=int, nargs='+', metavar='PROCESSO',
+                            help='Devolve às tabelas de origem o que foi arquivado dos processos')
+
+    def handle(self, *args, **options):
+        if options['desarquivar']:
+            linhas = desarquivar(*options['desarquivar'])
+            self.stdout.write(self.style.SUCCESS(f'{linhas} linhas devolvidas às tabelas de origem.'))
+            return
+
+        def progresso(processados, total):
+            self.stdout.write(f'{processados}/{total} processos...')
+
+        resumo = arquivar(dias=options['dias'], lote=options['lote'], progresso=progresso)
+        processos = resumo.pop('processos')
+        detalhes = ', '.join(f'{quantidade} {rotulo.split(".")[1]}' for rotulo, quantidade in resumo.items())
+        self.stdout.write(self.style.SUCCESS(f'{processos} processos arquivados ({detalhes}).'))
@@ -0,0 +1,21 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from dashboard.deduplicacao import LIMIAR, MAX_BLOCO, detectar_duplicidades
+
+
+class Command(BaseCommand):
+    help = 'Detecta clientes possivelmente duplicados (dashboard e financeiro) e os envia para a fila de revisão'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--limiar', type=int, default=LIMIAR, help='Pontuação mínima para entrar na fila')
+        parser.add_argument('--max-bloco', type=int, default=MAX_BLOCO,
+                            help='Tamanho máximo de um bloco por nome fonético + cidade')
+
+    def handle(self, *args, **options):
+        inicio = time.monotonic()
+        avaliados, encontrados = detectar_duplicidades(options['limiar'], options['max_bloco'])
+        self.stdout.write(self.style.SUCCESS(
+            f'{avaliados} pares avaliados, {encontrados} acima do limiar em {time.monotonic() - inicio:.1f}s.'
+        ))
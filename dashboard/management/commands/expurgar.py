@@ -0,0 +1,42 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from dashboard.expurgo import LOTE, expurgar, restaurar
+from dashboard.models import Cliente, Processo
+from users.models import Lawyer
+
+MODELOS = {'cliente': Cliente, 'processo': Processo, 'advogado': Lawyer}
+
+
+class Command(BaseCommand):
+    help = (
+        'Apaga um cliente, processo ou advogado e todos os seus dependentes em blocos, com uma transação '
+        'por bloco. Se for interrompido, rodar de novo continua de onde parou.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('modelo', nargs='?', choices=sorted(MODELOS))
+        parser.add_argument('pk', nargs='?', type=int)
+        parser.add_argument('--arquivar', action='store_true',
+                            help='Grava as linhas em JSON Lines (EXPURGO_ROOT) antes de apagá-las')
+        parser.add_argument('--lote', type=int, default=LOTE, help='Linhas por transação')
+        parser.add_argument('--restaurar', metavar='PASTA', help='Devolve ao banco as linhas arquivadas na pasta')
+
+    def handle(self, *args, **options):
+        if options['restaurar']:
+            gravadas = restaurar(options['restaurar'], lote=options['lote'])
+            self.stdout.write(self.style.SUCCESS(f'{gravadas} linhas restauradas.'))
+            return
+        if not options['modelo'] or options['pk'] is None:
+            raise CommandError('Informe o modelo e a chave primária (ou --restaurar).')
+
+        raiz = MODELOS[options['modelo']]._base_manager.filter(pk=options['pk']).first()
+        if raiz is None:
+            raise CommandError(f"{options['modelo']} {options['pk']} não encontrado.")
+
+        def progresso(processados, total):
+            self.stdout.write(f'{processados}/{total} linhas...')
+
+        resumo = expurgar(raiz, arquivar=options['arquivar'], lote=options['lote'], progresso=progresso)
+        self.stdout.write(self.style.SUCCESS(
+            f"{resumo['excluidos']} linhas apagadas e {resumo['anulados']} referências anuladas em {resumo['blocos']} blocos."
+        ))
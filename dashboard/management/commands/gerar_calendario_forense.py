@@ -0,0 +1,26 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from dashboard.prazos import gerar_calendarios
+
+
+class Command(BaseCommand):
+    help = 'Recria os calendários forenses (dias úteis por tribunal) a partir dos arquivos de feriados'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--pasta', help='Pasta com os arquivos CSV de feriados (padrão: settings.FERIADOS_DIR)')
+        parser.add_argument('--ano-inicial', type=int, help='Primeiro ano do calendário (padrão: ano passado)')
+        parser.add_argument('--ano-final', type=int, help='Último ano do calendário (padrão: daqui a dois anos)')
+
+    def handle(self, *args, **options):
+        inicio = time.monotonic()
+        try:
+            calendarios = gerar_calendarios(options['pasta'], options['ano_inicial'], options['ano_final'])
+        except (OSError, ValueError) as erro:
+            raise CommandError(str(erro))
+        for codigo, dias in calendarios.items():
+            self.stdout.write(f'{codigo or "nacional"}: {dias} dias')
+        self.stdout.write(self.style.SUCCESS(
+            f'{len(calendarios)} calendário(s) gerado(s) em {time.monotonic() - inicio:.1f}s.'
+        ))
@@ -0,0 +1,31 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from dashboard.documentos import DOCUMENTOS, gerar_lote, ids_do_lote
+
+
+class Command(BaseCommand):
+    help = 'Gera em lote recibos ou contratos de honorários, reaproveitando os que não mudaram'
+
+    def add_arguments(self, parser):
+        parser.add_argument('modelo', choices=sorted(DOCUMENTOS), help='Tipo de documento')
+        parser.add_argument('--mes', help='aaaa-mm: receitas pagas (recibos) ou processos iniciados (contratos) no mês')
+        parser.add_argument('--id', type=int, action='append', dest='ids',
+                            help='Gera apenas o objeto informado (pode ser repetido)')
+        parser.add_argument('--processos', type=int, help='Processos de renderização (1 renderiza no próprio processo)')
+
+    def handle(self, *args, **options):
+        if not options['mes'] and not options['ids']:
+            raise CommandError('Informe --mes ou --id.')
+
+        def progresso(processados, total):
+            self.stdout.write(f'{processados}/{total} documentos...')
+
+        inicio = time.perf_counter()
+        ids = ids_do_lote(options['modelo'], options['mes'], options['ids'])
+        resumo = gerar_lote(options['modelo'], ids, processos=options['processos'], progresso=progresso)
+        self.stdout.write(self.style.SUCCESS(
+            f"{resumo['gerados']} gerados e {resumo['reaproveitados']} reaproveitados de {resumo['total']} "
+            f"em {time.perf_counter() - inicio:.1f}s."
+        ))
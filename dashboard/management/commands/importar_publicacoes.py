@@ -0,0 +1,58 @@
+import shutil
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from dashboard.busca import verificar_alertas
+from dashboard.publicacoes import EXTENSOES, ImportadorPublicacoes, importar_arquivo
+
+
+class Command(BaseCommand):
+    help = 'Importa publicações dos arquivos de diário oficial de uma pasta (opcionalmente observando novos arquivos)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('pasta', nargs='?', help='Pasta com os arquivos (padrão: settings.PUBLICACOES_DIR)')
+        parser.add_argument('--observar', action='store_true', help='Continua observando a pasta por novos arquivos')
+        parser.add_argument('--intervalo', type=int, default=30, help='Segundos entre as verificações da pasta')
+
+    def handle(self, *args, **options):
+        pasta = Path(options['pasta'] or settings.PUBLICACOES_DIR)
+        for subpasta in ('processados', 'pendentes', 'erros'):
+            (pasta / subpasta).mkdir(parents=True, exist_ok=True)
+
+        while True:
+            arquivos = sorted(
+                caminho for caminho in pasta.iterdir()
+                if caminho.is_file() and caminho.suffix.lower() in EXTENSOES
+            )
+            if arquivos:
+                # Os índices de processos são montados uma vez por varredura
+                importador = ImportadorPublicacoes()
+                for caminho in arquivos:
+                    self.importar(importador, pasta, caminho)
+                ocorrencias = verificar_alertas()
+                if ocorrencias:
+                    self.stdout.write(f'{len(ocorrencias)} alerta(s) com novas publicações')
+            if not options['observar']:
+                break
+            time.sleep(options['intervalo'])
+
+    def importar(self, importador, pasta, caminho):
+        inicio = time.monotonic()
+        try:
+            resumo = importar_arquivo(
+                caminho, importador, pasta / 'pendentes' / f'{caminho.stem}.pendentes.jsonl'
+            )
+        except (OSError, ValueError) as erro:
+            shutil.move(caminho, pasta / 'erros' / caminho.name)
+            self.stderr.write(self.style.ERROR(f'{caminho.name}: {erro}'))
+            return
+
+        shutil.move(caminho, pasta / 'processados' / caminho.name)
+        self.stdout.write(self.style.SUCCESS(
+            f"{caminho.name}: {resumo['lidas']} lidas, {resumo['importadas']} importadas, "
+            f"{resumo['duplicadas']} duplicadas, {resumo['sem_processo']} sem processo, "
+            f"{resumo['invalidas']} inválidas em {time.monotonic() - inicio:.1f}s"
+        ))
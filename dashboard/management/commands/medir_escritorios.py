@@ -0,0 +1,228 @@
+import re
+import time
+from datetime import timedelta
+from decimal import Decimal
+
+from django.apps import apps
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.test import Client
+from django.urls import reverse
+from django.utils import timezone
+
+from dashboard import historico, versoes
+from dashboard.forms import ProcessoForm, ReceitaForm, TaskForm
+from dashboard.models import Cliente, FormaPagamento, Processo, Receita, Task, TipoReceita
+from users import tenancy
+from users.models import Escritorio, Lawyer, LawyerManager
+
+PAGINAS = ('dashboard:home', 'dashboard:clients', 'dashboard:processo_list', 'dashboard:receitas', 'dashboard:task_list')
+DETALHES = (
+    ('dashboard:client_detail', Cliente), ('dashboard:processo_detail', Processo),
+    ('dashboard:receita_detail', Receita), ('dashboard:task_detail', Task), ('dashboard:lawyer_detail', Lawyer),
+)
+WIDGET = re.compile(r'data-widget="([\w-]+)"[^>]*\sdata-url="([^"]+)"')
+NOME_MEDICAO = 'Escritório de medição'
+BLOCO = 1000
+
+
+class Command(BaseCommand):
+    help = (
+        'Confere o isolamento entre escritórios (páginas, detalhes, formulários e gerenciadores) e mede se o '
+        'dashboard de um escritório fica mais lento quando outro escritório cresce. Cria um segundo escritório '
+        'com --volume clientes e o remove no fim. Grava no banco configurado: use uma cópia.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--usuario', help='Usuário do escritório medido (padrão: primeiro ativo com escritório)')
+        parser.add_argument('--volume', type=int, default=20000,
+                            help='Clientes do outro escritório (com um processo, duas receitas e uma tarefa cada)')
+        parser.add_argument('--repeticoes', type=int, default=5, help='Requisições por URL em cada medição')
+
+    def handle(self, *args, **options):
+        usuarios = Lawyer.objects.filter(is_active=True, escritorio__isnull=False).order_by('-is_superuser', 'pk')
+        if options['usuario']:
+            usuarios = usuarios.filter(username=options['usuario'])
+        usuario = usuarios.first()
+        if usuario is None:
+            raise CommandError('Nenhum usuário ativo com escritório encontrado.')
+        if Escritorio.objects.filter(nome=NOME_MEDICAO).exists():
+            raise CommandError(f'Já existe um "{NOME_MEDICAO}": remova-o antes de medir.')
+
+        hosts = [host for host in settings.ALLOWED_HOSTS if host not in ('*',) and not host.startswith('.')]
+        host = hosts[0] if hosts else 'localhost'
+        navegador = Client(HTTP_HOST=host)
+        navegador.force_login(usuario)
+
+        outro = Escritorio.objects.create(nome=NOME_MEDICAO)
+        with tenancy.activate(outro.pk):
+            advogado = Lawyer.objects.create_user(f'medicao-escritorio-{outro.pk}', is_active=True)
+        intruso = Client(HTTP_HOST=host)
+        intruso.force_login(advogado)
+        try:
+            repeticoes = max(options['repeticoes'], 1)
+            antes = self.medir(navegador, repeticoes)
+            inicio = time.perf_counter()
+            linhas = self.povoar(outro, advogado, options['volume'])
+            self.stdout.write(f'{linhas} linhas gravadas no outro escritório em {time.perf_counter() - inicio:.1f}s.')
+            depois = self.medir(navegador, repeticoes)
+
+            self.stdout.write(self.style.MIGRATE_HEADING(
+                f'{usuario.escritorio} ({usuario.username}): outro escritório vazio / com {options["volume"]} clientes '
+                f'(melhor de {repeticoes}, cache vazio)'
+            ))
+            for url in antes:
+                self.stdout.write(f'  {url:<40} {antes[url]:8.1f} ms {depois[url]:8.1f} ms {depois[url] / antes[url]:6.2f}x')
+            total_antes, total_depois = sum(antes.values()), sum(depois.values())
+            self.stdout.write(f'  {"total":<40} {total_antes:8.1f} ms {total_depois:8.1f} ms {total_depois / total_antes:6.2f}x')
+            self.planos(usuario.escritorio_id)
+
+            self.stdout.write(self.style.MIGRATE_HEADING('Isolamento'))
+            falhas = self.isolamento(usuario, navegador, outro, intruso)
+        finally:
+            self.remover(outro, advogado)
+
+        if falhas:
+            raise CommandError(f'{len(falhas)} vazamento(s) entre escritórios:\n' + '\n'.join(falhas))
+        self.stdout.write(self.style.SUCCESS('Nenhum dado de um escritório visível no outro.'))
+
+    def medir(self, navegador, repeticoes):
+        """Melhor tempo, com o cache vazio, de cada página e dos widgets do dashboard; {url: ms}"""
+        urls = [reverse(nome) for nome in PAGINAS]
+        html = navegador.get(reverse('dashboard:home')).content.decode()
+        urls += [url for _, url in WIDGET.findall(html)]
+        tempos = {}
+        for url in urls:
+            medidas = []
+            for _ in range(repeticoes):
+                cache.clear()
+                inicio = time.perf_counter()
+                resposta = navegador.get(url)
+                medidas.append((time.perf_counter() - inicio) * 1000)
+                if resposta.status_code != 200:
+                    raise CommandError(f'{url} respondeu {resposta.status_code}')
+            # O mínimo: o volume do outro escritório não varia entre as repetições, o ruído da máquina sim
+            tempos[url] = min(medidas)
+        return tempos
+
+    def povoar(self, escritorio, advogado, volume):
+        """Clientes, processos, receitas e tarefas do outro escritório, gravados em lote"""
+        hoje = timezone.localdate()
+        linhas = 0
+        with tenancy.activate(escritorio.pk), historico.pausado():
+            tipo = TipoReceita.objects.create(nome='Honorários (medição)')
+            forma = FormaPagamento.objects.create(nome='PIX (medição)')
+            for inicio in range(0, volume, BLOCO):
+                numeros = range(inicio, min(inicio + BLOCO, volume))
+                with transaction.atomic():
+                    clientes = Cliente.objects.bulk_create([
+                        Cliente(
+                            nome=f'Cliente de medição {numero}', cpf_cnpj=f'med-{escritorio.pk}-{numero}',
+                            email=f'medicao{numero}@exemplo.com', telefone='0000-0000',
+                            data_cadastro=timezone.now() - timedelta(days=numero % 3650),
+                        )
+                        for numero in numeros
+                    ])
+                    processos = Processo.objects.bulk_create([
+                        Processo(
+                            numero=f'MED-{escritorio.pk}-{cliente.pk}', cliente=cliente, advogado_responsavel=advogado,
+                            titulo='Processo de medição', descricao='-', data_inicio=hoje - timedelta(days=cliente.pk % 3650),
+                        )
+                        for cliente in clientes
+                    ])
+                    receitas = Receita.objects.bulk_create([
+                        Receita(
+                            descricao='Receita de medição', valor_total=Decimal('1000.00'), cliente_id=processo.cliente_id,
+                            processo=processo, advogado=advogado, tipo=tipo, forma_pagamento=forma,
+                            condicao_pagamento='a_vista', data_vencimento=hoje + timedelta(days=dias - 180 + processo.pk % 90),
+                        )
+                        for processo in processos for dias in (0, 30)
+                    ])
+                    tarefas = Task.objects.bulk_create([
+                        Task(
+                            titulo='Tarefa de medição', advogado=advogado, processo=processo, cliente_id=processo.cliente_id,
+                            data_inicio=timezone.now() + timedelta(hours=processo.pk % 2000 - 1000),
+                        )
+                        for processo in processos
+                    ])
+                linhas += len(clientes) + len(processos) + len(receitas) + len(tarefas)
+        versoes.incrementar(Cliente, Processo, Receita, Task)
+        return linhas
+
+    def planos(self, escritorio_id):
+        """Plano das consultas principais do dashboard: devem usar os índices que começam pelo escritório"""
+        hoje = timezone.localdate()
+        with tenancy.activate(escritorio_id):
+            # Montadas com o escritório ativo: o gerenciador aplica o filtro ao criar o queryset
+            consultas = {
+                'clientes ativos por saldo': Cliente.objects.filter(ativo=True).order_by('-saldo_aberto')[:10],
+                'receitas pendentes vencidas': Receita.objects.filter(pago=False, data_vencimento__lt=hoje),
+                'tarefas pendentes da semana': Task.objects.filter(
+                    status='pendente', data_inicio__date__range=(hoje, hoje + timedelta(days=7)),
+                ),
+            }
+        for nome, consulta in consultas.items():
+            self.stdout.write(f'  {nome}: {" / ".join(consulta.explain().splitlines())}')
+
+    def isolamento(self, usuario, navegador, outro, intruso):
+        """Lista das falhas de isolamento entre o escritório do usuário e o outro"""
+        falhas = []
+        with tenancy.activate(usuario.escritorio_id):
+            amostra = {
+                'cliente': list(Cliente.objects.order_by('-pk').values_list('cpf_cnpj', flat=True)[:20]),
+                'processo': list(Processo.objects.order_by('-pk').values_list('numero', flat=True)[:20]),
+            }
+            proprios = {modelo: modelo.objects.order_by('-pk').first() for _, modelo in DETALHES}
+        with tenancy.activate(outro.pk):
+            alheios = {modelo: modelo.objects.order_by('-pk').first() for _, modelo in DETALHES}
+
+        # Páginas e widgets do outro escritório não mostram os dados do usuário
+        urls = [reverse(nome) for nome in PAGINAS]
+        urls += [url for _, url in WIDGET.findall(intruso.get(reverse('dashboard:home')).content.decode())]
+        for url in urls:
+            cache.clear()
+            html = intruso.get(url).content.decode()
+            for tipo, valores in amostra.items():
+                falhas += [f'{url}: {tipo} {valor} de {usuario.escritorio}' for valor in valores if valor and valor in html]
+
+        # Detalhes de um escritório respondem 404 no outro, nos dois sentidos
+        for nome, modelo in DETALHES:
+            for cliente_http, objetos in ((intruso, proprios), (navegador, alheios)):
+                if objetos[modelo] is None:
+                    continue
+                url = reverse(nome, args=[objetos[modelo].pk])
+                if (status := cliente_http.get(url).status_code) != 404:
+                    falhas.append(f'{url}: {status} no outro escritório')
+
+        # Gerenciadores e escolhas dos formulários
+        for escritorio_id in (usuario.escritorio_id, outro.pk):
+            with tenancy.activate(escritorio_id):
+                for modelo in apps.get_models():
+                    if isinstance(modelo._default_manager, (tenancy.EscritorioManager, LawyerManager)):
+                        if modelo._default_manager.exclude(escritorio_id=escritorio_id).exists():
+                            falhas.append(f'{modelo._meta.label}: linhas de outro escritório no gerenciador')
+                for formulario in (ProcessoForm(), ReceitaForm(), TaskForm()):
+                    for campo, field in formulario.fields.items():
+                        queryset = getattr(field, 'queryset', None)
+                        if queryset is not None and hasattr(queryset.model, 'escritorio_id') and \
+                                queryset.exclude(escritorio_id=escritorio_id).exists():
+                            falhas.append(f'{type(formulario).__name__}.{campo}: escolhas de outro escritório')
+        for falha in falhas:
+            self.stdout.write(self.style.ERROR(f'  {falha}'))
+        self.stdout.write(f'  {len(urls)} páginas, {len(DETALHES)} detalhes e {len(apps.get_models())} modelos conferidos.')
+        return falhas
+
+    def remover(self, escritorio, advogado):
+        """Apaga o outro escritório e suas linhas; DELETE direto, sem os sinais (as chaves são conferidas no commit)"""
+        with transaction.atomic():
+            for modelo in apps.get_models():
+                if isinstance(modelo._default_manager, tenancy.EscritorioManager):
+                    linhas = modelo._base_manager.filter(escritorio_id=escritorio.pk)
+                    linhas._raw_delete(linhas.db)
+            with historico.pausado():
+                advogado.delete()
+            escritorio.delete()
+        versoes.incrementar(Cliente, Processo, Receita, Task)
+        cache.clear()
@@ -0,0 +1,127 @@
+import time
+import tracemalloc
+import uuid
+from datetime import timedelta
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from dashboard.expurgo import LOTE, expurgar
+from dashboard.models import (
+    AtividadeRecente, Audiencia, Cliente, Despesa, FormaPagamento, Processo, Publicacao, Receita, Task,
+    TipoDespesa, TipoReceita,
+)
+from users.models import Lawyer
+
+
+class Command(BaseCommand):
+    help = (
+        'Cria um cliente sintético com muitas linhas dependentes e compara o delete() do Django com o '
+        'expurgo em blocos (tempo, pico de memória e maior transação de escrita). Grava no banco '
+        'configurado: use uma cópia.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dependentes', type=int, default=100_000, help='Linhas dependentes do cliente')
+        parser.add_argument('--lote', type=int, default=LOTE, help='Linhas por transação no expurgo')
+        parser.add_argument('--sem-delete', action='store_true', help='Mede apenas o expurgo em blocos')
+
+    def handle(self, *args, **options):
+        self.advogado = Lawyer.objects.order_by('pk').first()
+        if self.advogado is None:
+            raise CommandError('É preciso ao menos um advogado cadastrado.')
+        self.tipo_receita = TipoReceita.objects.order_by('pk').first() or TipoReceita.objects.create(nome='Honorários')
+        self.tipo_despesa = TipoDespesa.objects.order_by('pk').first() or TipoDespesa.objects.create(nome='Custas')
+        self.forma = FormaPagamento.objects.order_by('pk').first() or FormaPagamento.objects.create(nome='PIX')
+
+        resultados = []
+        if not options['sem_delete']:
+            cliente = self.criar(options['dependentes'])
+            resultados.append(('delete()', *self.medir(lambda: self.excluir(cliente))))
+        cliente = self.criar(options['dependentes'])
+        blocos = []
+        ultimo = [time.perf_counter()]
+
+        def progresso(processados, total):
+            agora = time.perf_counter()
+            blocos.append(agora - ultimo[0])
+            ultimo[0] = agora
+
+        tempo, pico, _ = self.medir(lambda: expurgar(cliente, lote=options['lote'], progresso=progresso))
+        resultados.append((f"expurgo (lote {options['lote']})", tempo, pico, max(blocos[1:-1] or blocos)))
+
+        self.stdout.write(f"{options['dependentes']} linhas dependentes")
+        self.stdout.write(f"{'':<22}{'tempo':>10}{'memória (pico)':>18}{'maior transação':>18}")
+        for nome, tempo, pico, transacao in resultados:
+            self.stdout.write(f'{nome:<22}{tempo:>9.2f}s{pico / 2**20:>15.1f} MB{transacao:>17.2f}s')
+
+    def excluir(self, cliente):
+        with transaction.atomic():
+            cliente.delete()
+
+    def medir(self, funcao):
+        tracemalloc.start()
+        inicio = time.perf_counter()
+        funcao()
+        tempo = time.perf_counter() - inicio
+        pico = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        # delete() faz tudo numa única transação
+        return tempo, pico, tempo
+
+    def criar(self, dependentes):
+        """Cliente com processos, receitas, tarefas, audiências, publicações, despesas e atividades"""
+        marca = uuid.uuid4().hex[:12]
+        agora, hoje = timezone.now(), timezone.localdate()
+        cliente = Cliente.objects.create(
+            nome=f'Cliente sintético {marca}', cpf_cnpj=f'S{marca}', email='sintetico@example.com', telefone='0',
+        )
+        quantidade_processos = max(dependentes // 100, 1)
+        processos = Processo.objects.bulk_create([
+            Processo(
+                numero=f'S{marca}-{indice}', cliente=cliente, advogado_responsavel=self.advogado,
+                titulo='Processo sintético', descricao='-', data_inicio=hoje,
+            )
+            for indice in range(quantidade_processos)
+        ], batch_size=1000)
+        restante = dependentes - quantidade_processos
+        partes = {'receitas': 0.35, 'tarefas': 0.2, 'audiencias': 0.15, 'publicacoes': 0.1, 'despesas': 0.1}
+        quantidades = {nome: int(restante * fracao) for nome, fracao in partes.items()}
+        quantidades['atividades'] = restante - sum(quantidades.values())
+
+        def processo(indice):
+            return processos[indice % len(processos)]
+
+        Receita.objects.bulk_create([
+            Receita(
+                descricao='Parcela', valor_total=Decimal('100.00'), data_vencimento=hoje, tipo=self.tipo_receita,
+                cliente=cliente, processo=processo(indice), condicao_pagamento='a_vista', forma_pagamento=self.forma,
+            )
+            for indice in range(quantidades['receitas'])
+        ], batch_size=1000)
+        Task.objects.bulk_create([
+            Task(titulo='Tarefa', data_inicio=agora, advogado=self.advogado, cliente=cliente, processo=processo(indice))
+            for indice in range(quantidades['tarefas'])
+        ], batch_size=1000)
+        Audiencia.objects.bulk_create([
+            Audiencia(processo=processo(indice), tipo='inicial', data_hora=agora + timedelta(days=indice % 90), local='-')
+            for indice in range(quantidades['audiencias'])
+        ], batch_size=1000)
+        Publicacao.objects.bulk_create([
+            Publicacao(processo=processo(indice), titulo='Intimação', conteudo='-', data_publicacao=hoje, orgao='-', lida=True)
+            for indice in range(quantidades['publicacoes'])
+        ], batch_size=1000)
+        Despesa.objects.bulk_create([
+            Despesa(
+                descricao='Custas', valor=Decimal('10.00'), data_vencimento=hoje, tipo=self.tipo_despesa,
+                processo=processo(indice), forma_pagamento=self.forma,
+            )
+            for indice in range(quantidades['despesas'])
+        ], batch_size=1000)
+        AtividadeRecente.objects.bulk_create([
+            AtividadeRecente(tipo='tarefa_criada', descricao='-', usuario=self.advogado, cliente=cliente, processo=processo(indice))
+            for indice in range(quantidades['atividades'])
+        ], batch_size=1000)
+        return cliente
@@ -0,0 +1,64 @@
+import time
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from dashboard import historico
+from dashboard.models import Alteracao, Cliente, Processo, Receita
+
+
+class Command(BaseCommand):
+    help = (
+        'Mede o custo do histórico de alterações na gravação: edições de receitas, processos e clientes, '
+        'uma transação por edição como nas views, com e sem o registro. Grava no banco configurado: use uma cópia.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--edicoes', type=int, default=500, help='Edições por modelo em cada rodada')
+        parser.add_argument('--rodadas', type=int, default=5, help='Rodadas alternando com e sem histórico')
+
+    def handle(self, *args, **options):
+        edicoes = options['edicoes']
+        amostras = {
+            'receita': (list(Receita.objects.order_by('pk')[:edicoes]), self.editar_receita),
+            'processo': (list(Processo.objects.order_by('pk')[:edicoes]), self.editar_processo),
+            'cliente': (list(Cliente.objects.order_by('pk')[:edicoes]), self.editar_cliente),
+        }
+        if not all(objetos for objetos, _ in amostras.values()):
+            raise CommandError('É preciso ao menos uma receita, um processo e um cliente.')
+
+        entradas = Alteracao.objects.count()
+        self.stdout.write(f"{'':<10}{'sem histórico':>16}{'com histórico':>16}{'custo':>10}")
+        for nome, (objetos, editar) in amostras.items():
+            tempos = {False: [], True: []}
+            for _ in range(options['rodadas']):
+                for ativo in (False, True):
+                    tempos[ativo].append(self.medir(objetos, editar, ativo))
+            sem, com = min(tempos[False]) / len(objetos), min(tempos[True]) / len(objetos)
+            self.stdout.write(f'{nome:<10}{sem * 1000:>13.3f} ms{com * 1000:>13.3f} ms{(com / sem - 1) * 100:>9.1f}%')
+        self.stdout.write(f'{Alteracao.objects.count() - entradas} entradas gravadas.')
+
+    def medir(self, objetos, editar, ativo):
+        inicio = time.perf_counter()
+        if ativo:
+            self.rodada(objetos, editar)
+        else:
+            with historico.pausado():
+                self.rodada(objetos, editar)
+        return time.perf_counter() - inicio
+
+    def rodada(self, objetos, editar):
+        for objeto in objetos:
+            with transaction.atomic():
+                editar(objeto)
+                objeto.save()
+
+    def editar_receita(self, receita):
+        receita.desconto = Decimal('1.00') if receita.desconto != Decimal('1.00') else Decimal('0.00')
+
+    def editar_processo(self, processo):
+        processo.vara = 'Vara B' if processo.vara == 'Vara A' else 'Vara A'
+
+    def editar_cliente(self, cliente):
+        cliente.cidade = 'Cidade B' if cliente.cidade == 'Cidade A' else 'Cidade A'
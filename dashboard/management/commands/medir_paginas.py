@@ -0,0 +1,110 @@
+import re
+import statistics
+import time
+
+from django.conf import settings
+from django.contrib.staticfiles import finders
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from users.models import Lawyer
+
+PAGINAS = ('dashboard:home', 'dashboard:clients')
+WIDGET = re.compile(r'data-widget="([\w-]+)"[^>]*\sdata-url="([^"]+)"')
+ESTATICO = re.compile(r'(?:src|href)="/' + re.escape(settings.STATIC_URL.strip('/')) + r'/([^"?#]+)"')
+
+
+def tamanho_estatico(caminho):
+    """Tamanho do arquivo estático servido em `caminho` (com ou sem hash no nome)"""
+    try:
+        return staticfiles_storage.size(caminho)
+    except (OSError, NotImplementedError):
+        encontrado = finders.find(caminho)
+        return len(open(encontrado, 'rb').read()) if encontrado else 0
+
+
+class Command(BaseCommand):
+    help = (
+        'Mede o tempo de renderização, as consultas e os bytes transferidos das páginas principais '
+        'e dos widgets que elas carregam (primeira pintura e carga completa)'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('paginas', nargs='*', default=PAGINAS, help='Nomes das URLs (padrão: dashboard e clientes)')
+        parser.add_argument('--usuario', help='Usuário autenticado nas requisições (padrão: primeiro ativo)')
+        parser.add_argument('--repeticoes', type=int, default=20, help='Requisições com o cache já preenchido')
+
+    def handle(self, *args, **options):
+        usuarios = Lawyer.objects.filter(is_active=True).order_by('-is_superuser', 'pk')
+        if options['usuario']:
+            usuarios = usuarios.filter(username=options['usuario'])
+        usuario = usuarios.first()
+        if usuario is None:
+            raise CommandError('Nenhum usuário ativo encontrado.')
+
+        hosts = [host for host in settings.ALLOWED_HOSTS if host not in ('*',) and not host.startswith('.')]
+        navegador = Client(HTTP_HOST=hosts[0] if hosts else 'localhost')
+        navegador.force_login(usuario)
+
+        for nome in options['paginas']:
+            url = reverse(nome)
+            cache.clear()
+            frio, html, consultas_frio = self.requisitar(navegador, url)
+            tempos, consultas = [], 0
+            for _ in range(max(options['repeticoes'], 1)):
+                tempo, html, consultas = self.requisitar(navegador, url)
+                tempos.append(tempo)
+
+            estaticos = sorted({caminho for caminho in ESTATICO.findall(html.decode())})
+            bytes_estaticos = sum(tamanho_estatico(caminho) for caminho in estaticos)
+            self.stdout.write(self.style.MIGRATE_HEADING(f'{nome} ({url})'))
+            self.stdout.write(f'  cache vazio:      {frio:8.1f} ms  {consultas_frio:3d} consultas')
+            self.stdout.write(
+                f'  cache preenchido: {statistics.median(tempos):8.1f} ms  {consultas:3d} consultas '
+                f'(mediana de {len(tempos)}; mín. {min(tempos):.1f} ms)'
+            )
+            self.stdout.write(f'  HTML por requisição:   {len(html):8d} bytes')
+            self.stdout.write(f'  estáticos locais ({len(estaticos)}): {bytes_estaticos:8d} bytes (só na primeira visita)')
+
+            widgets = WIDGET.findall(html.decode())
+            if widgets:
+                self.medir_widgets(navegador, widgets, statistics.median(tempos), max(options['repeticoes'], 1))
+
+    def medir_widgets(self, navegador, widgets, tempo_pagina, repeticoes):
+        """
+        Tempo de cada widget com o cache vazio e preenchido. A primeira pintura é
+        a resposta da página; com os widgets buscados em paralelo pelo navegador,
+        a carga completa é a página mais o widget mais lento.
+        """
+        cache.clear()
+        frios, quentes = {}, {}
+        for nome, url in widgets:
+            frios[nome], corpo, consultas_frio = self.requisitar(navegador, url)
+            tempos = []
+            for _ in range(repeticoes):
+                tempo, corpo, consultas = self.requisitar(navegador, url)
+                tempos.append(tempo)
+            quentes[nome] = statistics.median(tempos)
+            self.stdout.write(
+                f'  widget {nome:<14} {frios[nome]:7.1f} ms / {consultas_frio:2d} consultas (vazio)   '
+                f'{quentes[nome]:6.1f} ms / {consultas:2d} consultas (preenchido)   {len(corpo):6d} bytes'
+            )
+        for rotulo, medidas in (('cache vazio', frios), ('cache preenchido', quentes)):
+            self.stdout.write(
+                f'  {rotulo}: primeira pintura {tempo_pagina:.1f} ms; carga completa {tempo_pagina + max(medidas.values()):.1f} ms '
+                f'em paralelo ({tempo_pagina + sum(medidas.values()):.1f} ms em série)'
+            )
+
+    def requisitar(self, navegador, url):
+        with CaptureQueriesContext(connection) as consultas:
+            inicio = time.perf_counter()
+            resposta = navegador.get(url)
+            tempo = (time.perf_counter() - inicio) * 1000
+        if resposta.status_code != 200:
+            raise CommandError(f'{url} respondeu {resposta.status_code}')
+        return tempo, resposta.content, len(consultas)
@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from dashboard.contadores import recalcular_clientes
+from dashboard.models import Cliente
+
+
+class Command(BaseCommand):
+    help = 'Recalcula os contadores desnormalizados dos clientes (faturado, recebido, saldo, processos)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--lote', type=int, default=1000, help='Quantidade de clientes por transação')
+        parser.add_argument('--cliente', type=int, action='append', dest='clientes',
+                            help='Recalcula apenas o cliente informado (pode ser repetido)')
+
+    def handle(self, *args, **options):
+        tamanho = options['lote']
+        clientes = Cliente.objects.order_by('pk')
+        if options['clientes']:
+            clientes = clientes.filter(pk__in=options['clientes'])
+
+        total = 0
+        ultimo_pk = 0
+        while True:
+            ids = list(clientes.filter(pk__gt=ultimo_pk).values_list('pk', flat=True)[:tamanho])
+            if not ids:
+                break
+            with transaction.atomic():
+                total += recalcular_clientes(ids)
+            ultimo_pk = ids[-1]
+            self.stdout.write(f'{total} clientes recalculados...')
+
+        self.stdout.write(self.style.SUCCESS(f'Contadores recalculados para {total} clientes.'))
@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand
+
+from dashboard.extratos import reconstruir
+from dashboard.models import Cliente
+
+
+class Command(BaseCommand):
+    help = 'Reconstrói os extratos pré-calculados da área do cliente'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--lote', type=int, default=500, help='Quantidade de clientes por lote')
+        parser.add_argument('--cliente', type=int, action='append', dest='clientes',
+                            help='Reconstrói apenas o cliente informado (pode ser repetido)')
+        parser.add_argument('--area-ativa', action='store_true',
+                            help='Apenas clientes com a área do cliente ativa')
+
+    def handle(self, *args, **options):
+        tamanho = options['lote']
+        clientes = Cliente.objects.order_by('pk')
+        if options['clientes']:
+            clientes = clientes.filter(pk__in=options['clientes'])
+        if options['area_ativa']:
+            clientes = clientes.filter(area_cliente_ativa=True)
+
+        total = 0
+        ultimo_pk = 0
+        while True:
+            ids = list(clientes.filter(pk__gt=ultimo_pk).values_list('pk', flat=True)[:tamanho])
+            if not ids:
+                break
+            total += reconstruir(ids)
+            ultimo_pk = ids[-1]
+            self.stdout.write(f'{total} extratos reconstruídos...')
+
+        self.stdout.write(self.style.SUCCESS(f'Extratos reconstruídos para {total} clientes.'))
@@ -0,0 +1,81 @@
+import multiprocessing
+import os
+import signal
+import socket
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from dashboard import fila, processo_worker
+
+
+class Command(BaseCommand):
+    help = 'Executa os jobs em segundo plano da fila gravada no banco, com um pool de threads ou processos'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--concorrencia', type=int, default=4, help='Jobs executados ao mesmo tempo')
+        parser.add_argument('--processos', action='store_true', help='Usa um pool de processos em vez de threads')
+        parser.add_argument('--intervalo', type=float, default=1.0, help='Segundos de espera quando a fila está vazia')
+        parser.add_argument('--uma-vez', action='store_true',
+                            help='Executa os jobs vencidos e termina quando a fila esvaziar')
+        parser.add_argument('--sem-periodicos', action='store_true', help='Não agenda os jobs periódicos')
+
+    def handle(self, *args, **options):
+        nome = f'{socket.gethostname()}:{os.getpid()}'
+        concorrencia = max(options['concorrencia'], 1)
+        self.parar = False
+        signal.signal(signal.SIGTERM, self.interromper)
+        signal.signal(signal.SIGINT, self.interromper)
+
+        if options['processos']:
+            # spawn: os processos não herdam as conexões abertas deste processo
+            connections.close_all()
+            pool = ProcessPoolExecutor(
+                concorrencia, mp_context=multiprocessing.get_context('spawn'), initializer=processo_worker.iniciar,
+            )
+            executar = processo_worker.executar
+        else:
+            pool = ThreadPoolExecutor(concorrencia, thread_name_prefix='job')
+            executar = fila.executar
+
+        self.stdout.write(f'Worker {nome} iniciado ({concorrencia} {"processos" if options["processos"] else "threads"}).')
+        em_execucao = set()
+        executados = 0
+        proxima_manutencao = 0
+        with pool:
+            while not self.parar:
+                if time.monotonic() >= proxima_manutencao:
+                    recuperados = fila.recuperar_travados()
+                    if recuperados:
+                        self.stdout.write(self.style.WARNING(f'{recuperados} job(s) travado(s) devolvido(s) à fila.'))
+                    if not options['sem_periodicos'] and not options['uma_vez']:
+                        fila.agendar_periodicos()
+                    proxima_manutencao = time.monotonic() + 30
+
+                livres = concorrencia - len(em_execucao)
+                reservados = fila.reservar(nome, livres) if livres else []
+                for job_id in reservados:
+                    em_execucao.add(pool.submit(executar, job_id))
+
+                if em_execucao:
+                    concluidos, em_execucao = wait(
+                        em_execucao, timeout=0 if reservados else options['intervalo'], return_when=FIRST_COMPLETED,
+                    )
+                    executados += len(concluidos)
+                    for futuro in concluidos:
+                        if futuro.exception() is not None:
+                            self.stderr.write(self.style.ERROR(f'Erro no worker: {futuro.exception()}'))
+                elif options['uma_vez']:
+                    break
+                elif not reservados:
+                    time.sleep(options['intervalo'])
+
+            # Espera os jobs em andamento terminarem antes de sair
+            executados += len(wait(em_execucao).done)
+
+        self.stdout.write(self.style.SUCCESS(f'Worker {nome} encerrado: {executados} job(s) executado(s).'))
+
+    def interromper(self, *args):
+        self.parar = True
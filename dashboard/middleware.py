@@ -0,0 +1,15 @@
+from . import historico
+
+
+class HistoricoMiddleware:
+    """Deixa a requisição corrente disponível para o histórico de alterações (dashboard.historico)"""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        token = historico.REQUISICAO.set(request)
+        try:
+            return self.get_response(request)
+        finally:
+            historico.REQUISICAO.reset(token)
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.5 on 2026-10-19 11:53
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dashboard', '0011_alter_atividaderecente_tipo'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RateioParticipacao',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('percentual', models.DecimalField(decimal_places=2, max_digits=5, verbose_name='Percentual')),
+                ('data_criacao', models.DateTimeField(auto_now_add=True, verbose_name='Data de Criação')),
+                ('advogado', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='participacoes_rateio', to=settings.AUTH_USER_MODEL, verbose_name='Advogado')),
+                ('receita', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='participacoes', to='dashboard.receita', verbose_name='Receita')),
+            ],
+            options={
+                'verbose_name': 'Participação no Rateio',
+                'verbose_name_plural': 'Participações no Rateio',
+                'ordering': ['-percentual'],
+                'indexes': [models.Index(fields=['advogado', 'receita'], name='rateio_advogado_receita_idx')],
+                'constraints': [models.UniqueConstraint(fields=('receita', 'advogado'), name='rateio_receita_advogado_unico'), models.CheckConstraint(condition=models.Q(('percentual__gt', 0), ('percentual__lte', 100)), name='rateio_percentual_valido')],
+            },
+        ),
+    ]
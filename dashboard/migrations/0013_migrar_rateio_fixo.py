@@ -0,0 +1,78 @@
+from decimal import Decimal
+
+from django.db import migrations
+
+TAMANHO_LOTE = 1000
+
+
+def copiar_rateio_fixo(apps, schema_editor):
+    """Copia os pares rateio_advogado_N/rateio_percentual_N para RateioParticipacao em lotes"""
+    Receita = apps.get_model('dashboard', 'Receita')
+    RateioParticipacao = apps.get_model('dashboard', 'RateioParticipacao')
+
+    receitas = Receita.objects.filter(rateio_ativo=True).order_by('pk').values_list(
+        'pk',
+        'rateio_advogado_1_id', 'rateio_percentual_1',
+        'rateio_advogado_2_id', 'rateio_percentual_2',
+        'rateio_advogado_3_id', 'rateio_percentual_3',
+    )
+
+    ultimo_pk = 0
+    while True:
+        lote = list(receitas.filter(pk__gt=ultimo_pk)[:TAMANHO_LOTE])
+        if not lote:
+            break
+
+        participacoes = []
+        for receita_id, *pares in lote:
+            # Agrupa por advogado caso o mesmo nome apareça em mais de uma coluna
+            percentuais = {}
+            for advogado_id, percentual in zip(pares[0::2], pares[1::2]):
+                if advogado_id and percentual and percentual > 0:
+                    percentuais[advogado_id] = percentuais.get(advogado_id, Decimal('0.00')) + percentual
+            for advogado_id, percentual in percentuais.items():
+                participacoes.append(RateioParticipacao(
+                    receita_id=receita_id,
+                    advogado_id=advogado_id,
+                    percentual=min(percentual, Decimal('100.00')),
+                ))
+
+        RateioParticipacao.objects.bulk_create(participacoes, ignore_conflicts=True)
+        ultimo_pk = lote[-1][0]
+
+
+def restaurar_rateio_fixo(apps, schema_editor):
+    """Restaura até três participações por receita nas colunas fixas"""
+    Receita = apps.get_model('dashboard', 'Receita')
+    RateioParticipacao = apps.get_model('dashboard', 'RateioParticipacao')
+
+    por_receita = {}
+    for receita_id, advogado_id, percentual in RateioParticipacao.objects.order_by(
+        'receita_id', '-percentual'
+    ).values_list('receita_id', 'advogado_id', 'percentual').iterator(chunk_size=TAMANHO_LOTE):
+        por_receita.setdefault(receita_id, []).append((advogado_id, percentual))
+
+    receitas = []
+    for receita_id, participacoes in por_receita.items():
+        receita = Receita(pk=receita_id)
+        for indice, (advogado_id, percentual) in enumerate(participacoes[:3], start=1):
+            setattr(receita, f'rateio_advogado_{indice}_id', advogado_id)
+            setattr(receita, f'rateio_percentual_{indice}', percentual)
+        receitas.append(receita)
+
+    Receita.objects.bulk_update(
+        receitas,
+        [f'rateio_{campo}_{indice}' for indice in range(1, 4) for campo in ('advogado', 'percentual')],
+        batch_size=TAMANHO_LOTE,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dashboard', '0012_rateioparticipacao'),
+    ]
+
+    operations = [
+        migrations.RunPython(copiar_rateio_fixo, restaurar_rateio_fixo),
+    ]
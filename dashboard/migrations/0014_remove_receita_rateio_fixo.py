@@ -0,0 +1,37 @@
+# Generated by Django 5.2.5 on 2026-10-19 11:53
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dashboard', '0013_migrar_rateio_fixo'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='receita',
+            name='rateio_advogado_1',
+        ),
+        migrations.RemoveField(
+            model_name='receita',
+            name='rateio_advogado_2',
+        ),
+        migrations.RemoveField(
+            model_name='receita',
+            name='rateio_advogado_3',
+        ),
+        migrations.RemoveField(
+            model_name='receita',
+            name='rateio_percentual_1',
+        ),
+        migrations.RemoveField(
+            model_name='receita',
+            name='rateio_percentual_2',
+        ),
+        migrations.RemoveField(
+            model_name='receita',
+            name='rateio_percentual_3',
+        ),
+    ]
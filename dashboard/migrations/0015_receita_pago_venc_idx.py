@@ -0,0 +1,19 @@
+# Generated by Django 5.2.5 on 2026-10-19 11:56
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dashboard', '0014_remove_receita_rateio_fixo'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='receita',
+            index=models.Index(fields=['pago', 'data_vencimento'], name='receita_pago_venc_idx'),
+        ),
+    ]
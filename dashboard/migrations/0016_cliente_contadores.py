@@ -0,0 +1,50 @@
+# Generated by Django 5.2.5 on 2026-10-19 12:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dashboard', '0015_receita_pago_venc_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='cliente',
+            name='numero_processos',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Número de Processos'),
+        ),
+        migrations.AddField(
+            model_name='cliente',
+            name='saldo_aberto',
+            field=models.DecimalField(decimal_places=2, default=0, editable=False, max_digits=14, verbose_name='Saldo em Aberto'),
+        ),
+        migrations.AddField(
+            model_name='cliente',
+            name='total_faturado',
+            field=models.DecimalField(decimal_places=2, default=0, editable=False, max_digits=14, verbose_name='Total Faturado'),
+        ),
+        migrations.AddField(
+            model_name='cliente',
+            name='total_recebido',
+            field=models.DecimalField(decimal_places=2, default=0, editable=False, max_digits=14, verbose_name='Total Recebido'),
+        ),
+        migrations.AddField(
+            model_name='cliente',
+            name='ultima_movimentacao',
+            field=models.DateTimeField(blank=True, editable=False, null=True, verbose_name='Última Movimentação'),
+        ),
+        migrations.AddIndex(
+            model_name='cliente',
+            index=models.Index(condition=models.Q(('ativo', True)), fields=['-total_faturado'], name='cliente_ativo_faturado_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='cliente',
+            index=models.Index(condition=models.Q(('ativo', True)), fields=['-saldo_aberto'], name='cliente_ativo_saldo_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='cliente',
+            index=models.Index(fields=['-saldo_aberto'], name='cliente_saldo_idx'),
+        ),
+    ]
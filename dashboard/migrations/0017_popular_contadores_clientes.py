@@ -0,0 +1,68 @@
+from decimal import Decimal
+
+from django.db import migrations
+from django.db.models import Count, DecimalField, ExpressionWrapper, F, Max, Q, Sum, Value
+from django.db.models.functions import Coalesce
+
+TAMANHO_LOTE = 1000
+VALOR = DecimalField(max_digits=14, decimal_places=2)
+ZERO = Decimal('0.00')
+
+
+def popular_contadores(apps, schema_editor):
+    """Calcula os contadores iniciais dos clientes em lotes de TAMANHO_LOTE"""
+    Cliente = apps.get_model('dashboard', 'Cliente')
+    Receita = apps.get_model('dashboard', 'Receita')
+    Processo = apps.get_model('dashboard', 'Processo')
+
+    saldo = ExpressionWrapper(
+        F('valor_total') - F('desconto') - Coalesce('valor_recebido', Value(ZERO)),
+        output_field=VALOR,
+    )
+
+    ultimo_pk = 0
+    while True:
+        clientes = list(Cliente.objects.filter(pk__gt=ultimo_pk).order_by('pk').only('pk')[:TAMANHO_LOTE])
+        if not clientes:
+            break
+        ids = [cliente.pk for cliente in clientes]
+
+        receitas = {
+            linha['cliente_id']: linha
+            for linha in Receita.objects.filter(cliente_id__in=ids).annotate(saldo=saldo).values('cliente_id').annotate(
+                faturado=Coalesce(Sum(F('valor_total') - F('desconto'), output_field=VALOR), Value(ZERO), output_field=VALOR),
+                recebido=Coalesce(Sum('valor_recebido'), Value(ZERO), output_field=VALOR),
+                aberto=Coalesce(Sum('saldo', filter=Q(pago=False, saldo__gt=0)), Value(ZERO), output_field=VALOR),
+                ultima=Max('data_atualizacao'),
+            ).order_by()
+        }
+        processos = dict(
+            Processo.objects.filter(cliente_id__in=ids).values('cliente_id').annotate(
+                quantidade=Count('id')
+            ).order_by().values_list('cliente_id', 'quantidade')
+        )
+
+        for cliente in clientes:
+            linha = receitas.get(cliente.pk, {})
+            cliente.total_faturado = linha.get('faturado', ZERO)
+            cliente.total_recebido = linha.get('recebido', ZERO)
+            cliente.saldo_aberto = linha.get('aberto', ZERO)
+            cliente.numero_processos = processos.get(cliente.pk, 0)
+            cliente.ultima_movimentacao = linha.get('ultima')
+
+        Cliente.objects.bulk_update(
+            clientes,
+            ['total_faturado', 'total_recebido', 'saldo_aberto', 'numero_processos', 'ultima_movimentacao'],
+        )
+        ultimo_pk = ids[-1]
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dashboard', '0016_cliente_contadores'),
+    ]
+
+    operations = [
+        migrations.RunPython(popular_contadores, migrations.RunPython.noop),
+    ]
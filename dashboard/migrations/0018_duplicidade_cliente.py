@@ -0,0 +1,45 @@
+# Generated by Django 5.2.5 on 2026-10-19 12:06
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dashboard', '0017_popular_contadores_clientes'),
+        ('finance', '0009_populate_monthly_summaries'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='cliente',
+            name='cliente_financeiro',
+            field=models.OneToOneField(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='cliente_dashboard', to='finance.client', verbose_name='Cadastro no Financeiro'),
+        ),
+        migrations.CreateModel(
+            name='DuplicidadeCliente',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('origem_a', models.CharField(choices=[('cliente', 'Cliente'), ('financeiro', 'Cliente do Financeiro')], max_length=10, verbose_name='Origem A')),
+                ('id_a', models.PositiveBigIntegerField(verbose_name='Cadastro A')),
+                ('origem_b', models.CharField(choices=[('cliente', 'Cliente'), ('financeiro', 'Cliente do Financeiro')], max_length=10, verbose_name='Origem B')),
+                ('id_b', models.PositiveBigIntegerField(verbose_name='Cadastro B')),
+                ('pontuacao', models.PositiveSmallIntegerField(verbose_name='Pontuação')),
+                ('motivos', models.CharField(max_length=100, verbose_name='Motivos')),
+                ('status', models.CharField(choices=[('pendente', 'Pendente'), ('mesclado', 'Mesclado'), ('descartado', 'Descartado')], default='pendente', max_length=10, verbose_name='Status')),
+                ('data_criacao', models.DateTimeField(auto_now_add=True, verbose_name='Data de Criação')),
+                ('data_revisao', models.DateTimeField(blank=True, null=True, verbose_name='Data da Revisão')),
+                ('revisado_por', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL, verbose_name='Revisado por')),
+            ],
+            options={
+                'verbose_name': 'Duplicidade de Cliente',
+                'verbose_name_plural': 'Duplicidades de Clientes',
+                'ordering': ['-pontuacao', 'pk'],
+                'indexes': [models.Index(fields=['status', '-pontuacao'], name='duplicidade_status_idx'), models.Index(fields=['origem_b', 'id_b'], name='duplicidade_b_idx')],
+                'constraints': [models.UniqueConstraint(fields=('origem_a', 'id_a', 'origem_b', 'id_b'), name='duplicidade_par_unico')],
+            },
+        ),
+    ]
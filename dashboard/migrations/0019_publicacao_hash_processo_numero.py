@@ -0,0 +1,23 @@
+# Generated by Django 5.2.5 on 2026-10-19 12:08
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dashboard', '0018_duplicidade_cliente'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='processo',
+            name='numero_normalizado',
+            field=models.CharField(blank=True, db_index=True, editable=False, max_length=50, verbose_name='Número Normalizado'),
+        ),
+        migrations.AddField(
+            model_name='publicacao',
+            name='hash_conteudo',
+            field=models.CharField(blank=True, editable=False, max_length=64, null=True, unique=True, verbose_name='Hash do Conteúdo'),
+        ),
+    ]
@@ -0,0 +1,58 @@
+import hashlib
+import re
+
+from django.db import migrations
+
+TAMANHO_LOTE = 1000
+
+
+def somente_digitos(valor):
+    return re.sub(r'\D', '', valor or '')
+
+
+def preencher(apps, schema_editor):
+    """Preenche Processo.numero_normalizado e Publicacao.hash_conteudo dos registros existentes"""
+    Processo = apps.get_model('dashboard', 'Processo')
+    Publicacao = apps.get_model('dashboard', 'Publicacao')
+
+    ultimo_pk = 0
+    while True:
+        lote = list(Processo.objects.filter(pk__gt=ultimo_pk).order_by('pk').only('pk', 'numero')[:TAMANHO_LOTE])
+        if not lote:
+            break
+        for processo in lote:
+            processo.numero_normalizado = somente_digitos(processo.numero)
+        Processo.objects.bulk_update(lote, ['numero_normalizado'])
+        ultimo_pk = lote[-1].pk
+
+    vistos = set()
+    ultimo_pk = 0
+    while True:
+        lote = list(
+            Publicacao.objects.filter(pk__gt=ultimo_pk).order_by('pk').values_list(
+                'pk', 'processo__numero', 'data_publicacao', 'conteudo'
+            )[:TAMANHO_LOTE]
+        )
+        if not lote:
+            break
+        atualizadas = []
+        for pk, numero, data, conteudo in lote:
+            texto = f"{somente_digitos(numero)}|{data.isoformat()}|{' '.join((conteudo or '').split())}"
+            chave = hashlib.sha256(texto.encode('utf-8')).hexdigest()
+            # Duplicatas já existentes ficam sem hash para não violar a unicidade
+            if chave not in vistos:
+                vistos.add(chave)
+                atualizadas.append(Publicacao(pk=pk, hash_conteudo=chave))
+        Publicacao.objects.bulk_update(atualizadas, ['hash_conteudo'])
+        ultimo_pk = lote[-1][0]
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dashboard', '0019_publicacao_hash_processo_numero'),
+    ]
+
+    operations = [
+        migrations.RunPython(preencher, migrations.RunPython.noop),
+    ]
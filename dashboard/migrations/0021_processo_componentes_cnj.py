@@ -0,0 +1,43 @@
+# Generated by Django 5.2.5 on 2026-10-19 12:10
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dashboard', '0020_preencher_numero_normalizado_hash'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='processo',
+            name='cnj_ano',
+            field=models.PositiveSmallIntegerField(blank=True, editable=False, null=True, verbose_name='Ano (CNJ)'),
+        ),
+        migrations.AddField(
+            model_name='processo',
+            name='cnj_origem',
+            field=models.PositiveSmallIntegerField(blank=True, editable=False, null=True, verbose_name='Origem (CNJ)'),
+        ),
+        migrations.AddField(
+            model_name='processo',
+            name='cnj_segmento',
+            field=models.PositiveSmallIntegerField(blank=True, editable=False, null=True, verbose_name='Segmento do Judiciário (CNJ)'),
+        ),
+        migrations.AddField(
+            model_name='processo',
+            name='cnj_tribunal',
+            field=models.PositiveSmallIntegerField(blank=True, editable=False, null=True, verbose_name='Tribunal (CNJ)'),
+        ),
+        migrations.AddIndex(
+            model_name='processo',
+            index=models.Index(fields=['cnj_segmento', 'cnj_tribunal', 'cnj_ano'], name='processo_cnj_tribunal_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='processo',
+            index=models.Index(fields=['cnj_ano'], name='processo_cnj_ano_idx'),
+        ),
+    ]
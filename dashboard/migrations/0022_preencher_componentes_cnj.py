@@ -0,0 +1,47 @@
+import re
+
+from django.db import migrations
+
+TAMANHO_LOTE = 1000
+
+
+def componentes(numero):
+    digitos = re.sub(r'\D', '', numero or '')
+    if len(digitos) != 20:
+        return None
+    sequencial, digito, ano, segmento, tribunal, origem = (
+        digitos[0:7], digitos[7:9], digitos[9:13], digitos[13], digitos[14:16], digitos[16:20]
+    )
+    if 98 - int(f'{sequencial}{ano}{segmento}{tribunal}{origem}00') % 97 != int(digito):
+        return None
+    return int(ano), int(segmento), int(tribunal), int(origem)
+
+
+def preencher_componentes(apps, schema_editor):
+    """Preenche as colunas cnj_* dos processos com número CNJ válido"""
+    Processo = apps.get_model('dashboard', 'Processo')
+
+    ultimo_pk = 0
+    while True:
+        lote = list(Processo.objects.filter(pk__gt=ultimo_pk).order_by('pk').only('pk', 'numero')[:TAMANHO_LOTE])
+        if not lote:
+            break
+        atualizados = []
+        for processo in lote:
+            valores = componentes(processo.numero)
+            if valores:
+                processo.cnj_ano, processo.cnj_segmento, processo.cnj_tribunal, processo.cnj_origem = valores
+                atualizados.append(processo)
+        Processo.objects.bulk_update(atualizados, ['cnj_ano', 'cnj_segmento', 'cnj_tribunal', 'cnj_origem'])
+        ultimo_pk = lote[-1].pk
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dashboard', '0021_processo_componentes_cnj'),
+    ]
+
+    operations = [
+        migrations.RunPython(preencher_componentes, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,56 @@
+# Generated by Django 5.2.5 on 2026-10-19 12:12
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dashboard', '0022_preencher_componentes_cnj'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AlertaPublicacao',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('nome', models.CharField(max_length=100, verbose_name='Nome')),
+                ('termos', models.CharField(help_text='Palavras, "frases entre aspas" ou prefixos terminados em *', max_length=300, verbose_name='Termos')),
+                ('ativo', models.BooleanField(default=True, verbose_name='Ativo')),
+                ('ultima_publicacao', models.PositiveBigIntegerField(default=0, editable=False, verbose_name='Última Publicação Verificada')),
+                ('total_ocorrencias', models.PositiveIntegerField(default=0, editable=False, verbose_name='Total de Ocorrências')),
+                ('data_criacao', models.DateTimeField(auto_now_add=True, verbose_name='Data de Criação')),
+            ],
+            options={
+                'verbose_name': 'Alerta de Publicação',
+                'verbose_name_plural': 'Alertas de Publicação',
+                'ordering': ['nome'],
+            },
+        ),
+        migrations.AddField(
+            model_name='publicacao',
+            name='responsavel',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='publicacoes_atribuidas', to=settings.AUTH_USER_MODEL, verbose_name='Responsável'),
+        ),
+        migrations.AlterField(
+            model_name='atividaderecente',
+            name='tipo',
+            field=models.CharField(choices=[('cliente_cadastrado', 'Cliente Cadastrado'), ('cliente_desativado', 'Cliente Desativado'), ('audiencia_agendada', 'Audiência Agendada'), ('documento_gerado', 'Documento Gerado'), ('recebimento_confirmado', 'Recebimento Confirmado'), ('tarefa_criada', 'Tarefa Criada'), ('processo_criado', 'Processo Criado'), ('processo_atualizado', 'Processo Atualizado'), ('publicacao_recebida', 'Publicação Recebida'), ('alerta_publicacao', 'Alerta de Publicação')], max_length=30, verbose_name='Tipo'),
+        ),
+        migrations.AddIndex(
+            model_name='publicacao',
+            index=models.Index(condition=models.Q(('lida', False)), fields=['-data_publicacao', '-id'], name='publicacao_nao_lida_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='publicacao',
+            index=models.Index(condition=models.Q(('lida', False)), fields=['responsavel', '-data_publicacao'], name='publicacao_resp_nao_lida_idx'),
+        ),
+        migrations.AddField(
+            model_name='alertapublicacao',
+            name='advogado',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='alertas_publicacao', to=settings.AUTH_USER_MODEL, verbose_name='Advogado'),
+        ),
+    ]
@@ -0,0 +1,61 @@
+from django.db import migrations
+
+# Índice de texto completo (SQLite FTS5) sobre título e conteúdo das publicações.
+# A tabela usa o conteúdo de dashboard_publicacao (content=) e é mantida por
+# gatilhos, inclusive nas inserções em lote da importação.
+CRIAR = [
+    """
+    CREATE VIRTUAL TABLE dashboard_publicacao_fts USING fts5(
+        titulo, conteudo,
+        content='dashboard_publicacao', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    """
+    CREATE TRIGGER dashboard_publicacao_fts_ai AFTER INSERT ON dashboard_publicacao BEGIN
+        INSERT INTO dashboard_publicacao_fts(rowid, titulo, conteudo) VALUES (new.id, new.titulo, new.conteudo);
+    END
+    """,
+    """
+    CREATE TRIGGER dashboard_publicacao_fts_ad AFTER DELETE ON dashboard_publicacao BEGIN
+        INSERT INTO dashboard_publicacao_fts(dashboard_publicacao_fts, rowid, titulo, conteudo)
+        VALUES ('delete', old.id, old.titulo, old.conteudo);
+    END
+    """,
+    """
+    CREATE TRIGGER dashboard_publicacao_fts_au AFTER UPDATE OF titulo, conteudo ON dashboard_publicacao BEGIN
+        INSERT INTO dashboard_publicacao_fts(dashboard_publicacao_fts, rowid, titulo, conteudo)
+        VALUES ('delete', old.id, old.titulo, old.conteudo);
+        INSERT INTO dashboard_publicacao_fts(rowid, titulo, conteudo) VALUES (new.id, new.titulo, new.conteudo);
+    END
+    """,
+    "INSERT INTO dashboard_publicacao_fts(dashboard_publicacao_fts) VALUES ('rebuild')",
+]
+
+REMOVER = [
+    'DROP TRIGGER IF EXISTS dashboard_publicacao_fts_au',
+    'DROP TRIGGER IF EXISTS dashboard_publicacao_fts_ad',
+    'DROP TRIGGER IF EXISTS dashboard_publicacao_fts_ai',
+    'DROP TABLE IF EXISTS dashboard_publicacao_fts',
+]
+
+
+def executar(comandos):
+    def operacao(apps, schema_editor):
+        # Em outros bancos a busca usa o filtro por LIKE (ver dashboard.busca)
+        if schema_editor.connection.vendor != 'sqlite':
+            return
+        for comando in comandos:
+            schema_editor.execute(comando)
+    return operacao
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dashboard', '0023_publicacao_triagem_alertas'),
+    ]
+
+    operations = [
+        migrations.RunPython(executar(CRIAR), executar(REMOVER)),
+    ]
@@ -0,0 +1,43 @@
+# Generated by Django 5.2.5 on 2026-10-19 12:16
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dashboard', '0024_publicacao_fts'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Job',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('nome', models.CharField(max_length=100, verbose_name='Nome')),
+                ('argumentos', models.JSONField(blank=True, default=list, verbose_name='Argumentos')),
+                ('parametros', models.JSONField(blank=True, default=dict, verbose_name='Parâmetros')),
+                ('status', models.CharField(choices=[('fila', 'Na Fila'), ('executando', 'Executando'), ('concluido', 'Concluído'), ('falhou', 'Falhou'), ('cancelado', 'Cancelado')], default='fila', max_length=10, verbose_name='Status')),
+                ('prioridade', models.SmallIntegerField(default=0, verbose_name='Prioridade')),
+                ('executar_em', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Executar em')),
+                ('tentativas', models.PositiveSmallIntegerField(default=0, verbose_name='Tentativas')),
+                ('max_tentativas', models.PositiveSmallIntegerField(default=3, verbose_name='Máximo de Tentativas')),
+                ('chave', models.CharField(blank=True, max_length=150, null=True, verbose_name='Chave')),
+                ('lote', models.CharField(blank=True, editable=False, max_length=32, null=True, verbose_name='Lote de Reserva')),
+                ('worker', models.CharField(blank=True, max_length=100, null=True, verbose_name='Worker')),
+                ('resultado', models.JSONField(blank=True, null=True, verbose_name='Resultado')),
+                ('ultimo_erro', models.TextField(blank=True, null=True, verbose_name='Último Erro')),
+                ('data_criacao', models.DateTimeField(auto_now_add=True, verbose_name='Data de Criação')),
+                ('iniciado_em', models.DateTimeField(blank=True, null=True, verbose_name='Iniciado em')),
+                ('concluido_em', models.DateTimeField(blank=True, null=True, verbose_name='Concluído em')),
+            ],
+            options={
+                'verbose_name': 'Job',
+                'verbose_name_plural': 'Jobs',
+                'ordering': ['-data_criacao'],
+                'indexes': [models.Index(condition=models.Q(('status', 'fila')), fields=['-prioridade', 'executar_em'], name='job_fila_idx'), models.Index(fields=['lote'], name='job_lote_idx'), models.Index(fields=['status', 'concluido_em'], name='job_status_concluido_idx')],
+                'constraints': [models.UniqueConstraint(condition=models.Q(('status__in', ['fila', 'executando'])), fields=('chave',), name='job_chave_ativa_unica')],
+            },
+        ),
+    ]
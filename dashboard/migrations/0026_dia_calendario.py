@@ -0,0 +1,31 @@
+# Generated by Django 5.2.5 on 2026-10-19 12:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dashboard', '0025_job'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DiaCalendario',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('calendario', models.CharField(blank=True, max_length=20, verbose_name='Calendário')),
+                ('data', models.DateField(verbose_name='Data')),
+                ('util', models.BooleanField(verbose_name='Dia Útil')),
+                ('ordinal', models.PositiveIntegerField(verbose_name='Ordinal')),
+                ('motivo', models.CharField(blank=True, max_length=200, verbose_name='Motivo')),
+            ],
+            options={
+                'verbose_name': 'Dia do Calendário Forense',
+                'verbose_name_plural': 'Dias do Calendário Forense',
+                'ordering': ['calendario', 'data'],
+                'indexes': [models.Index(condition=models.Q(('util', True)), fields=['calendario', 'ordinal'], name='dia_calendario_ordinal_idx')],
+                'constraints': [models.UniqueConstraint(fields=('calendario', 'data'), name='dia_calendario_unico')],
+            },
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.2.5 on 2026-10-19 12:22
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dashboard', '0026_dia_calendario'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='VersaoModelo',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('modelo', models.CharField(max_length=100, unique=True, verbose_name='Modelo')),
+                ('versao', models.PositiveBigIntegerField(default=0, verbose_name='Versão')),
+                ('data_atualizacao', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Data de Atualização')),
+            ],
+            options={
+                'verbose_name': 'Versão de Modelo',
+                'verbose_name_plural': 'Versões de Modelos',
+            },
+        ),
+    ]
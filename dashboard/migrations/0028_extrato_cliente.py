@@ -0,0 +1,43 @@
+# Generated by Django 5.2.5 on 2026-10-19 12:38
+
+import django.core.serializers.json
+import django.db.models.deletion
+import django.utils.timezone
+from django.contrib.auth.hashers import identify_hasher, make_password
+from django.db import migrations, models
+
+
+def hashear_senhas(apps, schema_editor):
+    """Substitui as senhas da área do cliente gravadas em texto puro pelo hash"""
+    Cliente = apps.get_model('dashboard', 'Cliente')
+    for cliente in Cliente.objects.exclude(senha_area_cliente__isnull=True).exclude(senha_area_cliente='').only(
+        'pk', 'senha_area_cliente'
+    ).iterator():
+        try:
+            identify_hasher(cliente.senha_area_cliente)
+        except ValueError:
+            Cliente.objects.filter(pk=cliente.pk).update(senha_area_cliente=make_password(cliente.senha_area_cliente))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dashboard', '0027_versao_modelo'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ExtratoCliente',
+            fields=[
+                ('cliente', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='extrato', serialize=False, to='dashboard.cliente', verbose_name='Cliente')),
+                ('dados', models.JSONField(default=dict, encoder=django.core.serializers.json.DjangoJSONEncoder, verbose_name='Dados')),
+                ('chave_acesso', models.CharField(blank=True, max_length=64, verbose_name='Chave de Acesso')),
+                ('data_atualizacao', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Data de Atualização')),
+            ],
+            options={
+                'verbose_name': 'Extrato do Cliente',
+                'verbose_name_plural': 'Extratos dos Clientes',
+            },
+        ),
+        migrations.RunPython(hashear_senhas, migrations.RunPython.noop),
+    ]
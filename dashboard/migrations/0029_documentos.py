@@ -0,0 +1,71 @@
+# Generated by Django 5.2.5 on 2026-10-19 12:42
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dashboard', '0028_extrato_cliente'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DocumentoGerado',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('modelo', models.CharField(choices=[('recibo', 'Recibo'), ('contrato_honorarios', 'Contrato de Honorários')], max_length=30, verbose_name='Modelo')),
+                ('objeto_id', models.PositiveBigIntegerField(verbose_name='Objeto')),
+                ('assinatura', models.CharField(max_length=64, verbose_name='Assinatura')),
+                ('arquivo', models.CharField(max_length=255, verbose_name='Arquivo')),
+                ('tamanho', models.PositiveIntegerField(default=0, verbose_name='Tamanho (bytes)')),
+                ('data_criacao', models.DateTimeField(auto_now_add=True, verbose_name='Data de Criação')),
+            ],
+            options={
+                'verbose_name': 'Documento Gerado',
+                'verbose_name_plural': 'Documentos Gerados',
+                'ordering': ['-data_criacao'],
+            },
+        ),
+        migrations.AddField(
+            model_name='job',
+            name='progresso',
+            field=models.PositiveIntegerField(default=0, verbose_name='Itens Processados'),
+        ),
+        migrations.AddField(
+            model_name='job',
+            name='progresso_total',
+            field=models.PositiveIntegerField(blank=True, null=True, verbose_name='Total de Itens'),
+        ),
+        migrations.AddIndex(
+            model_name='receita',
+            index=models.Index(condition=models.Q(('pago', True)), fields=['data_recebimento'], name='receita_recebida_idx'),
+        ),
+        migrations.AddField(
+            model_name='documentogerado',
+            name='cliente',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to='dashboard.cliente', verbose_name='Cliente'),
+        ),
+        migrations.AddField(
+            model_name='documentogerado',
+            name='processo',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to='dashboard.processo', verbose_name='Processo'),
+        ),
+        migrations.AddField(
+            model_name='documentogerado',
+            name='receita',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to='dashboard.receita', verbose_name='Receita'),
+        ),
+        migrations.AddField(
+            model_name='documentogerado',
+            name='usuario',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL, verbose_name='Gerado por'),
+        ),
+        migrations.AddIndex(
+            model_name='documentogerado',
+            index=models.Index(fields=['modelo', 'objeto_id', 'assinatura'], name='documento_objeto_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.5 on 2026-10-19 12:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dashboard', '0029_documentos'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='atividaderecente',
+            name='tipo',
+            field=models.CharField(choices=[('cliente_cadastrado', 'Cliente Cadastrado'), ('cliente_desativado', 'Cliente Desativado'), ('audiencia_agendada', 'Audiência Agendada'), ('documento_gerado', 'Documento Gerado'), ('recebimento_confirmado', 'Recebimento Confirmado'), ('tarefa_criada', 'Tarefa Criada'), ('tarefa_atualizada', 'Tarefa Atualizada'), ('processo_criado', 'Processo Criado'), ('processo_atualizado', 'Processo Atualizado'), ('publicacao_recebida', 'Publicação Recebida'), ('alerta_publicacao', 'Alerta de Publicação')], max_length=30, verbose_name='Tipo'),
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 5.2.5 on 2026-10-19 13:09
+
+import dashboard.models
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dashboard', '0030_atividade_tarefa_atualizada'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='processo',
+            name='data_arquivamento',
+            field=models.DateTimeField(blank=True, editable=False, null=True, verbose_name='Data de Arquivamento'),
+        ),
+        migrations.CreateModel(
+            name='RegistroArquivado',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('modelo', models.CharField(max_length=50, verbose_name='Modelo')),
+                ('objeto_id', models.PositiveBigIntegerField(verbose_name='Objeto')),
+                ('dados', models.JSONField(encoder=dashboard.models.EncoderArquivo, verbose_name='Dados')),
+                ('data_arquivamento', models.DateTimeField(auto_now_add=True, verbose_name='Data de Arquivamento')),
+                ('processo', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='arquivados', to='dashboard.processo', verbose_name='Processo')),
+            ],
+            options={
+                'verbose_name': 'Registro Arquivado',
+                'verbose_name_plural': 'Registros Arquivados',
+                'indexes': [models.Index(fields=['processo', 'modelo'], name='arquivado_processo_idx')],
+                'constraints': [models.UniqueConstraint(fields=('modelo', 'objeto_id'), name='arquivado_objeto_unico')],
+            },
+        ),
+    ]
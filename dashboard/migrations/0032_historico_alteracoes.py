@@ -0,0 +1,36 @@
+# Generated by Django 5.2.5 on 2026-10-19 13:12
+
+import django.core.serializers.json
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dashboard', '0031_arquivo_processos'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Alteracao',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('modelo', models.CharField(max_length=50, verbose_name='Modelo')),
+                ('objeto_id', models.PositiveBigIntegerField(verbose_name='Objeto')),
+                ('acao', models.CharField(choices=[('criado', 'Criado'), ('alterado', 'Alterado'), ('excluido', 'Excluído')], max_length=10, verbose_name='Ação')),
+                ('campos', models.JSONField(blank=True, default=dict, encoder=django.core.serializers.json.DjangoJSONEncoder, verbose_name='Campos')),
+                ('data', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Data')),
+                ('usuario', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL, verbose_name='Usuário')),
+            ],
+            options={
+                'verbose_name': 'Alteração',
+                'verbose_name_plural': 'Alterações',
+                'ordering': ['-data', '-id'],
+                'indexes': [models.Index(fields=['modelo', 'objeto_id', '-data'], name='alteracao_objeto_idx'), models.Index(fields=['data'], name='alteracao_data_idx')],
+            },
+        ),
+    ]
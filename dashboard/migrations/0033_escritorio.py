@@ -0,0 +1,292 @@
+# Generated by Django 5.2.5 on 2026-10-19 13:37
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+# default=1: o escritório criado em users.0004, dono de todos os dados existentes
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dashboard', '0032_historico_alteracoes'),
+        ('finance', '0009_populate_monthly_summaries'),
+        ('users', '0004_escritorio'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='cliente',
+            name='cliente_ativo_faturado_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='cliente',
+            name='cliente_ativo_saldo_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='cliente',
+            name='cliente_saldo_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='duplicidadecliente',
+            name='duplicidade_status_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='processo',
+            name='processo_cnj_tribunal_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='processo',
+            name='processo_cnj_ano_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='publicacao',
+            name='publicacao_nao_lida_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='receita',
+            name='receita_pago_venc_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='receita',
+            name='receita_recebida_idx',
+        ),
+        migrations.AddField(
+            model_name='alertapublicacao',
+            name='escritorio',
+            field=models.ForeignKey(db_index=False, default=1, editable=False, on_delete=django.db.models.deletion.PROTECT, related_name='+', to='users.escritorio', verbose_name='Escritório'),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='atividaderecente',
+            name='escritorio',
+            field=models.ForeignKey(db_index=False, default=1, editable=False, on_delete=django.db.models.deletion.PROTECT, related_name='+', to='users.escritorio', verbose_name='Escritório'),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='audiencia',
+            name='escritorio',
+            field=models.ForeignKey(db_index=False, default=1, editable=False, on_delete=django.db.models.deletion.PROTECT, related_name='+', to='users.escritorio', verbose_name='Escritório'),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='banco',
+            name='escritorio',
+            field=models.ForeignKey(db_index=False, default=1, editable=False, on_delete=django.db.models.deletion.PROTECT, related_name='+', to='users.escritorio', verbose_name='Escritório'),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='cliente',
+            name='escritorio',
+            field=models.ForeignKey(db_index=False, default=1, editable=False, on_delete=django.db.models.deletion.PROTECT, related_name='+', to='users.escritorio', verbose_name='Escritório'),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='despesa',
+            name='escritorio',
+            field=models.ForeignKey(db_index=False, default=1, editable=False, on_delete=django.db.models.deletion.PROTECT, related_name='+', to='users.escritorio', verbose_name='Escritório'),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='documentogerado',
+            name='escritorio',
+            field=models.ForeignKey(db_index=False, default=1, editable=False, on_delete=django.db.models.deletion.PROTECT, related_name='+', to='users.escritorio', verbose_name='Escritório'),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='duplicidadecliente',
+            name='escritorio',
+            field=models.ForeignKey(db_index=False, default=1, editable=False, on_delete=django.db.models.deletion.PROTECT, related_name='+', to='users.escritorio', verbose_name='Escritório'),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='formapagamento',
+            name='escritorio',
+            field=models.ForeignKey(db_index=False, default=1, editable=False, on_delete=django.db.models.deletion.PROTECT, related_name='+', to='users.escritorio', verbose_name='Escritório'),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='fornecedor',
+            name='escritorio',
+            field=models.ForeignKey(db_index=False, default=1, editable=False, on_delete=django.db.models.deletion.PROTECT, related_name='+', to='users.escritorio', verbose_name='Escritório'),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='job',
+            name='escritorio',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='users.escritorio', verbose_name='Escritório'),
+        ),
+        migrations.AddField(
+            model_name='prazopagamento',
+            name='escritorio',
+            field=models.ForeignKey(db_index=False, default=1, editable=False, on_delete=django.db.models.deletion.PROTECT, related_name='+', to='users.escritorio', verbose_name='Escritório'),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='processo',
+            name='escritorio',
+            field=models.ForeignKey(db_index=False, default=1, editable=False, on_delete=django.db.models.deletion.PROTECT, related_name='+', to='users.escritorio', verbose_name='Escritório'),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='publicacao',
+            name='escritorio',
+            field=models.ForeignKey(db_index=False, default=1, editable=False, on_delete=django.db.models.deletion.PROTECT, related_name='+', to='users.escritorio', verbose_name='Escritório'),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='rateioparticipacao',
+            name='escritorio',
+            field=models.ForeignKey(db_index=False, default=1, editable=False, on_delete=django.db.models.deletion.PROTECT, related_name='+', to='users.escritorio', verbose_name='Escritório'),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='receita',
+            name='escritorio',
+            field=models.ForeignKey(db_index=False, default=1, editable=False, on_delete=django.db.models.deletion.PROTECT, related_name='+', to='users.escritorio', verbose_name='Escritório'),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='registroarquivado',
+            name='escritorio',
+            field=models.ForeignKey(db_index=False, default=1, editable=False, on_delete=django.db.models.deletion.PROTECT, related_name='+', to='users.escritorio', verbose_name='Escritório'),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='task',
+            name='escritorio',
+            field=models.ForeignKey(db_index=False, default=1, editable=False, on_delete=django.db.models.deletion.PROTECT, related_name='+', to='users.escritorio', verbose_name='Escritório'),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='tipodemanda',
+            name='escritorio',
+            field=models.ForeignKey(db_index=False, default=1, editable=False, on_delete=django.db.models.deletion.PROTECT, related_name='+', to='users.escritorio', verbose_name='Escritório'),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='tipodespesa',
+            name='escritorio',
+            field=models.ForeignKey(db_index=False, default=1, editable=False, on_delete=django.db.models.deletion.PROTECT, related_name='+', to='users.escritorio', verbose_name='Escritório'),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='tiporeceita',
+            name='escritorio',
+            field=models.ForeignKey(db_index=False, default=1, editable=False, on_delete=django.db.models.deletion.PROTECT, related_name='+', to='users.escritorio', verbose_name='Escritório'),
+            preserve_default=False,
+        ),
+        migrations.AlterField(
+            model_name='cliente',
+            name='cpf_cnpj',
+            field=models.CharField(max_length=20, verbose_name='CPF/CNPJ'),
+        ),
+        migrations.AlterField(
+            model_name='processo',
+            name='numero',
+            field=models.CharField(max_length=50, verbose_name='Número do Processo'),
+        ),
+        migrations.AlterField(
+            model_name='processo',
+            name='numero_normalizado',
+            field=models.CharField(blank=True, editable=False, max_length=50, verbose_name='Número Normalizado'),
+        ),
+        migrations.AlterField(
+            model_name='publicacao',
+            name='hash_conteudo',
+            field=models.CharField(blank=True, editable=False, max_length=64, null=True, verbose_name='Hash do Conteúdo'),
+        ),
+        migrations.AddIndex(
+            model_name='atividaderecente',
+            index=models.Index(fields=['escritorio', '-data_criacao'], name='atividade_escritorio_data_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='audiencia',
+            index=models.Index(fields=['escritorio', 'data_hora'], name='audiencia_escritorio_data_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='cliente',
+            index=models.Index(condition=models.Q(('ativo', True)), fields=['escritorio', '-total_faturado'], name='cliente_ativo_faturado_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='cliente',
+            index=models.Index(condition=models.Q(('ativo', True)), fields=['escritorio', '-saldo_aberto'], name='cliente_ativo_saldo_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='cliente',
+            index=models.Index(fields=['escritorio', '-saldo_aberto'], name='cliente_saldo_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='cliente',
+            index=models.Index(fields=['escritorio', '-data_cadastro'], name='cliente_cadastro_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='despesa',
+            index=models.Index(fields=['escritorio', 'pago', 'data_vencimento'], name='despesa_pago_venc_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='despesa',
+            index=models.Index(condition=models.Q(('pago', True)), fields=['escritorio', 'data_pagamento'], name='despesa_paga_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='duplicidadecliente',
+            index=models.Index(fields=['escritorio', 'status', '-pontuacao'], name='duplicidade_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='processo',
+            index=models.Index(fields=['escritorio', 'numero_normalizado'], name='processo_numero_norm_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='processo',
+            index=models.Index(fields=['escritorio', 'cnj_segmento', 'cnj_tribunal', 'cnj_ano'], name='processo_cnj_tribunal_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='processo',
+            index=models.Index(fields=['escritorio', 'cnj_ano'], name='processo_cnj_ano_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='processo',
+            index=models.Index(fields=['escritorio', '-data_inicio'], name='processo_escritorio_inicio_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='publicacao',
+            index=models.Index(fields=['escritorio', '-data_publicacao'], name='publicacao_escritorio_data_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='publicacao',
+            index=models.Index(condition=models.Q(('lida', False)), fields=['escritorio', '-data_publicacao', '-id'], name='publicacao_nao_lida_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='receita',
+            index=models.Index(fields=['escritorio', 'pago', 'data_vencimento'], name='receita_pago_venc_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='receita',
+            index=models.Index(fields=['escritorio', '-data_vencimento'], name='receita_escritorio_venc_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='receita',
+            index=models.Index(condition=models.Q(('pago', True)), fields=['escritorio', 'data_recebimento'], name='receita_recebida_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['escritorio', 'data_inicio'], name='task_escritorio_inicio_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['escritorio', 'status', 'data_inicio'], name='task_escritorio_status_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='cliente',
+            constraint=models.UniqueConstraint(fields=('escritorio', 'cpf_cnpj'), name='cliente_escritorio_documento_unico'),
+        ),
+        migrations.AddConstraint(
+            model_name='processo',
+            constraint=models.UniqueConstraint(fields=('escritorio', 'numero'), name='processo_escritorio_numero_unico'),
+        ),
+        migrations.AddConstraint(
+            model_name='publicacao',
+            constraint=models.UniqueConstraint(fields=('escritorio', 'hash_conteudo'), name='publicacao_escritorio_hash_unico'),
+        ),
+    ]
@@ -0,0 +1,45 @@
+# Generated by Django 5.2.5 on 2026-10-19 13:53
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+
+def escritorio_dos_objetos(apps, schema_editor):
+    """Entradas existentes: o escritório do objeto (o principal, default, se ele foi excluído)"""
+    Alteracao = apps.get_model('dashboard', 'Alteracao')
+    for rotulo in ('dashboard.cliente', 'dashboard.processo', 'dashboard.receita'):
+        modelo = apps.get_model(rotulo)
+        objetos = modelo.objects.filter(pk=OuterRef('objeto_id'))
+        Alteracao.objects.filter(modelo=rotulo, objeto_id__in=modelo.objects.values('pk')).update(
+            escritorio_id=Subquery(objetos.values('escritorio_id')[:1]),
+        )
+
+
+# default=1: o escritório criado em users.0004
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dashboard', '0033_escritorio'),
+        ('users', '0004_escritorio'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='alteracao',
+            name='alteracao_objeto_idx',
+        ),
+        migrations.AddField(
+            model_name='alteracao',
+            name='escritorio',
+            field=models.ForeignKey(db_index=False, default=1, editable=False, on_delete=django.db.models.deletion.PROTECT, related_name='+', to='users.escritorio', verbose_name='Escritório'),
+            preserve_default=False,
+        ),
+        migrations.RunPython(escritorio_dos_objetos, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='alteracao',
+            index=models.Index(fields=['escritorio', 'modelo', 'objeto_id', '-data'], name='alteracao_objeto_idx'),
+        ),
+    ]
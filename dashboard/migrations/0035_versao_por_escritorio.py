@@ -0,0 +1,33 @@
+# Generated by Django 5.2.5 on 2026-10-19 13:55
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dashboard', '0034_alteracao_escritorio'),
+        ('users', '0004_escritorio'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='versaomodelo',
+            name='escritorio',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='users.escritorio', verbose_name='Escritório'),
+        ),
+        migrations.AlterField(
+            model_name='versaomodelo',
+            name='modelo',
+            field=models.CharField(max_length=100, verbose_name='Modelo'),
+        ),
+        migrations.AddConstraint(
+            model_name='versaomodelo',
+            constraint=models.UniqueConstraint(fields=('escritorio', 'modelo'), name='versao_escritorio_modelo_unica'),
+        ),
+        migrations.AddConstraint(
+            model_name='versaomodelo',
+            constraint=models.UniqueConstraint(condition=models.Q(('escritorio__isnull', True)), fields=('modelo',), name='versao_modelo_geral_unica'),
+        ),
+    ]
@@ -0,0 +1,46 @@
+# Generated by Django 5.2.5 on 2026-10-19 13:59
+
+from decimal import Decimal
+
+from django.db import migrations, models
+from django.db.models import DecimalField, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+
+
+def popular_total_bruto(apps, schema_editor):
+    """Total bruto inicial: a soma dos valores cheios das receitas de cada cliente"""
+    Cliente = apps.get_model('dashboard', 'Cliente')
+    Receita = apps.get_model('dashboard', 'Receita')
+    valor = DecimalField(max_digits=14, decimal_places=2)
+    somas = Receita.objects.filter(cliente_id=OuterRef('pk')).values('cliente_id').annotate(
+        bruto=Sum('valor_total', output_field=valor),
+    ).values('bruto')
+    Cliente.objects.filter(pk__in=Receita.objects.values('cliente_id')).update(
+        total_bruto=Coalesce(Subquery(somas[:1]), Value(Decimal('0.00')), output_field=valor),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dashboard', '0035_versao_por_escritorio'),
+        ('finance', '0010_escritorio'),
+        ('users', '0004_escritorio'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='cliente',
+            name='cliente_ativo_faturado_idx',
+        ),
+        migrations.AddField(
+            model_name='cliente',
+            name='total_bruto',
+            field=models.DecimalField(decimal_places=2, default=0, editable=False, max_digits=14, verbose_name='Total Bruto'),
+        ),
+        migrations.AddIndex(
+            model_name='cliente',
+            index=models.Index(condition=models.Q(('ativo', True)), fields=['escritorio', '-total_bruto'], name='cliente_ativo_bruto_idx'),
+        ),
+        migrations.RunPython(popular_total_bruto, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,48 @@
+from django.db import migrations
+
+# No SQLite, o AddField de 0033_escritorio recria a tabela dashboard_publicacao
+# e os gatilhos de 0024_publicacao_fts somem com ela: as publicações novas não
+# entravam mais no índice. Recria os gatilhos e reconstrói o índice.
+CRIAR = [
+    'DROP TRIGGER IF EXISTS dashboard_publicacao_fts_ai',
+    'DROP TRIGGER IF EXISTS dashboard_publicacao_fts_ad',
+    'DROP TRIGGER IF EXISTS dashboard_publicacao_fts_au',
+    """
+    CREATE TRIGGER dashboard_publicacao_fts_ai AFTER INSERT ON dashboard_publicacao BEGIN
+        INSERT INTO dashboard_publicacao_fts(rowid, titulo, conteudo) VALUES (new.id, new.titulo, new.conteudo);
+    END
+    """,
+    """
+    CREATE TRIGGER dashboard_publicacao_fts_ad AFTER DELETE ON dashboard_publicacao BEGIN
+        INSERT INTO dashboard_publicacao_fts(dashboard_publicacao_fts, rowid, titulo, conteudo)
+        VALUES ('delete', old.id, old.titulo, old.conteudo);
+    END
+    """,
+    """
+    CREATE TRIGGER dashboard_publicacao_fts_au AFTER UPDATE OF titulo, conteudo ON dashboard_publicacao BEGIN
+        INSERT INTO dashboard_publicacao_fts(dashboard_publicacao_fts, rowid, titulo, conteudo)
+        VALUES ('delete', old.id, old.titulo, old.conteudo);
+        INSERT INTO dashboard_publicacao_fts(rowid, titulo, conteudo) VALUES (new.id, new.titulo, new.conteudo);
+    END
+    """,
+    "INSERT INTO dashboard_publicacao_fts(dashboard_publicacao_fts) VALUES ('rebuild')",
+]
+
+
+def recriar_gatilhos(apps, schema_editor):
+    # Em outros bancos a busca usa o filtro por LIKE (ver dashboard.busca)
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for comando in CRIAR:
+        schema_editor.execute(comando)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dashboard', '0036_cliente_total_bruto'),
+    ]
+
+    operations = [
+        migrations.RunPython(recriar_gatilhos, migrations.RunPython.noop),
+    ]
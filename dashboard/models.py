@@ -1,12 +1,41 @@
-from django.db import models
+import datetime
+
+from django.contrib.auth.hashers import check_password, make_password
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import models, transaction
 from django.utils import timezone
 from decimal import Decimal
 from users.models import Lawyer
+from users.tenancy import EscritorioModel
+
+from . import cnj
+
+class ValoresCarregados:
+    """
+    Guarda em _valores_carregados os valores lidos do banco, que o histórico de
+    alterações (dashboard.historico) compara com a instância ao gravar, sem
+    consultar a linha de novo.
+    """
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instancia = super().from_db(db, field_names, values)
+        instancia._valores_carregados = dict(zip(field_names, values))
+        return instancia
 
-class Cliente(models.Model):
+    def refresh_from_db(self, *args, **kwargs):
+        super().refresh_from_db(*args, **kwargs)
+        adiados = self.get_deferred_fields()
+        self._valores_carregados = {
+            campo.attname: getattr(self, campo.attname)
+            for campo in self._meta.concrete_fields if campo.attname not in adiados
+        }
+
+
+class Cliente(ValoresCarregados, EscritorioModel):
     nome = models.CharField(max_length=200, verbose_name="Nome")
     nome_mae = models.CharField(max_length=200, blank=True, null=True, verbose_name="Nome da Mãe")
-    cpf_cnpj = models.CharField(max_length=20, unique=True, verbose_name="CPF/CNPJ")
+    cpf_cnpj = models.CharField(max_length=20, verbose_name="CPF/CNPJ")
     email = models.EmailField(verbose_name="E-mail")
     telefone = models.CharField(max_length=20, verbose_name="Telefone")
     endereco = models.TextField(blank=True, null=True, verbose_name="Endereço")
@@ -16,17 +45,53 @@ class Cliente(models.Model):
     ativo = models.BooleanField(default=True, verbose_name="Ativo")
     area_cliente_ativa = models.BooleanField(default=False, verbose_name="Área do Cliente Ativa")
     senha_area_cliente = models.CharField(max_length=128, blank=True, null=True, verbose_name="Senha da Área do Cliente")
+    cliente_financeiro = models.OneToOneField(
+        'finance.Client', on_delete=models.SET_NULL, blank=True, null=True,
+        related_name='cliente_dashboard', verbose_name="Cadastro no Financeiro",
+    )
+
+    # Contadores desnormalizados, mantidos por dashboard.signals e recalculáveis com
+    # o comando recalcular_contadores_clientes
+    total_faturado = models.DecimalField(max_digits=14, decimal_places=2, default=0, editable=False, verbose_name="Total Faturado")
+    total_recebido = models.DecimalField(max_digits=14, decimal_places=2, default=0, editable=False, verbose_name="Total Recebido")
+    saldo_aberto = models.DecimalField(max_digits=14, decimal_places=2, default=0, editable=False, verbose_name="Saldo em Aberto")
+    # Sem os descontos: é o valor que ordena o ranking de clientes do dashboard
+    total_bruto = models.DecimalField(max_digits=14, decimal_places=2, default=0, editable=False, verbose_name="Total Bruto")
+    numero_processos = models.PositiveIntegerField(default=0, editable=False, verbose_name="Número de Processos")
+    ultima_movimentacao = models.DateTimeField(blank=True, null=True, editable=False, verbose_name="Última Movimentação")
     
     class Meta:
         verbose_name = "Cliente"
         verbose_name_plural = "Clientes"
         ordering = ['-data_cadastro']
+        constraints = [
+            models.UniqueConstraint(fields=['escritorio', 'cpf_cnpj'], name='cliente_escritorio_documento_unico'),
+        ]
+        # Todos começam pelo escritório, o filtro de toda consulta feita numa requisição (users.tenancy)
+        indexes = [
+            # Parciais: o Django filtra booleanos como WHERE "ativo", que não usa um índice composto
+            models.Index(fields=['escritorio', '-total_bruto'], condition=models.Q(ativo=True), name='cliente_ativo_bruto_idx'),
+            models.Index(fields=['escritorio', '-saldo_aberto'], condition=models.Q(ativo=True), name='cliente_ativo_saldo_idx'),
+            models.Index(fields=['escritorio', '-saldo_aberto'], name='cliente_saldo_idx'),
+            models.Index(fields=['escritorio', '-data_cadastro'], name='cliente_cadastro_idx'),
+        ]
     
     def __str__(self):
         return self.nome
 
+    def definir_senha_area_cliente(self, senha):
+        """Grava o hash da senha da área do cliente (não salva o cliente)"""
+        self.senha_area_cliente = make_password(senha)
 
-class TipoReceita(models.Model):
+    def verificar_senha_area_cliente(self, senha):
+        """Confere a senha, atualizando o hash se o algoritmo padrão mudou"""
+        def atualizar(senha):
+            self.definir_senha_area_cliente(senha)
+            self.save(update_fields=['senha_area_cliente'])
+        return bool(self.senha_area_cliente) and check_password(senha, self.senha_area_cliente, atualizar)
+
+
+class TipoReceita(EscritorioModel):
     nome = models.CharField(max_length=100, verbose_name="Nome")
     descricao = models.TextField(blank=True, null=True, verbose_name="Descrição")
     data_cadastro = models.DateTimeField(default=timezone.now, verbose_name="Data de Cadastro")
@@ -39,7 +104,7 @@ class TipoReceita(models.Model):
     def __str__(self):
         return self.nome
 
-class TipoDespesa(models.Model):
+class TipoDespesa(EscritorioModel):
     nome = models.CharField(max_length=100, verbose_name="Nome")
     descricao = models.TextField(blank=True, null=True, verbose_name="Descrição")
     data_cadastro = models.DateTimeField(default=timezone.now, verbose_name="Data de Cadastro")
@@ -51,7 +116,7 @@ class TipoDespesa(models.Model):
     def __str__(self):
         return self.nome
 
-class FormaPagamento(models.Model):
+class FormaPagamento(EscritorioModel):
     nome = models.CharField(max_length=100, verbose_name="Nome")
     ativo = models.BooleanField(default=True, verbose_name="Ativo")
     data_cadastro = models.DateTimeField(default=timezone.now, verbose_name="Data de Cadastro")
@@ -63,7 +128,7 @@ class FormaPagamento(models.Model):
     def __str__(self):
         return self.nome
 
-class PrazoPagamento(models.Model):
+class PrazoPagamento(EscritorioModel):
     nome = models.CharField(max_length=100, verbose_name="Nome")
     dias = models.IntegerField(verbose_name="Dias")
     data_cadastro = models.DateTimeField(default=timezone.now, verbose_name="Data de Cadastro")
@@ -75,7 +140,7 @@ class PrazoPagamento(models.Model):
     def __str__(self):
         return f"{self.nome} - {self.dias} dias"
 
-class Banco(models.Model):
+class Banco(EscritorioModel):
     nome = models.CharField(max_length=100, verbose_name="Nome")
     ativo = models.BooleanField(default=True, verbose_name="Ativo")
     data_cadastro = models.DateTimeField(default=timezone.now, verbose_name="Data de Cadastro")
@@ -87,7 +152,7 @@ class Banco(models.Model):
     def __str__(self):
         return self.nome
 
-class Processo(models.Model):
+class Processo(ValoresCarregados, EscritorioModel):
     STATUS_CHOICES = [
         ('ativo', 'Ativo'),
         ('suspenso', 'Suspenso'),
@@ -95,7 +160,12 @@ class Processo(models.Model):
         ('finalizado', 'Finalizado'),
     ]
     
-    numero = models.CharField(max_length=50, unique=True, verbose_name="Número do Processo")
+    numero = models.CharField(max_length=50, verbose_name="Número do Processo")
+    numero_normalizado = models.CharField(max_length=50, blank=True, editable=False, verbose_name="Número Normalizado")
+    cnj_ano = models.PositiveSmallIntegerField(blank=True, null=True, editable=False, verbose_name="Ano (CNJ)")
+    cnj_segmento = models.PositiveSmallIntegerField(blank=True, null=True, editable=False, verbose_name="Segmento do Judiciário (CNJ)")
+    cnj_tribunal = models.PositiveSmallIntegerField(blank=True, null=True, editable=False, verbose_name="Tribunal (CNJ)")
+    cnj_origem = models.PositiveSmallIntegerField(blank=True, null=True, editable=False, verbose_name="Origem (CNJ)")
     cliente = models.ForeignKey(Cliente, on_delete=models.CASCADE, verbose_name="Cliente")
     advogado_responsavel = models.ForeignKey('users.Lawyer', on_delete=models.CASCADE, verbose_name="Advogado Responsável")
     titulo = models.CharField(max_length=200, verbose_name="Título")
@@ -106,16 +176,44 @@ class Processo(models.Model):
     valor_causa = models.DecimalField(max_digits=10, decimal_places=2, blank=True, null=True, verbose_name="Valor da Causa")
     tribunal = models.CharField(max_length=100, blank=True, null=True, verbose_name="Tribunal")
     vara = models.CharField(max_length=100, blank=True, null=True, verbose_name="Vara")
+    # Preenchida quando tarefas, audiências, publicações e atividades vão para o arquivo (dashboard.arquivo)
+    data_arquivamento = models.DateTimeField(blank=True, null=True, editable=False, verbose_name="Data de Arquivamento")
+
+    ESCRITORIO_FROM = ('cliente',)
     
     class Meta:
         verbose_name = "Processo"
         verbose_name_plural = "Processos"
         ordering = ['-data_inicio']
+        constraints = [
+            models.UniqueConstraint(fields=['escritorio', 'numero'], name='processo_escritorio_numero_unico'),
+        ]
+        indexes = [
+            models.Index(fields=['escritorio', 'numero_normalizado'], name='processo_numero_norm_idx'),
+            models.Index(fields=['escritorio', 'cnj_segmento', 'cnj_tribunal', 'cnj_ano'], name='processo_cnj_tribunal_idx'),
+            models.Index(fields=['escritorio', 'cnj_ano'], name='processo_cnj_ano_idx'),
+            models.Index(fields=['escritorio', '-data_inicio'], name='processo_escritorio_inicio_idx'),
+        ]
     
     def __str__(self):
         return f"{self.numero} - {self.titulo}"
 
-class Task(models.Model):
+    @property
+    def segmento_display(self):
+        return cnj.SEGMENTOS.get(self.cnj_segmento)
+
+    def save(self, *args, **kwargs):
+        # Colunas derivadas do número (dashboard.cnj), usadas nas buscas por igualdade
+        self.numero_normalizado = cnj.normalizar(self.numero)
+        for campo, valor in cnj.componentes(self.numero).items():
+            setattr(self, campo, valor)
+        if kwargs.get('update_fields') is not None and 'numero' in kwargs['update_fields']:
+            kwargs['update_fields'] = {*kwargs['update_fields'], 'numero_normalizado', *cnj.CAMPOS}
+        # Os contadores do cliente (dashboard.signals) são atualizados na mesma transação
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+
+class Task(EscritorioModel):
     PRIORIDADE_CHOICES = [
         ('baixa', 'Baixa'),
         ('media', 'Média'),
@@ -142,16 +240,22 @@ class Task(models.Model):
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pendente', verbose_name="Status")
     data_criacao = models.DateTimeField(auto_now_add=True, verbose_name="Data de Criação")
     data_atualizacao = models.DateTimeField(auto_now=True, verbose_name="Data de Atualização")
+
+    ESCRITORIO_FROM = ('processo', 'cliente', 'advogado')
     
     class Meta:
         verbose_name = "Tarefa"
         verbose_name_plural = "Tarefas"
         ordering = ['-data_inicio']
+        indexes = [
+            models.Index(fields=['escritorio', 'data_inicio'], name='task_escritorio_inicio_idx'),
+            models.Index(fields=['escritorio', 'status', 'data_inicio'], name='task_escritorio_status_idx'),
+        ]
     
     def __str__(self):
         return self.titulo
 
-class Audiencia(models.Model):
+class Audiencia(EscritorioModel):
     TIPO_CHOICES = [
         ('inicial', 'Inicial'),
         ('instrucao', 'Instrução'),
@@ -168,16 +272,21 @@ class Audiencia(models.Model):
     compareceu = models.BooleanField(default=False, verbose_name="Compareceu")
     resultado = models.TextField(blank=True, null=True, verbose_name="Resultado")
     data_criacao = models.DateTimeField(auto_now_add=True, verbose_name="Data de Criação")
+
+    ESCRITORIO_FROM = ('processo',)
     
     class Meta:
         verbose_name = "Audiência"
         verbose_name_plural = "Audiências"
         ordering = ['-data_hora']
+        indexes = [
+            models.Index(fields=['escritorio', 'data_hora'], name='audiencia_escritorio_data_idx'),
+        ]
     
     def __str__(self):
         return f"{self.processo.numero} - {self.get_tipo_display()} - {self.data_hora.strftime('%d/%m/%Y %H:%M')}"
 
-class Publicacao(models.Model):
+class Publicacao(EscritorioModel):
     processo = models.ForeignKey(Processo, on_delete=models.CASCADE, verbose_name="Processo")
     titulo = models.CharField(max_length=200, verbose_name="Título")
     conteudo = models.TextField(verbose_name="Conteúdo")
@@ -185,17 +294,51 @@ class Publicacao(models.Model):
     orgao = models.CharField(max_length=100, verbose_name="Órgão")
     tipo = models.CharField(max_length=100, blank=True, null=True, verbose_name="Tipo")
     lida = models.BooleanField(default=False, verbose_name="Lida")
+    responsavel = models.ForeignKey('users.Lawyer', on_delete=models.SET_NULL, blank=True, null=True, related_name='publicacoes_atribuidas', verbose_name="Responsável")
+    hash_conteudo = models.CharField(max_length=64, blank=True, null=True, editable=False, verbose_name="Hash do Conteúdo")
     data_criacao = models.DateTimeField(auto_now_add=True, verbose_name="Data de Criação")
+
+    ESCRITORIO_FROM = ('processo',)
     
     class Meta:
         verbose_name = "Publicação"
         verbose_name_plural = "Publicações"
         ordering = ['-data_publicacao']
+        constraints = [
+            models.UniqueConstraint(fields=['escritorio', 'hash_conteudo'], name='publicacao_escritorio_hash_unico'),
+        ]
+        indexes = [
+            models.Index(fields=['escritorio', '-data_publicacao'], name='publicacao_escritorio_data_idx'),
+            # Caixa de entrada: só as não lidas entram nos índices
+            models.Index(fields=['escritorio', '-data_publicacao', '-id'], condition=models.Q(lida=False), name='publicacao_nao_lida_idx'),
+            models.Index(fields=['responsavel', '-data_publicacao'], condition=models.Q(lida=False), name='publicacao_resp_nao_lida_idx'),
+        ]
     
     def __str__(self):
         return f"{self.processo.numero} - {self.titulo}"
 
-class Receita(models.Model):
+
+class AlertaPublicacao(EscritorioModel):
+    """Termos de busca salvos, verificados a cada importação de publicações"""
+    advogado = models.ForeignKey('users.Lawyer', on_delete=models.CASCADE, related_name='alertas_publicacao', verbose_name="Advogado")
+    nome = models.CharField(max_length=100, verbose_name="Nome")
+    termos = models.CharField(max_length=300, verbose_name="Termos", help_text="Palavras, \"frases entre aspas\" ou prefixos terminados em *")
+    ativo = models.BooleanField(default=True, verbose_name="Ativo")
+    ultima_publicacao = models.PositiveBigIntegerField(default=0, editable=False, verbose_name="Última Publicação Verificada")
+    total_ocorrencias = models.PositiveIntegerField(default=0, editable=False, verbose_name="Total de Ocorrências")
+    data_criacao = models.DateTimeField(auto_now_add=True, verbose_name="Data de Criação")
+
+    ESCRITORIO_FROM = ('advogado',)
+
+    class Meta:
+        verbose_name = "Alerta de Publicação"
+        verbose_name_plural = "Alertas de Publicação"
+        ordering = ['nome']
+
+    def __str__(self):
+        return f"{self.nome} ({self.termos})"
+
+class Receita(ValoresCarregados, EscritorioModel):
     CONDICAO_PAGAMENTO_CHOICES = [
         ('a_vista', 'À vista'),
         ('parcelado', 'Parcelado'),
@@ -223,24 +366,55 @@ class Receita(models.Model):
     desconto = models.DecimalField(max_digits=10, decimal_places=2, default=0, verbose_name="Desconto")
     valor_recebido = models.DecimalField(max_digits=10, decimal_places=2, blank=True, null=True, verbose_name="Valor Recebido")
     rateio_ativo = models.BooleanField(default=False, verbose_name="Rateio Ativo")
-    rateio_advogado_1 = models.ForeignKey('users.Lawyer', on_delete=models.CASCADE, blank=True, null=True, related_name='rateio_advogado_1', verbose_name="Advogado 1 (Rateio)")
-    rateio_percentual_1 = models.DecimalField(max_digits=5, decimal_places=2, default=0, blank=True, null=True, verbose_name="Percentual Advogado 1")
-    rateio_advogado_2 = models.ForeignKey('users.Lawyer', on_delete=models.CASCADE, blank=True, null=True, related_name='rateio_advogado_2', verbose_name="Advogado 2 (Rateio)")
-    rateio_percentual_2 = models.DecimalField(max_digits=5, decimal_places=2, default=0, blank=True, null=True, verbose_name="Percentual Advogado 2")
-    rateio_advogado_3 = models.ForeignKey('users.Lawyer', on_delete=models.CASCADE, blank=True, null=True, related_name='rateio_advogado_3', verbose_name="Advogado 3 (Rateio)")
-    rateio_percentual_3 = models.DecimalField(max_digits=5, decimal_places=2, default=0, blank=True, null=True, verbose_name="Percentual Advogado 3")
     data_criacao = models.DateTimeField(auto_now_add=True, verbose_name="Data de Criação")
     data_atualizacao = models.DateTimeField(auto_now=True, verbose_name="Data de Atualização")
+
+    ESCRITORIO_FROM = ('cliente',)
     
     class Meta:
         verbose_name = "Receita"
         verbose_name_plural = "Receitas"
         ordering = ['-data_vencimento']
+        indexes = [
+            models.Index(fields=['escritorio', 'pago', 'data_vencimento'], name='receita_pago_venc_idx'),
+            models.Index(fields=['escritorio', '-data_vencimento'], name='receita_escritorio_venc_idx'),
+            # Lotes de recibos do mês
+            models.Index(fields=['escritorio', 'data_recebimento'], condition=models.Q(pago=True), name='receita_recebida_idx'),
+        ]
     
     def __str__(self):
         return f"{self.descricao} - R$ {self.valor_total}"
 
-class Despesa(models.Model):
+    def save(self, *args, **kwargs):
+        # Os contadores do cliente (dashboard.signals) são atualizados na mesma transação
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+
+class RateioParticipacao(EscritorioModel):
+    """Participação de um advogado no rateio de honorários de uma receita"""
+    receita = models.ForeignKey(Receita, on_delete=models.CASCADE, related_name='participacoes', verbose_name="Receita")
+    advogado = models.ForeignKey('users.Lawyer', on_delete=models.CASCADE, related_name='participacoes_rateio', verbose_name="Advogado")
+    percentual = models.DecimalField(max_digits=5, decimal_places=2, verbose_name="Percentual")
+    data_criacao = models.DateTimeField(auto_now_add=True, verbose_name="Data de Criação")
+
+    ESCRITORIO_FROM = ('receita',)
+
+    class Meta:
+        verbose_name = "Participação no Rateio"
+        verbose_name_plural = "Participações no Rateio"
+        ordering = ['-percentual']
+        constraints = [
+            models.UniqueConstraint(fields=['receita', 'advogado'], name='rateio_receita_advogado_unico'),
+            models.CheckConstraint(condition=models.Q(percentual__gt=0, percentual__lte=100), name='rateio_percentual_valido'),
+        ]
+        indexes = [
+            models.Index(fields=['advogado', 'receita'], name='rateio_advogado_receita_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.advogado} - {self.percentual}%"
+
+class Despesa(EscritorioModel):
     descricao = models.CharField(max_length=200, verbose_name="Descrição")
     valor = models.DecimalField(max_digits=10, decimal_places=2, verbose_name="Valor")
     data_vencimento = models.DateField(verbose_name="Data de Vencimento")
@@ -252,16 +426,22 @@ class Despesa(models.Model):
     observacoes = models.TextField(blank=True, null=True, verbose_name="Observações")
     pago = models.BooleanField(default=False, verbose_name="Pago")
     data_criacao = models.DateTimeField(auto_now_add=True, verbose_name="Data de Criação")
+
+    ESCRITORIO_FROM = ('processo',)
     
     class Meta:
         verbose_name = "Despesa"
         verbose_name_plural = "Despesas"
         ordering = ['-data_vencimento']
+        indexes = [
+            models.Index(fields=['escritorio', 'pago', 'data_vencimento'], name='despesa_pago_venc_idx'),
+            models.Index(fields=['escritorio', 'data_pagamento'], condition=models.Q(pago=True), name='despesa_paga_idx'),
+        ]
     
     def __str__(self):
         return f"{self.descricao} - R$ {self.valor}"
 
-class AtividadeRecente(models.Model):
+class AtividadeRecente(EscritorioModel):
     TIPO_CHOICES = [
         ('cliente_cadastrado', 'Cliente Cadastrado'),
         ('cliente_desativado', 'Cliente Desativado'),
@@ -269,9 +449,11 @@ class AtividadeRecente(models.Model):
         ('documento_gerado', 'Documento Gerado'),
         ('recebimento_confirmado', 'Recebimento Confirmado'),
         ('tarefa_criada', 'Tarefa Criada'),
+        ('tarefa_atualizada', 'Tarefa Atualizada'),
         ('processo_criado', 'Processo Criado'),
         ('processo_atualizado', 'Processo Atualizado'),
         ('publicacao_recebida', 'Publicação Recebida'),
+        ('alerta_publicacao', 'Alerta de Publicação'),
     ]
     
     tipo = models.CharField(max_length=30, choices=TIPO_CHOICES, verbose_name="Tipo")
@@ -283,17 +465,223 @@ class AtividadeRecente(models.Model):
     cliente = models.ForeignKey(Cliente, on_delete=models.CASCADE, blank=True, null=True)
     processo = models.ForeignKey(Processo, on_delete=models.CASCADE, blank=True, null=True)
     task = models.ForeignKey(Task, on_delete=models.CASCADE, blank=True, null=True)
+
+    ESCRITORIO_FROM = ('processo', 'cliente', 'task', 'usuario')
     
     class Meta:
         verbose_name = "Atividade Recente"
         verbose_name_plural = "Atividades Recentes"
         ordering = ['-data_criacao']
+        indexes = [
+            models.Index(fields=['escritorio', '-data_criacao'], name='atividade_escritorio_data_idx'),
+        ]
     
     def __str__(self):
         return f"{self.get_tipo_display()} - {self.descricao[:50]}..."
 
+class DuplicidadeCliente(EscritorioModel):
+    """Par de cadastros possivelmente duplicados, na fila de revisão"""
+    ORIGEM_CHOICES = [
+        ('cliente', 'Cliente'),
+        ('financeiro', 'Cliente do Financeiro'),
+    ]
+    STATUS_CHOICES = [
+        ('pendente', 'Pendente'),
+        ('mesclado', 'Mesclado'),
+        ('descartado', 'Descartado'),
+    ]
+
+    # Pares são gravados com (origem_a, id_a) < (origem_b, id_b) para não repetir
+    origem_a = models.CharField(max_length=10, choices=ORIGEM_CHOICES, verbose_name="Origem A")
+    id_a = models.PositiveBigIntegerField(verbose_name="Cadastro A")
+    origem_b = models.CharField(max_length=10, choices=ORIGEM_CHOICES, verbose_name="Origem B")
+    id_b = models.PositiveBigIntegerField(verbose_name="Cadastro B")
+    pontuacao = models.PositiveSmallIntegerField(verbose_name="Pontuação")
+    motivos = models.CharField(max_length=100, verbose_name="Motivos")
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pendente', verbose_name="Status")
+    revisado_por = models.ForeignKey('users.Lawyer', on_delete=models.SET_NULL, blank=True, null=True, verbose_name="Revisado por")
+    data_criacao = models.DateTimeField(auto_now_add=True, verbose_name="Data de Criação")
+    data_revisao = models.DateTimeField(blank=True, null=True, verbose_name="Data da Revisão")
+
+    class Meta:
+        verbose_name = "Duplicidade de Cliente"
+        verbose_name_plural = "Duplicidades de Clientes"
+        ordering = ['-pontuacao', 'pk']
+        constraints = [
+            models.UniqueConstraint(fields=['origem_a', 'id_a', 'origem_b', 'id_b'], name='duplicidade_par_unico'),
+        ]
+        indexes = [
+            models.Index(fields=['escritorio', 'status', '-pontuacao'], name='duplicidade_status_idx'),
+            models.Index(fields=['origem_b', 'id_b'], name='duplicidade_b_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.origem_a}:{self.id_a} x {self.origem_b}:{self.id_b} ({self.pontuacao})"
+
+
+class Job(models.Model):
+    """Trabalho executado fora da requisição pelo comando runworker (ver dashboard.fila)"""
+    STATUS_CHOICES = [
+        ('fila', 'Na Fila'),
+        ('executando', 'Executando'),
+        ('concluido', 'Concluído'),
+        ('falhou', 'Falhou'),
+        ('cancelado', 'Cancelado'),
+    ]
+
+    nome = models.CharField(max_length=100, verbose_name="Nome")
+    argumentos = models.JSONField(default=list, blank=True, verbose_name="Argumentos")
+    parametros = models.JSONField(default=dict, blank=True, verbose_name="Parâmetros")
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='fila', verbose_name="Status")
+    prioridade = models.SmallIntegerField(default=0, verbose_name="Prioridade")
+    executar_em = models.DateTimeField(default=timezone.now, verbose_name="Executar em")
+    tentativas = models.PositiveSmallIntegerField(default=0, verbose_name="Tentativas")
+    max_tentativas = models.PositiveSmallIntegerField(default=3, verbose_name="Máximo de Tentativas")
+    # Jobs com a mesma chave não ficam na fila (ou em execução) ao mesmo tempo
+    chave = models.CharField(max_length=150, blank=True, null=True, verbose_name="Chave")
+    lote = models.CharField(max_length=32, blank=True, null=True, editable=False, verbose_name="Lote de Reserva")
+    worker = models.CharField(max_length=100, blank=True, null=True, verbose_name="Worker")
+    resultado = models.JSONField(blank=True, null=True, verbose_name="Resultado")
+    # Andamento informado pelo próprio job com fila.progresso()
+    progresso = models.PositiveIntegerField(default=0, verbose_name="Itens Processados")
+    progresso_total = models.PositiveIntegerField(blank=True, null=True, verbose_name="Total de Itens")
+    ultimo_erro = models.TextField(blank=True, null=True, verbose_name="Último Erro")
+    data_criacao = models.DateTimeField(auto_now_add=True, verbose_name="Data de Criação")
+    iniciado_em = models.DateTimeField(blank=True, null=True, verbose_name="Iniciado em")
+    concluido_em = models.DateTimeField(blank=True, null=True, verbose_name="Concluído em")
+    # Escritório ativo ao enfileirar; o job é executado com ele (vazio: todos os escritórios)
+    escritorio = models.ForeignKey(
+        'users.Escritorio', on_delete=models.CASCADE, blank=True, null=True, related_name='+', verbose_name="Escritório",
+    )
+
+    class Meta:
+        verbose_name = "Job"
+        verbose_name_plural = "Jobs"
+        ordering = ['-data_criacao']
+        constraints = [
+            models.UniqueConstraint(
+                fields=['chave'], condition=models.Q(status__in=['fila', 'executando']), name='job_chave_ativa_unica'
+            ),
+        ]
+        indexes = [
+            # Reserva: só os jobs na fila entram no índice
+            models.Index(fields=['-prioridade', 'executar_em'], condition=models.Q(status='fila'), name='job_fila_idx'),
+            models.Index(fields=['lote'], name='job_lote_idx'),
+            models.Index(fields=['status', 'concluido_em'], name='job_status_concluido_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.nome} #{self.pk} ({self.get_status_display()})"
+
+
+class VersaoModelo(models.Model):
+    """
+    Contador de alterações por escritório e modelo, usado como validador HTTP
+    (ver dashboard.versoes). A linha sem escritório é a de quem vê todos.
+    """
+    escritorio = models.ForeignKey(
+        'users.Escritorio', on_delete=models.CASCADE, blank=True, null=True, related_name='+', verbose_name="Escritório",
+    )
+    modelo = models.CharField(max_length=100, verbose_name="Modelo")
+    versao = models.PositiveBigIntegerField(default=0, verbose_name="Versão")
+    data_atualizacao = models.DateTimeField(default=timezone.now, verbose_name="Data de Atualização")
+
+    class Meta:
+        verbose_name = "Versão de Modelo"
+        verbose_name_plural = "Versões de Modelos"
+        constraints = [
+            models.UniqueConstraint(fields=['escritorio', 'modelo'], name='versao_escritorio_modelo_unica'),
+            # NULL não conflita num índice único: a linha sem escritório tem o seu
+            models.UniqueConstraint(fields=['modelo'], condition=models.Q(escritorio__isnull=True), name='versao_modelo_geral_unica'),
+        ]
+
+    def __str__(self):
+        return f"{self.modelo} v{self.versao}"
+
+
+class ExtratoCliente(models.Model):
+    """
+    Extrato pré-calculado da área do cliente (ver dashboard.extratos): processos,
+    audiências futuras e receitas em aberto e pagas, lido com uma única consulta.
+    """
+    cliente = models.OneToOneField(Cliente, on_delete=models.CASCADE, primary_key=True, related_name='extrato', verbose_name="Cliente")
+    dados = models.JSONField(encoder=DjangoJSONEncoder, default=dict, verbose_name="Dados")
+    # Derivada da senha e da ativação da área: muda quando elas mudam e encerra as sessões abertas
+    chave_acesso = models.CharField(max_length=64, blank=True, verbose_name="Chave de Acesso")
+    data_atualizacao = models.DateTimeField(default=timezone.now, verbose_name="Data de Atualização")
+
+    class Meta:
+        verbose_name = "Extrato do Cliente"
+        verbose_name_plural = "Extratos dos Clientes"
+
+    def __str__(self):
+        return f"Extrato de {self.cliente_id}"
+
+
+class DocumentoGerado(EscritorioModel):
+    """Documento gerado em arquivo por dashboard.documentos (recibo, contrato de honorários)"""
+    MODELO_CHOICES = [
+        ('recibo', 'Recibo'),
+        ('contrato_honorarios', 'Contrato de Honorários'),
+    ]
+
+    modelo = models.CharField(max_length=30, choices=MODELO_CHOICES, verbose_name="Modelo")
+    # Id do objeto de origem (receita ou processo), mantido mesmo se ele for excluído
+    objeto_id = models.PositiveBigIntegerField(verbose_name="Objeto")
+    # Hash do template e dos dados usados; igual = documento reaproveitado
+    assinatura = models.CharField(max_length=64, verbose_name="Assinatura")
+    arquivo = models.CharField(max_length=255, verbose_name="Arquivo")
+    tamanho = models.PositiveIntegerField(default=0, verbose_name="Tamanho (bytes)")
+    cliente = models.ForeignKey(Cliente, on_delete=models.SET_NULL, blank=True, null=True, verbose_name="Cliente")
+    processo = models.ForeignKey(Processo, on_delete=models.SET_NULL, blank=True, null=True, verbose_name="Processo")
+    receita = models.ForeignKey(Receita, on_delete=models.SET_NULL, blank=True, null=True, verbose_name="Receita")
+    usuario = models.ForeignKey('users.Lawyer', on_delete=models.SET_NULL, blank=True, null=True, verbose_name="Gerado por")
+    data_criacao = models.DateTimeField(auto_now_add=True, verbose_name="Data de Criação")
+
+    ESCRITORIO_FROM = ('receita', 'processo', 'cliente')
+
+    class Meta:
+        verbose_name = "Documento Gerado"
+        verbose_name_plural = "Documentos Gerados"
+        ordering = ['-data_criacao']
+        indexes = [
+            models.Index(fields=['modelo', 'objeto_id', 'assinatura'], name='documento_objeto_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.get_modelo_display()} #{self.objeto_id}"
+
+
+class DiaCalendario(models.Model):
+    """
+    Dia do calendário forense pré-calculado (ver dashboard.prazos).
+
+    `ordinal` é a quantidade de dias úteis do calendário até a data, inclusive,
+    de modo que somar N dias úteis é procurar o dia útil com ordinal + N.
+    """
+    # '' para o calendário nacional; '8.26' (segmento.tribunal) ou '8.26.0100' (com a origem)
+    calendario = models.CharField(max_length=20, blank=True, verbose_name="Calendário")
+    data = models.DateField(verbose_name="Data")
+    util = models.BooleanField(verbose_name="Dia Útil")
+    ordinal = models.PositiveIntegerField(verbose_name="Ordinal")
+    motivo = models.CharField(max_length=200, blank=True, verbose_name="Motivo")
+
+    class Meta:
+        verbose_name = "Dia do Calendário Forense"
+        verbose_name_plural = "Dias do Calendário Forense"
+        ordering = ['calendario', 'data']
+        constraints = [
+            models.UniqueConstraint(fields=['calendario', 'data'], name='dia_calendario_unico'),
+        ]
+        indexes = [
+            models.Index(fields=['calendario', 'ordinal'], condition=models.Q(util=True), name='dia_calendario_ordinal_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.calendario or 'nacional'} {self.data:%d/%m/%Y} ({'útil' if self.util else self.motivo})"
+
 # Fornecedor para despesas
-class Fornecedor(models.Model):
+class Fornecedor(EscritorioModel):
     nome = models.CharField(max_length=200, verbose_name="Nome")
     cnpj_cpf = models.CharField(max_length=20, blank=True, null=True, verbose_name="CNPJ/CPF")
     telefone = models.CharField(max_length=20, blank=True, null=True, verbose_name="Telefone")
@@ -308,7 +696,7 @@ class Fornecedor(models.Model):
     def __str__(self):
         return self.nome
 
-class TipoDemanda(models.Model):
+class TipoDemanda(EscritorioModel):
     nome = models.CharField(max_length=100, verbose_name="Nome")
     descricao = models.TextField(blank=True, null=True, verbose_name="Descrição")
     area_direito = models.CharField(max_length=100, blank=True, null=True, verbose_name="Área do Direito")
@@ -318,4 +706,77 @@ class TipoDemanda(models.Model):
         verbose_name_plural = "Tipos de Demanda"
     
     def __str__(self):
-        return self.nome
\ No newline at end of file
+        return self.nome
+
+class EncoderArquivo(DjangoJSONEncoder):
+    """DjangoJSONEncoder sem cortar os microssegundos: o arquivo devolve os valores exatos"""
+
+    def default(self, o):
+        if isinstance(o, (datetime.datetime, datetime.time)):
+            return o.isoformat()
+        return super().default(o)
+
+
+class RegistroArquivado(EscritorioModel):
+    """
+    Linha de tarefa, audiência, publicação ou atividade de um processo
+    encerrado, retirada da tabela de origem por dashboard.arquivo.
+    """
+    # Rótulo do modelo de origem (dashboard.task...) e a chave primária que a linha tinha lá
+    modelo = models.CharField(max_length=50, verbose_name="Modelo")
+    objeto_id = models.PositiveBigIntegerField(verbose_name="Objeto")
+    processo = models.ForeignKey(Processo, on_delete=models.CASCADE, related_name='arquivados', verbose_name="Processo")
+    dados = models.JSONField(encoder=EncoderArquivo, verbose_name="Dados")
+    data_arquivamento = models.DateTimeField(auto_now_add=True, verbose_name="Data de Arquivamento")
+
+    ESCRITORIO_FROM = ('processo',)
+
+    class Meta:
+        verbose_name = "Registro Arquivado"
+        verbose_name_plural = "Registros Arquivados"
+        constraints = [
+            models.UniqueConstraint(fields=['modelo', 'objeto_id'], name='arquivado_objeto_unico'),
+        ]
+        indexes = [
+            models.Index(fields=['processo', 'modelo'], name='arquivado_processo_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.modelo} #{self.objeto_id}"
+
+
+class Alteracao(EscritorioModel):
+    """
+    Entrada do histórico de alterações (ver dashboard.historico): só os campos
+    que mudaram, como {campo: [antes, depois]}. Somente inclusão. O escritório
+    é o do objeto, gravado com a entrada.
+    """
+    ACAO_CHOICES = [
+        ('criado', 'Criado'),
+        ('alterado', 'Alterado'),
+        ('excluido', 'Excluído'),
+    ]
+
+    modelo = models.CharField(max_length=50, verbose_name="Modelo")
+    objeto_id = models.PositiveBigIntegerField(verbose_name="Objeto")
+    acao = models.CharField(max_length=10, choices=ACAO_CHOICES, verbose_name="Ação")
+    campos = models.JSONField(encoder=DjangoJSONEncoder, default=dict, blank=True, verbose_name="Campos")
+    usuario = models.ForeignKey('users.Lawyer', on_delete=models.SET_NULL, blank=True, null=True, related_name='+', verbose_name="Usuário")
+    data = models.DateTimeField(default=timezone.now, verbose_name="Data")
+
+    class Meta:
+        verbose_name = "Alteração"
+        verbose_name_plural = "Alterações"
+        ordering = ['-data', '-id']
+        indexes = [
+            models.Index(fields=['escritorio', 'modelo', 'objeto_id', '-data'], name='alteracao_objeto_idx'),
+            models.Index(fields=['data'], name='alteracao_data_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.modelo} #{self.objeto_id} {self.acao} em {self.data:%d/%m/%Y %H:%M}"
+
+    def save(self, *args, **kwargs):
+        if not self._state.adding:
+            raise ValueError('O histórico de alterações é somente inclusão.')
+        super().save(*args, **kwargs)
@@ -0,0 +1,226 @@
+"""
+Widgets do dashboard.
+
+A página do dashboard é só a casca (cabeçalho, atalhos e modais); cada widget
+é buscado pelo navegador em paralelo em dashboard/widgets/<nome>/, como
+fragmento HTML ou JSON (gráficos). Assim o widget mais lento não atrasa a
+primeira pintura nem os demais.
+
+Cada widget declara os modelos que lê e sua validade em segundos:
+
+- a resposta tem ETag derivado das versões desses modelos (dashboard.versoes)
+  e de uma janela de `validade` segundos, que cobre os números relativos ao
+  horário atual (tarefas atrasadas, audiências da semana);
+- o conteúdo gerado fica no cache do servidor com a mesma chave, mais o
+  escritório (users.tenancy), de modo que os usuários do escritório
+  compartilham a mesma renderização;
+- Cache-Control: private, max-age=`max_age` (0 para os que devem ser sempre
+  revalidados, como as atividades).
+"""
+import json
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Count, Q, Sum
+from django.template.loader import render_to_string
+from django.utils import timezone
+
+from users import tenancy
+
+from . import versoes
+from .models import AtividadeRecente, Audiencia, Cliente, Despesa, Processo, Receita, Task
+
+WIDGETS = {}
+ZERO = Decimal('0.00')
+
+
+class Widget:
+    def __init__(self, nome, funcao, modelos, template=None, validade=60, max_age=None):
+        self.nome = nome
+        self.funcao = funcao
+        self.modelos = modelos
+        self.template = template
+        self.validade = validade
+        self.max_age = validade if max_age is None else max_age
+
+    def janela(self, agora):
+        """Período de validade corrente; entra no ETag e na chave de cache"""
+        return int(agora.timestamp() // self.validade)
+
+    def conteudo(self, periodo, agora, versoes_atuais):
+        """(corpo, content type) do widget, do cache do servidor quando possível"""
+        chave = ':'.join((
+            'painel', str(tenancy.current_id()), self.nome, str(periodo), str(timezone.localdate(agora)), str(self.janela(agora)),
+            versoes.assinatura(versoes_atuais, *self.modelos),
+        ))
+        corpo = cache.get(chave)
+        if corpo is None:
+            contexto = self.funcao(periodo=periodo, agora=agora)
+            if self.template:
+                corpo = render_to_string(self.template, contexto)
+            else:
+                corpo = json.dumps(contexto, cls=DjangoJSONEncoder)
+            cache.set(chave, corpo, self.validade)
+        return corpo, 'text/html; charset=utf-8' if self.template else 'application/json'
+
+
+def widget(nome, *modelos, template=None, validade=60, max_age=None):
+    """Registra a função que monta o contexto (ou os dados JSON) de um widget"""
+    def registrar(funcao):
+        WIDGETS[nome] = Widget(nome, funcao, modelos, template, validade, max_age)
+        return funcao
+    return registrar
+
+
+def variacao(atual, anterior):
+    if not anterior:
+        return 0
+    return round((atual - anterior) / abs(anterior) * 100, 1)
+
+
+def inicio_mes(dia, meses_antes=0):
+    mes = dia.month - 1 - meses_antes
+    return date(dia.year + mes // 12, mes % 12 + 1, 1)
+
+
+@widget('resumo', Audiencia, Task, Cliente, template='dashboard/widgets/resumo.html')
+def resumo(periodo, agora):
+    hoje = timezone.localdate(agora)
+    audiencias = Audiencia.objects.aggregate(
+        hoje=Count('id', filter=Q(data_hora__date=hoje)),
+        semana=Count('id', filter=Q(data_hora__gte=agora, data_hora__lte=agora + timedelta(days=7))),
+    )
+    clientes = Cliente.objects.filter(ativo=True).aggregate(
+        total=Count('id'), com_processos=Count('id', filter=Q(numero_processos__gt=0)),
+    )
+    return {
+        'audiencias_hoje': audiencias['hoje'],
+        'audiencias_semana': audiencias['semana'],
+        'tarefas_atrasadas': Task.objects.filter(status='pendente', data_inicio__lt=agora).count(),
+        'taxa_conversao': round(clientes['com_processos'] / clientes['total'] * 100, 1) if clientes['total'] else 0,
+    }
+
+
+@widget('kpis', Cliente, Processo, Task, Audiencia, Receita, Despesa, template='dashboard/widgets/kpis.html')
+def kpis(periodo, agora):
+    """Indicadores principais, com uma consulta agregada por tabela"""
+    hoje = timezone.localdate(agora)
+    mes, mes_anterior = inicio_mes(hoje), inicio_mes(hoje, 1)
+
+    clientes = Cliente.objects.filter(ativo=True).aggregate(
+        total=Count('id'), novos=Count('id', filter=Q(data_cadastro__gte=agora - timedelta(days=periodo))),
+    )
+    processos = Processo.objects.aggregate(
+        ativos=Count('id', filter=Q(status='ativo')),
+        finalizados_mes=Count('id', filter=Q(status='finalizado', data_fim__gte=mes)),
+    )
+    tarefas = Task.objects.filter(status='pendente').aggregate(
+        pendentes=Count('id'), atrasadas=Count('id', filter=Q(data_inicio__lt=agora)),
+    )
+    receitas = Receita.objects.aggregate(
+        pagas_mes=Sum('valor_recebido', filter=Q(data_recebimento__gte=mes, data_recebimento__lte=hoje)),
+        mes=Sum('valor_total', filter=Q(data_vencimento__gte=mes, data_vencimento__lte=hoje)),
+        mes_anterior=Sum('valor_total', filter=Q(data_vencimento__gte=mes_anterior, data_vencimento__lt=mes)),
+        pendentes=Sum('valor_total', filter=Q(pago=False, data_vencimento__lte=hoje)),
+        vencidas=Sum('valor_total', filter=Q(pago=False, data_vencimento__lt=hoje)),
+    )
+    despesas = Despesa.objects.aggregate(
+        pagas_mes=Sum('valor', filter=Q(pago=True, data_pagamento__gte=mes, data_pagamento__lte=hoje)),
+        mes=Sum('valor', filter=Q(data_vencimento__gte=mes, data_vencimento__lte=hoje)),
+        mes_anterior=Sum('valor', filter=Q(data_vencimento__gte=mes_anterior, data_vencimento__lt=mes)),
+    )
+    receitas = {chave: valor or ZERO for chave, valor in receitas.items()}
+    despesas = {chave: valor or ZERO for chave, valor in despesas.items()}
+    saldo_mes = receitas['pagas_mes'] - despesas['pagas_mes']
+
+    return {
+        'total_clientes': clientes['total'],
+        'clientes_novos': clientes['novos'],
+        'processos_ativos': processos['ativos'],
+        'processos_finalizados_mes': processos['finalizados_mes'],
+        'tarefas_pendentes': tarefas['pendentes'],
+        'tarefas_atrasadas': tarefas['atrasadas'],
+        'audiencias_pendentes': Audiencia.objects.filter(
+            data_hora__gte=agora, data_hora__lte=agora + timedelta(days=30)
+        ).count(),
+        'receitas_pagas_mes': receitas['pagas_mes'],
+        'receitas_pendentes': receitas['pendentes'],
+        'receitas_vencidas': receitas['vencidas'],
+        'despesas_pagas_mes': despesas['pagas_mes'],
+        'saldo_mes': saldo_mes,
+        'variacao_receitas': variacao(receitas['mes'], receitas['mes_anterior']),
+        'variacao_despesas': variacao(despesas['mes'], despesas['mes_anterior']),
+        'variacao_saldo': variacao(saldo_mes, receitas['mes_anterior'] - despesas['mes_anterior']),
+    }
+
+
+@widget('financeiro', Receita, Despesa, validade=300)
+def financeiro(periodo, agora):
+    """Receitas e despesas por vencimento nos últimos 6 meses, uma consulta por tabela"""
+    hoje = timezone.localdate(agora)
+    meses = [inicio_mes(hoje, atras) for atras in range(5, -1, -1)]
+    limites = list(zip(meses, meses[1:] + [inicio_mes(hoje, -1)]))
+
+    def somas(modelo, campo):
+        return modelo.objects.aggregate(**{
+            f'mes{indice}': Sum(campo, filter=Q(data_vencimento__gte=inicio, data_vencimento__lt=fim))
+            for indice, (inicio, fim) in enumerate(limites)
+        })
+
+    receitas, despesas = somas(Receita, 'valor_total'), somas(Despesa, 'valor')
+    return [
+        {
+            'mes': inicio.strftime('%b/%Y'),
+            'receitas': float(receitas[f'mes{indice}'] or 0),
+            'despesas': float(despesas[f'mes{indice}'] or 0),
+        }
+        for indice, (inicio, _) in enumerate(limites)
+    ]
+
+
+@widget('processos', Processo, validade=300)
+def processos(periodo, agora):
+    return list(Processo.objects.values('status').annotate(count=Count('id')).order_by('status'))
+
+
+@widget('agenda', Audiencia, Task, Processo, Cliente, template='dashboard/widgets/agenda.html')
+def agenda(periodo, agora):
+    return {
+        'proximas_audiencias': Audiencia.objects.filter(data_hora__gte=agora).select_related(
+            'processo', 'processo__cliente'
+        ).order_by('data_hora')[:5],
+        'tarefas_urgentes': Task.objects.filter(
+            status__in=['pendente', 'em_andamento'],
+            prioridade__in=['alta', 'urgente'],
+            data_inicio__lte=agora + timedelta(days=7),
+        ).select_related('cliente', 'processo').order_by('data_inicio')[:5],
+    }
+
+
+@widget('atividades', AtividadeRecente, template='dashboard/widgets/atividades.html', max_age=0)
+def atividades(periodo, agora):
+    return {
+        'atividades_recentes': AtividadeRecente.objects.select_related(
+            'usuario', 'cliente', 'processo'
+        ).order_by('-data_criacao')[:10],
+    }
+
+
+@widget('vencimentos', Receita, Cliente, template='dashboard/widgets/vencimentos.html', validade=300)
+def vencimentos(periodo, agora):
+    hoje = timezone.localdate(agora)
+    return {
+        'proximos_vencimentos': Receita.objects.filter(
+            pago=False, data_vencimento__gte=hoje, data_vencimento__lte=hoje + timedelta(days=30),
+        ).select_related('cliente').order_by('data_vencimento')[:10],
+    }
+
+
+@widget('top_clientes', Cliente, Receita, template='dashboard/widgets/top_clientes.html', validade=300)
+def top_clientes(periodo, agora):
+    # Pelo valor bruto das receitas, como antes dos contadores; coberto por cliente_ativo_bruto_idx
+    return {
+        'top_clientes': Cliente.objects.filter(ativo=True, total_bruto__gt=0).order_by('-total_bruto')[:5],
+    }
@@ -0,0 +1,237 @@
+"""
+Cálculo de prazos processuais em dias úteis.
+
+Os calendários forenses ficam pré-calculados em DiaCalendario, um por código:
+'' (nacional), 'J' (segmento), 'J.TR' (tribunal) e 'J.TR.OOOO' (unidade de
+origem), com os componentes do número CNJ. Cada calendário soma os feriados do
+próprio código e dos códigos que o contêm, além de fins de semana, feriados
+móveis nacionais (Carnaval, Sexta-feira Santa e Corpus Christi) e do recesso
+de 20/12 a 20/01 (art. 220 do CPC).
+
+Os feriados vêm dos arquivos CSV de settings.FERIADOS_DIR, um por código
+(nacional.csv, 8.csv, 8.26.csv, 8.26.0100.csv), com as colunas data e
+descricao. A data pode ser dd/mm (todo ano), dd/mm/aaaa, um intervalo
+dd/mm/aaaa-dd/mm/aaaa (suspensões de expediente) ou pascoa±N (dias em relação
+ao domingo de Páscoa de cada ano).
+
+Contagem (art. 224 do CPC): exclui-se o dia do começo e o prazo termina no
+N-ésimo dia útil seguinte. Se a data de início não for dia útil, ela é
+considerada o próximo dia útil.
+"""
+import csv
+from bisect import bisect_right
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+from django.conf import settings
+from django.db import transaction
+
+from .models import DiaCalendario
+
+NACIONAL = ''
+RECESSO = 'Recesso forense (20/12 a 20/01)'
+TAMANHO_LOTE = 5000
+
+
+def pascoa(ano):
+    """Domingo de Páscoa (algoritmo de Meeus/Jones/Butcher)"""
+    a, b, c = ano % 19, ano // 100, ano % 100
+    d, e = b // 4, b % 4
+    f = (b + 8) // 25
+    g = (b - f + 1) // 3
+    h = (19 * a + b - d - g + 15) % 30
+    i, k = c // 4, c % 4
+    l = (32 + 2 * e + 2 * i - h - k) % 7
+    m = (a + 11 * h + 22 * l) // 451
+    mes = (h + l - 7 * m + 114) // 31
+    dia = (h + l - 7 * m + 114) % 31 + 1
+    return date(ano, mes, dia)
+
+
+def feriados_moveis(ano):
+    domingo = pascoa(ano)
+    return {
+        domingo - timedelta(days=48): 'Carnaval',
+        domingo - timedelta(days=47): 'Carnaval',
+        domingo - timedelta(days=2): 'Sexta-feira Santa',
+        domingo + timedelta(days=60): 'Corpus Christi',
+    }
+
+
+def em_recesso(dia):
+    return (dia.month == 12 and dia.day >= 20) or (dia.month == 1 and dia.day <= 20)
+
+
+def converter_data_feriado(texto, anos):
+    """Datas de uma linha do arquivo: dd/mm (em cada ano), dd/mm/aaaa, um intervalo ou pascoa±N"""
+    texto = texto.strip()
+    if texto.lower().startswith('pascoa'):
+        deslocamento = int(texto[6:] or 0)
+        return [pascoa(ano) + timedelta(days=deslocamento) for ano in anos]
+    if '-' in texto:
+        inicio, fim = (datetime.strptime(parte.strip(), '%d/%m/%Y').date() for parte in texto.split('-', 1))
+        return [inicio + timedelta(days=dias) for dias in range((fim - inicio).days + 1)]
+    partes = texto.split('/')
+    if len(partes) == 2:
+        dia, mes = int(partes[0]), int(partes[1])
+        return [date(ano, mes, dia) for ano in anos]
+    return [datetime.strptime(texto, '%d/%m/%Y').date()]
+
+
+def ler_feriados(pasta, anos):
+    """{código: {data: descrição}} a partir dos arquivos CSV da pasta"""
+    feriados = defaultdict(dict)
+    for caminho in sorted(pasta.glob('*.csv')):
+        codigo = NACIONAL if caminho.stem == 'nacional' else caminho.stem
+        with open(caminho, encoding='utf-8', newline='') as arquivo:
+            for linha in csv.DictReader(arquivo):
+                if not (linha.get('data') or '').strip():
+                    continue
+                try:
+                    datas = converter_data_feriado(linha['data'], anos)
+                except ValueError as erro:
+                    raise ValueError(f'{caminho.name}: data inválida "{linha["data"]}"') from erro
+                for dia in datas:
+                    feriados[codigo][dia] = (linha.get('descricao') or 'Feriado').strip()
+    return feriados
+
+
+def prefixos(codigo):
+    """Códigos cujos feriados valem para o calendário: '8.26.0100' -> '', '8', '8.26', '8.26.0100'"""
+    partes = codigo.split('.') if codigo else []
+    return [NACIONAL] + ['.'.join(partes[:tamanho]) for tamanho in range(1, len(partes) + 1)]
+
+
+def gerar_calendarios(pasta=None, ano_inicial=None, ano_final=None):
+    """
+    Recria os calendários de todos os códigos com arquivo de feriados (e o
+    nacional) para os anos informados. Retorna {código: dias gravados}.
+    """
+    hoje = date.today()
+    ano_inicial = ano_inicial or hoje.year - 1
+    ano_final = ano_final or hoje.year + 2
+    anos = range(ano_inicial, ano_final + 1)
+    feriados = ler_feriados(Path(pasta or settings.FERIADOS_DIR), anos)
+    for ano in anos:
+        for dia, descricao in feriados_moveis(ano).items():
+            feriados[NACIONAL].setdefault(dia, descricao)
+
+    inicio, fim = date(ano_inicial, 1, 1), date(ano_final, 12, 31)
+    resultado = {}
+    with transaction.atomic():
+        DiaCalendario.objects.all().delete()
+        for codigo in sorted(set(feriados) | {NACIONAL}):
+            aplicaveis = {}
+            for prefixo in prefixos(codigo):
+                aplicaveis.update(feriados.get(prefixo, {}))
+            dias, ordinal, dia = [], 0, inicio
+            while dia <= fim:
+                if dia.weekday() >= 5:
+                    motivo = 'Fim de semana'
+                elif em_recesso(dia):
+                    motivo = RECESSO
+                else:
+                    motivo = aplicaveis.get(dia, '')
+                ordinal += not motivo
+                dias.append(DiaCalendario(calendario=codigo, data=dia, util=not motivo, ordinal=ordinal, motivo=motivo[:200]))
+                dia += timedelta(days=1)
+            DiaCalendario.objects.bulk_create(dias, batch_size=TAMANHO_LOTE)
+            resultado[codigo] = len(dias)
+    return resultado
+
+
+def codigos_disponiveis():
+    return set(DiaCalendario.objects.values_list('calendario', flat=True).distinct())
+
+
+def codigo_calendario(segmento=None, tribunal=None, origem=None, disponiveis=None):
+    """Calendário mais específico disponível para os componentes CNJ de um processo"""
+    disponiveis = disponiveis if disponiveis is not None else codigos_disponiveis()
+    candidatos = []
+    if segmento is not None:
+        candidatos.append(str(segmento))
+        if tribunal is not None:
+            candidatos.append(f'{segmento}.{tribunal:02d}')
+            if origem is not None:
+                candidatos.append(f'{segmento}.{tribunal:02d}.{origem:04d}')
+    for codigo in reversed(candidatos):
+        if codigo in disponiveis:
+            return codigo
+    return NACIONAL
+
+
+def codigo_do_processo(processo, disponiveis=None):
+    return codigo_calendario(processo.cnj_segmento, processo.cnj_tribunal, processo.cnj_origem, disponiveis)
+
+
+class ForaDoCalendario(ValueError):
+    """A data ou o prazo saem do período pré-calculado do calendário"""
+
+
+class Calendario:
+    """Calendário carregado em memória, para calcular muitos prazos de uma vez"""
+
+    def __init__(self, codigo=NACIONAL):
+        self.codigo = codigo
+        self.ordinais = {}
+        self.uteis = []
+        for dia, util, ordinal in DiaCalendario.objects.filter(calendario=codigo).order_by('data').values_list(
+            'data', 'util', 'ordinal'
+        ).iterator(chunk_size=TAMANHO_LOTE):
+            self.ordinais[dia] = (ordinal, util)
+            if util:
+                self.uteis.append(dia)
+
+    def base(self, inicio):
+        """Ordinal do dia útil em que a contagem começa a partir de `inicio`"""
+        if inicio not in self.ordinais:
+            raise ForaDoCalendario(f'{inicio:%d/%m/%Y} fora do calendário forense "{self.codigo or "nacional"}"')
+        ordinal, util = self.ordinais[inicio]
+        return ordinal if util else ordinal + 1
+
+    def somar(self, inicio, dias):
+        """Data final de um prazo de `dias` dias úteis contado a partir de `inicio`"""
+        posicao = self.base(inicio) + dias - 1
+        if not 0 <= posicao < len(self.uteis):
+            raise ForaDoCalendario(f'Prazo além do calendário forense "{self.codigo or "nacional"}"')
+        return self.uteis[posicao]
+
+    def proximo_util(self, dia):
+        posicao = bisect_right(self.uteis, dia - timedelta(days=1))
+        if posicao >= len(self.uteis):
+            raise ForaDoCalendario(f'{dia:%d/%m/%Y} fora do calendário forense "{self.codigo or "nacional"}"')
+        return self.uteis[posicao]
+
+
+def calcular_prazo(inicio, dias, codigo=NACIONAL):
+    """Data final de um prazo com duas consultas pelo índice do calendário"""
+    dia = DiaCalendario.objects.filter(calendario=codigo, data=inicio).values_list('ordinal', 'util').first()
+    if dia is None:
+        raise ForaDoCalendario(f'{inicio:%d/%m/%Y} fora do calendário forense "{codigo or "nacional"}"')
+    ordinal, util = dia
+    final = DiaCalendario.objects.filter(
+        calendario=codigo, util=True, ordinal=(ordinal if util else ordinal + 1) + dias
+    ).values_list('data', flat=True).first()
+    if final is None:
+        raise ForaDoCalendario(f'Prazo além do calendário forense "{codigo or "nacional"}"')
+    return final
+
+
+def calcular_prazos(itens):
+    """
+    Calcula vários prazos carregando cada calendário uma única vez.
+
+    `itens` é uma sequência de (inicio, dias, codigo); retorna a lista das datas
+    finais na mesma ordem (None para os que saem do calendário).
+    """
+    calendarios = {}
+    resultado = []
+    for inicio, dias, codigo in itens:
+        if codigo not in calendarios:
+            calendarios[codigo] = Calendario(codigo)
+        try:
+            resultado.append(calendarios[codigo].somar(inicio, dias))
+        except ForaDoCalendario:
+            resultado.append(None)
+    return resultado
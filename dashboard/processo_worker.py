@@ -0,0 +1,25 @@
+"""
+Pontos de entrada dos processos do pool do runworker --processos.
+
+Os processos são iniciados com spawn e importam este módulo antes de o Django
+estar configurado, por isso os módulos do app só são importados nas funções.
+"""
+
+
+def iniciar():
+    import django
+
+    # O ready() do app registra os jobs
+    django.setup()
+
+
+def executar(job_id):
+    from .fila import executar
+
+    return executar(job_id)
+
+
+def renderizar_documentos(nome, itens):
+    from .documentos import renderizar
+
+    return renderizar(nome, itens)
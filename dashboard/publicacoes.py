@@ -0,0 +1,289 @@
+"""
+Importação em lote de publicações (diários oficiais) a partir de arquivos locais.
+
+Formatos aceitos, lidos registro a registro sem carregar o arquivo inteiro:
+
+- JSON Lines (.jsonl, .ndjson): um objeto por linha;
+- JSON (.json): uma lista de objetos;
+- texto (.txt): blocos separados por uma linha com "---". Cada bloco começa com
+  linhas "Campo: valor" (Processo, Data, Órgão, Tipo, Título, Partes) e, depois
+  de uma linha em branco, traz o conteúdo.
+
+Campos dos registros JSON: numero_processo, data_publicacao, orgao, tipo, titulo,
+conteudo e partes (lista ou texto separado por ";"). Registros que não são
+objetos, ou sem data e conteúdo em texto, contam como inválidos e não
+interrompem o arquivo.
+
+Cada publicação é casada com um Processo pelo número normalizado (coluna
+indexada, carregada uma vez em memória); sem número, procura-se um número CNJ no
+conteúdo e, por fim, o nome das partes entre os clientes com um único processo
+ativo. Um mesmo número pode existir em mais de um escritório: a publicação é
+gravada para cada um deles. Duplicatas são descartadas pelo hash do conteúdo
+(por escritório) e as inserções são feitas com bulk_create em lotes. Publicações sem processo vão para um arquivo
+de pendentes no formato JSON Lines, que pode ser reimportado depois.
+"""
+import hashlib
+import json
+import re
+from collections import Counter, defaultdict
+from datetime import date, datetime
+
+from django.db import transaction
+
+from . import cnj, eventos, versoes
+from .deduplicacao import normalizar_texto
+from .models import AtividadeRecente, Processo, Publicacao
+from users.models import Lawyer
+
+TAMANHO_LOTE = 1000
+TAMANHO_LEITURA = 1 << 16
+EXTENSOES = {'.json', '.jsonl', '.ndjson', '.txt'}
+
+CAMPOS_TEXTO = {
+    'PROCESSO': 'numero_processo',
+    'NUMERO': 'numero_processo',
+    'DATA': 'data_publicacao',
+    'ORGAO': 'orgao',
+    'TIPO': 'tipo',
+    'TITULO': 'titulo',
+    'PARTES': 'partes',
+}
+
+
+def ler_json_lines(arquivo):
+    for linha in arquivo:
+        linha = linha.strip()
+        if linha:
+            yield json.loads(linha)
+
+
+def ler_json(arquivo):
+    """Objetos de uma lista JSON, decodificados um a um conforme o arquivo é lido"""
+    decodificador = json.JSONDecoder()
+    buffer = ''
+    for bloco in iter(lambda: arquivo.read(TAMANHO_LEITURA), ''):
+        buffer += bloco
+        posicao = 0
+        while True:
+            while posicao < len(buffer) and buffer[posicao] in ' \t\r\n,[]':
+                posicao += 1
+            if posicao >= len(buffer):
+                break
+            try:
+                registro, posicao = decodificador.raw_decode(buffer, posicao)
+            except json.JSONDecodeError:
+                # Objeto incompleto: continua depois de ler o próximo bloco
+                break
+            yield registro
+        buffer = buffer[posicao:]
+    if buffer.strip(' \t\r\n,[]'):
+        raise ValueError('Arquivo JSON incompleto ou inválido')
+
+
+def ler_texto(arquivo):
+    registro, conteudo, no_cabecalho = {}, [], True
+    for linha in arquivo:
+        linha = linha.rstrip('\n')
+        if linha.strip() == '---':
+            if registro or conteudo:
+                registro['conteudo'] = '\n'.join(conteudo).strip()
+                yield registro
+            registro, conteudo, no_cabecalho = {}, [], True
+            continue
+        if no_cabecalho:
+            if not linha.strip():
+                no_cabecalho = False
+                continue
+            chave, separador, valor = linha.partition(':')
+            campo = CAMPOS_TEXTO.get(normalizar_texto(chave))
+            if separador and campo:
+                registro[campo] = valor.strip()
+                continue
+            no_cabecalho = False
+        conteudo.append(linha)
+    if registro or conteudo:
+        registro['conteudo'] = '\n'.join(conteudo).strip()
+        yield registro
+
+
+def ler_registros(arquivo, extensao):
+    if extensao in ('.jsonl', '.ndjson'):
+        return ler_json_lines(arquivo)
+    if extensao == '.json':
+        return ler_json(arquivo)
+    return ler_texto(arquivo)
+
+
+def texto(registro, campo):
+    """Valor do campo sem espaços nas pontas; vazio se faltar ou não for texto"""
+    valor = registro.get(campo)
+    return valor.strip() if isinstance(valor, str) else ''
+
+
+def converter_data(valor):
+    if isinstance(valor, date):
+        return valor
+    valor = valor.strip() if isinstance(valor, str) else ''
+    for formato, tamanho in (('%Y-%m-%d', 10), ('%d/%m/%Y', 10)):
+        try:
+            return datetime.strptime(valor[:tamanho], formato).date()
+        except ValueError:
+            continue
+    return None
+
+
+def hash_publicacao(numero_normalizado, data_publicacao, conteudo):
+    """Hash usado para descartar publicações repetidas (mesmo processo, data e texto)"""
+    texto = f"{numero_normalizado}|{data_publicacao.isoformat()}|{' '.join((conteudo or '').split())}"
+    return hashlib.sha256(texto.encode('utf-8')).hexdigest()
+
+
+def separar_partes(partes):
+    if not partes:
+        return []
+    if isinstance(partes, str):
+        partes = re.split(r'[;\n]| x | X ', partes)
+    elif not isinstance(partes, list):
+        return []
+    return [normalizar_texto(parte) for parte in partes if isinstance(parte, str) and parte.strip()]
+
+
+class ImportadorPublicacoes:
+    """Casa e grava publicações de um ou mais arquivos, reaproveitando os índices em memória"""
+
+    def __init__(self, tamanho_lote=TAMANHO_LOTE):
+        self.tamanho_lote = tamanho_lote
+        self.por_numero = defaultdict(list)
+        self.por_cliente = defaultdict(list)
+        for escritorio_id, processo_id, numero, advogado_id, cliente_nome, status in Processo.objects.values_list(
+            'escritorio_id', 'id', 'numero_normalizado', 'advogado_responsavel_id', 'cliente__nome', 'status'
+        ).iterator(chunk_size=5000):
+            processo = (escritorio_id, processo_id, advogado_id, numero)
+            if numero:
+                self.por_numero[numero].append(processo)
+            if status == 'ativo':
+                self.por_cliente[normalizar_texto(cliente_nome)].append(processo)
+
+    def casar(self, registro):
+        """
+        [(escritorio_id, processo_id, advogado_id, numero_normalizado)] dos
+        processos da publicação, no máximo um por escritório; vazia sem processo
+        """
+        numero = cnj.normalizar(str(registro.get('numero_processo') or ''))
+        if not numero:
+            numero = cnj.encontrar(texto(registro, 'conteudo')) or ''
+        if numero and numero in self.por_numero:
+            return self.por_numero[numero]
+
+        candidatos = defaultdict(set)
+        for parte in separar_partes(registro.get('partes')):
+            for processo in self.por_cliente.get(parte, ()):
+                candidatos[processo[0]].add(processo)
+        # Pelo nome, só os escritórios em que a parte tem um único processo ativo
+        return [processos.pop() for processos in candidatos.values() if len(processos) == 1]
+
+    def importar(self, registros, pendentes=None):
+        """
+        Importa um iterável de registros.
+
+        Publicações sem processo são gravadas em `pendentes` (um arquivo aberto
+        para escrita), uma por linha. Retorna o resumo da importação.
+        """
+        resumo = Counter()
+        por_advogado = Counter()
+        vistos = set()
+        lote = []
+
+        for registro in registros:
+            resumo['lidas'] += 1
+            # Registros que não são objetos (números, listas, textos soltos no JSON) são inválidos
+            if not isinstance(registro, dict):
+                resumo['invalidas'] += 1
+                continue
+            data_publicacao = converter_data(registro.get('data_publicacao'))
+            conteudo = texto(registro, 'conteudo')
+            if not data_publicacao or not conteudo:
+                resumo['invalidas'] += 1
+                continue
+
+            casamentos = self.casar(registro)
+            if not casamentos:
+                resumo['sem_processo'] += 1
+                if pendentes is not None:
+                    pendentes.write(json.dumps(registro, ensure_ascii=False, default=str) + '\n')
+                continue
+
+            for escritorio_id, processo_id, advogado_id, numero in casamentos:
+                chave = hash_publicacao(numero, data_publicacao, conteudo)
+                if (escritorio_id, chave) in vistos:
+                    resumo['duplicadas'] += 1
+                    continue
+                vistos.add((escritorio_id, chave))
+
+                lote.append((advogado_id, Publicacao(
+                    escritorio_id=escritorio_id,
+                    processo_id=processo_id,
+                    titulo=(texto(registro, 'titulo') or texto(registro, 'tipo') or 'Publicação')[:200],
+                    conteudo=conteudo,
+                    data_publicacao=data_publicacao,
+                    orgao=texto(registro, 'orgao')[:100],
+                    tipo=texto(registro, 'tipo')[:100] or None,
+                    hash_conteudo=chave,
+                )))
+            if len(lote) >= self.tamanho_lote:
+                self.gravar(lote, resumo, por_advogado)
+                lote = []
+
+        if lote:
+            self.gravar(lote, resumo, por_advogado)
+        resumo['por_advogado'] = por_advogado
+        return resumo
+
+    def gravar(self, lote, resumo, por_advogado):
+        existentes = set(Publicacao.objects.filter(
+            hash_conteudo__in=[publicacao.hash_conteudo for _, publicacao in lote]
+        ).values_list('escritorio_id', 'hash_conteudo'))
+        novas = [
+            (advogado_id, publicacao) for advogado_id, publicacao in lote
+            if (publicacao.escritorio_id, publicacao.hash_conteudo) not in existentes
+        ]
+        resumo['duplicadas'] += len(lote) - len(novas)
+
+        with transaction.atomic():
+            Publicacao.objects.bulk_create([publicacao for _, publicacao in novas], ignore_conflicts=True)
+            if novas:
+                eventos.publicar_nao_lidas()
+        resumo['importadas'] += len(novas)
+        por_advogado.update(advogado_id for advogado_id, _ in novas)
+
+
+def registrar_atividades(por_advogado, origem):
+    """Uma atividade publicacao_recebida por advogado (com publicações ativadas) com o total recebido"""
+    advogados = Lawyer.objects.filter(pk__in=por_advogado, enable_publications=True).values_list('pk', flat=True)
+    atividades = AtividadeRecente.objects.bulk_create([
+        AtividadeRecente(
+            tipo='publicacao_recebida',
+            descricao=f'{por_advogado[advogado_id]} nova(s) publicação(ões) recebida(s) - {origem}'[:300],
+            usuario_id=advogado_id,
+        )
+        for advogado_id in advogados
+    ])
+    if atividades:
+        versoes.incrementar(AtividadeRecente)
+        eventos.atividades_criadas(atividades)
+
+
+def importar_arquivo(caminho, importador=None, caminho_pendentes=None):
+    """Importa um arquivo de publicações e registra as atividades; retorna o resumo"""
+    importador = importador or ImportadorPublicacoes()
+    with open(caminho, encoding='utf-8') as arquivo:
+        registros = ler_registros(arquivo, caminho.suffix.lower())
+        if caminho_pendentes:
+            with open(caminho_pendentes, 'w', encoding='utf-8') as pendentes:
+                resumo = importador.importar(registros, pendentes)
+            if not resumo['sem_processo']:
+                caminho_pendentes.unlink()
+        else:
+            resumo = importador.importar(registros)
+    registrar_atividades(resumo['por_advogado'], caminho.name)
+    return resumo
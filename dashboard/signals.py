@@ -0,0 +1,185 @@
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from . import arquivo, eventos, extratos, historico, versoes
+from .contadores import contribuicao_de, contribuicao_receita, movimentar_cliente
+from .models import AtividadeRecente, Audiencia, Cliente, Processo, Publicacao, Receita
+
+
+@receiver(pre_save, sender=Receita)
+def guardar_receita_anterior(sender, instance, raw=False, **kwargs):
+    """Guarda os valores gravados antes da alteração para calcular a diferença"""
+    instance._contadores_anteriores = None
+    if instance.pk and not raw:
+        instance._contadores_anteriores = Receita.objects.filter(pk=instance.pk).values_list(
+            'cliente_id', 'valor_total', 'desconto', 'valor_recebido', 'pago'
+        ).first()
+
+
+@receiver(post_save, sender=Receita)
+def atualizar_contadores_receita(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    atual = contribuicao_de(instance)
+    anterior = getattr(instance, '_contadores_anteriores', None)
+    if anterior is None:
+        movimentar_cliente(instance.cliente_id, *atual)
+        return
+
+    cliente_anterior, *valores = anterior
+    antes = contribuicao_receita(*valores)
+    if cliente_anterior == instance.cliente_id:
+        movimentar_cliente(instance.cliente_id, *(novo - velho for novo, velho in zip(atual, antes)))
+    else:
+        movimentar_cliente(cliente_anterior, *(-valor for valor in antes))
+        movimentar_cliente(instance.cliente_id, *atual)
+
+
+@receiver(post_save, sender=Receita)
+def anunciar_recebimento(sender, instance, created, raw=False, **kwargs):
+    """Publica um evento quando a receita passa a paga ou o valor recebido aumenta"""
+    if raw:
+        return
+    anterior = getattr(instance, '_contadores_anteriores', None)
+    recebido_antes, pago_antes = (anterior[3] or 0, anterior[4]) if anterior else (0, False)
+    if (instance.valor_recebido or 0) > recebido_antes or (instance.pago and not pago_antes):
+        eventos.publicar('pagamento', {
+            'id': instance.pk,
+            'cliente_id': instance.cliente_id,
+            'descricao': instance.descricao,
+            'valor': instance.valor_recebido or instance.valor_total,
+            'pago': instance.pago,
+        })
+
+
+@receiver(post_delete, sender=Receita)
+def remover_contadores_receita(sender, instance, **kwargs):
+    movimentar_cliente(instance.cliente_id, *(-valor for valor in contribuicao_de(instance)))
+
+
+@receiver(pre_save, sender=Processo)
+def guardar_processo_anterior(sender, instance, raw=False, **kwargs):
+    instance._cliente_anterior_id = None
+    if instance.pk and not raw:
+        instance._cliente_anterior_id = Processo.objects.filter(pk=instance.pk).values_list(
+            'cliente_id', flat=True
+        ).first()
+
+
+@receiver(post_save, sender=Processo)
+def atualizar_contadores_processo(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    anterior = getattr(instance, '_cliente_anterior_id', None)
+    if created or anterior is None:
+        movimentar_cliente(instance.cliente_id, processos=1)
+    elif anterior != instance.cliente_id:
+        movimentar_cliente(anterior, processos=-1)
+        movimentar_cliente(instance.cliente_id, processos=1)
+    else:
+        movimentar_cliente(instance.cliente_id)
+
+
+@receiver(post_save, sender=Processo)
+def desarquivar_processo_reaberto(sender, instance, created, raw=False, **kwargs):
+    if not raw and not created and instance.status not in arquivo.ENCERRADOS and arquivo.desarquivar(instance.pk):
+        instance.data_arquivamento = None
+
+
+@receiver(post_delete, sender=Processo)
+def remover_contadores_processo(sender, instance, **kwargs):
+    movimentar_cliente(instance.cliente_id, processos=-1)
+
+
+@receiver(post_save, sender=AtividadeRecente)
+def anunciar_atividade(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        eventos.atividades_criadas([instance])
+
+
+@receiver(post_save, sender=Audiencia)
+def anunciar_audiencia(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        eventos.publicar('audiencia', {
+            'id': instance.pk,
+            'processo_id': instance.processo_id,
+            'tipo': instance.get_tipo_display(),
+            'data_hora': instance.data_hora,
+            'local': instance.local,
+        })
+
+
+@receiver(post_save, sender=Publicacao)
+@receiver(post_delete, sender=Publicacao)
+def anunciar_nao_lidas(sender, raw=False, **kwargs):
+    if not raw:
+        eventos.publicar_nao_lidas()
+
+
+# Extratos da área do cliente (dashboard.extratos), refeitos no commit
+
+@receiver(post_save, sender=Cliente)
+def marcar_extrato_cliente(sender, instance, raw=False, **kwargs):
+    if not raw:
+        extratos.marcar(instance.pk)
+
+
+@receiver(post_save, sender=Receita)
+@receiver(post_delete, sender=Receita)
+def marcar_extrato_receita(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    anterior = getattr(instance, '_contadores_anteriores', None)
+    extratos.marcar(instance.cliente_id, anterior[0] if anterior else None)
+
+
+@receiver(post_save, sender=Processo)
+@receiver(post_delete, sender=Processo)
+def marcar_extrato_processo(sender, instance, raw=False, **kwargs):
+    if not raw:
+        extratos.marcar(instance.cliente_id, getattr(instance, '_cliente_anterior_id', None))
+
+
+@receiver(pre_save, sender=Audiencia)
+def guardar_audiencia_anterior(sender, instance, raw=False, **kwargs):
+    instance._processo_anterior_id = None
+    if instance.pk and not raw:
+        instance._processo_anterior_id = Audiencia.objects.filter(pk=instance.pk).values_list(
+            'processo_id', flat=True
+        ).first()
+
+
+@receiver(post_save, sender=Audiencia)
+@receiver(post_delete, sender=Audiencia)
+def marcar_extrato_audiencia(sender, instance, raw=False, **kwargs):
+    if not raw:
+        extratos.marcar_processos(instance.processo_id, getattr(instance, '_processo_anterior_id', None))
+
+
+def incrementar_versao(sender, raw=False, **kwargs):
+    if not raw:
+        versoes.incrementar(sender)
+
+
+for _modelo in versoes.MODELOS:
+    post_save.connect(incrementar_versao, sender=_modelo, dispatch_uid=f'versao_save_{_modelo}')
+    post_delete.connect(incrementar_versao, sender=_modelo, dispatch_uid=f'versao_delete_{_modelo}')
+
+
+def guardar_estado_historico(sender, instance, raw=False, update_fields=None, **kwargs):
+    instance._historico_anterior = None if raw else historico.estado_gravado(instance, update_fields)
+
+
+def registrar_gravacao_historico(sender, instance, created, raw=False, update_fields=None, **kwargs):
+    if not raw:
+        historico.gravacao(instance, created, getattr(instance, '_historico_anterior', None), update_fields)
+
+
+def registrar_exclusao_historico(sender, instance, **kwargs):
+    historico.exclusao(instance)
+
+
+for _modelo in historico.MODELOS.values():
+    pre_save.connect(guardar_estado_historico, sender=_modelo, dispatch_uid=f'historico_pre_save_{_modelo._meta.label}')
+    post_save.connect(registrar_gravacao_historico, sender=_modelo, dispatch_uid=f'historico_save_{_modelo._meta.label}')
+    post_delete.connect(registrar_exclusao_historico, sender=_modelo, dispatch_uid=f'historico_delete_{_modelo._meta.label}')
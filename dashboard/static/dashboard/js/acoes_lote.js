@@ -0,0 +1,50 @@
+// Barra de ações em lote (dashboard/acoes_lote.html)
+document.addEventListener('DOMContentLoaded', function() {
+    const barra = document.getElementById('acoes-lote');
+    const caixas = () => Array.from(document.querySelectorAll('.selecionar-lote'));
+    const selecionados = () => caixas().filter(caixa => caixa.checked).map(caixa => caixa.value);
+    const atualizarTotal = () => { document.getElementById('lote-total').textContent = selecionados().length; };
+    const todos = document.getElementById('selecionar-lote-todos');
+
+    if (todos) {
+        todos.addEventListener('change', function() {
+            caixas().forEach(caixa => { caixa.checked = this.checked; });
+            atualizarTotal();
+        });
+    }
+    caixas().forEach(caixa => caixa.addEventListener('change', atualizarTotal));
+
+    document.getElementById('lote-aplicar').addEventListener('click', function() {
+        const ids = selecionados();
+        if (!ids.length) {
+            alert('Selecione ao menos um item.');
+            return;
+        }
+        const acao = document.getElementById('lote-acao');
+        if (!confirm(`${acao.options[acao.selectedIndex].text}: ${ids.length} item(ns). Confirmar?`)) {
+            return;
+        }
+        const corpo = {acao: acao.value, ids: ids};
+        const data = document.getElementById('lote-data');
+        if (data && data.value) {
+            corpo[data.dataset.campo] = data.value;
+        }
+        fetch(barra.dataset.url, {
+            method: 'POST',
+            headers: {
+                'Content-Type': 'application/json',
+                'X-CSRFToken': barra.querySelector('[name=csrfmiddlewaretoken]').value,
+                'X-Requested-With': 'XMLHttpRequest'
+            },
+            body: JSON.stringify(corpo)
+        })
+        .then(resposta => resposta.json())
+        .then(dados => {
+            alert(dados.message);
+            if (dados.success) {
+                window.location.reload();
+            }
+        })
+        .catch(() => alert('Erro ao aplicar a ação.'));
+    });
+});
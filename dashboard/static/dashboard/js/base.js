@@ -0,0 +1,24 @@
+// Auto-close sidebar on mobile after clicking a link
+document.addEventListener('DOMContentLoaded', function() {
+    const sidebarLinks = document.querySelectorAll('.sidebar .nav-link:not([data-bs-toggle])');
+    const sidebar = document.getElementById('sidebarMenu');
+    
+    sidebarLinks.forEach(link => {
+        link.addEventListener('click', function() {
+            if (window.innerWidth < 992) {
+                const bsOffcanvas = bootstrap.Offcanvas.getInstance(sidebar);
+                if (bsOffcanvas) {
+                    bsOffcanvas.hide();
+                }
+            }
+        });
+    });
+
+    // Update active state based on current URL
+    const currentPath = window.location.pathname;
+    sidebarLinks.forEach(link => {
+        if (link.getAttribute('href') === currentPath) {
+            link.classList.add('active');
+        }
+    });
+});
@@ -0,0 +1,535 @@
+const URLS = JSON.parse(document.getElementById('urls-clientes').textContent);
+
+// Variáveis globais
+let currentClientId = null;
+
+// Função para obter o token CSRF
+function getCookie(name) {
+    let cookieValue = null;
+    if (document.cookie && document.cookie !== '') {
+        const cookies = document.cookie.split(';');
+        for (let i = 0; i < cookies.length; i++) {
+            const cookie = cookies[i].trim();
+            if (cookie.substring(0, name.length + 1) === (name + '=')) {
+                cookieValue = decodeURIComponent(cookie.substring(name.length + 1));
+                break;
+            }
+        }
+    }
+    return cookieValue;
+}
+
+const csrftoken = getCookie('csrftoken');
+
+// Configurar AJAX com CSRF token
+$.ajaxSetup({
+    beforeSend: function(xhr, settings) {
+        if (!(/^http:.*/.test(settings.url) || /^https:.*/.test(settings.url))) {
+            xhr.setRequestHeader("X-CSRFToken", csrftoken);
+        }
+    }
+});
+
+// Salvar cliente
+$('#clientForm').on('submit', function(e) {
+    e.preventDefault();
+    
+    const formData = new FormData(this);
+    const submitBtn = $(this).find('button[type="submit"]');
+    submitBtn.html('<i class="fas fa-spinner fa-spin me-2"></i>Salvando...').prop('disabled', true);
+    
+    $.ajax({
+        url: URLS.client_create,
+        type: 'POST',
+        data: formData,
+        processData: false,
+        contentType: false,
+        headers: {
+            'X-Requested-With': 'XMLHttpRequest'
+        },
+        success: function(response) {
+            if (response.success) {
+                showAlert('Cliente cadastrado com sucesso!', 'success');
+                $('#clientModal').modal('hide');
+                location.reload();
+            } else {
+                showAlert('Erro ao cadastrar cliente: ' + JSON.stringify(response.errors), 'error');
+            }
+        },
+        error: function() {
+            showAlert('Erro ao processar solicitação', 'error');
+        },
+        complete: function() {
+            submitBtn.html('Salvar').prop('disabled', false);
+        }
+    });
+});
+
+// Editar cliente
+function editClient(clientId) {
+    $.ajaxCondicional({
+        url: URLS.client_detail.replace('/0/', `/${clientId}/`),
+        type: 'GET',
+        headers: {
+            'X-Requested-With': 'XMLHttpRequest'
+        },
+        success: function(response) {
+            if (response.success) {
+                const client = response.client;
+                $('#edit_client_id').val(client.id);
+                $('#edit_nome').val(client.nome);
+                $('#edit_nome_mae').val(client.nome_mae || '');
+                $('#edit_cpf_cnpj').val(client.cpf_cnpj);
+                $('#edit_telefone').val(client.telefone);
+                $('#edit_email').val(client.email);
+                $('#edit_endereco').val(client.endereco || '');
+                $('#edit_cidade').val(client.cidade || '');
+                $('#edit_estado').val(client.estado || '');
+                $('#edit_ativo').prop('checked', client.ativo);
+                
+                $('#editClientModal').modal('show');
+            } else {
+                showAlert('Erro ao carregar dados do cliente', 'error');
+            }
+        },
+        error: function() {
+            showAlert('Erro ao processar solicitação', 'error');
+        }
+    });
+}
+
+// Salvar edição do cliente
+$('#editClientForm').on('submit', function(e) {
+    e.preventDefault();
+    
+    const clientId = $('#edit_client_id').val();
+    const formData = new FormData(this);
+    const submitBtn = $(this).find('button[type="submit"]');
+    submitBtn.html('<i class="fas fa-spinner fa-spin me-2"></i>Salvando...').prop('disabled', true);
+    
+    $.ajax({
+        url: URLS.client_edit.replace('/0/', `/${clientId}/`),
+        type: 'POST',
+        data: formData,
+        processData: false,
+        contentType: false,
+        headers: {
+            'X-Requested-With': 'XMLHttpRequest'
+        },
+        success: function(response) {
+            if (response.success) {
+                showAlert('Cliente atualizado com sucesso!', 'success');
+                $('#editClientModal').modal('hide');
+                location.reload();
+            } else {
+                showAlert('Erro ao atualizar cliente: ' + JSON.stringify(response.errors), 'error');
+            }
+        },
+        error: function() {
+            showAlert('Erro ao processar solicitação', 'error');
+        },
+        complete: function() {
+            submitBtn.html('Salvar').prop('disabled', false);
+        }
+    });
+});
+
+// Mostrar dados do cliente
+function showClientData(clientId) {
+    $('#clientDataContent').html('<div class="text-center"><i class="fas fa-spinner fa-spin"></i> Carregando...</div>');
+    $('#clientDataModal').modal('show');
+    
+    $.ajaxCondicional({
+        url: URLS.client_detail.replace('/0/', `/${clientId}/`),
+        type: 'GET',
+        headers: {
+            'X-Requested-With': 'XMLHttpRequest'
+        },
+        success: function(response) {
+            if (response.success) {
+                const client = response.client;
+                $('#clientDataContent').html(`
+                    <div class="row">
+                        <div class="col-md-6">
+                            <table class="table table-borderless">
+                                <tr><th>Nome:</th><td>${client.nome}</td></tr>
+                                <tr><th>Nome da Mãe:</th><td>${client.nome_mae || '-'}</td></tr>
+                                <tr><th>CPF/CNPJ:</th><td>${client.cpf_cnpj}</td></tr>
+                                <tr><th>Telefone:</th><td>${client.telefone}</td></tr>
+                                <tr><th>E-mail:</th><td>${client.email || '-'}</td></tr>
+                            </table>
+                        </div>
+                        <div class="col-md-6">
+                            <table class="table table-borderless">
+                                <tr><th>Endereço:</th><td>${client.endereco || '-'}</td></tr>
+                                <tr><th>Cidade:</th><td>${client.cidade || '-'}</td></tr>
+                                <tr><th>Estado:</th><td>${client.estado || '-'}</td></tr>
+                                <tr><th>Data Cadastro:</th><td>${client.data_cadastro || '-'}</td></tr>
+                                <tr><th>Status:</th><td>
+                                    ${client.ativo ? '<span class="badge bg-success">Ativo</span>' : '<span class="badge bg-secondary">Inativo</span>'}
+                                    ${client.area_cliente_ativa ? '<br><span class="badge bg-info mt-1">Área ativa</span>' : ''}
+                                </td></tr>
+                            </table>
+                        </div>
+                    </div>
+                `);
+            } else {
+                $('#clientDataContent').html('<div class="alert alert-danger">Erro ao carregar dados do cliente</div>');
+            }
+        },
+        error: function() {
+            $('#clientDataContent').html('<div class="alert alert-danger">Erro ao processar solicitação</div>');
+        }
+    });
+}
+
+// Mostrar informações financeiras
+function showFinancial(clientId) {
+    $('#financialContent').html('<div class="text-center"><i class="fas fa-spinner fa-spin"></i> Carregando...</div>');
+    $('#financialModal').modal('show');
+    
+    $.ajaxCondicional({
+        url: URLS.client_financial.replace('/0/', `/${clientId}/`),
+        type: 'GET',
+        headers: {
+            'X-Requested-With': 'XMLHttpRequest'
+        },
+        success: function(response) {
+            if (response.success) {
+                let content = `
+                    <div class="row mb-4">
+                        <div class="col-md-3">
+                            <div class="card bg-primary text-white">
+                                <div class="card-body text-center">
+                                    <h6>Total Receitas</h6>
+                                    <h4>R$ ${response.total_receitas || '0,00'}</h4>
+                                </div>
+                            </div>
+                        </div>
+                        <div class="col-md-3">
+                            <div class="card bg-success text-white">
+                                <div class="card-body text-center">
+                                    <h6>Total Recebido</h6>
+                                    <h4>R$ ${response.total_recebido || '0,00'}</h4>
+                                </div>
+                            </div>
+                        </div>
+                        <div class="col-md-3">
+                            <div class="card bg-danger text-white">
+                                <div class="card-body text-center">
+                                    <h6>Total Restante</h6>
+                                    <h4>R$ ${response.total_restante || '0,00'}</h4>
+                                </div>
+                            </div>
+                        </div>
+                        <div class="col-md-3">
+                            <div class="card bg-info text-white">
+                                <div class="card-body text-center">
+                                    <h6>Taxa Recebimento</h6>
+                                    <h4>${response.total_receitas && response.total_receitas !== '0,00' ? Math.round((parseFloat(response.total_recebido.replace('.', '').replace(',', '.')) / parseFloat(response.total_receitas.replace('.', '').replace(',', '.'))) * 100) + '%' : '0%'}</h4>
+                                </div>
+                            </div>
+                        </div>
+                    </div>
+                `;
+                
+                if (response.receitas && response.receitas.length > 0) {
+                    content += `
+                        <div class="card">
+                            <div class="card-header">
+                                <h6 class="mb-0">Histórico de Receitas</h6>
+                            </div>
+                            <div class="card-body p-0">
+                                <div class="table-responsive" style="max-height: 400px; overflow-y: auto;">
+                                    <table class="table table-hover mb-0">
+                                        <thead class="table-light">
+                                            <tr>
+                                                <th>Descrição</th>
+                                                <th>Processo</th>
+                                                <th>Valor Total</th>
+                                                <th>Valor Recebido</th>
+                                                <th>Valor Restante</th>
+                                                <th>Vencimento</th>
+                                                <th>Status</th>
+                                                <th>Forma Pagamento</th>
+                                                <th>Ações</th>
+                                            </tr>
+                                        </thead>
+                                        <tbody>
+                    `;
+                    
+                    response.receitas.forEach(receita => {
+                        content += `
+                            <tr>
+                                <td class="text-truncate" style="max-width: 200px;">${receita.descricao}</td>
+                                <td class="font-monospace text-muted small">${receita.processo}</td>
+                                <td class="font-monospace">R$ ${receita.valor_total}</td>
+                                <td class="font-monospace text-success">R$ ${receita.valor_recebido}</td>
+                                <td class="font-monospace ${parseFloat(receita.valor_restante.replace('.', '').replace(',', '.')) > 0 ? 'text-danger' : 'text-muted'}">R$ ${receita.valor_restante}</td>
+                                <td class="text-muted small">${receita.data_vencimento}</td>
+                                <td>
+                                    <span class="badge bg-${receita.status_class}">${receita.status}</span>
+                                </td>
+                                <td class="text-muted small">${receita.forma_pagamento}</td>
+                                <td>
+                                    ${parseFloat(receita.valor_restante.replace('.', '').replace(',', '.')) > 0 ? 
+                                        `<button type="button" class="btn btn-sm btn-outline-success" onclick="showAddPaymentModal(${receita.id}, '${receita.descricao}', '${receita.valor_restante}')" title="Adicionar Pagamento">
+                                            <i class="fas fa-plus"></i>
+                                        </button>` : 
+                                        '<span class="text-muted">-</span>'
+                                    }
+                                </td>
+                            </tr>
+                        `;
+                    });
+                    
+                    content += `
+                                        </tbody>
+                                    </table>
+                                </div>
+                            </div>
+                        </div>
+                    `;
+                } else {
+                    content += `
+                        <div class="text-center py-4">
+                            <i class="fas fa-receipt fa-3x text-muted mb-3"></i>
+                            <h5 class="text-muted">Nenhuma receita encontrada</h5>
+                            <p class="text-muted">Este cliente não possui receitas cadastradas.</p>
+                        </div>
+                    `;
+                }
+                
+                $('#financialContent').html(content);
+            } else {
+                $('#financialContent').html('<div class="alert alert-danger">Erro ao carregar informações financeiras</div>');
+            }
+        },
+        error: function() {
+            $('#financialContent').html('<div class="alert alert-danger">Erro ao processar solicitação</div>');
+        }
+    });
+}
+
+// Excluir cliente
+function deleteClient(clientId, clientName) {
+    currentClientId = clientId;
+    $('#deleteClientName').text(clientName);
+    $('#deleteModal').modal('show');
+}
+
+$('#confirmDeleteBtn').on('click', function() {
+    if (!currentClientId) return;
+    
+    const btn = $(this);
+    btn.html('<i class="fas fa-spinner fa-spin me-2"></i>Excluindo...').prop('disabled', true);
+    
+    $.ajax({
+        url: URLS.client_delete.replace('/0/', `/${currentClientId}/`),
+        type: 'POST',
+        headers: {
+            'X-Requested-With': 'XMLHttpRequest'
+        },
+        success: function(response) {
+            if (response.success) {
+                showAlert('Cliente excluído com sucesso!', 'success');
+                $('#deleteModal').modal('hide');
+                location.reload();
+            } else {
+                showAlert('Erro ao excluir cliente', 'error');
+            }
+        },
+        error: function() {
+            showAlert('Erro ao processar solicitação', 'error');
+        },
+        complete: function() {
+            btn.html('Excluir').prop('disabled', false);
+            currentClientId = null;
+        }
+    });
+});
+
+// Ativar área do cliente
+function activateClientArea(clientId) {
+    $.ajax({
+        url: URLS.activate_client_area.replace('/0/', `/${clientId}/`),
+        type: 'POST',
+        headers: {
+            'X-Requested-With': 'XMLHttpRequest'
+        },
+        success: function(response) {
+            if (response.success) {
+                $('#clientCPF').text(response.cpf);
+                $('#generatedPassword').text(response.password);
+                $('#activateAreaModal').modal('show');
+                
+                // Recarregar página após fechar o modal
+                $('#activateAreaModal').on('hidden.bs.modal', function() {
+                    location.reload();
+                });
+            } else {
+                showAlert('Erro ao ativar área do cliente', 'error');
+            }
+        },
+        error: function() {
+            showAlert('Erro ao processar solicitação', 'error');
+        }
+    });
+}
+
+// Função para mostrar alertas
+function showAlert(message, type) {
+    const alertClass = type === 'success' ? 'alert-success' : 'alert-danger';
+    const alertHtml = `
+        <div class="alert ${alertClass} alert-dismissible fade show position-fixed" 
+             style="top: 20px; right: 20px; z-index: 9999; min-width: 300px;" role="alert">
+            ${message}
+            <button type="button" class="btn-close" data-bs-dismiss="alert" aria-label="Close"></button>
+        </div>
+    `;
+    $('body').append(alertHtml);
+    
+    setTimeout(() => {
+        $('.alert').fadeOut();
+    }, 5000);
+}
+
+// Limpar modais quando fechados
+$('#clientModal').on('hidden.bs.modal', function() {
+    $('#clientForm')[0].reset();
+});
+
+$('#editClientModal').on('hidden.bs.modal', function() {
+    $('#editClientForm')[0].reset();
+});
+
+$('#deleteModal').on('hidden.bs.modal', function() {
+    currentClientId = null;
+    $('#deleteClientName').text('');
+});
+
+// Variables for payment modal
+let currentReceitaId = null;
+
+// Show add payment modal
+function showAddPaymentModal(receitaId, descricao, valorRestante) {
+    currentReceitaId = receitaId;
+    $('#paymentReceita').val(descricao);
+    $('#paymentValorRestante').val('R$ ' + valorRestante);
+    $('#paymentData').val(new Date().toISOString().split('T')[0]);
+    
+    // Load payment methods and banks
+    loadPaymentOptions();
+    
+    $('#addPaymentModal').modal('show');
+}
+
+// Load payment options
+function loadPaymentOptions() {
+    // Load payment methods
+    $.ajax({
+        url: URLS.get_formas_pagamento_ajax,
+        type: 'GET',
+        headers: {
+            'X-Requested-With': 'XMLHttpRequest'
+        },
+        success: function(response) {
+            if (response.success) {
+                let options = '<option value="">Selecione...</option>';
+                response.formas_pagamento.forEach(function(forma) {
+                    options += `<option value="${forma.id}">${forma.nome}</option>`;
+                });
+                $('#paymentForma').html(options);
+            } else {
+                console.error('Erro ao carregar formas de pagamento:', response.message);
+                $('#paymentForma').html('<option value="">Erro ao carregar...</option>');
+            }
+        },
+        error: function() {
+            console.error('Erro na requisição AJAX para formas de pagamento');
+            $('#paymentForma').html('<option value="">Erro ao carregar...</option>');
+        }
+    });
+    
+    // Load banks
+    $.ajaxCondicional({
+        url: URLS.get_payment_options,
+        type: 'GET',
+        headers: {
+            'X-Requested-With': 'XMLHttpRequest'
+        },
+        success: function(response) {
+            if (response.success && response.bancos) {
+                let options = '<option value="">Selecione...</option>';
+                response.bancos.forEach(function(banco) {
+                    options += `<option value="${banco.id}">${banco.nome}</option>`;
+                });
+                $('#paymentBanco').html(options);
+            } else {
+                console.error('Erro ao carregar bancos:', response.message);
+                $('#paymentBanco').html('<option value="">Erro ao carregar...</option>');
+            }
+        },
+        error: function() {
+            console.error('Erro na requisição AJAX para bancos');
+            $('#paymentBanco').html('<option value="">Erro ao carregar...</option>');
+        }
+    });
+}
+
+// Handle add payment form submission
+$('#addPaymentForm').on('submit', function(e) {
+    e.preventDefault();
+    
+    if (!currentReceitaId) return;
+    
+    const formData = new FormData(this);
+    const submitBtn = $(this).find('button[type="submit"]');
+    submitBtn.html('<i class="fas fa-spinner fa-spin me-2"></i>Processando...').prop('disabled', true);
+    
+    $.ajax({
+        url: URLS.add_partial_payment.replace('/0/', `/${currentReceitaId}/`),
+        type: 'POST',
+        data: formData,
+        processData: false,
+        contentType: false,
+        headers: {
+            'X-Requested-With': 'XMLHttpRequest'
+        },
+        success: function(response) {
+            if (response.success) {
+                showAlert(response.message, 'success');
+                $('#addPaymentModal').modal('hide');
+                
+                // Refresh financial data if financial modal is open
+                if ($('#financialModal').hasClass('show')) {
+                    const clientId = $('#financialModal').data('client-id');
+                    if (clientId) {
+                        showFinancial(clientId);
+                    }
+                }
+            } else {
+                showAlert('Erro ao adicionar pagamento: ' + response.message, 'error');
+            }
+        },
+        error: function() {
+            showAlert('Erro ao processar pagamento', 'error');
+        },
+        complete: function() {
+            submitBtn.html('<i class="fas fa-plus me-2"></i>Adicionar Pagamento').prop('disabled', false);
+        }
+    });
+});
+
+// Store client ID in financial modal for refresh
+$('#financialModal').on('show.bs.modal', function(e) {
+    const button = $(e.relatedTarget);
+    const clientId = button.data('client-id') || currentClientId;
+    $(this).data('client-id', clientId);
+});
+
+// Reset payment form when modal is hidden
+$('#addPaymentModal').on('hidden.bs.modal', function() {
+    $('#addPaymentForm')[0].reset();
+    currentReceitaId = null;
+});
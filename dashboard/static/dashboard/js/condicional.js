@@ -0,0 +1,37 @@
+/*
+ * Requisições GET condicionais para os endpoints JSON do dashboard.
+ *
+ * $.ajaxCondicional aceita as mesmas opções de $.ajax. Guarda o ETag e os dados
+ * da última resposta de cada URL e os reenvia em If-None-Match; quando o
+ * servidor responde 304 (nada mudou), o callback success recebe os dados
+ * guardados, sem o servidor ter refeito as consultas nem reenviado o corpo.
+ */
+(function ($) {
+    var respostas = {};
+
+    $.ajaxCondicional = function (opcoes) {
+        var url = opcoes.url;
+        var guardada = respostas[url];
+        var sucesso = opcoes.success;
+        var cabecalhos = $.extend({}, opcoes.headers);
+        if (guardada) {
+            cabecalhos['If-None-Match'] = guardada.etag;
+        }
+
+        return $.ajax($.extend({}, opcoes, {
+            type: 'GET',
+            cache: true,
+            headers: cabecalhos,
+            success: function (dados, status, xhr) {
+                if (xhr.status === 304 && guardada) {
+                    dados = guardada.dados;
+                } else if (xhr.getResponseHeader('ETag')) {
+                    respostas[url] = {etag: xhr.getResponseHeader('ETag'), dados: dados};
+                }
+                if (sucesso) {
+                    sucesso.call(this, dados, status, xhr);
+                }
+            }
+        }));
+    };
+})(jQuery);
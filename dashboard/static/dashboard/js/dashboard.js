@@ -0,0 +1,497 @@
+const URLS = JSON.parse(document.getElementById('urls-dashboard').textContent);
+
+// Widgets do dashboard: cada um é buscado em paralelo em data-url; os
+// fragmentos HTML substituem o conteúdo e os dados JSON desenham os gráficos
+const GRAFICOS = {
+    financeiro: function(dados) {
+        const ctxFinancial = document.getElementById('financialChart').getContext('2d');
+        new Chart(ctxFinancial, {
+            type: 'line',
+            data: {
+                labels: dados.map(item => item.mes),
+                datasets: [{
+                    label: 'Receitas',
+                    data: dados.map(item => item.receitas),
+                    borderColor: '#38a169',
+                    backgroundColor: 'rgba(56, 161, 105, 0.1)',
+                    tension: 0.4,
+                    fill: true
+                }, {
+                    label: 'Despesas',
+                    data: dados.map(item => item.despesas),
+                    borderColor: '#e53e3e',
+                    backgroundColor: 'rgba(229, 62, 62, 0.1)',
+                    tension: 0.4,
+                    fill: true
+                }]
+            },
+            options: {
+                responsive: true,
+                maintainAspectRatio: false,
+                plugins: {
+                    legend: {
+                        position: 'top',
+                    }
+                },
+                scales: {
+                    y: {
+                        beginAtZero: true,
+                        ticks: {
+                            callback: function(value) {
+                                return 'R$ ' + value.toLocaleString('pt-BR');
+                            }
+                        }
+                    }
+                }
+            }
+        });
+    },
+    processos: function(dados) {
+        if (dados.length > 0) {
+            const ctxProcess = document.getElementById('processChart').getContext('2d');
+            new Chart(ctxProcess, {
+                type: 'doughnut',
+                data: {
+                    labels: dados.map(item => {
+                        const statusMap = {
+                            'ativo': 'Ativo',
+                            'suspenso': 'Suspenso',
+                            'arquivado': 'Arquivado',
+                            'finalizado': 'Finalizado'
+                        };
+                        return statusMap[item.status] || item.status;
+                    }),
+                    datasets: [{
+                        data: dados.map(item => item.count),
+                        backgroundColor: [
+                            '#3182ce',
+                            '#d69e2e',
+                            '#718096',
+                            '#38a169'
+                        ]
+                    }]
+                },
+                options: {
+                    responsive: true,
+                    maintainAspectRatio: false,
+                    plugins: {
+                        legend: {
+                            position: 'bottom',
+                        }
+                    }
+                }
+            });
+        }
+    }
+};
+
+function carregarWidget(elemento, revalidar) {
+    const url = elemento.dataset.url + window.location.search;
+    const grafico = GRAFICOS[elemento.dataset.widget];
+    return fetch(url, {
+        headers: {'X-Requested-With': 'XMLHttpRequest'},
+        credentials: 'same-origin',
+        // Ao recarregar por um evento, ignora o max-age e revalida pelo ETag
+        cache: revalidar ? 'no-cache' : 'default'
+    })
+        .then(response => {
+            if (!response.ok) {
+                throw new Error(response.status);
+            }
+            return grafico ? response.json() : response.text();
+        })
+        .then(conteudo => {
+            if (grafico) {
+                grafico(conteudo);
+            } else {
+                elemento.innerHTML = conteudo;
+            }
+        })
+        .catch(() => {
+            if (!grafico) {
+                elemento.innerHTML = '<div class="empty-state"><i class="fas fa-exclamation-circle"></i><p>Não foi possível carregar</p></div>';
+            }
+        });
+}
+
+function recarregarWidgets(nomes) {
+    document.querySelectorAll('[data-widget]').forEach(elemento => {
+        const nome = elemento.dataset.widget;
+        // Os gráficos só são desenhados na abertura da página
+        if (!GRAFICOS[nome] && (!nomes || nomes.includes(nome))) {
+            carregarWidget(elemento, true);
+        }
+    });
+}
+
+function escapar(texto) {
+    const div = document.createElement('div');
+    div.textContent = texto;
+    return div.innerHTML;
+}
+
+const ICONES_ATIVIDADE = {
+    cliente_cadastrado: ['client', 'fa-user-plus'],
+    tarefa_criada: ['task', 'fa-tasks'],
+    audiencia_agendada: ['document', 'fa-calendar'],
+    documento_gerado: ['document', 'fa-file-alt'],
+    recebimento_confirmado: ['payment', 'fa-dollar-sign']
+};
+
+// Insere a atividade recebida no topo da lista, mantendo as 10 mais recentes
+function adicionarAtividade(atividade) {
+    const lista = document.querySelector('[data-widget="atividades"]');
+    if (!lista || lista.querySelector('.widget-carregando')) {
+        return;
+    }
+    lista.querySelectorAll('.empty-state').forEach(vazio => vazio.remove());
+    const [classe, icone] = ICONES_ATIVIDADE[atividade.tipo] || ['document', 'fa-info'];
+    lista.insertAdjacentHTML('afterbegin', `
+        <div class="activity-item">
+            <div class="activity-icon ${classe}"><i class="fas ${icone}"></i></div>
+            <div class="activity-content">
+                <h6 class="activity-title">${escapar(atividade.titulo)}</h6>
+                <p class="activity-desc">${escapar(atividade.descricao)}</p>
+            </div>
+            <div class="activity-time">agora</div>
+        </div>`);
+    lista.querySelectorAll('.activity-item').forEach((item, indice) => {
+        if (indice >= 10) {
+            item.remove();
+        }
+    });
+}
+
+function atualizarPublicacoesNaoLidas(quantidade) {
+    const badge = document.getElementById('badge-publicacoes');
+    if (badge) {
+        badge.textContent = quantidade;
+        badge.classList.toggle('d-none', !quantidade);
+    }
+}
+
+// Stream de eventos do servidor: cada evento traz só o que mudou; o navegador
+// reconecta sozinho enviando o Last-Event-ID do último evento recebido
+function iniciarEventos() {
+    if (!window.EventSource) {
+        return;
+    }
+    const fonte = new EventSource(URLS.dashboard_eventos);
+    const dados = evento => JSON.parse(evento.data);
+
+    fonte.addEventListener('atividade', evento => adicionarAtividade(dados(evento)));
+    fonte.addEventListener('pagamento', evento => {
+        const pagamento = dados(evento);
+        showToast('success', `Recebimento confirmado: ${escapar(pagamento.descricao)}`);
+        recarregarWidgets(['kpis', 'vencimentos', 'top_clientes']);
+    });
+    fonte.addEventListener('audiencia', evento => {
+        const audiencia = dados(evento);
+        const quando = new Date(audiencia.data_hora).toLocaleString('pt-BR');
+        showToast('success', `Audiência agendada: ${escapar(audiencia.tipo)} em ${quando}`);
+        recarregarWidgets(['resumo', 'kpis', 'agenda']);
+    });
+    fonte.addEventListener('publicacoes', evento => atualizarPublicacoesNaoLidas(dados(evento).nao_lidas));
+    // Eventos perdidos além do histórico do servidor: recarrega tudo
+    fonte.addEventListener('sincronizar', () => recarregarWidgets());
+}
+
+document.addEventListener('DOMContentLoaded', function() {
+    document.querySelectorAll('[data-widget]').forEach(elemento => carregarWidget(elemento));
+
+    // Gráfico de Projeção de Fluxo de Caixa
+    let cashFlowChart = null;
+    function loadCashFlow(granularidade) {
+        fetch(URLS.fluxo_caixa_data + '?granularidade=' + granularidade, {
+            headers: {'X-Requested-With': 'XMLHttpRequest'}
+        })
+            .then(response => response.json())
+            .then(data => {
+                const faixas = data.faixas;
+                if (cashFlowChart) {
+                    cashFlowChart.destroy();
+                }
+                cashFlowChart = new Chart(document.getElementById('cashFlowChart').getContext('2d'), {
+                    type: 'bar',
+                    data: {
+                        labels: faixas.map(item => item.rotulo),
+                        datasets: [{
+                            label: 'Entradas previstas',
+                            data: faixas.map(item => item.entradas),
+                            backgroundColor: 'rgba(56, 161, 105, 0.7)'
+                        }, {
+                            label: 'Saídas previstas',
+                            data: faixas.map(item => -item.saidas),
+                            backgroundColor: 'rgba(229, 62, 62, 0.7)'
+                        }, {
+                            type: 'line',
+                            label: 'Saldo acumulado',
+                            data: faixas.map(item => item.acumulado),
+                            borderColor: '#3182ce',
+                            tension: 0.3
+                        }]
+                    },
+                    options: {
+                        responsive: true,
+                        maintainAspectRatio: false,
+                        plugins: {
+                            legend: {
+                                position: 'top',
+                            }
+                        },
+                        scales: {
+                            y: {
+                                ticks: {
+                                    callback: function(value) {
+                                        return 'R$ ' + value.toLocaleString('pt-BR');
+                                    }
+                                }
+                            }
+                        }
+                    }
+                });
+            });
+    }
+    loadCashFlow('semanal');
+    document.getElementById('fluxoCaixaGranularidade').addEventListener('change', function() {
+        loadCashFlow(this.value);
+    });
+
+    // Animações de entrada
+    const observer = new IntersectionObserver((entries) => {
+        entries.forEach(entry => {
+            if (entry.isIntersecting) {
+                entry.target.style.opacity = '0';
+                entry.target.style.transform = 'translateY(20px)';
+                
+                setTimeout(() => {
+                    entry.target.style.transition = 'all 0.6s ease';
+                    entry.target.style.opacity = '1';
+                    entry.target.style.transform = 'translateY(0)';
+                }, Math.random() * 200);
+            }
+        });
+    });
+    
+    document.querySelectorAll('.stat-card, .info-card').forEach(card => {
+        observer.observe(card);
+    });
+
+    // Modal form handlers
+    initializeModalForms();
+    
+    // Load data for select fields
+    loadSelectData();
+    
+    // Atualizações em tempo real
+    iniciarEventos();
+});
+
+// Initialize modal forms with AJAX handling
+function initializeModalForms() {
+    // Cliente form handler
+    $('#clienteForm').on('submit', function(e) {
+        e.preventDefault();
+        const formData = new FormData(this);
+        
+        $.ajax({
+            url: URLS.client_create,
+            type: 'POST',
+            data: formData,
+            processData: false,
+            contentType: false,
+            headers: {
+                'X-Requested-With': 'XMLHttpRequest',
+                'X-CSRFToken': $('[name=csrfmiddlewaretoken]').val()
+            },
+            success: function(response) {
+                if (response.success) {
+                    $('#clienteModal').modal('hide');
+                    $('#clienteForm')[0].reset();
+                    showToast('success', response.message);
+                    // Refresh page after 1 second to show updated data
+                    setTimeout(() => location.reload(), 1000);
+                } else {
+                    showFormErrors('clienteForm', response.errors);
+                }
+            },
+            error: function(xhr, status, error) {
+                showToast('error', 'Erro ao salvar cliente. Tente novamente.');
+            }
+        });
+    });
+    
+    // Processo form handler
+    $('#processoForm').on('submit', function(e) {
+        e.preventDefault();
+        const formData = new FormData(this);
+        
+        $.ajax({
+            url: URLS.processo_create,
+            type: 'POST',
+            data: formData,
+            processData: false,
+            contentType: false,
+            headers: {
+                'X-Requested-With': 'XMLHttpRequest',
+                'X-CSRFToken': $('[name=csrfmiddlewaretoken]').val()
+            },
+            success: function(response) {
+                if (response.success) {
+                    $('#processoModal').modal('hide');
+                    $('#processoForm')[0].reset();
+                    showToast('success', response.message);
+                    setTimeout(() => location.reload(), 1000);
+                } else {
+                    showFormErrors('processoForm', response.errors);
+                }
+            },
+            error: function(xhr, status, error) {
+                showToast('error', 'Erro ao salvar processo. Tente novamente.');
+            }
+        });
+    });
+    
+    // Audiencia form handler
+    $('#audienciaForm').on('submit', function(e) {
+        e.preventDefault();
+        const formData = new FormData(this);
+        
+        $.ajax({
+            url: URLS.audiencia_create,
+            type: 'POST',
+            data: formData,
+            processData: false,
+            contentType: false,
+            headers: {
+                'X-Requested-With': 'XMLHttpRequest',
+                'X-CSRFToken': $('[name=csrfmiddlewaretoken]').val()
+            },
+            success: function(response) {
+                if (response.success) {
+                    $('#audienciaModal').modal('hide');
+                    $('#audienciaForm')[0].reset();
+                    showToast('success', response.message);
+                    setTimeout(() => location.reload(), 1000);
+                } else {
+                    showFormErrors('audienciaForm', response.errors);
+                }
+            },
+            error: function(xhr, status, error) {
+                showToast('error', 'Erro ao agendar audiência. Tente novamente.');
+            }
+        });
+    });
+    
+    // Receita form handler
+    $('#receitaForm').on('submit', function(e) {
+        e.preventDefault();
+        const formData = new FormData(this);
+        
+        $.ajax({
+            url: URLS.receita_create,
+            type: 'POST',
+            data: formData,
+            processData: false,
+            contentType: false,
+            headers: {
+                'X-Requested-With': 'XMLHttpRequest',
+                'X-CSRFToken': $('[name=csrfmiddlewaretoken]').val()
+            },
+            success: function(response) {
+                if (response.success) {
+                    $('#receitaModal').modal('hide');
+                    $('#receitaForm')[0].reset();
+                    showToast('success', response.message);
+                    setTimeout(() => location.reload(), 1000);
+                } else {
+                    showFormErrors('receitaForm', response.errors);
+                }
+            },
+            error: function(xhr, status, error) {
+                showToast('error', 'Erro ao lançar receita. Tente novamente.');
+            }
+        });
+    });
+}
+
+// Load data for select fields
+function loadSelectData() {
+    // Load clientes
+    $.get(URLS.get_clientes_ajax, function(data) {
+        const clienteSelects = $('select[name="cliente"]');
+        clienteSelects.each(function() {
+            const $select = $(this);
+            const defaultOption = $select.find('option[value=""]').text();
+            $select.empty().append(`<option value="">${defaultOption}</option>`);
+            
+            data.forEach(function(cliente) {
+                $select.append(`<option value="${cliente.id}">${cliente.nome}</option>`);
+            });
+        });
+    });
+    
+    // Load processos
+    $.get(URLS.get_processos_ajax, function(data) {
+        const processoSelects = $('select[name="processo"]');
+        processoSelects.each(function() {
+            const $select = $(this);
+            const defaultOption = $select.find('option[value=""]').text();
+            $select.empty().append(`<option value="">${defaultOption}</option>`);
+            
+            data.forEach(function(processo) {
+                const title = `${processo.numero} - ${processo.titulo} (${processo.cliente__nome})`;
+                $select.append(`<option value="${processo.id}">${title}</option>`);
+            });
+        });
+    });
+    
+    // Load formas de pagamento
+    $.get(URLS.get_formas_pagamento_ajax, function(data) {
+        const formaSelects = $('select[name="forma_pagamento"]');
+        formaSelects.each(function() {
+            const $select = $(this);
+            const defaultOption = $select.find('option[value=""]').text();
+            $select.empty().append(`<option value="">${defaultOption}</option>`);
+            
+            data.forEach(function(forma) {
+                $select.append(`<option value="${forma.id}">${forma.nome}</option>`);
+            });
+        });
+    });
+}
+
+// Show form errors
+function showFormErrors(formId, errors) {
+    // Clear previous errors
+    $(`#${formId} .is-invalid`).removeClass('is-invalid');
+    $(`#${formId} .invalid-feedback`).remove();
+    
+    // Show new errors
+    Object.keys(errors).forEach(function(field) {
+        const $field = $(`#${formId} [name="${field}"]`);
+        if ($field.length) {
+            $field.addClass('is-invalid');
+            const errorText = Array.isArray(errors[field]) ? errors[field].join(', ') : errors[field];
+            $field.after(`<div class="invalid-feedback">${errorText}</div>`);
+        }
+    });
+}
+
+// Show toast notification
+function showToast(type, message) {
+    const alertClass = type === 'success' ? 'alert-success' : 'alert-danger';
+    const alertHtml = `
+        <div class="alert ${alertClass} alert-dismissible fade show position-fixed" 
+             style="top: 20px; right: 20px; z-index: 9999; min-width: 300px;" role="alert">
+            ${message}
+            <button type="button" class="btn-close" data-bs-dismiss="alert" aria-label="Close"></button>
+        </div>
+    `;
+    $('body').append(alertHtml);
+    
+    // Auto remove after 5 seconds
+    setTimeout(() => {
+        $('.alert').fadeOut();
+    }, 5000);
+}
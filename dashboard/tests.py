@@ -1,3 +1,1856 @@
-from django.test import TestCase
+import csv
+import json
+import re
+import tempfile
+import threading
+from datetime import date, timedelta
+from decimal import Decimal
+from io import StringIO
+from pathlib import Path
+from unittest import mock
 
-# Create your tests here.
+from asgiref.sync import sync_to_async
+from django.contrib.staticfiles import finders
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
+from django.db.migrations.executor import MigrationExecutor
+from django.test import SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from finance.models import Client
+from users import tenancy
+from users.models import Escritorio, Lawyer
+
+from . import aging, arquivo, busca, cnj, deduplicacao, documentos, eventos, expurgo, extratos, fila, fluxo_caixa, historico, lote, painel, prazos, publicacoes, versoes
+from .comissoes import relatorio_comissoes
+from .contadores import recalcular_clientes
+from .models import AlertaPublicacao, Alteracao, AtividadeRecente, Cliente, DocumentoGerado, DuplicidadeCliente, FormaPagamento, Job, Processo, Publicacao, RateioParticipacao, Receita, RegistroArquivado, Task, TipoReceita, VersaoModelo
+
+
+def povoar_escritorio(escritorio, sufixo):
+    """Advogado, cliente, processo, receita e tarefa de um escritório, com nomes que o identificam"""
+    with tenancy.activate(escritorio.pk):
+        advogado = Lawyer.objects.create_user(f'advogado-{sufixo}', password='senha')
+        cliente = Cliente.objects.create(
+            nome=f'Cliente {sufixo}', cpf_cnpj=f'doc-{sufixo}', email=f'{sufixo}@exemplo.com', telefone='0000-0000',
+        )
+        processo = Processo.objects.create(
+            numero=f'PROC-{sufixo}', cliente=cliente, advogado_responsavel=advogado, titulo=f'Processo {sufixo}',
+            descricao='-', data_inicio=timezone.localdate(),
+        )
+        receita = Receita.objects.create(
+            descricao=f'Receita {sufixo}', valor_total=Decimal('100.00'), cliente=cliente, processo=processo,
+            advogado=advogado, tipo=TipoReceita.objects.create(nome=f'Honorários {sufixo}'),
+            forma_pagamento=FormaPagamento.objects.create(nome=f'PIX {sufixo}'), condicao_pagamento='a_vista',
+            data_vencimento=timezone.localdate() + timedelta(days=10),
+        )
+        tarefa = Task.objects.create(
+            titulo=f'Tarefa {sufixo}', advogado=advogado, processo=processo, cliente=cliente,
+            data_inicio=timezone.now() + timedelta(days=1),
+        )
+    return {'advogado': advogado, 'cliente': cliente, 'processo': processo, 'receita': receita, 'tarefa': tarefa}
+
+
+class EscritorioIsolamentoTests(TestCase):
+    """Um escritório não vê nem altera as linhas do outro (users.tenancy)"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.escritorio_a = Escritorio.objects.create(nome='Escritório A')
+        cls.escritorio_b = Escritorio.objects.create(nome='Escritório B')
+        cls.a = povoar_escritorio(cls.escritorio_a, 'alfa')
+        cls.b = povoar_escritorio(cls.escritorio_b, 'beta')
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.a['advogado'])
+
+    def test_listas_mostram_so_o_escritorio_ativo(self):
+        # A lista de receitas mostra o nome do cliente; as tarefas vêm do calendário
+        agora = timezone.now()
+        periodo = {'start': (agora - timedelta(days=7)).isoformat(), 'end': (agora + timedelta(days=7)).isoformat()}
+        paginas = [
+            ('dashboard:clients', {}, 'Cliente alfa', 'Cliente beta'),
+            ('dashboard:processo_list', {}, 'PROC-alfa', 'PROC-beta'),
+            ('dashboard:receitas', {}, 'Cliente alfa', 'Cliente beta'),
+            ('dashboard:calendar_events', periodo, 'Tarefa alfa', 'Tarefa beta'),
+        ]
+        for nome, parametros, proprio, alheio in paginas:
+            with self.subTest(pagina=nome):
+                resposta = self.client.get(reverse(nome), parametros)
+                self.assertContains(resposta, proprio)
+                self.assertNotContains(resposta, alheio)
+
+    def test_detalhes_do_outro_escritorio_respondem_404(self):
+        detalhes = {
+            'dashboard:client_detail': 'cliente', 'dashboard:processo_detail': 'processo',
+            'dashboard:receita_detail': 'receita', 'dashboard:task_detail': 'tarefa',
+            'dashboard:lawyer_detail': 'advogado',
+        }
+        for nome, chave in detalhes.items():
+            with self.subTest(detalhe=nome):
+                self.assertEqual(self.client.get(reverse(nome, args=[self.a[chave].pk])).status_code, 200)
+                self.assertEqual(self.client.get(reverse(nome, args=[self.b[chave].pk])).status_code, 404)
+
+    def test_historico_do_outro_escritorio_vem_vazio(self):
+        cliente = self.b['cliente']
+        self.assertTrue(Alteracao._base_manager.filter(modelo='dashboard.cliente', objeto_id=cliente.pk).exists())
+        resposta = self.client.get(reverse('dashboard:historico_objeto', args=['cliente', cliente.pk]))
+        self.assertEqual(resposta.status_code, 200)
+        self.assertIsNone(resposta.context['objeto'])
+        self.assertEqual(resposta.context['alteracoes'], [])
+
+        proprio = self.client.get(reverse('dashboard:historico_objeto', args=['cliente', self.a['cliente'].pk]))
+        self.assertEqual([alteracao.acao for alteracao in proprio.context['alteracoes']], ['criado'])
+
+    def test_historico_sem_escritorio_ativo_traz_as_entradas(self):
+        self.assertEqual(historico.consulta(Cliente, self.b['cliente'].pk).count(), 1)
+
+    def test_acao_em_lote_ignora_ids_do_outro_escritorio(self):
+        ids = [self.a['cliente'].pk, self.b['cliente'].pk]
+        resposta = self.client.post(
+            reverse('dashboard:cliente_lote'), {'acao': 'desativar', 'ids': ids}, content_type='application/json',
+        )
+        self.assertEqual(resposta.json()['quantidade'], 1)
+        self.assertFalse(Cliente._base_manager.get(pk=self.a['cliente'].pk).ativo)
+        self.assertTrue(Cliente._base_manager.get(pk=self.b['cliente'].pk).ativo)
+
+    def test_bulk_create_atribui_o_escritorio_ativo(self):
+        with tenancy.activate(self.escritorio_a.pk):
+            cliente, = Cliente.objects.bulk_create([
+                Cliente(nome='Em lote', cpf_cnpj='lote-1', email='lote@exemplo.com', telefone='0'),
+            ])
+        self.assertEqual(cliente.escritorio_id, self.escritorio_a.pk)
+
+    def test_bulk_create_sem_escritorio_ativo_herda_das_relacoes(self):
+        processo, = Processo.objects.bulk_create([
+            Processo(
+                numero='PROC-lote', cliente=self.b['cliente'], advogado_responsavel=self.b['advogado'],
+                titulo='Em lote', descricao='-', data_inicio=timezone.localdate(),
+            ),
+        ])
+        # Task herda do advogado quando não há processo nem cliente
+        tarefa, = Task.objects.bulk_create([
+            Task(titulo='Em lote', advogado=self.b['advogado'], data_inicio=timezone.now()),
+        ])
+        self.assertEqual(processo.escritorio_id, self.escritorio_b.pk)
+        self.assertEqual(tarefa.escritorio_id, self.escritorio_b.pk)
+
+    def test_situacao_da_fila_so_conta_os_jobs_do_escritorio(self):
+        with tenancy.activate(self.escritorio_b.pk):
+            fila.enfileirar('expurgo.executar', atraso=timedelta(hours=1))
+        resposta = self.client.get(reverse('dashboard:jobs_status'))
+        self.assertEqual(resposta.status_code, 200)
+        self.assertEqual(sum(resposta.json()['status'].values()), 0)
+        self.assertEqual(sum(fila.situacao()['status'].values()), 1)
+
+    def test_versoes_sao_por_escritorio(self):
+        with tenancy.activate(self.escritorio_a.pk):
+            antes_a = versoes.atuais(Cliente)
+        with tenancy.activate(self.escritorio_b.pk):
+            antes_b = versoes.atuais(Cliente)
+            versoes.incrementar(Cliente)
+            self.assertNotEqual(versoes.atuais(Cliente), antes_b)
+        with tenancy.activate(self.escritorio_a.pk):
+            self.assertEqual(versoes.atuais(Cliente), antes_a)
+
+
+class ContadoresClienteTests(TestCase):
+    """Os contadores de Cliente acompanham as gravações e batem com o recálculo"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.escritorio = Escritorio.objects.create(nome='Escritório de contadores')
+        cls.dados = povoar_escritorio(cls.escritorio, 'contador')
+        with tenancy.activate(cls.escritorio.pk):
+            cls.outro = Cliente.objects.create(nome='Outro', cpf_cnpj='doc-outro', email='outro@exemplo.com', telefone='0')
+
+    def setUp(self):
+        self.enterContext(tenancy.activate(self.escritorio.pk))
+        self.cliente = self.dados['cliente']
+        self.receita = Receita.objects.get(pk=self.dados['receita'].pk)
+
+    def contadores(self, cliente):
+        return Cliente.objects.values(
+            'total_faturado', 'total_recebido', 'saldo_aberto', 'total_bruto', 'numero_processos',
+        ).get(pk=cliente.pk)
+
+    def test_receita_nova_soma_nos_contadores(self):
+        self.assertEqual(self.contadores(self.cliente), {
+            'total_faturado': Decimal('100.00'), 'total_recebido': Decimal('0.00'), 'saldo_aberto': Decimal('100.00'),
+            'total_bruto': Decimal('100.00'), 'numero_processos': 1,
+        })
+
+    def test_alteracao_aplica_a_diferenca(self):
+        self.receita.desconto = Decimal('10.00')
+        self.receita.valor_recebido = Decimal('40.00')
+        self.receita.save()
+        contadores = self.contadores(self.cliente)
+        self.assertEqual(contadores['total_faturado'], Decimal('90.00'))
+        self.assertEqual(contadores['total_bruto'], Decimal('100.00'))
+        self.assertEqual(contadores['total_recebido'], Decimal('40.00'))
+        self.assertEqual(contadores['saldo_aberto'], Decimal('50.00'))
+
+        self.receita.valor_recebido = Decimal('90.00')
+        self.receita.pago = True
+        self.receita.save()
+        self.assertEqual(self.contadores(self.cliente)['saldo_aberto'], Decimal('0.00'))
+
+    def test_troca_de_cliente_move_os_valores(self):
+        self.receita.cliente = self.outro
+        self.receita.save()
+        self.assertEqual(self.contadores(self.cliente)['total_faturado'], Decimal('0.00'))
+        self.assertEqual(self.contadores(self.outro)['total_faturado'], Decimal('100.00'))
+        self.assertEqual(self.contadores(self.outro)['saldo_aberto'], Decimal('100.00'))
+
+    def test_exclusoes_descontam(self):
+        self.receita.delete()
+        self.dados['tarefa'].delete()
+        Processo.objects.get(pk=self.dados['processo'].pk).delete()
+        contadores = self.contadores(self.cliente)
+        self.assertEqual(contadores['total_bruto'], Decimal('0.00'))
+        self.assertEqual(contadores['saldo_aberto'], Decimal('0.00'))
+        self.assertEqual(contadores['numero_processos'], 0)
+
+    def test_recalculo_confere_com_o_incremental(self):
+        self.receita.desconto = Decimal('25.00')
+        self.receita.valor_recebido = Decimal('30.00')
+        self.receita.save()
+        incremental = self.contadores(self.cliente)
+        Cliente.objects.filter(pk=self.cliente.pk).update(total_faturado=0, total_bruto=0, saldo_aberto=0, numero_processos=0)
+        recalcular_clientes([self.cliente.pk])
+        self.assertEqual(self.contadores(self.cliente), incremental)
+
+    def test_ranking_de_clientes_usa_o_valor_bruto(self):
+        Receita.objects.create(
+            descricao='Com desconto', valor_total=Decimal('150.00'), desconto=Decimal('100.00'), cliente=self.outro,
+            tipo=self.receita.tipo, forma_pagamento=self.receita.forma_pagamento, condicao_pagamento='a_vista',
+            data_vencimento=timezone.localdate(),
+        )
+        ranking = painel.top_clientes(30, timezone.now())['top_clientes']
+        self.assertEqual([cliente.pk for cliente in ranking], [self.outro.pk, self.cliente.pk])
+
+
+class NumeroCNJTests(SimpleTestCase):
+    """Dígito verificador e decomposição dos números CNJ (dashboard.cnj)"""
+
+    VALIDO = '1234567-13.2019.5.02.0001'
+
+    def test_digito_segue_o_modulo_97(self):
+        self.assertEqual(cnj.calcular_digito('1234567', '2019', '5', '02', '0001'), '13')
+        self.assertEqual(cnj.calcular_digito('0000001', '2024', '8', '26', '0100'), '39')
+        # ISO 7064: o número completo, com o dígito no fim, deixa resto 1
+        for sequencial in ('0000000', '0710802', '9999999'):
+            digito = cnj.calcular_digito(sequencial, '2014', '8', '07', '0001')
+            self.assertEqual(int(f'{sequencial}20148070001{digito}') % 97, 1)
+
+    def test_interpretar_aceita_com_e_sem_mascara(self):
+        esperado = cnj.NumeroCNJ('1234567', '13', '2019', '5', '02', '0001')
+        self.assertEqual(cnj.interpretar(self.VALIDO), esperado)
+        self.assertEqual(cnj.interpretar('12345671320195020001'), esperado)
+        self.assertEqual(cnj.formatar('12345671320195020001'), self.VALIDO)
+
+    def test_rejeita_digito_errado_e_tamanho_errado(self):
+        self.assertFalse(cnj.validar('1234567-14.2019.5.02.0001'))
+        self.assertFalse(cnj.validar('1234567-13.2019.5.02.001'))
+        self.assertIsNone(cnj.formatar('processo 123'))
+        self.assertEqual(cnj.componentes('123'), dict.fromkeys(cnj.CAMPOS))
+
+    def test_encontrar_ignora_numeros_invalidos(self):
+        texto = 'Autos 1234567-14.2019.5.02.0001 e 1234567-13.2019.5.02.0001 apensados'
+        self.assertEqual(cnj.encontrar(texto), '12345671320195020001')
+        self.assertIsNone(cnj.encontrar('Autos 1234567-14.2019.5.02.0001'))
+
+
+class ProcessoCNJTests(TestCase):
+    """Processo grava os componentes do número e é encontrado em qualquer formatação"""
+
+    def test_componentes_e_busca(self):
+        escritorio = Escritorio.objects.create(nome='Escritório CNJ')
+        dados = povoar_escritorio(escritorio, 'cnj')
+        with tenancy.activate(escritorio.pk):
+            processo = dados['processo']
+            processo.numero = NumeroCNJTests.VALIDO
+            processo.save()
+            processo = Processo.objects.get(pk=processo.pk)
+            self.assertEqual(processo.numero_normalizado, '12345671320195020001')
+            self.assertEqual(
+                (processo.cnj_ano, processo.cnj_segmento, processo.cnj_tribunal, processo.cnj_origem), (2019, 5, 2, 1),
+            )
+            self.assertEqual(cnj.buscar_processo('12345671320195020001'), processo)
+            self.assertEqual(cnj.buscar_processo('1234567-13.2019.5.02.0001'), processo)
+
+
+class PrazosTests(TestCase):
+    """Prazos em dias úteis nos calendários pré-calculados (dashboard.prazos)"""
+
+    @classmethod
+    def setUpTestData(cls):
+        arquivos = {
+            'nacional.csv': 'data,descricao\n21/04,Tiradentes\n',
+            '8.26.csv': 'data,descricao\n09/07,Revolução Constitucionalista\n',
+            '8.26.0100.csv': 'data,descricao\n14/07/2025-15/07/2025,Suspensão de expediente\n',
+        }
+        with tempfile.TemporaryDirectory() as pasta:
+            for nome, conteudo in arquivos.items():
+                Path(pasta, nome).write_text(conteudo, encoding='utf-8')
+            prazos.gerar_calendarios(pasta, 2024, 2025)
+
+    def test_pascoa_e_feriados_moveis(self):
+        self.assertEqual(prazos.pascoa(2024), date(2024, 3, 31))
+        self.assertEqual(prazos.pascoa(2025), date(2025, 4, 20))
+        self.assertEqual(sorted(prazos.feriados_moveis(2025)), [
+            date(2025, 3, 3), date(2025, 3, 4), date(2025, 4, 18), date(2025, 6, 19),
+        ])
+
+    def test_contagem_exclui_o_dia_do_inicio(self):
+        # Sexta-feira: um dia útil termina na segunda
+        self.assertEqual(prazos.calcular_prazo(date(2025, 6, 6), 1), date(2025, 6, 9))
+        # Quinta-feira antes de Tiradentes (21/04, segunda) e da Sexta-feira Santa
+        self.assertEqual(prazos.calcular_prazo(date(2025, 4, 17), 2), date(2025, 4, 23))
+
+    def test_inicio_em_dia_nao_util_conta_do_proximo_util(self):
+        # Sábado antes do Carnaval: o início passa para a quarta de cinzas
+        self.assertEqual(prazos.calcular_prazo(date(2025, 3, 1), 1), date(2025, 3, 6))
+
+    def test_recesso_forense(self):
+        self.assertEqual(prazos.calcular_prazo(date(2024, 12, 19), 1), date(2025, 1, 21))
+
+    def test_calendario_soma_os_feriados_dos_codigos_que_o_contem(self):
+        inicio = date(2025, 7, 8)
+        self.assertEqual(prazos.calcular_prazo(inicio, 1), date(2025, 7, 9))
+        self.assertEqual(prazos.calcular_prazo(inicio, 1, '8.26'), date(2025, 7, 10))
+        self.assertEqual(prazos.calcular_prazo(inicio, 3, '8.26.0100'), date(2025, 7, 16))
+
+    def test_codigo_mais_especifico_disponivel(self):
+        self.assertEqual(prazos.codigo_calendario(8, 26, 100), '8.26.0100')
+        self.assertEqual(prazos.codigo_calendario(8, 26, 200), '8.26')
+        self.assertEqual(prazos.codigo_calendario(5, 2, 1), prazos.NACIONAL)
+
+    def test_calendario_em_memoria_confere_com_a_consulta(self):
+        for codigo in (prazos.NACIONAL, '8.26', '8.26.0100'):
+            calendario = prazos.Calendario(codigo)
+            for inicio in (date(2024, 2, 10), date(2025, 3, 1), date(2025, 7, 8), date(2024, 12, 19)):
+                for dias in (1, 5, 15):
+                    with self.subTest(codigo=codigo, inicio=inicio, dias=dias):
+                        self.assertEqual(calendario.somar(inicio, dias), prazos.calcular_prazo(inicio, dias, codigo))
+
+    def test_fora_do_calendario(self):
+        with self.assertRaises(prazos.ForaDoCalendario):
+            prazos.calcular_prazo(date(2023, 6, 1), 1)
+        with self.assertRaises(prazos.ForaDoCalendario):
+            prazos.Calendario().somar(date(2025, 12, 1), 30)
+
+    def test_calculo_em_lote_usa_o_calendario_do_processo(self):
+        escritorio = Escritorio.objects.create(nome='Escritório de prazos')
+        dados = povoar_escritorio(escritorio, 'prazos')
+        with tenancy.activate(escritorio.pk):
+            processo = dados['processo']
+            processo.numero = '0000001-39.2024.8.26.0100'
+            processo.save()
+        self.client.force_login(dados['advogado'])
+        resposta = self.client.post(reverse('dashboard:prazos_calcular'), {'itens': [
+            {'data': '2025-07-08', 'dias': 3, 'processo': processo.pk},
+            {'data': '2025-07-08', 'dias': 1, 'calendario': '8.26'},
+            {'data': '2025-07-08', 'dias': 1, 'calendario': '9.99'},
+        ]}, content_type='application/json')
+        self.assertEqual(
+            [(prazo['calendario'], prazo['final']) for prazo in resposta.json()['prazos']],
+            [('8.26.0100', '2025-07-16'), ('8.26', '2025-07-10'), ('nacional', '2025-07-09')],
+        )
+
+
+class Interrupcao(Exception):
+    pass
+
+
+class ExpurgoTests(TestCase):
+    """Expurgo em blocos: retomada depois de uma interrupção, arquivo e rota da exclusão de processos"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.escritorio = Escritorio.objects.create(nome='Escritório de expurgo')
+        cls.dados = povoar_escritorio(cls.escritorio, 'expurgo')
+        with tenancy.activate(cls.escritorio.pk):
+            receita = cls.dados['receita']
+            for numero in range(3):
+                Receita.objects.create(
+                    descricao=f'Parcela {numero}', valor_total=Decimal('50.00'), cliente=receita.cliente,
+                    processo=receita.processo, tipo=receita.tipo, forma_pagamento=receita.forma_pagamento,
+                    condicao_pagamento='a_vista', data_vencimento=receita.data_vencimento,
+                )
+
+    def setUp(self):
+        self.enterContext(tenancy.activate(self.escritorio.pk))
+        self.processo = Processo.objects.get(pk=self.dados['processo'].pk)
+
+    def restantes(self):
+        return (
+            Processo._base_manager.filter(pk=self.processo.pk).count(),
+            Receita._base_manager.filter(processo_id=self.processo.pk).count(),
+            Task._base_manager.filter(processo_id=self.processo.pk).count(),
+        )
+
+    def interromper_no_bloco(self, bloco):
+        def progresso(processados, total):
+            if processados >= bloco:
+                raise Interrupcao
+        return progresso
+
+    def test_retomada_continua_de_onde_parou(self):
+        self.assertEqual(expurgo.dependentes(self.processo), 5)
+        with self.assertRaises(Interrupcao):
+            expurgo.expurgar(self.processo, lote=1, progresso=self.interromper_no_bloco(2))
+        # Os blocos já confirmados ficam apagados e o resto continua lá
+        self.assertEqual(expurgo.dependentes(self.processo), 3)
+
+        resumo = expurgo.expurgar(Processo.objects.get(pk=self.processo.pk), lote=1)
+        self.assertEqual(resumo['excluidos'], 3)
+        self.assertEqual(self.restantes(), (0, 0, 0))
+        cliente = Cliente.objects.get(pk=self.dados['cliente'].pk)
+        self.assertEqual((cliente.numero_processos, cliente.total_bruto), (0, Decimal('0.00')))
+
+    def test_arquivo_retomado_restaura_sem_duplicar(self):
+        with tempfile.TemporaryDirectory() as raiz, self.settings(EXPURGO_ROOT=raiz):
+            with self.assertRaises(Interrupcao):
+                expurgo.expurgar(self.processo, arquivar=True, lote=2, progresso=self.interromper_no_bloco(2))
+            expurgo.expurgar(Processo.objects.get(pk=self.processo.pk), arquivar=True, lote=2)
+            self.assertEqual(self.restantes(), (0, 0, 0))
+
+            expurgo.restaurar(expurgo.diretorio(self.processo))
+        self.assertEqual(self.restantes(), (1, 4, 1))
+        cliente = Cliente.objects.get(pk=self.dados['cliente'].pk)
+        self.assertEqual((cliente.numero_processos, cliente.total_bruto), (1, Decimal('250.00')))
+
+    def test_exclusao_grande_vai_para_o_worker(self):
+        self.client.force_login(self.dados['advogado'])
+        url = reverse('dashboard:processo_delete', args=[self.processo.pk])
+        self.assertEqual(self.client.get(url).status_code, 200)
+        with mock.patch.object(expurgo, 'LOTE', 0):
+            self.client.post(url)
+        self.assertEqual(self.restantes(), (1, 4, 1))
+
+        job = Job.objects.get(nome='expurgo.executar')
+        self.assertEqual(job.escritorio_id, self.escritorio.pk)
+        self.assertEqual(fila.reservar('teste'), [job.pk])
+        self.assertTrue(fila.executar(job.pk, fechar_conexao=False))
+        self.assertEqual(self.restantes(), (0, 0, 0))
+
+    def test_exclusao_pequena_apaga_na_hora(self):
+        self.client.force_login(self.dados['advogado'])
+        resposta = self.client.post(reverse('dashboard:processo_delete', args=[self.processo.pk]))
+        self.assertRedirects(resposta, reverse('dashboard:processo_list'), fetch_redirect_response=False)
+        self.assertEqual(self.restantes(), (0, 0, 0))
+        self.assertFalse(Job.objects.exists())
+
+
+class ArquivoTests(TestCase):
+    """Ida e volta do arquivo frio, inclusive depois de mesclagens e expurgos"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.escritorio = Escritorio.objects.create(nome='Escritório de arquivo')
+        cls.dados = povoar_escritorio(cls.escritorio, 'arquivo')
+        with tenancy.activate(cls.escritorio.pk):
+            cls.estagiario = Lawyer.objects.create_user('estagiario-arquivo')
+            cls.destino = Cliente.objects.create(nome='Destino', cpf_cnpj='doc-destino', email='d@exemplo.com', telefone='0')
+            processo = cls.dados['processo']
+            Task.objects.create(
+                titulo='Tarefa do estagiário', advogado=cls.estagiario, processo=processo, cliente=processo.cliente,
+                data_inicio=timezone.now() - timedelta(days=900),
+            )
+            Task.objects.filter(processo=processo).update(status='concluida')
+            Processo.objects.filter(pk=processo.pk).update(
+                status='finalizado', data_fim=timezone.localdate() - timedelta(days=900),
+            )
+
+    def setUp(self):
+        self.enterContext(tenancy.activate(self.escritorio.pk))
+        self.processo = Processo.objects.get(pk=self.dados['processo'].pk)
+        self.tarefas = {tarefa.pk: tarefa.titulo for tarefa in Task.objects.filter(processo=self.processo)}
+
+    def reabrir(self):
+        return lote.alterar_status_processos([self.processo.pk], 'ativo', self.dados['advogado'])
+
+    def test_ida_e_volta(self):
+        resumo = arquivo.arquivar(dias=365)
+        self.assertEqual((resumo['processos'], resumo['dashboard.task']), (1, 2))
+        self.assertFalse(Task.objects.filter(processo=self.processo).exists())
+        self.assertIsNotNone(Processo.objects.get(pk=self.processo.pk).data_arquivamento)
+
+        # Leitura: detalhe e lista do processo continuam encontrando as tarefas
+        tarefa = arquivo.obter_ou_404(Task, self.dados['tarefa'].pk)
+        self.assertTrue(tarefa.arquivado)
+        self.assertEqual(tarefa.escritorio_id, self.escritorio.pk)
+        self.assertEqual({tarefa.pk for tarefa in arquivo.do_processo(self.processo, Task)}, set(self.tarefas))
+
+        self.reabrir()
+        self.assertEqual(dict(Task.objects.filter(processo=self.processo).values_list('pk', 'titulo')), self.tarefas)
+        self.assertFalse(RegistroArquivado.objects.exists())
+        self.assertIsNone(Processo.objects.get(pk=self.processo.pk).data_arquivamento)
+
+    def test_processo_com_tarefa_em_aberto_nao_e_arquivado(self):
+        Task.objects.filter(pk=self.dados['tarefa'].pk).update(status='pendente')
+        self.assertEqual(arquivo.arquivar(dias=365)['processos'], 0)
+
+    def test_reabrir_depois_de_mesclar_o_cliente(self):
+        arquivo.arquivar(dias=365)
+        deduplicacao.mesclar_clientes(self.destino, [Cliente.objects.get(pk=self.dados['cliente'].pk)])
+        self.assertEqual(arquivo.obter(Task, self.dados['tarefa'].pk).cliente_id, self.destino.pk)
+
+        self.reabrir()
+        self.assertEqual(set(Task.objects.filter(processo=self.processo).values_list('cliente_id', flat=True)), {self.destino.pk})
+
+    def test_reabrir_depois_de_expurgar_o_advogado(self):
+        arquivo.arquivar(dias=365)
+        expurgo.expurgar(self.estagiario)
+        # Como o CASCADE teria feito com a linha viva: a tarefa do advogado expurgado não volta
+        self.assertEqual([tarefa.titulo for tarefa in arquivo.do_processo(self.processo, Task)], ['Tarefa arquivo'])
+
+        self.reabrir()
+        self.assertEqual(list(Task.objects.filter(processo=self.processo).values_list('titulo', flat=True)), ['Tarefa arquivo'])
+
+
+def nova_publicacao(processo, conteudo, titulo='Intimação', **campos):
+    campos.setdefault('data_publicacao', timezone.localdate())
+    return Publicacao.objects.create(processo=processo, titulo=titulo, conteudo=conteudo, orgao='TJSP', **campos)
+
+
+class BuscaPublicacoesTests(TestCase):
+    """Busca de texto completo nas publicações (dashboard.busca), mantida pelos gatilhos do FTS5"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.escritorio = Escritorio.objects.create(nome='Escritório de publicações')
+        cls.dados = povoar_escritorio(cls.escritorio, 'publicacoes')
+
+    def setUp(self):
+        self.enterContext(tenancy.activate(self.escritorio.pk))
+        self.processo = self.dados['processo']
+
+    def buscar(self, termos):
+        return list(busca.filtrar(Publicacao.objects.all(), termos).values_list('pk', flat=True))
+
+    def test_publicacao_nova_entra_no_indice(self):
+        publicacao = nova_publicacao(self.processo, 'Prazo para apresentar a contestação')
+        self.assertEqual(self.buscar('contestacao'), [publicacao.pk])
+
+    def test_edicao_e_exclusao_atualizam_o_indice(self):
+        publicacao = nova_publicacao(self.processo, 'Designada audiência de conciliação')
+        publicacao.conteudo = 'Sentença de procedência'
+        publicacao.save()
+        self.assertEqual(self.buscar('conciliacao'), [])
+        self.assertEqual(self.buscar('sentenca'), [publicacao.pk])
+
+        publicacao.delete()
+        self.assertEqual(self.buscar('sentenca'), [])
+
+    def test_sintaxe_dos_termos(self):
+        embargos = nova_publicacao(self.processo, 'Embargos de declaração opostos pela ré')
+        recurso = nova_publicacao(self.processo, 'Recurso de apelação recebido no efeito devolutivo')
+        self.assertEqual(self.buscar('"embargos de declaracao"'), [embargos.pk])
+        self.assertEqual(self.buscar('"declaracao de embargos"'), [])
+        self.assertEqual(self.buscar('apela*'), [recurso.pk])
+        self.assertEqual(set(self.buscar('embargos OU apelacao')), {embargos.pk, recurso.pk})
+        self.assertEqual(self.buscar('-embargos'), [recurso.pk])
+        # Operadores e pontuação do usuário não chegam crus ao MATCH
+        self.assertEqual(self.buscar('embargos ( : ^'), [embargos.pk])
+
+    def test_trechos_destacam_os_termos(self):
+        publicacao = nova_publicacao(self.processo, 'Intime-se a parte <autora> para a contestação')
+        trecho = busca.trechos([publicacao.pk], 'contestacao')[publicacao.pk]
+        self.assertIn('<mark>contestação</mark>', trecho)
+        self.assertIn('&lt;autora&gt;', trecho)
+
+    def test_alertas_contam_so_as_publicacoes_novas_do_escritorio(self):
+        nova_publicacao(self.processo, 'Penhora online deferida')
+        alerta = AlertaPublicacao.objects.create(advogado=self.dados['advogado'], nome='Penhoras', termos='penhora')
+        self.assertEqual(busca.verificar_alertas(), {alerta.pk: 1})
+        # A mesma publicação não conta duas vezes
+        self.assertEqual(busca.verificar_alertas(), {})
+
+        outro = Escritorio.objects.create(nome='Outro escritório de publicações')
+        with tenancy.activate(outro.pk):
+            nova_publicacao(povoar_escritorio(outro, 'publicacoes-outro')['processo'], 'Penhora de veículo')
+        nova_publicacao(self.processo, 'Nova penhora no rosto dos autos')
+        self.assertEqual(busca.verificar_alertas(AlertaPublicacao.objects.all()), {alerta.pk: 1})
+        alerta.refresh_from_db()
+        self.assertEqual(alerta.total_ocorrencias, 2)
+        self.assertEqual(AtividadeRecente.objects.filter(tipo='alerta_publicacao').count(), 2)
+
+
+class TriagemPublicacoesTests(TestCase):
+    """Ações em lote da triagem de publicações, pela view"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.escritorio = Escritorio.objects.create(nome='Escritório de triagem')
+        cls.dados = povoar_escritorio(cls.escritorio, 'triagem')
+        with tenancy.activate(cls.escritorio.pk):
+            cls.responsavel = Lawyer.objects.create_user('responsavel-triagem')
+            cls.publicacoes = [
+                nova_publicacao(cls.dados['processo'], f'Publicação {numero}', data_publicacao=date(2025, 7, 8))
+                for numero in range(3)
+            ]
+
+    def setUp(self):
+        self.client.force_login(self.dados['advogado'])
+        self.ids = [publicacao.pk for publicacao in self.publicacoes]
+
+    def triar(self, **dados):
+        return self.client.post(
+            reverse('dashboard:publicacao_triagem'), {'ids': self.ids, **dados}, content_type='application/json',
+        ).json()
+
+    def test_marcar_lidas_e_nao_lidas(self):
+        self.assertEqual(self.triar(acao='marcar_lidas')['quantidade'], 3)
+        self.assertEqual(self.triar(acao='marcar_lidas')['quantidade'], 0)
+        self.assertEqual(self.triar(acao='marcar_nao_lidas')['quantidade'], 3)
+        self.assertFalse(Publicacao._base_manager.filter(pk__in=self.ids, lida=True).exists())
+
+    def test_atribuir(self):
+        self.assertEqual(self.triar(acao='atribuir', advogado=self.responsavel.pk)['quantidade'], 3)
+        self.assertEqual(
+            set(Publicacao._base_manager.filter(pk__in=self.ids).values_list('responsavel_id', flat=True)), {self.responsavel.pk},
+        )
+
+    def test_criar_tarefas_marca_as_publicacoes_como_lidas(self):
+        Publicacao._base_manager.filter(pk=self.ids[0]).update(responsavel=self.responsavel)
+        resposta = self.triar(acao='criar_tarefas', prioridade='alta')
+        self.assertEqual(resposta['quantidade'], 3)
+        tarefas = Task._base_manager.filter(titulo__startswith='Publicação: ')
+        self.assertEqual(
+            sorted(tarefas.values_list('advogado_id', flat=True)),
+            sorted([self.responsavel.pk, self.dados['advogado'].pk, self.dados['advogado'].pk]),
+        )
+        self.assertEqual(set(tarefas.values_list('escritorio_id', 'prioridade')), {(self.escritorio.pk, 'alta')})
+        self.assertFalse(Publicacao._base_manager.filter(pk__in=self.ids, lida=False).exists())
+
+    def test_criar_prazos_conta_dias_uteis(self):
+        with tempfile.TemporaryDirectory() as pasta:
+            prazos.gerar_calendarios(pasta, 2025, 2025)
+        resposta = self.triar(acao='criar_prazos', dias=5)
+        self.assertEqual(resposta['quantidade'], 3)
+        finais = Task._base_manager.filter(titulo__startswith='Prazo (5 dias úteis)').values_list('data_inicio', flat=True)
+        self.assertEqual({timezone.localtime(final).date() for final in finais}, {date(2025, 7, 15)})
+
+    def test_entrada_invalida(self):
+        self.assertEqual(self.client.post(
+            reverse('dashboard:publicacao_triagem'), {'acao': 'apagar', 'ids': self.ids}, content_type='application/json',
+        ).status_code, 400)
+        self.assertEqual(self.client.post(
+            reverse('dashboard:publicacao_triagem'), {'acao': 'criar_prazos', 'ids': self.ids, 'dias': 0},
+            content_type='application/json',
+        ).status_code, 400)
+
+
+class AreaClienteTests(TestCase):
+    """Login do portal do cliente e validação da sessão pela chave de acesso do extrato"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.escritorio = Escritorio.objects.create(nome='Escritório do portal')
+        cls.dados = povoar_escritorio(cls.escritorio, 'portal')
+        cls.cliente = cls.dados['cliente']
+        cls.cliente.area_cliente_ativa = True
+        cls.cliente.definir_senha_area_cliente('senha-portal')
+        cls.cliente.save()
+
+    def entrar(self, senha='senha-portal', documento=None):
+        return self.client.post(reverse('dashboard:area_cliente_login'), {
+            'cpf_cnpj': documento or self.cliente.cpf_cnpj, 'senha': senha,
+        })
+
+    def alterar_cliente(self, **campos):
+        cliente = Cliente._base_manager.get(pk=self.cliente.pk)
+        for campo, valor in campos.items():
+            setattr(cliente, campo, valor)
+        with self.captureOnCommitCallbacks(execute=True):
+            cliente.save()
+
+    def test_login_abre_o_extrato(self):
+        self.assertRedirects(self.entrar(), reverse('dashboard:area_cliente'), fetch_redirect_response=False)
+        self.assertEqual(self.client.session['area_cliente_id'], self.cliente.pk)
+        resposta = self.client.get(reverse('dashboard:area_cliente'))
+        self.assertEqual(resposta.status_code, 200)
+        self.assertContains(resposta, 'Receita portal')
+
+        self.client.post(reverse('dashboard:area_cliente_logout'))
+        self.assertNotIn('area_cliente_id', self.client.session)
+
+    def test_senha_errada_e_documento_desconhecido(self):
+        for resposta in (self.entrar('outra'), self.entrar(documento='000.000.000-00')):
+            self.assertEqual(resposta.status_code, 200)
+            self.assertEqual(resposta.context['erro'], 'CPF/CNPJ ou senha inválidos.')
+            self.assertNotIn('area_cliente_id', self.client.session)
+
+    def test_area_inativa_nao_entra(self):
+        self.alterar_cliente(area_cliente_ativa=False)
+        self.assertEqual(self.entrar().status_code, 200)
+        self.assertNotIn('area_cliente_id', self.client.session)
+
+    def test_troca_de_senha_encerra_a_sessao(self):
+        self.entrar()
+        cliente = Cliente._base_manager.get(pk=self.cliente.pk)
+        cliente.definir_senha_area_cliente('nova-senha')
+        self.alterar_cliente(senha_area_cliente=cliente.senha_area_cliente)
+        self.assertRedirects(
+            self.client.get(reverse('dashboard:area_cliente')), reverse('dashboard:area_cliente_login'),
+            fetch_redirect_response=False,
+        )
+        self.assertNotIn('area_cliente_id', self.client.session)
+        self.assertRedirects(self.entrar('nova-senha'), reverse('dashboard:area_cliente'), fetch_redirect_response=False)
+
+    def test_desativacao_encerra_a_sessao(self):
+        self.entrar()
+        self.alterar_cliente(area_cliente_ativa=False)
+        self.assertRedirects(
+            self.client.get(reverse('dashboard:area_cliente')), reverse('dashboard:area_cliente_login'),
+            fetch_redirect_response=False,
+        )
+        self.assertEqual(extratos.chave_acesso(False, self.cliente.senha_area_cliente), '')
+
+    def test_mesmo_documento_em_dois_escritorios(self):
+        outro = Escritorio.objects.create(nome='Outro escritório do portal')
+        with tenancy.activate(outro.pk):
+            homonimo = Cliente.objects.create(
+                nome='Cliente do outro escritório', cpf_cnpj=self.cliente.cpf_cnpj, area_cliente_ativa=True,
+            )
+            homonimo.definir_senha_area_cliente('senha-outro')
+            homonimo.save()
+
+        self.entrar('senha-outro')
+        self.assertEqual(self.client.session['area_cliente_id'], homonimo.pk)
+        self.assertContains(self.client.get(reverse('dashboard:area_cliente')), 'Cliente do outro escritório')
+
+        self.entrar()
+        self.assertEqual(self.client.session['area_cliente_id'], self.cliente.pk)
+        self.assertNotContains(self.client.get(reverse('dashboard:area_cliente')), 'Cliente do outro escritório')
+
+
+class RateioTests(TestCase):
+    """Rateio de honorários: validação do formset na criação da receita e relatório de comissões"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.escritorio = Escritorio.objects.create(nome='Escritório do rateio')
+        cls.dados = povoar_escritorio(cls.escritorio, 'rateio')
+        with tenancy.activate(cls.escritorio.pk):
+            cls.socio = Lawyer.objects.create_user('socio-rateio')
+
+    def setUp(self):
+        self.client.force_login(self.dados['advogado'])
+
+    def criar_receita(self, *participacoes):
+        receita = self.dados['receita']
+        dados = {
+            'descricao': 'Honorários com rateio', 'valor_total': '300.00', 'data_emissao': '2025-07-01',
+            'data_vencimento': '2025-07-10', 'tipo': receita.tipo_id, 'cliente': receita.cliente_id,
+            'forma_pagamento': receita.forma_pagamento_id, 'condicao_pagamento': 'a_vista', 'desconto': '0',
+            'rateio_ativo': 'on',
+            'rateio-TOTAL_FORMS': 3, 'rateio-INITIAL_FORMS': 0, 'rateio-MIN_NUM_FORMS': 0, 'rateio-MAX_NUM_FORMS': 1000,
+        }
+        for indice, (advogado, percentual) in enumerate(participacoes):
+            dados[f'rateio-{indice}-advogado'] = advogado.pk
+            dados[f'rateio-{indice}-percentual'] = percentual
+        return self.client.post(reverse('dashboard:receita_create'), dados, headers={'x-requested-with': 'XMLHttpRequest'}).json()
+
+    def test_percentuais_somando_exatamente_cem(self):
+        resposta = self.criar_receita((self.dados['advogado'], '33.33'), (self.socio, '66.67'))
+        self.assertTrue(resposta['success'])
+        self.assertEqual(
+            set(RateioParticipacao._base_manager.filter(receita_id=resposta['receita_id']).values_list('advogado_id', 'percentual')),
+            {(self.dados['advogado'].pk, Decimal('33.33')), (self.socio.pk, Decimal('66.67'))},
+        )
+
+    def test_percentuais_que_nao_somam_cem(self):
+        resposta = self.criar_receita((self.dados['advogado'], '33.33'), (self.socio, '66.66'))
+        self.assertFalse(resposta['success'])
+        self.assertEqual(resposta['errors']['rateio'], ['Os percentuais do rateio devem somar 100% (atual: 99.99%).'])
+        self.assertFalse(Receita._base_manager.filter(descricao='Honorários com rateio').exists())
+
+    def test_advogado_repetido(self):
+        resposta = self.criar_receita((self.socio, '50'), (self.socio, '50'))
+        self.assertFalse(resposta['success'])
+        self.assertEqual(len(resposta['errors']['rateio']), 1)
+        self.assertIn('advogado', resposta['errors']['rateio'][0])
+
+    def test_erros_de_cada_participacao(self):
+        # Erro de campo pelo nome do campo; a restrição de 0 a 100% pelo prefixo da linha
+        resposta = self.criar_receita((self.dados['advogado'], 'metade'), (self.socio, '150'))
+        self.assertFalse(resposta['success'])
+        self.assertIn('rateio-0-percentual', resposta['errors'])
+        self.assertIn('rateio-1', resposta['errors'])
+        self.assertNotIn('rateio', resposta['errors'])
+
+    def test_relatorio_de_comissoes_em_decimal(self):
+        with tenancy.activate(self.escritorio.pk):
+            receita = Receita.objects.create(
+                descricao='Êxito', valor_total=Decimal('101.00'), cliente=self.dados['cliente'],
+                advogado=self.dados['advogado'], tipo=self.dados['receita'].tipo,
+                forma_pagamento=self.dados['receita'].forma_pagamento, condicao_pagamento='a_vista',
+                data_vencimento=date(2025, 7, 10), data_recebimento=date(2025, 7, 12), valor_recebido=Decimal('101.00'),
+                pago=True, rateio_ativo=True,
+            )
+            RateioParticipacao.objects.create(receita=receita, advogado=self.dados['advogado'], percentual=Decimal('33'))
+            RateioParticipacao.objects.create(receita=receita, advogado=self.socio, percentual=Decimal('67'))
+            Receita.objects.create(
+                descricao='Consulta', valor_total=Decimal('50.00'), desconto=Decimal('0.10'), cliente=self.dados['cliente'],
+                advogado=self.socio, tipo=self.dados['receita'].tipo, forma_pagamento=self.dados['receita'].forma_pagamento,
+                condicao_pagamento='a_vista', data_vencimento=date(2025, 7, 20),
+            )
+            linhas = {
+                linha['advogado'].pk: (linha['faturado'], linha['recebido'], linha['receitas'])
+                for linha in relatorio_comissoes(date(2025, 7, 1), date(2025, 7, 31))
+            }
+        self.assertEqual(linhas, {
+            self.dados['advogado'].pk: (Decimal('33.33'), Decimal('33.33'), 1),
+            self.socio.pk: (Decimal('117.57'), Decimal('67.67'), 2),
+        })
+
+
+class MigracaoRateioTests(TransactionTestCase):
+    """As migrações 0012 a 0014 levam o rateio das colunas fixas para RateioParticipacao e voltam"""
+
+    antes = [('dashboard', '0012_rateioparticipacao')]
+    depois = [('dashboard', '0014_remove_receita_rateio_fixo')]
+
+    def migrar(self, alvo):
+        executor = MigrationExecutor(connection)
+        executor.migrate(alvo)
+        return executor.loader.project_state(alvo).apps
+
+    def tearDown(self):
+        executor = MigrationExecutor(connection)
+        executor.migrate(executor.loader.graph.leaf_nodes())
+
+    def test_ida_e_volta(self):
+        # O app users não volta junto com o dashboard: os advogados vêm do modelo atual
+        primeiro = Lawyer.objects.create_user('primeiro-migracao')
+        segundo = Lawyer.objects.create_user('segundo-migracao')
+        # As versões por escritório não cabem na unicidade por modelo de antes da 0035; são só cache
+        VersaoModelo._base_manager.all().delete()
+        apps = self.migrar(self.antes)
+        Receita = apps.get_model('dashboard', 'Receita')
+        cliente = apps.get_model('dashboard', 'Cliente').objects.create(
+            nome='Cliente da migração', cpf_cnpj='doc-migracao', email='migracao@exemplo.com', telefone='0000-0000',
+        )
+        campos = {
+            'cliente': cliente, 'valor_total': Decimal('100.00'), 'data_vencimento': date(2025, 7, 10),
+            'condicao_pagamento': 'a_vista',
+            'tipo': apps.get_model('dashboard', 'TipoReceita').objects.create(nome='Honorários'),
+            'forma_pagamento': apps.get_model('dashboard', 'FormaPagamento').objects.create(nome='PIX'),
+        }
+        # O mesmo advogado em duas colunas soma as participações
+        com_rateio = Receita.objects.create(
+            descricao='Com rateio', rateio_ativo=True, **campos,
+            rateio_advogado_1_id=primeiro.pk, rateio_percentual_1=Decimal('50.00'),
+            rateio_advogado_2_id=segundo.pk, rateio_percentual_2=Decimal('30.00'),
+            rateio_advogado_3_id=primeiro.pk, rateio_percentual_3=Decimal('20.00'),
+        )
+        Receita.objects.create(
+            descricao='Rateio desligado', rateio_ativo=False, rateio_advogado_1_id=segundo.pk,
+            rateio_percentual_1=Decimal('100.00'), **campos,
+        )
+
+        apps = self.migrar(self.depois)
+        self.assertEqual(
+            set(apps.get_model('dashboard', 'RateioParticipacao').objects.values_list('receita_id', 'advogado_id', 'percentual')),
+            {(com_rateio.pk, primeiro.pk, Decimal('70.00')), (com_rateio.pk, segundo.pk, Decimal('30.00'))},
+        )
+
+        apps = self.migrar(self.antes)
+        restaurada = apps.get_model('dashboard', 'Receita').objects.get(pk=com_rateio.pk)
+        self.assertEqual(
+            (restaurada.rateio_advogado_1_id, restaurada.rateio_percentual_1, restaurada.rateio_advogado_2_id,
+             restaurada.rateio_percentual_2, restaurada.rateio_advogado_3_id),
+            (primeiro.pk, Decimal('70.00'), segundo.pk, Decimal('30.00'), None),
+        )
+
+
+class AcoesLoteTests(TestCase):
+    """Cada ação em lote faz o que os sinais fariam: contadores, extratos, histórico, versões e uma atividade"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.escritorio = Escritorio.objects.create(nome='Escritório dos lotes')
+        cls.dados = povoar_escritorio(cls.escritorio, 'lote')
+        receita = cls.dados['receita']
+        with tenancy.activate(cls.escritorio.pk):
+            cls.parcial = Receita.objects.create(
+                descricao='Receita parcial', valor_total=Decimal('80.75'), desconto=Decimal('0.25'),
+                valor_recebido=Decimal('30.00'), parcial=True, cliente=receita.cliente, tipo=receita.tipo,
+                forma_pagamento=receita.forma_pagamento, condicao_pagamento='a_vista', data_vencimento=receita.data_vencimento,
+            )
+
+    def setUp(self):
+        self.enterContext(tenancy.activate(self.escritorio.pk))
+        self.cliente = self.dados['cliente']
+        self.antes = self.estado()
+
+    def estado(self):
+        return {
+            'atividades': AtividadeRecente.objects.count(),
+            'alteracoes': Alteracao.objects.filter(acao='alterado').count(),
+            'versoes': {nome: versao for nome, (versao, _) in versoes.atuais().items()},
+        }
+
+    def conferir(self, modelo, alteracoes):
+        """Uma atividade, a versão do modelo e das atividades incrementada e `alteracoes` entradas novas no histórico"""
+        depois = self.estado()
+        self.assertEqual(depois['atividades'], self.antes['atividades'] + 1)
+        self.assertEqual(depois['alteracoes'], self.antes['alteracoes'] + alteracoes)
+        for nome in (modelo._meta.label, 'dashboard.AtividadeRecente'):
+            self.assertEqual(depois['versoes'][nome], self.antes['versoes'].get(nome, 0) + 1)
+        return AtividadeRecente.objects.latest('pk')
+
+    def contadores(self):
+        return Cliente.objects.values(
+            'total_faturado', 'total_recebido', 'saldo_aberto', 'total_bruto', 'numero_processos', 'ativo',
+        ).get(pk=self.cliente.pk)
+
+    def extrato(self):
+        return extratos.ler(self.cliente.pk)[0]
+
+    def test_quitar_receitas(self):
+        ids = [self.dados['receita'].pk, self.parcial.pk]
+        with self.captureOnCommitCallbacks(execute=True):
+            quantidade, valor = lote.quitar_receitas(ids, self.dados['advogado'])
+        self.assertEqual((quantidade, str(valor)), (2, '150.50'))
+
+        atividade = self.conferir(Receita, alteracoes=2)
+        self.assertEqual(atividade.descricao, '2 receita(s) quitada(s) em lote: R$ 150.50')
+        self.assertEqual(atividade.cliente_id, self.cliente.pk)
+        self.assertEqual(
+            Alteracao.objects.get(modelo='dashboard.receita', objeto_id=self.parcial.pk, acao='alterado').campos['valor_recebido'],
+            ['30.00', '80.50'],
+        )
+        self.assertEqual(self.contadores(), {
+            'total_faturado': Decimal('180.50'), 'total_recebido': Decimal('180.50'), 'saldo_aberto': Decimal('0.00'),
+            'total_bruto': Decimal('180.75'), 'numero_processos': 1, 'ativo': True,
+        })
+        extrato = self.extrato()
+        self.assertEqual(extrato['receitas_abertas'], [])
+        self.assertEqual(
+            {chave: Decimal(valor) for chave, valor in extrato['totais'].items()},
+            {'faturado': Decimal('180.50'), 'recebido': Decimal('180.50'), 'em_aberto': Decimal('0.00')},
+        )
+
+        # Repetir não quita de novo nem registra outra atividade
+        self.assertEqual(lote.quitar_receitas(ids, self.dados['advogado']), (0, Decimal('0.00')))
+        self.assertEqual(AtividadeRecente.objects.count(), self.antes['atividades'] + 1)
+
+    def test_alterar_status_processos(self):
+        processo = self.dados['processo']
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(lote.alterar_status_processos([processo.pk], 'finalizado', self.dados['advogado']), 1)
+
+        atividade = self.conferir(Processo, alteracoes=1)
+        self.assertEqual((atividade.processo_id, atividade.cliente_id), (processo.pk, self.cliente.pk))
+        campos = Alteracao.objects.get(modelo='dashboard.processo', objeto_id=processo.pk, acao='alterado').campos
+        self.assertEqual(campos['status'], ['ativo', 'finalizado'])
+        self.assertEqual(Processo.objects.get(pk=processo.pk).data_fim, timezone.localdate())
+        self.assertEqual(self.contadores()['numero_processos'], 1)
+        self.assertEqual([item['status'] for item in self.extrato()['processos']], ['Finalizado'])
+
+    def test_alterar_status_tarefas(self):
+        contadores = self.contadores()
+        tarefa = self.dados['tarefa']
+        self.assertEqual(lote.alterar_status_tarefas([tarefa.pk], 'concluida', self.dados['advogado']), 1)
+
+        # Tarefas não entram no histórico nem nos contadores do cliente
+        atividade = self.conferir(Task, alteracoes=0)
+        self.assertEqual(atividade.task_id, tarefa.pk)
+        self.assertEqual(Task.objects.get(pk=tarefa.pk).status, 'concluida')
+        self.assertEqual(self.contadores(), contadores)
+        self.assertEqual(lote.alterar_status_tarefas([tarefa.pk], 'concluida', self.dados['advogado']), 0)
+
+    def test_desativar_clientes(self):
+        contadores = self.contadores()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(lote.desativar_clientes([self.cliente.pk], self.dados['advogado']), 1)
+
+        atividade = self.conferir(Cliente, alteracoes=1)
+        self.assertEqual(atividade.cliente_id, self.cliente.pk)
+        self.assertEqual(
+            Alteracao.objects.get(modelo='dashboard.cliente', objeto_id=self.cliente.pk, acao='alterado').campos,
+            {'ativo': [True, False]},
+        )
+        self.assertEqual(self.contadores(), {**contadores, 'ativo': False})
+        self.assertEqual(self.extrato()['totais']['em_aberto'], '150.50')
+
+
+class ImportacaoPublicacoesTests(TestCase):
+    """Importação de arquivos de publicações (dashboard.publicacoes e o comando importar_publicacoes)"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.escritorio = Escritorio.objects.create(nome='Escritório da importação')
+        cls.dados = povoar_escritorio(cls.escritorio, 'importacao')
+        with tenancy.activate(cls.escritorio.pk):
+            cls.processo = Processo.objects.create(
+                numero=NumeroCNJTests.VALIDO, cliente=cls.dados['cliente'], advogado_responsavel=cls.dados['advogado'],
+                titulo='Processo CNJ', descricao='-', data_inicio=timezone.localdate(), status='suspenso',
+            )
+
+    def registro(self, **campos):
+        return {'data_publicacao': '2025-07-08', 'orgao': 'TJSP', 'conteudo': 'Intime-se a parte.', **campos}
+
+    def importar(self, registros):
+        return publicacoes.ImportadorPublicacoes().importar(registros)
+
+    def test_duplicadas_pelo_hash(self):
+        registro = self.registro(numero_processo=NumeroCNJTests.VALIDO)
+        resumo = self.importar([registro, {**registro, 'conteudo': '  Intime-se   a parte. '}])
+        self.assertEqual((resumo['importadas'], resumo['duplicadas']), (1, 1))
+        self.assertEqual(resumo['por_advogado'], {self.dados['advogado'].pk: 1})
+        # Reimportar o mesmo arquivo não grava de novo
+        resumo = self.importar([registro])
+        self.assertEqual((resumo['importadas'], resumo['duplicadas']), (0, 1))
+        self.assertEqual(Publicacao._base_manager.get().processo_id, self.processo.pk)
+
+    def test_numero_citado_no_conteudo(self):
+        resumo = self.importar([self.registro(conteudo=f'Autos {NumeroCNJTests.VALIDO}: manifeste-se.')])
+        self.assertEqual(resumo['importadas'], 1)
+        self.assertEqual(Publicacao._base_manager.get().processo_id, self.processo.pk)
+
+    def test_casamento_pelo_nome_das_partes(self):
+        # O cliente tem um único processo ativo (o outro está suspenso)
+        resumo = self.importar([self.registro(partes='Fulano de Tal x CLIENTE IMPORTAÇÃO')])
+        self.assertEqual(resumo['importadas'], 1)
+        self.assertEqual(Publicacao._base_manager.get().processo_id, self.dados['processo'].pk)
+
+        # Com dois processos ativos o nome é ambíguo e a publicação fica pendente
+        Processo._base_manager.filter(pk=self.processo.pk).update(status='ativo')
+        pendentes = StringIO()
+        resumo = publicacoes.ImportadorPublicacoes().importar(
+            [self.registro(conteudo='Outra intimação.', partes=['Cliente importacao'])], pendentes,
+        )
+        self.assertEqual((resumo['importadas'], resumo['sem_processo']), (0, 1))
+        self.assertEqual(json.loads(pendentes.getvalue())['partes'], ['Cliente importacao'])
+
+    def test_registros_malformados_contam_como_invalidos(self):
+        valido = self.registro(numero_processo=NumeroCNJTests.VALIDO)
+        resumo = self.importar([
+            1, 'texto solto', None, ['lista'],
+            self.registro(conteudo=5), self.registro(data_publicacao=20250708), self.registro(conteudo=''),
+            {**valido, 'titulo': 7, 'orgao': ['TJSP'], 'tipo': {'nome': 'Intimação'}, 'partes': [1, None]},
+        ])
+        self.assertEqual((resumo['lidas'], resumo['invalidas'], resumo['importadas']), (8, 7, 1))
+        publicacao = Publicacao._base_manager.get()
+        self.assertEqual((publicacao.titulo, publicacao.orgao, publicacao.tipo), ('Publicação', '', None))
+
+    def test_comando_separa_os_arquivos_com_erro(self):
+        valido = self.registro(numero_processo=NumeroCNJTests.VALIDO)
+        with tempfile.TemporaryDirectory() as nome:
+            pasta = Path(nome)
+            (pasta / 'misto.jsonl').write_text('[1, 2]\n"texto"\n' + json.dumps(valido) + '\n', encoding='utf-8')
+            (pasta / 'lista.json').write_text('[1, "dois", null]', encoding='utf-8')
+            (pasta / 'quebrado.json').write_text('[{"conteudo": "sem fim"', encoding='utf-8')
+            saida, erros = StringIO(), StringIO()
+            call_command('importar_publicacoes', str(pasta), stdout=saida, stderr=erros)
+
+            self.assertEqual(sorted(caminho.name for caminho in (pasta / 'processados').iterdir()), ['lista.json', 'misto.jsonl'])
+            self.assertEqual([caminho.name for caminho in (pasta / 'erros').iterdir()], ['quebrado.json'])
+        self.assertIn('misto.jsonl: 3 lidas, 1 importadas', saida.getvalue())
+        self.assertIn('lista.json: 3 lidas, 0 importadas, 0 duplicadas, 0 sem processo, 3 inválidas', saida.getvalue())
+        self.assertIn('quebrado.json', erros.getvalue())
+        self.assertEqual(Publicacao._base_manager.count(), 1)
+
+
+class FluxoCaixaTests(TestCase):
+    """Saldos das receitas em aberto distribuídos pelos vencimentos na projeção do fluxo de caixa"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.escritorio = Escritorio.objects.create(nome='Escritório do fluxo de caixa')
+        cls.dados = povoar_escritorio(cls.escritorio, 'fluxo')
+
+    def setUp(self):
+        self.enterContext(tenancy.activate(self.escritorio.pk))
+        self.hoje = timezone.localdate()
+
+    def parcelada(self, valor_recebido=None):
+        receita = self.dados['receita']
+        return Receita.objects.create(
+            descricao='Parcelada', valor_total=Decimal('300.00'), valor_recebido=valor_recebido, cliente=receita.cliente,
+            tipo=receita.tipo, forma_pagamento=receita.forma_pagamento, condicao_pagamento='parcelado',
+            numero_parcelas=3, data_vencimento=self.hoje + timedelta(days=5),
+        )
+
+    def receitas(self):
+        # A receita à vista de povoar_escritorio vence em dez dias
+        clientes, dias, valores = fluxo_caixa.carregar_receitas(self.hoje)
+        return sorted(zip(dias, valores))
+
+    def test_parcelas_em_aberto(self):
+        self.parcelada()
+        self.assertEqual(self.receitas(), [(5, 100.0), (10, 100.0), (35, 100.0), (65, 100.0)])
+
+    def test_parcialmente_paga_comeca_na_primeira_parcela_em_aberto(self):
+        self.parcelada(valor_recebido=Decimal('150.00'))
+        self.assertEqual(self.receitas(), [(10, 100.0), (35, 50.0), (65, 100.0)])
+
+    def test_parcelas_pagas_inteiras(self):
+        self.parcelada(valor_recebido=Decimal('200.00'))
+        self.assertEqual(self.receitas(), [(10, 100.0), (65, 100.0)])
+
+
+class HistoricoTests(TestCase):
+    """Histórico de alterações (dashboard.historico) gravado pelos sinais de clientes, processos e receitas"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.escritorio = Escritorio.objects.create(nome='Escritório do histórico')
+        cls.outro = Escritorio.objects.create(nome='Outro escritório do histórico')
+        cls.dados = povoar_escritorio(cls.escritorio, 'historico')
+        cls.outros = povoar_escritorio(cls.outro, 'historico-outro')
+
+    def setUp(self):
+        self.enterContext(tenancy.activate(self.escritorio.pk))
+
+    def alteracoes(self, objeto, acao='alterado'):
+        return list(historico.consulta(type(objeto), objeto.pk).filter(acao=acao).values_list('campos', flat=True))
+
+    def test_update_fields_registra_so_os_campos_gravados(self):
+        cliente = Cliente.objects.get(pk=self.dados['cliente'].pk)
+        cliente.nome = 'Cliente renomeado'
+        cliente.email = 'novo@exemplo.com'
+        cliente.save(update_fields=['nome'])
+        self.assertEqual(self.alteracoes(cliente), [{'nome': ['Cliente historico', 'Cliente renomeado']}])
+
+        # O e-mail não foi gravado: continua pendente para a próxima gravação completa
+        cliente.save()
+        self.assertEqual(self.alteracoes(cliente)[0], {'email': ['historico@exemplo.com', 'novo@exemplo.com']})
+
+    def test_senha_da_area_do_cliente_fica_oculta(self):
+        cliente = Cliente.objects.get(pk=self.dados['cliente'].pk)
+        cliente.definir_senha_area_cliente('primeira')
+        cliente.save()
+        cliente.definir_senha_area_cliente('segunda')
+        cliente.save(update_fields=['senha_area_cliente'])
+        self.assertEqual(self.alteracoes(cliente), [
+            {'senha_area_cliente': ['***', '***']}, {'senha_area_cliente': [None, '***']},
+        ])
+        cliente_id = cliente.pk
+        cliente.delete()
+        entrada = Alteracao.objects.get(modelo='dashboard.cliente', objeto_id=cliente_id, acao='excluido')
+        self.assertEqual(entrada.campos['senha_area_cliente'], ['***', None])
+
+    def test_exclusao_guarda_os_valores_e_o_escritorio(self):
+        receita_id = self.dados['receita'].pk
+        Receita.objects.get(pk=receita_id).delete()
+        entrada = Alteracao.objects.get(modelo='dashboard.receita', objeto_id=receita_id, acao='excluido')
+        self.assertEqual(entrada.escritorio_id, self.escritorio.pk)
+        self.assertEqual(entrada.campos['descricao'], ['Receita historico', None])
+        self.assertEqual(entrada.campos['valor_total'], ['100.00', None])
+        self.assertNotIn('observacoes', entrada.campos)
+
+    def test_consulta_so_do_escritorio_ativo(self):
+        receita = self.outros['receita']
+        with tenancy.activate(self.outro.pk):
+            receita = Receita.objects.get(pk=receita.pk)
+            receita.descricao = 'Alterada no outro escritório'
+            receita.save()
+        self.assertEqual(list(historico.consulta(Receita, receita.pk)), [])
+        with tenancy.activate(self.outro.pk):
+            self.assertEqual([entrada.acao for entrada in historico.consulta(Receita, receita.pk)], ['alterado', 'criado'])
+        # Sem escritório ativo (administradores) vê todos
+        with tenancy.activate(None):
+            self.assertEqual(historico.consulta(Receita, receita.pk).count(), 2)
+
+    def test_limpar_apaga_so_o_que_passou_da_retencao(self):
+        # A criação dos clientes dos dois escritórios fica fora da retenção, em blocos de uma entrada
+        Alteracao._base_manager.filter(modelo='dashboard.cliente').update(data=timezone.now() - timedelta(days=31))
+        restantes = Alteracao._base_manager.exclude(modelo='dashboard.cliente').count()
+        with mock.patch.object(historico, 'BLOCO', 1), tenancy.activate(None):
+            self.assertEqual(historico.limpar(dias=30), 2)
+        self.assertFalse(Alteracao._base_manager.filter(modelo='dashboard.cliente').exists())
+        self.assertEqual(Alteracao._base_manager.count(), restantes)
+
+
+class FilaJobsTests(TestCase):
+    """Reserva, falhas, recuperação e agendamento dos jobs (dashboard.fila)"""
+
+    def setUp(self):
+        self.enterContext(mock.patch.dict(fila.REGISTRO))
+        self.enterContext(mock.patch.object(fila.random, 'uniform', return_value=1.0))
+
+    def novo(self, **campos):
+        return Job.objects.create(nome='teste.job', **campos)
+
+    def test_dois_workers_nao_reservam_o_mesmo_job(self):
+        urgente, primeiro, segundo = self.novo(prioridade=5), self.novo(), self.novo()
+        self.novo(executar_em=timezone.now() + timedelta(hours=1))
+        uuid4 = fila.uuid.uuid4
+        do_outro = []
+
+        def outro_worker_antes_do_update():
+            # O worker "a" reserva entre o início da chamada do worker "b" e o UPDATE dela
+            reserva.side_effect = uuid4
+            do_outro.extend(fila.reservar('a', 2))
+            return uuid4()
+
+        with mock.patch.object(fila.uuid, 'uuid4', side_effect=outro_worker_antes_do_update) as reserva:
+            deste = fila.reservar('b', 2)
+
+        self.assertEqual(do_outro, [urgente.pk, primeiro.pk])
+        self.assertEqual(deste, [segundo.pk])
+        self.assertEqual(fila.reservar('c', 10), [])
+        self.assertEqual(
+            dict(Job.objects.filter(status='executando').values_list('pk', 'worker')),
+            {urgente.pk: 'a', primeiro.pk: 'a', segundo.pk: 'b'},
+        )
+        self.assertEqual(set(Job.objects.filter(status='executando').values_list('tentativas', flat=True)), {1})
+
+    def test_falha_reagenda_com_espera_exponencial(self):
+        def falha():
+            raise RuntimeError('indisponível')
+
+        fila.REGISTRO['teste.job'] = falha
+        job = self.novo(max_tentativas=3)
+        for tentativa, segundos in ((1, 30), (2, 60)):
+            Job.objects.filter(pk=job.pk).update(executar_em=timezone.now())
+            self.assertEqual(fila.reservar('teste'), [job.pk])
+            antes = timezone.now()
+            self.assertFalse(fila.executar(job.pk, fechar_conexao=False))
+            job.refresh_from_db()
+            self.assertEqual((job.status, job.tentativas, job.lote), ('fila', tentativa, None))
+            self.assertIn('indisponível', job.ultimo_erro)
+            self.assertAlmostEqual((job.executar_em - antes).total_seconds(), segundos, delta=1)
+
+        Job.objects.filter(pk=job.pk).update(executar_em=timezone.now())
+        fila.reservar('teste')
+        fila.executar(job.pk, fechar_conexao=False)
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.tentativas), ('falhou', 3))
+        self.assertEqual(fila.espera(20), timedelta(seconds=fila.ESPERA_MAXIMA))
+
+    def test_recuperar_travados(self):
+        antigo = timezone.now() - timedelta(seconds=fila.TEMPO_LIMITE + 60)
+        travado = self.novo(status='executando', iniciado_em=antigo, tentativas=1, lote='x', worker='morto')
+        esgotado = self.novo(status='executando', iniciado_em=antigo, tentativas=3, lote='y', worker='morto')
+        recente = self.novo(status='executando', iniciado_em=timezone.now(), tentativas=1, lote='z', worker='vivo')
+
+        self.assertEqual(fila.recuperar_travados(), 2)
+        situacao = dict(Job.objects.values_list('pk', 'status'))
+        self.assertEqual(
+            [situacao[travado.pk], situacao[esgotado.pk], situacao[recente.pk]], ['fila', 'falhou', 'executando'],
+        )
+        self.assertIsNone(Job.objects.get(pk=travado.pk).lote)
+
+    def test_agendar_periodicos(self):
+        self.assertIn('historico.limpar', fila.PERIODICOS)
+        self.assertEqual(fila.agendar_periodicos(), len(fila.PERIODICOS))
+        # Com uma execução ativa de cada, não cria outras
+        self.assertEqual(fila.agendar_periodicos(), 0)
+
+        concluido_em = timezone.now() - timedelta(hours=2)
+        Job.objects.filter(chave='periodico:historico.limpar').update(status='concluido', concluido_em=concluido_em)
+        self.assertEqual(fila.agendar_periodicos(), 1)
+        proxima = Job.objects.get(chave='periodico:historico.limpar', status='fila')
+        self.assertEqual(proxima.executar_em, concluido_em + fila.PERIODICOS['historico.limpar'])
+        self.assertIsNone(proxima.escritorio_id)
+
+
+class VersoesTests(TestCase):
+    """ETag e 304 dos endpoints JSON por escritório e por usuário (dashboard.versoes)"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.escritorio_a = Escritorio.objects.create(nome='Escritório das versões A')
+        cls.escritorio_b = Escritorio.objects.create(nome='Escritório das versões B')
+        cls.a = povoar_escritorio(cls.escritorio_a, 'versoes-a')
+        cls.b = povoar_escritorio(cls.escritorio_b, 'versoes-b')
+        with tenancy.activate(cls.escritorio_a.pk):
+            cls.colega = Lawyer.objects.create_user('colega-versoes')
+
+    def setUp(self):
+        cache.clear()
+        self.url = reverse('dashboard:get_payment_options')
+
+    def get(self, advogado, etag=None):
+        self.client.force_login(advogado)
+        return self.client.get(self.url, headers={'if-none-match': etag} if etag else {})
+
+    def versao(self, escritorio_id, modelo):
+        with tenancy.activate(escritorio_id):
+            return versoes.atuais(modelo).get(versoes.rotulo(modelo), (0, None))[0]
+
+    def test_304_so_para_o_mesmo_usuario(self):
+        etag = self.get(self.a['advogado'])['ETag']
+        resposta = self.get(self.a['advogado'], etag)
+        self.assertEqual(resposta.status_code, 304)
+        self.assertEqual(resposta['ETag'], etag)
+
+        for advogado in (self.colega, self.b['advogado']):
+            resposta = self.get(advogado, etag)
+            self.assertEqual(resposta.status_code, 200)
+            self.assertNotEqual(resposta['ETag'], etag)
+
+    def test_gravacao_invalida_so_o_proprio_escritorio(self):
+        etag_a = self.get(self.a['advogado'])['ETag']
+        etag_b = self.get(self.b['advogado'])['ETag']
+        with tenancy.activate(self.escritorio_b.pk):
+            FormaPagamento.objects.create(nome='Boleto do B')
+
+        self.assertEqual(self.get(self.a['advogado'], etag_a).status_code, 304)
+        resposta = self.get(self.b['advogado'], etag_b)
+        self.assertEqual(resposta.status_code, 200)
+        self.assertIn('Boleto do B', [forma['nome'] for forma in resposta.json()['formas_pagamento']])
+
+    def test_incrementar(self):
+        antes = {escritorio: self.versao(escritorio, Receita) for escritorio in (None, self.escritorio_a.pk, self.escritorio_b.pk)}
+        with tenancy.activate(self.escritorio_a.pk):
+            versoes.incrementar(Receita)
+        self.assertEqual(self.versao(None, Receita), antes[None] + 1)
+        self.assertEqual(self.versao(self.escritorio_a.pk, Receita), antes[self.escritorio_a.pk] + 1)
+        self.assertEqual(self.versao(self.escritorio_b.pk, Receita), antes[self.escritorio_b.pk])
+
+        # Sem escritório ativo (comandos e jobs), muda a versão de todos
+        versoes.incrementar(Receita)
+        self.assertEqual(self.versao(self.escritorio_b.pk, Receita), antes[self.escritorio_b.pk] + 1)
+
+        # A primeira gravação de um modelo cria as linhas com a versão 1
+        with tenancy.activate(self.escritorio_a.pk):
+            versoes.incrementar('dashboard.ModeloNovo')
+        self.assertEqual(self.versao(self.escritorio_a.pk, 'dashboard.ModeloNovo'), 1)
+        self.assertEqual(self.versao(self.escritorio_b.pk, 'dashboard.ModeloNovo'), 0)
+
+
+class AgingTests(TestCase):
+    """Relatório de aging das receitas em aberto: faixas, detalhamento e CSV"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.escritorio = Escritorio.objects.create(nome='Escritório do aging')
+        cls.dados = povoar_escritorio(cls.escritorio, 'aging')
+        cls.hoje = timezone.localdate()
+        with tenancy.activate(cls.escritorio.pk):
+            for descricao, dias, valor, campos in (
+                ('Vencida ontem', 1, '10.00', {}),
+                ('Vencida há 30 dias', 30, '20.00', {'valor_recebido': Decimal('5.00')}),
+                ('Vencida há 31 dias', 31, '40.00', {'desconto': Decimal('10.00')}),
+                ('Vencida há 61 dias', 61, '80.00', {}),
+                ('Vencida há 91 dias', 91, '160.00', {'advogado': None}),
+                ('Já paga', 45, '999.00', {'pago': True}),
+                ('Recebida por inteiro', 45, '50.00', {'valor_recebido': Decimal('50.00')}),
+            ):
+                cls.receita(descricao, cls.hoje - timedelta(days=dias), Decimal(valor), **campos)
+
+    @classmethod
+    def receita(cls, descricao, vencimento, valor, **campos):
+        modelo = cls.dados['receita']
+        campos = {'advogado': cls.dados['advogado'], **campos}
+        return Receita.objects.create(
+            descricao=descricao, valor_total=valor, data_vencimento=vencimento, cliente=modelo.cliente, tipo=modelo.tipo,
+            forma_pagamento=modelo.forma_pagamento, condicao_pagamento='a_vista', **campos,
+        )
+
+    def setUp(self):
+        self.client.force_login(self.dados['advogado'])
+
+    def relatorio(self, agrupar_por):
+        with tenancy.activate(self.escritorio.pk):
+            return aging.relatorio_aging(agrupar_por, self.hoje)
+
+    def test_saldos_por_faixa(self):
+        [linha] = self.relatorio('cliente')
+        self.assertEqual((linha['id'], linha['nome']), (self.dados['cliente'].pk, 'Cliente aging'))
+        self.assertEqual(linha['faixas'], [
+            ('a_vencer', Decimal('100.00')), ('dias_1_30', Decimal('25.00')), ('dias_31_60', Decimal('30.00')),
+            ('dias_61_90', Decimal('80.00')), ('dias_90_mais', Decimal('160.00')),
+        ])
+        self.assertEqual(linha['total'], Decimal('395.00'))
+
+        por_advogado = {linha['nome']: linha['total'] for linha in self.relatorio('advogado')}
+        self.assertEqual(por_advogado, {'-': Decimal('160.00'), 'advogado-aging': Decimal('235.00')})
+
+    def detalhe(self, agrupar_por='cliente', **parametros):
+        return self.client.get(reverse('dashboard:relatorio_aging_detalhe', args=[agrupar_por]), parametros)
+
+    def test_detalhamento(self):
+        resposta = self.detalhe(id=self.dados['cliente'].pk, faixa='dias_1_30')
+        self.assertEqual(
+            [receita.descricao for receita in resposta.context['page_obj']], ['Vencida há 30 dias', 'Vencida ontem'],
+        )
+        self.assertEqual(resposta.context['faixa_rotulo'], '1-30 dias')
+
+        # Sem id: a linha dos sem advogado; faixa desconhecida: todas as faixas
+        resposta = self.detalhe('advogado', faixa='qualquer')
+        self.assertEqual([receita.descricao for receita in resposta.context['page_obj']], ['Vencida há 91 dias'])
+
+        self.assertEqual(self.detalhe(id='abc').status_code, 404)
+        self.assertRedirects(self.detalhe('banco'), reverse('dashboard:relatorio_aging'), fetch_redirect_response=False)
+
+    def test_csv(self):
+        resposta = self.client.get(reverse('dashboard:relatorio_aging'), {'agrupar': 'tipo', 'formato': 'csv'})
+        self.assertEqual(resposta['Content-Disposition'], 'attachment; filename="aging_tipo.csv"')
+        linhas = list(csv.reader(resposta.content.decode().splitlines(), delimiter=';'))
+        self.assertEqual(linhas, [
+            ['Tipo', 'A vencer', '1-30 dias', '31-60 dias', '61-90 dias', '+90 dias', 'Total'],
+            ['Honorários aging', '100.00', '25.00', '30.00', '80.00', '160.00', '395.00'],
+        ])
+
+        resposta = self.detalhe(id=self.dados['cliente'].pk, faixa='dias_31_60', formato='csv')
+        linhas = list(csv.reader(resposta.content.decode().splitlines(), delimiter=';'))
+        self.assertEqual(linhas[1], [
+            'Vencida há 31 dias', 'Cliente aging', 'advogado-aging', 'Honorários aging',
+            (self.hoje - timedelta(days=31)).strftime('%d/%m/%Y'), '30.00',
+        ])
+        self.assertEqual(len(linhas), 2)
+
+
+class DeduplicacaoTests(TestCase):
+    """Chaves de bloqueio, detecção por escritório e mesclagem de clientes (dashboard.deduplicacao)"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.escritorio = Escritorio.objects.create(nome='Escritório da deduplicação')
+        cls.outro = Escritorio.objects.create(nome='Outro escritório da deduplicação')
+        cls.dados = povoar_escritorio(cls.escritorio, 'dedup')
+        with tenancy.activate(cls.escritorio.pk):
+            cls.destino = Cliente.objects.create(
+                nome='José da Silva', cpf_cnpj='123.456.789-09', email='jose@exemplo.com', telefone='(11) 9999-0000',
+                cidade='São Paulo',
+            )
+            cls.origem = Cliente.objects.create(
+                nome='Jose Silva', cpf_cnpj='12345678909 ', email='JOSE@exemplo.com', telefone='', cidade='sao paulo',
+                nome_mae='Maria da Silva',
+            )
+
+    def setUp(self):
+        self.enterContext(tenancy.activate(self.escritorio.pk))
+
+    def test_chaves_de_bloqueio(self):
+        self.assertEqual(deduplicacao.normalizar_documento('123.456.789-09'), '12345678909')
+        self.assertEqual(deduplicacao.normalizar_documento('111.111.111-11'), '')
+        self.assertEqual(deduplicacao.normalizar_documento('1234'), '')
+        self.assertEqual(deduplicacao.normalizar_email(' Jose@Exemplo.com '), 'jose@exemplo.com')
+        self.assertEqual(
+            deduplicacao.chave_nome('José da Silva', 'São Paulo'), deduplicacao.chave_nome('JOSE SILVA', 'sao paulo'),
+        )
+        self.assertEqual(deduplicacao.chave_nome('Philipe Souza', 'Recife'), deduplicacao.chave_nome('Filipe Sousa', 'Recife'))
+        self.assertNotEqual(deduplicacao.chave_nome('José Silva', 'São Paulo'), deduplicacao.chave_nome('José Silva', 'Santos'))
+
+        cadastros = [cadastro for cadastro in deduplicacao.carregar_cadastros() if cadastro[1] in (self.destino.pk, self.origem.pk)]
+        blocos = {chave for chave, indices in deduplicacao.gerar_blocos(cadastros).items() if len(indices) == 2}
+        self.assertEqual({tipo for tipo, _ in blocos}, {'documento', 'email', 'nome'})
+        pontuacao, motivos = deduplicacao.pontuar(*cadastros)
+        self.assertEqual(motivos, ['documento', 'email', 'nome'])
+        self.assertGreaterEqual(pontuacao, deduplicacao.LIMIAR)
+        # Documentos diferentes nunca são a mesma pessoa
+        outro = (*cadastros[1][:3], '98765432100', *cadastros[1][4:])
+        self.assertEqual(deduplicacao.pontuar(cadastros[0], outro), (0, []))
+
+    def test_deteccao_por_escritorio(self):
+        Client.objects.create(name='José Silva', cpf='123.456.789-09')
+        with tenancy.activate(self.outro.pk):
+            Cliente.objects.create(nome='José da Silva', cpf_cnpj='123.456.789-09', email='jose@exemplo.com', telefone='-')
+
+        with tenancy.activate(None):
+            deduplicacao.detectar_duplicidades()
+        pares = {
+            (par.origem_a, par.id_a, par.origem_b, par.id_b)
+            for par in DuplicidadeCliente._base_manager.all()
+        }
+        financeiro = Client.objects.get().pk
+        self.assertEqual(pares, {
+            ('cliente', self.destino.pk, 'cliente', self.origem.pk),
+            ('cliente', self.destino.pk, 'financeiro', financeiro),
+            ('cliente', self.origem.pk, 'financeiro', financeiro),
+        })
+
+    def test_mesclagem_reaponta_todas_as_relacoes(self):
+        modelo = self.dados['receita']
+        processo = Processo.objects.create(
+            numero='PROC-dedup-origem', cliente=self.origem, advogado_responsavel=self.dados['advogado'], titulo='Origem',
+            descricao='-', data_inicio=timezone.localdate(),
+        )
+        receita = Receita.objects.create(
+            descricao='Receita da origem', valor_total=Decimal('70.00'), cliente=self.origem, tipo=modelo.tipo,
+            forma_pagamento=modelo.forma_pagamento, condicao_pagamento='a_vista', data_vencimento=timezone.localdate(),
+        )
+        Task.objects.create(titulo='Tarefa da origem', advogado=self.dados['advogado'], cliente=self.origem, data_inicio=timezone.now())
+        AtividadeRecente.objects.create(
+            tipo='cliente_cadastrado', descricao='Origem', cliente=self.origem, usuario=self.dados['advogado'],
+        )
+        DocumentoGerado.objects.create(
+            modelo='recibo', objeto_id=receita.pk, assinatura='a' * 64, arquivo='recibo.pdf', cliente=self.origem, receita=receita,
+        )
+        with tenancy.activate(None):
+            deduplicacao.detectar_duplicidades()
+        origem_id = self.origem.pk
+
+        with self.captureOnCommitCallbacks(execute=True):
+            deduplicacao.mesclar_clientes(self.destino, [Cliente.objects.get(pk=origem_id)])
+
+        relacoes = [relacao for relacao in expurgo.dependencias(Cliente) if relacao.one_to_many]
+        self.assertIn(DocumentoGerado, [relacao.related_model for relacao in relacoes])
+        for relacao in relacoes:
+            with self.subTest(modelo=relacao.related_model.__name__):
+                linhas = relacao.related_model._base_manager
+                self.assertFalse(linhas.filter(**{f'{relacao.field.name}_id': origem_id}).exists())
+                self.assertTrue(linhas.filter(**{relacao.field.name: self.destino}).exists())
+
+        self.assertFalse(Cliente._base_manager.filter(pk=origem_id).exists())
+        destino = Cliente.objects.get(pk=self.destino.pk)
+        self.assertEqual((destino.nome_mae, destino.telefone), ('Maria da Silva', '(11) 9999-0000'))
+        self.assertEqual((destino.total_faturado, destino.numero_processos), (Decimal('70.00'), 1))
+        self.assertEqual(Processo.objects.get(pk=processo.pk).cliente_id, destino.pk)
+        self.assertEqual(Decimal(extratos.ler(destino.pk)[0]['totais']['faturado']), Decimal('70.00'))
+        self.assertEqual(
+            DuplicidadeCliente._base_manager.get(origem_a='cliente', id_a=destino.pk, origem_b='cliente', id_b=origem_id).status,
+            'mesclado',
+        )
+
+
+class PaginasEstaticasTests(TestCase):
+    """Dashboard e clientes sem JS/CSS embutido e o comando medir_paginas"""
+
+    ESTATICO = re.compile(r'(?:src|href)="/static/([^"?#]+)"')
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.escritorio = Escritorio.objects.create(nome='Escritório das páginas')
+        cls.dados = povoar_escritorio(cls.escritorio, 'paginas')
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.dados['advogado'])
+
+    def test_scripts_e_estilos_em_arquivos_estaticos(self):
+        paginas = {
+            'dashboard:home': {'dashboard/js/dashboard.js'},
+            'dashboard:clients': {'dashboard/js/clientes.js', 'dashboard/js/acoes_lote.js'},
+        }
+        for nome, bundles in paginas.items():
+            with self.subTest(pagina=nome):
+                html = self.client.get(reverse(nome)).content.decode()
+                self.assertNotIn('<style', html)
+                # Só sobram os blocos JSON com os dados que os scripts leem
+                for script in re.findall(r'<script(?![^>]*\ssrc=)([^>]*)>', html):
+                    self.assertIn('application/json', script)
+
+                estaticos = self.ESTATICO.findall(html)
+                self.assertLessEqual(bundles, set(estaticos))
+                for caminho in estaticos:
+                    arquivo = finders.find(caminho)
+                    self.assertIsNotNone(arquivo, caminho)
+                    conteudo = open(arquivo, encoding='utf-8').read()
+                    self.assertNotIn('{%', conteudo)
+                    self.assertNotIn('{{', conteudo)
+
+    def test_medir_paginas(self):
+        saida = StringIO()
+        call_command('medir_paginas', '--usuario', self.dados['advogado'].username, '--repeticoes', '1', stdout=saida)
+        saida = saida.getvalue()
+        for nome in ('dashboard:home', 'dashboard:clients'):
+            self.assertIn(f'{nome} ({reverse(nome)})', saida)
+        # Os widgets do dashboard são medidos um a um, com o cache vazio e preenchido
+        for nome in painel.WIDGETS:
+            self.assertIn(f'widget {nome} ', saida)
+        self.assertIn('primeira pintura', saida)
+        self.assertRegex(saida, r'HTML por requisição:\s+[1-9]\d* bytes')
+        self.assertRegex(saida, r'estáticos locais \([1-9]\d*\): +[1-9]\d* bytes')
+
+        with self.assertRaisesMessage(CommandError, 'Nenhum usuário ativo'):
+            call_command('medir_paginas', '--usuario', 'nao-existe', stdout=StringIO())
+
+
+class PainelWidgetsTests(TestCase):
+    """Cache e validadores dos widgets do dashboard por versão e por escritório (dashboard.painel)"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.escritorio_a = Escritorio.objects.create(nome='Escritório do painel A')
+        cls.escritorio_b = Escritorio.objects.create(nome='Escritório do painel B')
+        cls.a = povoar_escritorio(cls.escritorio_a, 'painel-a')
+        cls.b = povoar_escritorio(cls.escritorio_b, 'painel-b')
+
+    def setUp(self):
+        cache.clear()
+        self.widget = painel.WIDGETS['top_clientes']
+        self.agora = timezone.now()
+
+    def conteudo(self, escritorio, versoes_atuais=None):
+        with tenancy.activate(escritorio.pk):
+            if versoes_atuais is None:
+                versoes_atuais = versoes.atuais(*self.widget.modelos)
+            return self.widget.conteudo(30, self.agora, versoes_atuais)[0]
+
+    def test_chave_muda_com_as_versoes(self):
+        with tenancy.activate(self.escritorio_a.pk):
+            anteriores = versoes.atuais(*self.widget.modelos)
+        self.assertIn('Cliente painel-a', self.conteudo(self.escritorio_a, anteriores))
+        with self.assertNumQueries(0):
+            self.assertIn('Cliente painel-a', self.conteudo(self.escritorio_a, anteriores))
+
+        # Sem incrementar a versão a renderização guardada continua valendo
+        Cliente._base_manager.filter(pk=self.a['cliente'].pk).update(nome='Cliente renomeado')
+        self.assertIn('Cliente painel-a', self.conteudo(self.escritorio_a))
+
+        with tenancy.activate(self.escritorio_a.pk):
+            versoes.incrementar(Cliente)
+            atuais = versoes.atuais(*self.widget.modelos)
+        self.assertNotEqual(
+            versoes.assinatura(atuais, *self.widget.modelos), versoes.assinatura(anteriores, *self.widget.modelos),
+        )
+        self.assertIn('Cliente renomeado', self.conteudo(self.escritorio_a, atuais))
+        # A versão de um modelo que o widget não lê não troca a chave
+        with tenancy.activate(self.escritorio_a.pk):
+            versoes.incrementar(Processo)
+        with self.assertNumQueries(1):
+            self.assertIn('Cliente renomeado', self.conteudo(self.escritorio_a))
+
+    def test_chave_por_escritorio(self):
+        with tenancy.activate(self.escritorio_a.pk):
+            versoes_a = versoes.atuais(*self.widget.modelos)
+        self.assertIn('Cliente painel-a', self.conteudo(self.escritorio_a, versoes_a))
+        # Mesmas versões, outro escritório: outra renderização
+        conteudo_b = self.conteudo(self.escritorio_b, versoes_a)
+        self.assertIn('Cliente painel-b', conteudo_b)
+        self.assertNotIn('Cliente painel-a', conteudo_b)
+
+    def test_endpoint_com_etag_e_cache_control(self):
+        url = reverse('dashboard:dashboard_widget', args=['top_clientes'])
+        self.client.force_login(self.a['advogado'])
+        resposta = self.client.get(url)
+        self.assertContains(resposta, 'Cliente painel-a')
+        self.assertEqual(resposta.headers['Cache-Control'], f'private, max-age={self.widget.max_age}')
+        etag = resposta.headers['ETag']
+        self.assertEqual(self.client.get(url, headers={'if-none-match': etag}).status_code, 304)
+
+        self.client.force_login(self.b['advogado'])
+        resposta = self.client.get(url, headers={'if-none-match': etag})
+        self.assertEqual(resposta.status_code, 200)
+        self.assertContains(resposta, 'Cliente painel-b')
+        self.assertNotContains(resposta, 'Cliente painel-a')
+        self.assertEqual(self.client.get(reverse('dashboard:dashboard_widget', args=['nao-existe'])).status_code, 404)
+
+
+class EventosTests(TestCase):
+    """Canal de eventos e streams SSE síncrono e assíncrono (dashboard.eventos)"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.escritorio_a = Escritorio.objects.create(nome='Escritório dos eventos A')
+        cls.escritorio_b = Escritorio.objects.create(nome='Escritório dos eventos B')
+        cls.a = povoar_escritorio(cls.escritorio_a, 'eventos-a')
+
+    def setUp(self):
+        cache.clear()
+        self.canal = eventos.Canal()
+        self.enterContext(mock.patch.object(eventos, 'canal', self.canal))
+
+    def stream(self, ultimo_id=None):
+        with tenancy.activate(self.escritorio_a.pk):
+            return eventos.Stream(ultimo_id, heartbeat=5, duracao=10)
+
+    def publicar_depois(self, tipo, dados, escritorio_id):
+        """Publica de outra thread, com o stream já esperando"""
+        publicacao = threading.Timer(0.05, self.canal.publicar, (tipo, dados, escritorio_id))
+        publicacao.start()
+        self.addCleanup(publicacao.join)
+
+    def test_stream_sincrono(self):
+        fluxo = self.stream().sincrono()
+        abertura = next(fluxo)
+        self.assertTrue(abertura.startswith(f'retry: {eventos.RECONEXAO_MS}\n\n'))
+        self.assertIn('event: publicacoes\ndata: {"nao_lidas": 0}', abertura)
+
+        self.publicar_depois('audiencia', {'id': 1}, self.escritorio_a.pk)
+        self.assertEqual(next(fluxo), f'id: {self.canal.identificador(1)}\nevent: audiencia\ndata: {{"id": 1}}\n\n')
+
+        # Eventos de outro escritório são descartados
+        self.publicar_depois('audiencia', {'id': 2}, self.escritorio_b.pk)
+        self.assertEqual(next(fluxo), '')
+        self.assertEqual(self.stream().numero, 2)
+
+    async def test_stream_assincrono(self):
+        fluxo = (await sync_to_async(self.stream)()).assincrono()
+        self.assertIn('event: publicacoes', await anext(fluxo))
+
+        self.publicar_depois('pagamento', {'valor': '10.00'}, self.escritorio_a.pk)
+        self.assertEqual(
+            await anext(fluxo), f'id: {self.canal.identificador(1)}\nevent: pagamento\ndata: {{"valor": "10.00"}}\n\n',
+        )
+        self.assertFalse(self.canal.assinantes_async)
+
+    def test_reconexao_com_last_event_id(self):
+        for numero in range(3):
+            self.canal.publicar('atividade', {'id': numero}, self.escritorio_a.pk)
+
+        abertura = self.stream(self.canal.identificador(1)).abertura()
+        self.assertNotIn('"id": 0', abertura)
+        self.assertIn(f'id: {self.canal.identificador(2)}\nevent: atividade\ndata: {{"id": 1}}', abertura)
+        self.assertIn('"id": 2', abertura)
+        self.assertNotIn('sincronizar', abertura)
+
+        # Id de outra instância do canal (ou além do histórico): recarregar os widgets
+        for ultimo_id in ('outro-2', self.canal.identificador(9)):
+            with self.subTest(ultimo_id=ultimo_id):
+                abertura = self.stream(ultimo_id).abertura()
+                self.assertIn('event: sincronizar', abertura)
+                self.assertNotIn('event: atividade', abertura)
+
+        curto = eventos.Canal(tamanho=1)
+        curto.publicar('atividade', {}, None)
+        curto.publicar('atividade', {}, None)
+        self.assertEqual(curto.posicao(curto.identificador(1)), 1)
+        self.assertIsNone(curto.posicao(curto.identificador(0)))
+
+    def test_sinais_publicam_depois_do_commit(self):
+        with tenancy.activate(self.escritorio_a.pk):
+            with self.captureOnCommitCallbacks() as callbacks:
+                AtividadeRecente.objects.create(
+                    tipo='cliente_cadastrado', descricao='Evento', cliente=self.a['cliente'], usuario=self.a['advogado'],
+                )
+                self.assertEqual(self.canal.ultimo, 0)
+            for callback in callbacks:
+                callback()
+        _, tipo, dados, escritorio_id = self.canal.desde(0)[-1]
+        self.assertEqual((tipo, dados['descricao'], escritorio_id), ('atividade', 'Evento', self.escritorio_a.pk))
+
+
+class PorExtensoTests(SimpleTestCase):
+    """Valores dos recibos por extenso (dashboard.documentos.por_extenso)"""
+
+    def test_valores(self):
+        casos = {
+            '0': 'zero real',
+            '0.01': 'um centavo',
+            '1': 'um real',
+            '1.99': 'um real e noventa e nove centavos',
+            '100': 'cem reais',
+            '101': 'cento e um reais',
+            '1000': 'mil reais',
+            '1234': 'mil duzentos e trinta e quatro reais',
+            '1520.30': 'mil quinhentos e vinte reais e trinta centavos',
+            '2000.05': 'dois mil reais e cinco centavos',
+            '21100': 'vinte e um mil e cem reais',
+            '1000000': 'um milhão de reais',
+            '1000100': 'um milhão e cem reais',
+            '2500000.50': 'dois milhões e quinhentos mil reais e cinquenta centavos',
+            '2345678': 'dois milhões trezentos e quarenta e cinco mil seiscentos e setenta e oito reais',
+            '3000000000': 'três bilhões de reais',
+        }
+        for valor, texto in casos.items():
+            with self.subTest(valor=valor):
+                self.assertEqual(documentos.por_extenso(Decimal(valor)), texto)
+        self.assertEqual(documentos.por_extenso(None), 'zero real')
+
+
+class DocumentosTests(TestCase):
+    """Geração, reaproveitamento pela assinatura e lote de documentos (dashboard.documentos)"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.escritorio = Escritorio.objects.create(nome='Escritório dos documentos')
+        cls.dados = povoar_escritorio(cls.escritorio, 'documentos')
+
+    def setUp(self):
+        pasta = tempfile.TemporaryDirectory()
+        self.addCleanup(pasta.cleanup)
+        self.enterContext(override_settings(DOCUMENTOS_ROOT=pasta.name))
+        self.enterContext(tenancy.activate(self.escritorio.pk))
+        self.receita = self.dados['receita']
+
+    def test_reaproveita_pela_assinatura(self):
+        gerado = documentos.gerar('recibo', self.receita.pk, self.dados['advogado'])
+        local = documentos.armazenamento()
+        conteudo = local.open(gerado.arquivo).read().decode()
+        self.assertIn('cem reais', conteudo)
+        self.assertIn('Escritório dos documentos', conteudo)
+        self.assertEqual((gerado.cliente_id, gerado.receita_id), (self.dados['cliente'].pk, self.receita.pk))
+        self.assertEqual(gerado.tamanho, len(conteudo.encode()))
+        self.assertTrue(AtividadeRecente.objects.filter(tipo='documento_gerado', cliente=self.dados['cliente']).exists())
+
+        # Mesmos dados: o mesmo documento, sem renderizar de novo
+        with mock.patch.object(documentos, 'renderizar') as renderizar:
+            self.assertEqual(documentos.gerar('recibo', self.receita.pk).pk, gerado.pk)
+        renderizar.assert_not_called()
+
+        # Dados alterados: nova assinatura e novo arquivo
+        Receita.objects.filter(pk=self.receita.pk).update(descricao='Honorários revisados')
+        novo = documentos.gerar('recibo', self.receita.pk)
+        self.assertNotEqual((novo.pk, novo.assinatura, novo.arquivo), (gerado.pk, gerado.assinatura, gerado.arquivo))
+        self.assertIn('Honorários revisados', local.open(novo.arquivo).read().decode())
+
+        # Arquivo apagado do disco: gerado outra vez
+        local.delete(novo.arquivo)
+        refeito = documentos.gerar('recibo', self.receita.pk)
+        self.assertNotEqual(refeito.pk, novo.pk)
+        self.assertTrue(local.exists(refeito.arquivo))
+
+        with self.assertRaises(LookupError):
+            documentos.gerar('recibo', 0)
+
+    def test_lote_reaproveita_e_informa_o_andamento(self):
+        outra = Receita.objects.create(
+            descricao='Segunda parcela', valor_total=Decimal('1520.30'), cliente=self.dados['cliente'],
+            tipo=self.receita.tipo, forma_pagamento=self.receita.forma_pagamento, condicao_pagamento='a_vista',
+            data_vencimento=timezone.localdate(),
+        )
+        documentos.gerar('recibo', self.receita.pk)
+        andamento = []
+        resumo = documentos.gerar_lote(
+            'recibo', [self.receita.pk, outra.pk, 0], processos=1, progresso=lambda *passo: andamento.append(passo),
+        )
+        self.assertEqual(resumo['total'], 3)
+        self.assertEqual((resumo['gerados'], resumo['reaproveitados']), (1, 1))
+        self.assertEqual(andamento, [(0, 3), (2, 3), (3, 3)])
+        gerado = DocumentoGerado.objects.get(receita=outra)
+        self.assertEqual(resumo['bytes'], gerado.tamanho)
+        self.assertIn('mil quinhentos e vinte reais e trinta centavos', documentos.armazenamento().open(gerado.arquivo).read().decode())
+
+        resumo = documentos.gerar_lote('recibo', [self.receita.pk, outra.pk], processos=1)
+        self.assertEqual((resumo['gerados'], resumo['reaproveitados']), (0, 2))
+
+    def test_contrato_soma_as_parcelas(self):
+        gerado = documentos.gerar('contrato_honorarios', self.dados['processo'].pk)
+        self.assertEqual(gerado.processo_id, self.dados['processo'].pk)
+        self.assertIsNone(gerado.receita_id)
+        Receita.objects.create(
+            descricao='Segunda parcela', valor_total=Decimal('50.00'), cliente=self.dados['cliente'],
+            processo=self.dados['processo'], tipo=self.receita.tipo, forma_pagamento=self.receita.forma_pagamento,
+            condicao_pagamento='a_vista', data_vencimento=timezone.localdate(),
+        )
+        # Nova parcela muda o contexto e, com ele, o documento
+        novo = documentos.gerar('contrato_honorarios', self.dados['processo'].pk)
+        self.assertNotEqual(novo.assinatura, gerado.assinatura)
+        conteudo = documentos.armazenamento().open(novo.arquivo).read().decode()
+        self.assertIn('cento e cinquenta reais', conteudo)
+        self.assertIn('Segunda parcela', conteudo)
+
+    def test_documentos_lote_valida_a_entrada(self):
+        url = reverse('dashboard:documentos_lote')
+        self.assertEqual(self.client.post(url, {'modelo': 'recibo', 'mes': '2026-10'}).status_code, 302)
+        self.client.force_login(self.dados['advogado'])
+        self.assertEqual(self.client.get(url).status_code, 405)
+
+        invalidos = [
+            {'modelo': 'recibo'},
+            {'modelo': 'nao-existe', 'mes': '2026-10'},
+            {'mes': '2026-10'},
+            {'modelo': 'recibo', 'mes': '2026-13'},
+            {'modelo': 'recibo', 'mes': 'outubro'},
+            {'modelo': 'recibo', 'ids': ['1', 'x']},
+        ]
+        for dados in invalidos:
+            with self.subTest(dados=dados):
+                resposta = self.client.post(url, dados)
+                self.assertEqual(resposta.status_code, 400)
+                self.assertFalse(resposta.json()['success'])
+        self.assertFalse(Job.objects.exists())
+
+        resposta = self.client.post(url, {'modelo': 'recibo', 'ids': [str(self.receita.pk)]})
+        self.assertTrue(resposta.json()['success'])
+        job = Job.objects.get(pk=resposta.json()['job'])
+        self.assertEqual((job.nome, job.argumentos), ('documentos.gerar_lote', ['recibo']))
+        self.assertEqual(job.parametros['ids'], [self.receita.pk])
+        # O mesmo lote ainda na fila não é agendado de novo
+        self.assertEqual(self.client.post(url, {'modelo': 'recibo', 'ids': [str(self.receita.pk)]}).json()['job'], job.pk)
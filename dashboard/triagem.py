@@ -0,0 +1,101 @@
+"""
+Ações em lote sobre publicações (marcar como lida, atribuir e criar tarefas).
+
+Cada ação é feita com um UPDATE sobre todo o conjunto de ids ou com
+bulk_create, independentemente da quantidade de publicações selecionadas.
+"""
+from collections import Counter
+from datetime import datetime, time
+
+from django.db import transaction
+from django.db.models.functions import Substr
+from django.utils import timezone
+
+from . import eventos, prazos, versoes
+from .models import AtividadeRecente, Publicacao, Task
+
+ACOES = {
+    'marcar_lidas': 'Marcar como lidas',
+    'marcar_nao_lidas': 'Marcar como não lidas',
+    'atribuir': 'Atribuir responsável',
+    'criar_tarefas': 'Criar tarefas',
+    'criar_prazos': 'Criar tarefas de prazo',
+}
+
+
+def marcar_lidas(ids, lida=True):
+    """Marca as publicações como lidas (ou não lidas); retorna quantas mudaram"""
+    alteradas = Publicacao.objects.filter(pk__in=ids).exclude(lida=lida).update(lida=lida)
+    if alteradas:
+        eventos.publicar_nao_lidas()
+    return alteradas
+
+
+def atribuir(ids, responsavel):
+    """Define (ou remove, com None) o responsável pelas publicações"""
+    return Publicacao.objects.filter(pk__in=ids).update(responsavel=responsavel)
+
+
+def inicio_tarefa(data):
+    inicio = datetime.combine(data, time(9, 0)) if not isinstance(data, datetime) else data
+    return timezone.make_aware(inicio) if timezone.is_naive(inicio) else inicio
+
+
+def criar_tarefas(ids, advogado=None, data=None, prioridade='media', marcar_lida=True, dias_uteis=None):
+    """
+    Cria uma tarefa por publicação, vinculada ao processo e ao cliente.
+
+    Com `dias_uteis`, a data de cada tarefa é o fim do prazo contado da data da
+    publicação no calendário forense do processo (publicações cujo prazo sai do
+    calendário ficam sem tarefa); senão, todas usam `data` (padrão: hoje).
+    Sem `advogado`, a tarefa vai para o responsável pela publicação ou, na falta
+    dele, para o advogado responsável pelo processo. Registra uma atividade
+    tarefa_criada por advogado com o total de tarefas. Retorna as tarefas criadas.
+    """
+    inicio = inicio_tarefa(data or timezone.localdate())
+    linhas = list(Publicacao.objects.filter(pk__in=ids).annotate(resumo=Substr('conteudo', 1, 500)).values_list(
+        'titulo', 'resumo', 'data_publicacao', 'processo_id', 'processo__numero', 'processo__cliente_id',
+        'processo__advogado_responsavel_id', 'responsavel_id',
+        'processo__cnj_segmento', 'processo__cnj_tribunal', 'processo__cnj_origem', 'id',
+    ).order_by())
+
+    finais = [None] * len(linhas)
+    if dias_uteis is not None:
+        disponiveis = prazos.codigos_disponiveis()
+        finais = prazos.calcular_prazos(
+            (linha[2], dias_uteis, prazos.codigo_calendario(*linha[8:11], disponiveis=disponiveis))
+            for linha in linhas
+        )
+
+    tarefas, tratadas = [], []
+    for linha, final in zip(linhas, finais):
+        titulo, resumo, data_publicacao, processo_id, numero, cliente_id, advogado_processo_id, responsavel_id = linha[:8]
+        if dias_uteis is not None and final is None:
+            continue
+        tratadas.append(linha[11])
+        tarefas.append(Task(
+            titulo=(f'Prazo ({dias_uteis} dias úteis): {titulo}' if final else f'Publicação: {titulo}')[:200],
+            descricao=f'Processo {numero} - publicação de {data_publicacao:%d/%m/%Y}\n\n{resumo}',
+            data_inicio=inicio_tarefa(final) if final else inicio,
+            dia_todo=True,
+            advogado_id=advogado.pk if advogado else (responsavel_id or advogado_processo_id),
+            cliente_id=cliente_id,
+            processo_id=processo_id,
+            prioridade=prioridade,
+        ))
+
+    por_advogado = Counter(tarefa.advogado_id for tarefa in tarefas)
+    with transaction.atomic():
+        tarefas = Task.objects.bulk_create(tarefas)
+        eventos.atividades_criadas(AtividadeRecente.objects.bulk_create([
+            AtividadeRecente(
+                tipo='tarefa_criada',
+                descricao=f'{quantidade} tarefa(s) criada(s) a partir de publicações',
+                usuario_id=advogado_id,
+            )
+            for advogado_id, quantidade in por_advogado.items()
+        ]))
+        if marcar_lida:
+            marcar_lidas(tratadas)
+        versoes.incrementar(Task, AtividadeRecente)
+    return tarefas
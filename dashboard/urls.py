@@ -5,8 +5,14 @@ app_name = 'dashboard'
 
 urlpatterns = [
     path('', views.dashboard_view, name='home'),
+    path('widgets/<slug:nome>/', views.dashboard_widget, name='dashboard_widget'),
+    path('eventos/', views.dashboard_eventos, name='dashboard_eventos'),
     path('clients/', views.cliente_list, name='clients'),
     path('clients/create/', views.cliente_create, name='client_create'),
+    path('clients/lote/', views.cliente_lote, name='cliente_lote'),
+    path('clients/duplicados/', views.cliente_duplicados, name='cliente_duplicados'),
+    path('clients/duplicados/detectar/', views.cliente_duplicados_detectar, name='cliente_duplicados_detectar'),
+    path('clients/duplicados/<int:pk>/resolver/', views.cliente_duplicado_resolver, name='cliente_duplicado_resolver'),
     path('clients/<int:pk>/edit/', views.cliente_update, name='client_edit'),
     path('clients/<int:pk>/delete/', views.cliente_delete, name='client_delete'),
     path('clients/<int:pk>/', views.cliente_detail, name='client_detail'),
@@ -27,6 +33,7 @@ urlpatterns = [
     # Task URLs
     path('tasks/', views.task_list, name='task_list'),
     path('tasks/create/', views.task_create, name='task_create'),
+    path('tasks/lote/', views.task_lote, name='task_lote'),
     path('tasks/<int:pk>/edit/', views.task_update, name='task_update'),
     path('tasks/<int:pk>/delete/', views.task_delete, name='task_delete'),
     path('tasks/<int:pk>/', views.task_detail, name='task_detail'),
@@ -34,10 +41,15 @@ urlpatterns = [
     # Receitas URLs
     path('receitas/', views.receita_list, name='receitas'),
     path('receitas/create/', views.receita_create, name='receita_create'),
+    path('receitas/lote/', views.receita_lote, name='receita_lote'),
     path('receitas/<int:pk>/edit/', views.receita_update, name='receita_update'),
     path('receitas/<int:pk>/delete/', views.receita_delete, name='receita_delete'),
     path('receitas/<int:pk>/pay/', views.receita_pay, name='receita_pay'),
     path('receitas/<int:pk>/', views.receita_detail, name='receita_detail'),
+    path('receitas/<int:pk>/recibo/', views.receita_recibo, name='receita_recibo'),
+    path('receitas/comissoes/', views.relatorio_comissoes_view, name='relatorio_comissoes'),
+    path('receitas/aging/', views.relatorio_aging_view, name='relatorio_aging'),
+    path('receitas/aging/<str:agrupar_por>/', views.relatorio_aging_detalhe_view, name='relatorio_aging_detalhe'),
     
     # Audiencia URLs
     path('audiencias/', views.audiencia_list, name='audiencia_list'),
@@ -48,11 +60,35 @@ urlpatterns = [
     # Processo URLs
     path('processos/', views.processo_list, name='processo_list'),
     path('processos/create/', views.processo_create, name='processo_create'),
+    path('processos/lote/', views.processo_lote, name='processo_lote'),
     path('processos/<int:pk>/edit/', views.processo_update, name='processo_update'),
     path('processos/<int:pk>/delete/', views.processo_delete, name='processo_delete'),
     path('processos/<int:pk>/', views.processo_detail, name='processo_detail'),
+    path('processos/<int:pk>/contrato/', views.processo_contrato, name='processo_contrato'),
+    path('processos/tribunais/', views.relatorio_processos_tribunal, name='relatorio_processos_tribunal'),
+
+    # Publicacao URLs
+    path('publicacoes/', views.publicacao_list, name='publicacao_list'),
+    path('publicacoes/triagem/', views.publicacao_triagem, name='publicacao_triagem'),
+    path('publicacoes/alertas/create/', views.publicacao_alerta_create, name='publicacao_alerta_create'),
+    path('publicacoes/alertas/<int:pk>/delete/', views.publicacao_alerta_delete, name='publicacao_alerta_delete'),
+
+    path('prazos/calcular/', views.prazos_calcular, name='prazos_calcular'),
+
+    # Job URLs
+    path('jobs/status/', views.jobs_status, name='jobs_status'),
+    path('jobs/<int:pk>/', views.job_status, name='job_status'),
+
+    # Documentos URLs
+    path('documentos/lote/', views.documentos_lote, name='documentos_lote'),
+    path('documentos/<int:pk>/', views.documento_download, name='documento_download'),
+
+    # Histórico de alterações URLs
+    path('historico/<str:modelo>/<int:pk>/', views.historico_objeto, name='historico_objeto'),
 
     path('calendar_events/', views.calendar_events, name='calendar_events'),
+    path('dashboard_data/', views.get_dashboard_data, name='dashboard_data'),
+    path('fluxo_caixa/', views.fluxo_caixa_data, name='fluxo_caixa_data'),
     
     # AJAX Modal endpoints
     path('ajax/cliente/create/', views.cliente_create, name='ajax_cliente_create'),
@@ -67,6 +103,9 @@ urlpatterns = [
     path('client/<int:pk>/edit/', views.client_edit, name='client_edit'),
     path('client/<int:pk>/financial/', views.client_financial, name='client_financial'),
     path('client/<int:pk>/activate-area/', views.activate_client_area, name='activate_client_area'),
+    path('area-cliente/', views.area_cliente, name='area_cliente'),
+    path('area-cliente/login/', views.area_cliente_login, name='area_cliente_login'),
+    path('area-cliente/sair/', views.area_cliente_logout, name='area_cliente_logout'),
     path('receita/<int:receita_pk>/add-payment/', views.add_partial_payment, name='add_partial_payment'),
     
     
@@ -0,0 +1,115 @@
+"""
+Versões por escritório e modelo, usadas como validadores HTTP e chaves de cache.
+
+Cada modelo listado em MODELOS tem um contador em VersaoModelo, incrementado
+pelos sinais de gravação e exclusão na mesma transação da alteração (e
+explicitamente pelas rotinas que alteram em lote com UPDATE ou bulk_create).
+Os contadores são por escritório (users.tenancy): a gravação de um escritório
+não invalida os caches e ETags dos outros. A linha sem escritório, lida por
+quem vê todos, muda a cada gravação; uma gravação sem escritório ativo
+(comandos, jobs periódicos) muda as de todos.
+
+- Respostas condicionais (ETag/Last-Modified) nos endpoints JSON de leitura:
+  o ETag é derivado das versões dos modelos que a resposta lê e do escopo (a
+  URL e o usuário), de modo que uma requisição com If-None-Match ainda válido
+  recebe 304 depois de uma única consulta, sem rodar as consultas da view.
+- Widgets do dashboard em cache (dashboard.painel): assinatura() entra na
+  chave, e qualquer alteração nos modelos do widget troca a chave.
+"""
+import hashlib
+from calendar import timegm
+
+from django.db.models import F, Q
+from django.utils import timezone
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+
+from users import tenancy
+from users.models import Escritorio
+
+from .models import VersaoModelo
+
+MODELOS = (
+    'dashboard.Cliente', 'dashboard.Processo', 'dashboard.Receita', 'dashboard.Despesa',
+    'dashboard.TipoReceita', 'dashboard.FormaPagamento', 'dashboard.Banco', 'users.Lawyer',
+    'dashboard.AtividadeRecente', 'dashboard.Audiencia', 'dashboard.Task',
+)
+
+
+def rotulo(modelo):
+    return modelo if isinstance(modelo, str) else modelo._meta.label
+
+
+def incrementar(*modelos):
+    """
+    Incrementa a versão dos modelos no escritório ativo e na linha geral
+    (chamado pelos sinais e pelas alterações em lote); sem escritório ativo,
+    em todos.
+    """
+    agora = timezone.now()
+    escritorio_id = tenancy.current_id()
+    escritorios = [None, escritorio_id] if escritorio_id is not None else [None, *Escritorio.objects.values_list('pk', flat=True)]
+    for modelo in modelos:
+        nome = rotulo(modelo)
+        linhas = VersaoModelo.objects.filter(modelo=nome)
+        if escritorio_id is not None:
+            linhas = linhas.filter(Q(escritorio_id=escritorio_id) | Q(escritorio__isnull=True))
+        if linhas.update(versao=F('versao') + 1, data_atualizacao=agora) < len(escritorios):
+            # Primeira gravação do modelo em algum dos escritórios
+            VersaoModelo.objects.bulk_create([
+                VersaoModelo(escritorio_id=escritorio, modelo=nome, versao=1, data_atualizacao=agora)
+                for escritorio in escritorios
+            ], ignore_conflicts=True)
+
+
+def atuais(*modelos):
+    """{rótulo: (versão, data da última alteração)} dos modelos no escritório ativo, em uma consulta"""
+    nomes = {rotulo(modelo) for modelo in modelos} or set(MODELOS)
+    return {
+        nome: (versao, data) for nome, versao, data in
+        VersaoModelo.objects.filter(escritorio_id=tenancy.current_id(), modelo__in=nomes).values_list(
+            'modelo', 'versao', 'data_atualizacao',
+        )
+    }
+
+
+def assinatura(versoes, *modelos):
+    """Versões dos modelos em texto ('12.3.40'), a partir do resultado de atuais()"""
+    return '.'.join(str(versoes.get(rotulo(modelo), (0, None))[0]) for modelo in modelos)
+
+
+class Validadores:
+    """
+    Validadores de uma resposta que lê os modelos informados.
+
+    Uso na view:
+
+        validadores = Validadores(request, Cliente, Processo)
+        if (nao_modificado := validadores.resposta_nao_modificada()):
+            return nao_modificado
+        ...
+        return validadores.aplicar(JsonResponse(dados))
+    """
+
+    def __init__(self, request, *modelos, escopo=''):
+        self.request = request
+        nomes = sorted({rotulo(modelo) for modelo in modelos})
+        self.versoes = versoes = atuais(*nomes)
+        partes = [f'{nome}={versoes.get(nome, (0, None))[0]}' for nome in nomes]
+        partes += [request.get_full_path(), str(request.user.pk), str(escopo)]
+        self.etag = quote_etag(hashlib.md5('|'.join(partes).encode('utf-8')).hexdigest())
+        datas = [data for _, data in versoes.values() if data]
+        self.ultima_alteracao = timegm(max(datas).utctimetuple()) if datas else None
+
+    def resposta_nao_modificada(self):
+        """Resposta 304 se o cliente já tem a versão atual, senão None"""
+        resposta = get_conditional_response(self.request, etag=self.etag, last_modified=self.ultima_alteracao)
+        return self.aplicar(resposta) if resposta is not None else None
+
+    def aplicar(self, resposta):
+        resposta.headers['ETag'] = self.etag
+        if self.ultima_alteracao is not None:
+            resposta.headers['Last-Modified'] = http_date(self.ultima_alteracao)
+        # Sempre revalidar: os dados são por usuário e mudam a qualquer momento
+        resposta.headers['Cache-Control'] = 'private, no-cache'
+        return resposta
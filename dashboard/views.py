@@ -1,283 +1,81 @@
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
-from django.http import JsonResponse
-from django.db.models import Q, Count, Sum
+from django.contrib.auth.hashers import make_password
+from django.core.exceptions import NON_FIELD_ERRORS
+from django.core.handlers.asgi import ASGIRequest
+from django.http import FileResponse, Http404, HttpResponse, JsonResponse, StreamingHttpResponse
+from django.db import transaction
+from django.db.models import Q, Count, Max, Sum
+from django.db.models.functions import Substr
+from django.urls import reverse
 from django.utils import timezone
+from django.utils.crypto import constant_time_compare
+from django.utils.dateparse import parse_date
 from datetime import datetime, timedelta
 from decimal import Decimal
+import csv
 import json
+import re
 
 from .models import (
     Task, Cliente, Processo, Audiencia, Publicacao,
     Receita, Despesa, AtividadeRecente, TipoReceita, TipoDespesa,
-    FormaPagamento, Banco, PrazoPagamento, TipoDemanda
+    FormaPagamento, Banco, PrazoPagamento, TipoDemanda, DuplicidadeCliente, AlertaPublicacao, Job,
+    DocumentoGerado,
 )
+from finance.models import Client
+from users import tenancy
 from users.models import Lawyer
+from . import arquivo, busca, cnj, documentos, eventos, expurgo, extratos, fila, historico, lote, painel, prazos, triagem
+from .versoes import Validadores
+from .aging import CENTAVO, DIMENSOES, FAIXAS, detalhe_aging, relatorio_aging
+from .comissoes import relatorio_comissoes
+from .deduplicacao import resolver_duplicidade
+from .fluxo_caixa import projecao_fluxo_caixa
 from .forms import (
     TaskForm, ClienteForm, AdvogadoForm, ProcessoForm, 
     AudienciaForm, ReceitaForm, DespesaForm, DashboardFilterForm, TipoReceitaForm,
-    TipoDespesaForm, FormaPagamentoForm, BancoForm, PrazoPagamentoForm, TipoDemandaForm
+    TipoDespesaForm, FormaPagamentoForm, BancoForm, PrazoPagamentoForm, TipoDemandaForm,
+    RateioParticipacaoFormSet, AlertaPublicacaoForm
 )
 
 @login_required
 def dashboard_view(request):
-    """View principal do dashboard com métricas e dados avançados"""
-    
-    # Verificar se o usuário tem perfil de advogado
+    """Casca do dashboard: os indicadores, gráficos e listas são widgets carregados em paralelo (ver dashboard.painel)"""
+    return render(request, 'dashboard/dashboard.html')
+
+@login_required
+def dashboard_widget(request, nome):
+    """Fragmento HTML ou dados JSON de um widget do dashboard"""
+    widget = painel.WIDGETS.get(nome)
+    if widget is None:
+        raise Http404('Widget não encontrado')
     try:
-        advogado = request.user
-    except:
-        messages.warning(request, 'Perfil de advogado não encontrado. Entre em contato com o administrador.')
-    
-    # Filtros de período
-    periodo = int(request.GET.get('periodo', 30))
-    data_inicio = timezone.now() - timedelta(days=periodo)
-    hoje = timezone.now().date()
-    inicio_mes = hoje.replace(day=1)
-    mes_anterior = (inicio_mes - timedelta(days=1)).replace(day=1)
-    
-    # === MÉTRICAS PRINCIPAIS ===
-    
-    # Clientes
-    total_clientes = Cliente.objects.filter(ativo=True).count()
-    clientes_novos = Cliente.objects.filter(
-        data_cadastro__gte=data_inicio,
-        ativo=True
-    ).count()
-    clientes_com_processos = Cliente.objects.filter(
-        processo__isnull=False,
-        ativo=True
-    ).distinct().count()
-    
-    # Processos
-    total_processos = Processo.objects.count()
-    processos_ativos = Processo.objects.filter(status='ativo').count()
-    processos_finalizados_mes = Processo.objects.filter(
-        status='finalizado',
-        data_fim__gte=inicio_mes
-    ).count()
-    
-    # Tarefas
-    tarefas_pendentes = Task.objects.filter(status='pendente').count()
-    tarefas_atrasadas = Task.objects.filter(
-        status='pendente',
-        data_inicio__lt=timezone.now()
-    ).count()
-    tarefas_concluidas_mes = Task.objects.filter(
-        status='concluida',
-        data_atualizacao__gte=inicio_mes
-    ).count()
-    
-    # Audiências
-    audiencias_pendentes = Audiencia.objects.filter(
-        data_hora__gte=timezone.now(),
-        data_hora__lte=timezone.now() + timedelta(days=30)
-    ).count()
-    audiencias_hoje = Audiencia.objects.filter(
-        data_hora__date=hoje
-    ).count()
-    audiencias_semana = Audiencia.objects.filter(
-        data_hora__gte=timezone.now(),
-        data_hora__lte=timezone.now() + timedelta(days=7)
-    ).count()
-    
-    # Publicações
-    publicacoes_nao_lidas = Publicacao.objects.filter(lida=False).count()
-    publicacoes_mes = Publicacao.objects.filter(
-        data_publicacao__gte=inicio_mes
-    ).count()
-    
-    # === MÉTRICAS FINANCEIRAS AVANÇADAS ===
-    
-    # Receitas do mês atual
-    receitas_mes = Receita.objects.filter(
-        data_vencimento__gte=inicio_mes,
-        data_vencimento__lte=hoje
-    ).aggregate(total=Sum('valor_total'))['total'] or Decimal('0.00')
-    
-    receitas_pagas_mes = Receita.objects.filter(
-        data_recebimento__gte=inicio_mes,
-        data_recebimento__lte=hoje
-    ).aggregate(total=Sum('valor_recebido'))['total'] or Decimal('0.00')
-    
-    receitas_pendentes = Receita.objects.filter(
-        pago=False,
-        data_vencimento__lte=hoje
-    ).aggregate(total=Sum('valor_total'))['total'] or Decimal('0.00')
-    
-    receitas_vencidas = Receita.objects.filter(
-        pago=False,
-        data_vencimento__lt=hoje
-    ).aggregate(total=Sum('valor_total'))['total'] or Decimal('0.00')
-    
-    # Receitas do mês anterior para comparação
-    receitas_mes_anterior = Receita.objects.filter(
-        data_vencimento__gte=mes_anterior,
-        data_vencimento__lt=inicio_mes
-    ).aggregate(total=Sum('valor_total'))['total'] or Decimal('0.00')
-    
-    # Despesas do mês
-    despesas_mes = Despesa.objects.filter(
-        data_vencimento__gte=inicio_mes,
-        data_vencimento__lte=hoje
-    ).aggregate(total=Sum('valor'))['total'] or Decimal('0.00')
-    
-    despesas_pagas_mes = Despesa.objects.filter(
-        data_pagamento__gte=inicio_mes,
-        data_pagamento__lte=hoje,
-        pago=True
-    ).aggregate(total=Sum('valor'))['total'] or Decimal('0.00')
-    
-    # Despesas do mês anterior para comparação
-    despesas_mes_anterior = Despesa.objects.filter(
-        data_vencimento__gte=mes_anterior,
-        data_vencimento__lt=inicio_mes
-    ).aggregate(total=Sum('valor'))['total'] or Decimal('0.00')
-    
-    # Cálculos de saldo e variação
-    saldo_mes = receitas_pagas_mes - despesas_pagas_mes
-    saldo_mes_anterior = receitas_mes_anterior - despesas_mes_anterior
-    
-    # Cálculo da variação percentual
-    variacao_receitas = 0
-    if receitas_mes_anterior > 0:
-        variacao_receitas = ((receitas_mes - receitas_mes_anterior) / receitas_mes_anterior) * 100
-    
-    variacao_despesas = 0
-    if despesas_mes_anterior > 0:
-        variacao_despesas = ((despesas_mes - despesas_mes_anterior) / despesas_mes_anterior) * 100
-    
-    variacao_saldo = 0
-    if saldo_mes_anterior != 0:
-        variacao_saldo = ((saldo_mes - saldo_mes_anterior) / abs(saldo_mes_anterior)) * 100
-    
-    # === DADOS PARA GRÁFICOS ===
-    
-    # Distribuição de processos por status
-    processos_por_status = list(Processo.objects.values('status').annotate(
-        count=Count('id')
-    ))
-    
-    # Receitas vs Despesas últimos 6 meses
-    receitas_despesas_meses = []
-    for i in range(6):
-        mes_ref = hoje.replace(day=1) - timedelta(days=30*i)
-        mes_fim = (mes_ref.replace(day=28) + timedelta(days=4)).replace(day=1) - timedelta(days=1)
-        
-        receitas = Receita.objects.filter(
-            data_vencimento__gte=mes_ref,
-            data_vencimento__lte=mes_fim
-        ).aggregate(total=Sum('valor_total'))['total'] or 0
-        
-        despesas = Despesa.objects.filter(
-            data_vencimento__gte=mes_ref,
-            data_vencimento__lte=mes_fim
-        ).aggregate(total=Sum('valor'))['total'] or 0
-        
-        receitas_despesas_meses.append({
-            'mes': mes_ref.strftime('%b/%Y'),
-            'receitas': float(receitas),
-            'despesas': float(despesas)
-        })
-    
-    receitas_despesas_meses.reverse()  # Ordem cronológica
-    
-    # Top 5 clientes por receita
-    top_clientes = Cliente.objects.annotate(
-        total_receitas=Sum('receita__valor_total')
-    ).filter(
-        total_receitas__isnull=False,
-        ativo=True
-    ).order_by('-total_receitas')[:5]
-    
-    # === ATIVIDADES E AGENDA ===
-    
-    # Atividades recentes
-    atividades_recentes = AtividadeRecente.objects.select_related(
-        'usuario', 'cliente', 'processo'
-    ).order_by('-data_criacao')[:10]
-    
-    # Próximas audiências
-    proximas_audiencias = Audiencia.objects.filter(
-        data_hora__gte=timezone.now()
-    ).select_related('processo', 'processo__cliente').order_by('data_hora')[:5]
-    
-    # Tarefas urgentes
-    tarefas_urgentes = Task.objects.filter(
-        status__in=['pendente', 'em_andamento'],
-        prioridade__in=['alta', 'urgente'],
-        data_inicio__lte=timezone.now() + timedelta(days=7)
-    ).select_related('cliente', 'processo').order_by('data_inicio')[:5]
-    
-    # Próximos vencimentos de receitas
-    proximos_vencimentos = Receita.objects.filter(
-        pago=False,
-        data_vencimento__gte=hoje,
-        data_vencimento__lte=hoje + timedelta(days=30)
-    ).select_related('cliente').order_by('data_vencimento')[:10]
-    
-    # Taxa de conversão de clientes
-    taxa_conversao = 0
-    if total_clientes > 0:
-        taxa_conversao = (clientes_com_processos / total_clientes) * 100
-    
-    # Ticket médio
-    ticket_medio = 0
-    if total_clientes > 0 and receitas_mes > 0:
-        ticket_medio = receitas_mes / total_clientes
-    
-    context = {
-        # Métricas básicas
-        'total_clientes': total_clientes,
-        'total_processos': total_processos,
-        'processos_ativos': processos_ativos,
-        'tarefas_pendentes': tarefas_pendentes,
-        'tarefas_atrasadas': tarefas_atrasadas,
-        'audiencias_pendentes': audiencias_pendentes,
-        'audiencias_hoje': audiencias_hoje,
-        'audiencias_semana': audiencias_semana,
-        'publicacoes_nao_lidas': publicacoes_nao_lidas,
-        
-        # Métricas financeiras
-        'receitas_mes': receitas_mes,
-        'receitas_pagas_mes': receitas_pagas_mes,
-        'receitas_pendentes': receitas_pendentes,
-        'receitas_vencidas': receitas_vencidas,
-        'despesas_mes': despesas_mes,
-        'despesas_pagas_mes': despesas_pagas_mes,
-        'saldo_mes': saldo_mes,
-        
-        # Variações percentuais
-        'variacao_receitas': round(variacao_receitas, 1),
-        'variacao_despesas': round(variacao_despesas, 1),
-        'variacao_saldo': round(variacao_saldo, 1),
-        
-        # Métricas calculadas
-        'clientes_novos': clientes_novos,
-        'clientes_com_processos': clientes_com_processos,
-        'taxa_conversao': round(taxa_conversao, 1),
-        'ticket_medio': ticket_medio,
-        'processos_finalizados_mes': processos_finalizados_mes,
-        'tarefas_concluidas_mes': tarefas_concluidas_mes,
-        'publicacoes_mes': publicacoes_mes,
-        
-        # Dados para gráficos
-        'processos_por_status': processos_por_status,
-        'receitas_despesas_meses': receitas_despesas_meses,
-        'top_clientes': top_clientes,
-        
-        # Listas
-        'atividades_recentes': atividades_recentes,
-        'proximas_audiencias': proximas_audiencias,
-        'tarefas_urgentes': tarefas_urgentes,
-        'proximos_vencimentos': proximos_vencimentos,
-        
-        # Formulário de filtro
-        'filter_form': DashboardFilterForm(request.GET),
-    }
-    
-    return render(request, 'dashboard/dashboard.html', context)
+        periodo = int(request.GET.get('periodo', 30))
+    except ValueError:
+        periodo = 30
+    agora = timezone.now()
+    validadores = Validadores(request, *widget.modelos, escopo=(timezone.localdate(agora), widget.janela(agora)))
+    if (nao_modificado := validadores.resposta_nao_modificada()):
+        nao_modificado.headers['Cache-Control'] = f'private, max-age={widget.max_age}'
+        return nao_modificado
+    corpo, tipo = widget.conteudo(periodo, agora, validadores.versoes)
+    resposta = validadores.aplicar(HttpResponse(corpo, content_type=tipo))
+    resposta.headers['Cache-Control'] = f'private, max-age={widget.max_age}'
+    return resposta
+
+@login_required
+def dashboard_eventos(request):
+    """Stream de eventos (text/event-stream) com as atualizações do dashboard"""
+    ultimo_id = request.headers.get('Last-Event-ID') or request.GET.get('ultimo')
+    stream = eventos.Stream(ultimo_id)
+    # Sob ASGI o stream espera os eventos sem ocupar uma thread
+    conteudo = stream.assincrono() if isinstance(request, ASGIRequest) else stream.sincrono()
+    resposta = StreamingHttpResponse(conteudo, content_type='text/event-stream')
+    resposta.headers['Cache-Control'] = 'no-cache'
+    resposta.headers['X-Accel-Buffering'] = 'no'
+    return resposta
 
 @login_required
 def task_list(request):
@@ -342,7 +140,7 @@ def task_delete(request, pk):
 @login_required
 def task_detail(request, pk):
     """Detalhes da tarefa"""
-    task = get_object_or_404(Task, pk=pk)
+    task = arquivo.obter_ou_404(Task, pk)
     
     return render(request, 'dashboard/task_detail.html', {
         'task': task
@@ -436,42 +234,20 @@ def processo_update(request, pk):
         form = ProcessoForm(instance=processo)
     return render(request, 'dashboard/processo_form.html', {'form': form, 'title': 'Editar Processo'})
 
-@login_required
-def processo_detail(request, pk):
-    """Detalhes do processo"""
-    processo = get_object_or_404(Processo, pk=pk)
-    
-    # Check if it's an AJAX request
-    if request.headers.get('X-Requested-With') == 'XMLHttpRequest' or 'application/json' in request.META.get('HTTP_ACCEPT', ''):
-        return JsonResponse({
-            'success': True,
-            'process': {
-                'id': processo.id,
-                'numero': processo.numero,
-                'titulo': processo.titulo,
-                'descricao': processo.descricao,
-                'status': processo.status,
-                'data_inicio': processo.data_inicio.strftime('%Y-%m-%d'),
-                'data_fim': processo.data_fim.strftime('%Y-%m-%d') if processo.data_fim else None,
-                'valor_causa': float(processo.valor_causa) if processo.valor_causa else None,
-                'tribunal': processo.tribunal,
-                'vara': processo.vara,
-                'cliente_id': processo.cliente.id,
-                'advogado_responsavel_id': processo.advogado_responsavel.id,
-            }
-        })
-    
-    return render(request, 'dashboard/processo_detail.html', {
-        'processo': processo
-    })
-
 @login_required
 def processo_delete(request, pk):
     """Deletar processo"""
     processo = get_object_or_404(Processo, pk=pk)
     if request.method == 'POST':
-        processo.delete()
-        messages.success(request, 'Processo excluído com sucesso!')
+        # Processos com muitos dependentes são apagados em blocos pelo worker
+        if expurgo.dependentes(processo) > expurgo.LOTE:
+            job = fila.enfileirar(
+                'expurgo.executar', 'dashboard.Processo', processo.pk, chave=f'expurgo:dashboard.processo:{processo.pk}',
+            )
+            messages.info(request, f'Exclusão do processo agendada (job #{job.pk}).')
+        else:
+            expurgo.expurgar(processo)
+            messages.success(request, 'Processo excluído com sucesso!')
         return redirect('dashboard:processo_list')
     return render(request, 'dashboard/processo_confirm_delete.html', {'processo': processo})
 
@@ -489,7 +265,7 @@ from django.core.paginator import Paginator
 @login_required
 def cliente_list(request):
     """Lista de clientes"""
-    clientes = Cliente.objects.all().order_by('nome')
+    clientes = Cliente.objects.all()
     
     # Filtros
     search = request.GET.get('search')
@@ -506,6 +282,18 @@ def cliente_list(request):
     elif status == 'inativo':
         clientes = clientes.filter(ativo=False)
     
+    # Ordenação
+    ordenacoes = {
+        'nome': ('nome',),
+        'saldo': ('-saldo_aberto', 'nome'),
+        'faturado': ('-total_faturado', 'nome'),
+        'recentes': ('-ultima_movimentacao', 'nome'),
+    }
+    ordenar = request.GET.get('ordenar', 'nome')
+    if ordenar not in ordenacoes:
+        ordenar = 'nome'
+    clientes = clientes.order_by(*ordenacoes[ordenar])
+    
     # Paginação
     page_size = request.GET.get('page_size', 15)
     try:
@@ -519,7 +307,7 @@ def cliente_list(request):
     
     # Estatísticas para o dashboard
     active_clients_count = Cliente.objects.filter(ativo=True).count()
-    clients_with_processes = Cliente.objects.filter(processo__isnull=False).distinct().count()
+    clients_with_processes = Cliente.objects.filter(numero_processos__gt=0).count()
     
     # Novos clientes este mês
     today = timezone.now().date()
@@ -535,10 +323,12 @@ def cliente_list(request):
     return render(request, 'dashboard/clients.html', {
         'page_obj': page_obj,
         'page_size': page_size,
+        'ordenar': ordenar,
         'active_clients_count': active_clients_count,
         'clients_with_processes': clients_with_processes,
         'new_clients_this_month': new_clients_this_month,
-        'lawyers': lawyers
+        'lawyers': lawyers,
+        'acoes_lote': lote.ACOES_CLIENTES,
     })
 
 @login_required
@@ -675,10 +465,12 @@ def cliente_update(request, pk):
 @login_required
 def cliente_detail(request, pk):
     """Detalhes do cliente"""
-    cliente = get_object_or_404(Cliente, pk=pk)
-    
     # Check if it's an AJAX request
     if request.headers.get('X-Requested-With') == 'XMLHttpRequest' or 'application/json' in request.META.get('HTTP_ACCEPT', ''):
+        validadores = Validadores(request, Cliente, Processo, Lawyer)
+        if (nao_modificado := validadores.resposta_nao_modificada()):
+            return nao_modificado
+        cliente = get_object_or_404(Cliente, pk=pk)
         # Get client processes
         processos = Processo.objects.filter(cliente=cliente).select_related('advogado_responsavel')
         processes_data = []
@@ -692,7 +484,7 @@ def cliente_detail(request, pk):
                 'advogado_responsavel': f"{processo.advogado_responsavel.first_name} {processo.advogado_responsavel.last_name}" if processo.advogado_responsavel else '-'
             })
         
-        return JsonResponse({
+        return validadores.aplicar(JsonResponse({
             'success': True,
             'client': {
                 'id': cliente.id,
@@ -709,8 +501,9 @@ def cliente_detail(request, pk):
                 'data_cadastro': cliente.data_cadastro.strftime('%d/%m/%Y'),
             },
             'processes': processes_data
-        })
+        }))
     
+    cliente = get_object_or_404(Cliente, pk=pk)
     return render(request, 'dashboard/cliente_detail.html', {
         'cliente': cliente
     })
@@ -994,7 +787,7 @@ def payment_edit_view(request, client_pk, payment_pk):
     if request.method == 'POST':
         form = ReceitaForm(request.POST, instance=receita)
         if form.is_valid():
-            form.save()
+            salvar_receita(form)
             messages.success(request, 'Pagamento atualizado com sucesso!')
             return redirect('dashboard:client_financial', pk=client_pk)
     else:
@@ -1027,7 +820,14 @@ def payment_delete_view(request, client_pk, payment_pk):
 @login_required
 def get_dashboard_data(request):
     """API endpoint para dados do dashboard"""
-    periodo = int(request.GET.get('periodo', 30))
+    try:
+        periodo = int(request.GET.get('periodo', 30))
+    except ValueError:
+        periodo = 30
+    # O início do período muda com a data: entra no escopo do validador
+    validadores = Validadores(request, Processo, Receita, Despesa, escopo=timezone.localdate())
+    if (nao_modificado := validadores.resposta_nao_modificada()):
+        return nao_modificado
     data_inicio = timezone.now() - timedelta(days=periodo)
     
     # Dados para gráficos
@@ -1045,7 +845,15 @@ def get_dashboard_data(request):
         }
     }
     
-    return JsonResponse(data)
+    return validadores.aplicar(JsonResponse(data))
+
+@login_required
+def fluxo_caixa_data(request):
+    """API endpoint com a projeção de fluxo de caixa (semanal ou mensal)"""
+    granularidade = request.GET.get('granularidade', 'semanal')
+    if granularidade not in ('semanal', 'mensal'):
+        granularidade = 'semanal'
+    return JsonResponse(projecao_fluxo_caixa(granularidade))
 
 @login_required 
 def calendar_events(request):
@@ -1166,33 +974,6 @@ def audiencia_delete(request, pk):
     return render(request, 'dashboard/audiencia_confirm_delete.html', {'audiencia': audiencia})
 
 
-@login_required
-def activate_client_area(request, pk):
-    """Ativar área do cliente"""
-    cliente = get_object_or_404(Cliente, pk=pk)
-    
-    if request.method == 'POST':
-        # Gerar senha aleatória
-        import random
-        import string
-        senha = ''.join(random.choices(string.ascii_letters + string.digits, k=12))
-        
-        # Atualizar cliente
-        cliente.area_cliente_ativa = True
-        cliente.senha_area_cliente = senha  # Em produção, isso deve ser hasheado
-        cliente.save()
-        
-        # Criar atividade recente
-        AtividadeRecente.objects.create(
-            tipo='cliente_area_ativada',
-            descricao=f'Área do cliente ativada para: {cliente.nome}',
-            usuario=request.user,
-            cliente=cliente
-        )
-        
-        messages.success(request, 'Área do cliente ativada com sucesso!')
-        return redirect('dashboard:client_edit', pk=cliente.pk)
-    
 # Views para Receitas
 from django.core.paginator import Paginator
 
@@ -1249,17 +1030,44 @@ def receita_list(request):
         'page_size': page_size,
         'clientes': clientes,
         'tipos_receita': tipos_receita,
+        'acoes_lote': lote.ACOES_RECEITAS,
     })
 
+def rateio_valido(form, formset):
+    """O formset de rateio só é validado quando o rateio está ativo na receita"""
+    return not form.cleaned_data.get('rateio_ativo') or formset.is_valid()
+
+def erros_rateio(formset):
+    """Erros do formset de rateio como em form.errors, pelo nome do campo no formulário HTML"""
+    erros = {}
+    if formset.non_form_errors():
+        erros['rateio'] = formset.non_form_errors()
+    for rateio_form in formset.forms:
+        for campo, lista in rateio_form.errors.items():
+            erros[rateio_form.prefix if campo == NON_FIELD_ERRORS else rateio_form.add_prefix(campo)] = lista
+    return erros
+
+def salvar_receita(form, formset=None):
+    """Salva a receita e suas participações de rateio na mesma transação"""
+    with transaction.atomic():
+        receita = form.save()
+        if receita.rateio_ativo and formset is not None:
+            formset.instance = receita
+            formset.save()
+        elif not receita.rateio_ativo:
+            receita.participacoes.all().delete()
+    return receita
+
 @login_required
 def receita_create(request):
     """Criar nova receita"""
     if request.method == 'POST':
+        form = ReceitaForm(request.POST)
+        formset = RateioParticipacaoFormSet(request.POST, instance=form.instance, prefix='rateio')
         # Check if it's an AJAX request
         if request.headers.get('X-Requested-With') == 'XMLHttpRequest' or 'application/json' in request.META.get('HTTP_ACCEPT', ''):
-            form = ReceitaForm(request.POST)
-            if form.is_valid():
-                receita = form.save()
+            if form.is_valid() and rateio_valido(form, formset):
+                receita = salvar_receita(form, formset)
                 
                 # Criar atividade recente
                 AtividadeRecente.objects.create(
@@ -1275,22 +1083,26 @@ def receita_create(request):
                     'message': 'Receita cadastrada com sucesso!'
                 })
             else:
+                errors = dict(form.errors)
+                if form.is_valid() and form.cleaned_data.get('rateio_ativo'):
+                    errors.update(erros_rateio(formset))
                 return JsonResponse({
                     'success': False,
-                    'errors': form.errors
+                    'errors': errors
                 })
         else:
             # Regular form submission
-            form = ReceitaForm(request.POST)
-            if form.is_valid():
-                receita = form.save()
+            if form.is_valid() and rateio_valido(form, formset):
+                salvar_receita(form, formset)
                 messages.success(request, 'Receita cadastrada com sucesso!')
                 return redirect('dashboard:receitas')
     else:
         form = ReceitaForm()
+        formset = RateioParticipacaoFormSet(instance=form.instance, prefix='rateio')
     
     return render(request, 'dashboard/receita_form.html', {
         'form': form,
+        'rateio_formset': formset,
     })
 
 @login_required
@@ -1300,15 +1112,18 @@ def receita_update(request, pk):
     
     if request.method == 'POST':
         form = ReceitaForm(request.POST, instance=receita)
-        if form.is_valid():
-            form.save()
+        formset = RateioParticipacaoFormSet(request.POST, instance=receita, prefix='rateio')
+        if form.is_valid() and rateio_valido(form, formset):
+            salvar_receita(form, formset)
             messages.success(request, 'Receita atualizada com sucesso!')
             return redirect('dashboard:receitas')
     else:
         form = ReceitaForm(instance=receita)
+        formset = RateioParticipacaoFormSet(instance=receita, prefix='rateio')
     
     return render(request, 'dashboard/receita_form.html', {
         'form': form,
+        'rateio_formset': formset,
     })
 
 @login_required
@@ -1406,13 +1221,207 @@ def receita_pay(request, pk):
 @login_required
 def receita_detail(request, pk):
     """Detalhes da receita"""
-    receita = get_object_or_404(Receita, pk=pk)
+    receita = get_object_or_404(
+        Receita.objects.prefetch_related('participacoes__advogado'), pk=pk
+    )
     
     return render(request, 'dashboard/receita_detail.html', {
         'receita': receita,
     })
     return redirect('dashboard:client_edit', pk=cliente.pk)
 
+@login_required
+def relatorio_comissoes_view(request):
+    """Relatório de honorários faturados e recebidos por advogado no mês"""
+    hoje = timezone.now().date()
+    try:
+        inicio_mes = datetime.strptime(request.GET.get('mes', ''), '%Y-%m').date()
+    except ValueError:
+        inicio_mes = hoje.replace(day=1)
+    fim_mes = (inicio_mes.replace(day=28) + timedelta(days=4)).replace(day=1) - timedelta(days=1)
+
+    comissoes = relatorio_comissoes(inicio_mes, fim_mes)
+
+    return render(request, 'dashboard/relatorio_comissoes.html', {
+        'comissoes': comissoes,
+        'mes': inicio_mes,
+        'total_faturado': sum((c['faturado'] for c in comissoes), Decimal('0.00')),
+        'total_recebido': sum((c['recebido'] for c in comissoes), Decimal('0.00')),
+    })
+
+@login_required
+def relatorio_aging_view(request):
+    """Relatório de aging das receitas em aberto por faixa de atraso"""
+    agrupar_por = request.GET.get('agrupar', 'cliente')
+    if agrupar_por not in DIMENSOES:
+        agrupar_por = 'cliente'
+
+    linhas = relatorio_aging(agrupar_por)
+    totais = [
+        sum((linha['faixas'][indice][1] for linha in linhas), Decimal('0.00'))
+        for indice in range(len(FAIXAS))
+    ]
+
+    if request.GET.get('formato') == 'csv':
+        response = HttpResponse(content_type='text/csv; charset=utf-8')
+        response['Content-Disposition'] = f'attachment; filename="aging_{agrupar_por}.csv"'
+        writer = csv.writer(response, delimiter=';')
+        writer.writerow([agrupar_por.capitalize()] + [rotulo for _, rotulo in FAIXAS] + ['Total'])
+        for linha in linhas:
+            writer.writerow([linha['nome']] + [valor for _, valor in linha['faixas']] + [linha['total']])
+        return response
+
+    return render(request, 'dashboard/relatorio_aging.html', {
+        'linhas': linhas,
+        'faixas': FAIXAS,
+        'totais': totais,
+        'total_geral': sum(totais, Decimal('0.00')),
+        'agrupar_por': agrupar_por,
+    })
+
+@login_required
+def relatorio_aging_detalhe_view(request, agrupar_por):
+    """Receitas em aberto que compõem uma linha (e opcionalmente uma faixa) do aging"""
+    if agrupar_por not in DIMENSOES:
+        return redirect('dashboard:relatorio_aging')
+
+    valor = request.GET.get('id') or None
+    if valor is not None:
+        try:
+            valor = int(valor)
+        except ValueError:
+            raise Http404('Linha do aging não encontrada')
+    faixa = request.GET.get('faixa')
+    if faixa not in dict(FAIXAS):
+        faixa = None
+
+    receitas = detalhe_aging(agrupar_por, valor, faixa)
+
+    if request.GET.get('formato') == 'csv':
+        response = HttpResponse(content_type='text/csv; charset=utf-8')
+        response['Content-Disposition'] = f'attachment; filename="aging_{agrupar_por}_detalhe.csv"'
+        writer = csv.writer(response, delimiter=';')
+        writer.writerow(['Receita', 'Cliente', 'Advogado', 'Tipo', 'Vencimento', 'Saldo'])
+        for receita in receitas.iterator(chunk_size=2000):
+            writer.writerow([
+                receita.descricao,
+                receita.cliente.nome,
+                receita.advogado.username if receita.advogado else '',
+                receita.tipo.nome,
+                receita.data_vencimento.strftime('%d/%m/%Y'),
+                receita.saldo.quantize(CENTAVO),
+            ])
+        return response
+
+    paginator = Paginator(receitas, 50)
+    page_obj = paginator.get_page(request.GET.get('page'))
+
+    return render(request, 'dashboard/relatorio_aging_detalhe.html', {
+        'page_obj': page_obj,
+        'agrupar_por': agrupar_por,
+        'valor': valor or '',
+        'faixa': faixa or '',
+        'faixa_rotulo': dict(FAIXAS).get(faixa, 'Todas as faixas'),
+    })
+
+def resumo_cadastro(origem, registro):
+    """Campos comuns de Cliente e finance.Client para a tela de revisão de duplicidades"""
+    if registro is None:
+        return None
+    if origem == 'cliente':
+        return {
+            'origem': 'Cliente',
+            'nome': registro.nome,
+            'documento': registro.cpf_cnpj,
+            'email': registro.email,
+            'telefone': registro.telefone,
+            'cidade': registro.cidade,
+            'nome_mae': registro.nome_mae,
+            'processos': registro.numero_processos,
+        }
+    return {
+        'origem': 'Financeiro',
+        'nome': registro.name,
+        'documento': registro.cpf,
+        'email': registro.email,
+        'telefone': registro.phone,
+        'cidade': registro.city,
+        'nome_mae': registro.mother_name,
+        'processos': None,
+    }
+
+
+@login_required
+def cliente_duplicados(request):
+    """Fila de revisão de clientes possivelmente duplicados"""
+    status = request.GET.get('status', 'pendente')
+    if status not in dict(DuplicidadeCliente.STATUS_CHOICES):
+        status = 'pendente'
+
+    duplicidades = DuplicidadeCliente.objects.filter(status=status).select_related('revisado_por')
+    paginator = Paginator(duplicidades, 25)
+    page_obj = paginator.get_page(request.GET.get('page'))
+
+    # Os cadastros da página são carregados com uma consulta por origem
+    ids = {'cliente': set(), 'financeiro': set()}
+    for duplicidade in page_obj:
+        ids[duplicidade.origem_a].add(duplicidade.id_a)
+        ids[duplicidade.origem_b].add(duplicidade.id_b)
+    registros = {
+        'cliente': Cliente.objects.in_bulk(ids['cliente']),
+        'financeiro': Client.objects.in_bulk(ids['financeiro']),
+    }
+
+    pares = []
+    for duplicidade in page_obj:
+        pares.append({
+            'duplicidade': duplicidade,
+            'a': resumo_cadastro(duplicidade.origem_a, registros[duplicidade.origem_a].get(duplicidade.id_a)),
+            'b': resumo_cadastro(duplicidade.origem_b, registros[duplicidade.origem_b].get(duplicidade.id_b)),
+        })
+
+    return render(request, 'dashboard/cliente_duplicados.html', {
+        'page_obj': page_obj,
+        'pares': pares,
+        'status': status,
+        'status_choices': DuplicidadeCliente.STATUS_CHOICES,
+    })
+
+
+@login_required
+def cliente_duplicados_detectar(request):
+    """Agenda a detecção de duplicidades para o worker (não roda na requisição)"""
+    if request.method == 'POST':
+        job = fila.enfileirar('clientes.detectar_duplicidades', chave='clientes.detectar_duplicidades')
+        messages.info(request, f'Detecção de duplicidades agendada (job #{job.pk}). A fila será atualizada ao término.')
+    return redirect('dashboard:cliente_duplicados')
+
+
+@login_required
+def cliente_duplicado_resolver(request, pk):
+    """Mescla ou descarta um par da fila de duplicidades"""
+    duplicidade = get_object_or_404(DuplicidadeCliente, pk=pk, status='pendente')
+    if request.method != 'POST':
+        return redirect('dashboard:cliente_duplicados')
+
+    acao = request.POST.get('acao')
+    if acao not in ('mesclar', 'descartar'):
+        messages.error(request, 'Ação inválida.')
+        return redirect('dashboard:cliente_duplicados')
+
+    try:
+        resolver_duplicidade(duplicidade, acao, request.user, manter=request.POST.get('manter', 'a'))
+    except (Cliente.DoesNotExist, Client.DoesNotExist):
+        DuplicidadeCliente.objects.filter(pk=pk).update(status='descartado', data_revisao=timezone.now())
+        messages.warning(request, 'Um dos cadastros já foi removido; o par foi descartado.')
+        return redirect('dashboard:cliente_duplicados')
+
+    if acao == 'mesclar':
+        messages.success(request, 'Cadastros mesclados com sucesso!')
+    else:
+        messages.success(request, 'Par descartado.')
+    return redirect('dashboard:cliente_duplicados')
+
 # Views para TipoReceita
 @login_required
 def tipo_receita_list(request):
@@ -1776,6 +1785,9 @@ def tipo_demanda_delete(request, pk):
 @login_required
 def client_processes(request, pk):
     """API endpoint para buscar processos de um cliente"""
+    validadores = Validadores(request, Cliente, Processo, Lawyer)
+    if (nao_modificado := validadores.resposta_nao_modificada()):
+        return nao_modificado
     cliente = get_object_or_404(Cliente, pk=pk)
     processos = Processo.objects.filter(cliente=cliente).select_related('advogado_responsavel')
     
@@ -1790,25 +1802,28 @@ def client_processes(request, pk):
             'advogado_responsavel': f"{processo.advogado_responsavel.first_name} {processo.advogado_responsavel.last_name}" if processo.advogado_responsavel else '-'
         })
     
-    return JsonResponse({
+    return validadores.aplicar(JsonResponse({
         'processes': processes_data,
         'client_name': cliente.nome
-    })
+    }))
 
 @login_required
 def get_payment_options(request):
     """Get payment form options for AJAX requests"""
+    validadores = Validadores(request, TipoReceita, FormaPagamento, Banco)
+    if (nao_modificado := validadores.resposta_nao_modificada()):
+        return nao_modificado
     try:
         tipos_receita = TipoReceita.objects.all()
         formas_pagamento = FormaPagamento.objects.filter(ativo=True)
         bancos = Banco.objects.filter(ativo=True)
         
-        return JsonResponse({
+        return validadores.aplicar(JsonResponse({
             'success': True,
             'tipos_receita': [{'id': t.id, 'nome': t.nome} for t in tipos_receita],
             'formas_pagamento': [{'id': f.id, 'nome': f.nome} for f in formas_pagamento],
             'bancos': [{'id': b.id, 'nome': b.nome} for b in bancos]
-        })
+        }))
     except Exception as e:
         return JsonResponse({
             'success': False,
@@ -1878,12 +1893,16 @@ def client_edit(request, pk):
 @login_required
 def client_financial(request, pk):
     """Retornar informações financeiras do cliente via AJAX"""
-    cliente = get_object_or_404(Cliente, pk=pk)
-    
     if request.headers.get('X-Requested-With') == 'XMLHttpRequest':
+        validadores = Validadores(request, Cliente, Receita, Processo, FormaPagamento)
+        if (nao_modificado := validadores.resposta_nao_modificada()):
+            return nao_modificado
+        cliente = get_object_or_404(Cliente, pk=pk)
         try:
             # Buscar receitas do cliente
-            receitas = Receita.objects.filter(cliente=cliente).order_by('-data_vencimento')
+            receitas = Receita.objects.filter(cliente=cliente).select_related(
+                'processo', 'forma_pagamento'
+            ).order_by('-data_vencimento')
             
             # Calcular totais considerando pagamentos parciais
             total_receitas = receitas.aggregate(total=Sum('valor_total'))['total'] or Decimal('0.00')
@@ -1929,14 +1948,14 @@ def client_financial(request, pk):
                     'forma_pagamento': receita.forma_pagamento.nome if receita.forma_pagamento else '-'
                 })
             
-            return JsonResponse({
+            return validadores.aplicar(JsonResponse({
                 'success': True,
                 'cliente': cliente.nome,
                 'total_receitas': f"{total_receitas:,.2f}".replace(',', 'X').replace('.', ',').replace('X', '.'),
                 'total_recebido': f"{total_recebido:,.2f}".replace(',', 'X').replace('.', ',').replace('X', '.'),
                 'total_restante': f"{total_restante:,.2f}".replace(',', 'X').replace('.', ',').replace('X', '.'),
                 'receitas': receitas_data
-            })
+            }))
         except Exception as e:
             return JsonResponse({
                 'success': False,
@@ -2032,53 +2051,156 @@ def add_partial_payment(request, receita_pk):
     
     return JsonResponse({'success': False, 'message': 'Método não permitido'})
 
-@login_required 
+@login_required
 def activate_client_area(request, pk):
-    """Ativar área do cliente e gerar senha"""
+    """Ativar área do cliente e gerar senha (a senha só é exibida nesta resposta)"""
     cliente = get_object_or_404(Cliente, pk=pk)
-    
-    if request.method == 'POST' and request.headers.get('X-Requested-With') == 'XMLHttpRequest':
-        try:
-            import secrets
-            import string
-            
-            # Gerar senha aleatória
-            alphabet = string.ascii_letters + string.digits
-            password = ''.join(secrets.choice(alphabet) for i in range(8))
-            
-            # Ativar área do cliente
-            cliente.area_cliente_ativa = True
-            cliente.senha_area_cliente = password  # Assumindo que este campo existe
-            cliente.save()
-            
-            # Criar atividade recente
-            AtividadeRecente.objects.create(
-                tipo='area_cliente_ativada',
-                descricao=f'Área do cliente ativada: {cliente.nome}',
-                usuario=request.user,
-                cliente=cliente
-            )
-            
-            return JsonResponse({
-                'success': True,
-                'cpf': cliente.cpf_cnpj,
-                'password': password,
-                'message': 'Área do cliente ativada com sucesso!'
-            })
-        except Exception as e:
+    ajax = request.headers.get('X-Requested-With') == 'XMLHttpRequest'
+
+    if request.method != 'POST':
+        if ajax:
+            return JsonResponse({'success': False, 'message': 'Método não permitido'})
+        return redirect('dashboard:client_edit', pk=cliente.pk)
+
+    try:
+        import secrets
+        import string
+
+        # Gerar senha aleatória; só o hash é gravado
+        alphabet = string.ascii_letters + string.digits
+        password = ''.join(secrets.choice(alphabet) for i in range(8))
+
+        cliente.area_cliente_ativa = True
+        cliente.definir_senha_area_cliente(password)
+        cliente.save()
+
+        # Criar atividade recente
+        AtividadeRecente.objects.create(
+            tipo='area_cliente_ativada',
+            descricao=f'Área do cliente ativada: {cliente.nome}',
+            usuario=request.user,
+            cliente=cliente
+        )
+    except Exception as e:
+        if ajax:
             return JsonResponse({
                 'success': False,
                 'message': f'Erro ao ativar área do cliente: {str(e)}'
             })
-    
-    return JsonResponse({'success': False, 'message': 'Método não permitido'})
+        messages.error(request, f'Erro ao ativar área do cliente: {str(e)}')
+        return redirect('dashboard:client_edit', pk=cliente.pk)
+
+    if ajax:
+        return JsonResponse({
+            'success': True,
+            'cpf': cliente.cpf_cnpj,
+            'password': password,
+            'message': 'Área do cliente ativada com sucesso!'
+        })
+    messages.success(request, f'Área do cliente ativada. Login: {cliente.cpf_cnpj} - senha: {password}')
+    return redirect('dashboard:client_edit', pk=cliente.pk)
+
+
+# Área do cliente (portal somente leitura, fora do login dos advogados)
+
+def area_cliente_login(request):
+    """Login do cliente com CPF/CNPJ e a senha gerada na ativação da área"""
+    erro = None
+    if request.method == 'POST':
+        documento = request.POST.get('cpf_cnpj', '').strip()
+        senha = request.POST.get('senha', '')
+        # O mesmo documento pode ser cliente de mais de um escritório: vale o cadastro cuja senha confere
+        candidatos = list(Cliente.objects.filter(cpf_cnpj=documento, area_cliente_ativa=True).only(
+            'pk', 'nome', 'area_cliente_ativa', 'senha_area_cliente', 'escritorio'
+        ))
+        cliente = next((candidato for candidato in candidatos if candidato.verificar_senha_area_cliente(senha)), None)
+        if cliente is not None:
+            request.session.cycle_key()
+            request.session['area_cliente_id'] = cliente.pk
+            request.session['area_cliente_chave'] = extratos.chave_acesso(True, cliente.senha_area_cliente)
+            return redirect('dashboard:area_cliente')
+        if not candidatos:
+            # Mesmo custo de hash para documentos inexistentes
+            make_password(senha)
+        erro = 'CPF/CNPJ ou senha inválidos.'
+    return render(request, 'dashboard/area_cliente/login.html', {'erro': erro})
+
+
+def area_cliente(request):
+    """Extrato do cliente: uma leitura do extrato pré-calculado, que também valida a sessão"""
+    cliente_id = request.session.get('area_cliente_id')
+    extrato = extratos.ler(cliente_id) if cliente_id else None
+    if extrato is None or not extrato[1] or not constant_time_compare(extrato[1], request.session.get('area_cliente_chave', '')):
+        # Senha trocada ou área desativada depois do login
+        request.session.pop('area_cliente_id', None)
+        request.session.pop('area_cliente_chave', None)
+        return redirect('dashboard:area_cliente_login')
+    return render(request, 'dashboard/area_cliente/extrato.html', {'extrato': extrato[0], 'hoje': timezone.localdate()})
+
+
+def area_cliente_logout(request):
+    if request.method == 'POST':
+        request.session.pop('area_cliente_id', None)
+        request.session.pop('area_cliente_chave', None)
+    return redirect('dashboard:area_cliente_login')
 
 # Views para Processos
+def inteiro_ou_none(valor):
+    try:
+        return int(valor)
+    except (TypeError, ValueError):
+        return None
+
+
 @login_required
 def processo_list(request):
     """Lista de processos"""
     processos = Processo.objects.all().select_related('cliente', 'advogado_responsavel').order_by('-data_inicio')
-    return render(request, 'dashboard/processo_list.html', {'processos': processos})
+
+    busca = request.GET.get('q', '').strip()
+    if busca:
+        if re.fullmatch(r'[\d.\-/ ]+', busca):
+            # Número do processo: igualdade no índice de numero_normalizado, em qualquer formatação
+            processos = processos.filter(numero_normalizado=cnj.normalizar(busca))
+        else:
+            processos = processos.filter(Q(titulo__icontains=busca) | Q(cliente__nome__icontains=busca))
+
+    filtros = {
+        'cnj_segmento': inteiro_ou_none(request.GET.get('segmento')),
+        'cnj_tribunal': inteiro_ou_none(request.GET.get('tribunal')),
+        'cnj_ano': inteiro_ou_none(request.GET.get('ano')),
+    }
+    processos = processos.filter(**{campo: valor for campo, valor in filtros.items() if valor is not None})
+
+    return render(request, 'dashboard/processo_list.html', {
+        'processos': processos,
+        'busca': busca,
+        'filtros': filtros,
+        'segmentos': cnj.SEGMENTOS.items(),
+        'acoes_lote': lote.ACOES_PROCESSOS,
+    })
+
+
+@login_required
+def relatorio_processos_tribunal(request):
+    """Quantidade de processos por segmento, tribunal e ano (componentes do número CNJ)"""
+    processos = Processo.objects.filter(cnj_segmento__isnull=False)
+    ano = inteiro_ou_none(request.GET.get('ano'))
+    if ano:
+        processos = processos.filter(cnj_ano=ano)
+
+    linhas = processos.values('cnj_segmento', 'cnj_tribunal', 'cnj_ano').annotate(
+        total=Count('id'),
+        ativos=Count('id', filter=Q(status='ativo')),
+    ).order_by('cnj_segmento', 'cnj_tribunal', '-cnj_ano')
+    for linha in linhas:
+        linha['segmento'] = cnj.SEGMENTOS.get(linha['cnj_segmento'], '-')
+
+    return render(request, 'dashboard/relatorio_processos_tribunal.html', {
+        'linhas': linhas,
+        'ano': ano,
+        'sem_cnj': Processo.objects.filter(cnj_segmento__isnull=True).count(),
+    })
 
 @login_required
 def processo_create(request):
@@ -2164,33 +2286,39 @@ def processo_update(request, pk):
 @login_required
 def processo_detail(request, pk):
     """Detalhes do processo"""
-    processo = get_object_or_404(Processo, pk=pk)
-    return render(request, 'dashboard/processo_detail.html', {'processo': processo})
+    # Check if it's an AJAX request
+    if request.headers.get('X-Requested-With') == 'XMLHttpRequest' or 'application/json' in request.META.get('HTTP_ACCEPT', ''):
+        validadores = Validadores(request, Processo)
+        if (nao_modificado := validadores.resposta_nao_modificada()):
+            return nao_modificado
+        processo = get_object_or_404(Processo, pk=pk)
+        return validadores.aplicar(JsonResponse({
+            'success': True,
+            'process': {
+                'id': processo.id,
+                'numero': processo.numero,
+                'titulo': processo.titulo,
+                'descricao': processo.descricao,
+                'status': processo.status,
+                'data_inicio': processo.data_inicio.strftime('%Y-%m-%d'),
+                'data_fim': processo.data_fim.strftime('%Y-%m-%d') if processo.data_fim else None,
+                'valor_causa': float(processo.valor_causa) if processo.valor_causa else None,
+                'tribunal': processo.tribunal,
+                'vara': processo.vara,
+                'cliente_id': processo.cliente_id,
+                'advogado_responsavel_id': processo.advogado_responsavel_id,
+            }
+        }))
 
-@login_required
-def processo_delete(request, pk):
-    """Deletar processo"""
-    processo = get_object_or_404(Processo, pk=pk)
-    
-    if request.method == 'POST':
-        processo.status = 'arquivado'
-        processo.save()
-        
-        # Criar atividade recente
-        AtividadeRecente.objects.create(
-            tipo='processo_arquivado',
-            descricao=f'Processo arquivado: {processo.numero}',
-            usuario=request.user,
-            processo=processo,
-            cliente=processo.cliente
-        )
-        
-        messages.success(request, 'Processo arquivado com sucesso!')
-        return redirect('dashboard:processo_list')
-    
-    return render(request, 'dashboard/confirm_delete.html', {
-        'object': processo,
-        'object_name': 'processo'
+    processo = get_object_or_404(Processo.objects.select_related('cliente', 'advogado_responsavel'), pk=pk)
+    # Inclui o que já foi para o arquivo (dashboard.arquivo)
+    return render(request, 'dashboard/processo_detail.html', {
+        'processo': processo,
+        'audiencias': sorted(arquivo.do_processo(processo, Audiencia), key=lambda item: item.data_hora, reverse=True),
+        'tarefas': sorted(arquivo.do_processo(processo, Task), key=lambda item: item.data_inicio, reverse=True),
+        'publicacoes': sorted(
+            arquivo.do_processo(processo, Publicacao), key=lambda item: item.data_publicacao, reverse=True,
+        ),
     })
 
 # View para audiências que estava faltando 
@@ -2244,3 +2372,409 @@ def audiencia_create(request):
         form = AudienciaForm()
     
     return render(request, 'dashboard/audiencia_form.html', {'form': form})
+
+
+# Views para Publicações
+
+@login_required
+def publicacao_list(request):
+    """Caixa de entrada de publicações, com busca de texto completo e triagem em lote"""
+    situacao = request.GET.get('situacao', 'nao_lidas')
+    responsavel = request.GET.get('responsavel', '')
+    termos = request.GET.get('q', '').strip()
+
+    # O conteúdo completo não é carregado na listagem, só o início dele
+    publicacoes = Publicacao.objects.select_related(
+        'processo', 'processo__cliente', 'responsavel'
+    ).defer('conteudo').annotate(resumo=Substr('conteudo', 1, 300)).order_by('-data_publicacao', '-id')
+    if situacao == 'nao_lidas':
+        publicacoes = publicacoes.filter(lida=False)
+    elif situacao == 'lidas':
+        publicacoes = publicacoes.filter(lida=True)
+    if responsavel == 'eu':
+        publicacoes = publicacoes.filter(responsavel=request.user)
+    elif responsavel == 'sem':
+        publicacoes = publicacoes.filter(responsavel__isnull=True)
+    elif inteiro_ou_none(responsavel):
+        publicacoes = publicacoes.filter(responsavel_id=int(responsavel))
+    if termos:
+        publicacoes = busca.filtrar(publicacoes, termos)
+
+    paginator = Paginator(publicacoes, 50)
+    page_obj = paginator.get_page(request.GET.get('page'))
+    destaques = busca.trechos([publicacao.pk for publicacao in page_obj], termos) if termos else {}
+    for publicacao in page_obj:
+        publicacao.trecho = destaques.get(publicacao.pk)
+
+    return render(request, 'dashboard/publicacao_list.html', {
+        'page_obj': page_obj,
+        'situacao': situacao,
+        'responsavel': responsavel,
+        'busca': termos,
+        'nao_lidas': Publicacao.objects.filter(lida=False).count(),
+        'advogados': Lawyer.objects.filter(is_active=True).order_by('first_name', 'username'),
+        'acoes': triagem.ACOES,
+        'prioridades': Task.PRIORIDADE_CHOICES,
+        'alertas': AlertaPublicacao.objects.filter(advogado=request.user),
+        'alerta_form': AlertaPublicacaoForm(),
+    })
+
+
+def dados_lote(request):
+    """
+    (dados, ids) de uma ação em lote enviada em JSON ou formulário; dados é
+    None se o JSON é inválido e ids é None se a lista de ids é inválida.
+    """
+    if request.content_type == 'application/json':
+        try:
+            dados = json.loads(request.body or b'{}')
+        except ValueError:
+            return None, None
+        # Um JSON válido que não é um objeto ([1, 2], "texto") também é inválido aqui
+        if not isinstance(dados, dict):
+            return None, None
+        ids = dados.get('ids') or []
+        if not isinstance(ids, list):
+            return dados, None
+    else:
+        dados = request.POST
+        ids = request.POST.getlist('ids')
+    try:
+        return dados, [int(pk) for pk in ids]
+    except (TypeError, ValueError):
+        return dados, None
+
+
+@login_required
+def publicacao_triagem(request):
+    """
+    Triagem em lote (AJAX): recebe a ação e os ids das publicações, em JSON ou
+    formulário, e aplica a ação com uma única operação sobre o conjunto.
+    """
+    if request.method != 'POST':
+        return JsonResponse({'success': False, 'message': 'Método não permitido.'}, status=405)
+
+    dados, ids = dados_lote(request)
+    if dados is None:
+        return JsonResponse({'success': False, 'message': 'JSON inválido.'}, status=400)
+    if ids is None:
+        return JsonResponse({'success': False, 'message': 'Lista de publicações inválida.'}, status=400)
+
+    acao = dados.get('acao')
+    if acao not in triagem.ACOES or not ids:
+        return JsonResponse({'success': False, 'message': 'Informe uma ação válida e ao menos uma publicação.'}, status=400)
+
+    advogado = None
+    if dados.get('advogado'):
+        advogado = Lawyer.objects.filter(pk=inteiro_ou_none(str(dados['advogado'])), is_active=True).first()
+        if advogado is None:
+            return JsonResponse({'success': False, 'message': 'Advogado não encontrado.'}, status=400)
+
+    if acao == 'marcar_lidas':
+        quantidade = triagem.marcar_lidas(ids)
+    elif acao == 'marcar_nao_lidas':
+        quantidade = triagem.marcar_lidas(ids, lida=False)
+    elif acao == 'atribuir':
+        quantidade = triagem.atribuir(ids, advogado)
+    else:
+        prioridade = dados.get('prioridade') or 'media'
+        if prioridade not in dict(Task.PRIORIDADE_CHOICES):
+            return JsonResponse({'success': False, 'message': 'Prioridade inválida.'}, status=400)
+        dias_uteis = None
+        if acao == 'criar_prazos':
+            dias_uteis = inteiro_ou_none(dados.get('dias'))
+            if not dias_uteis or not 0 < dias_uteis <= 365:
+                return JsonResponse({'success': False, 'message': 'Informe o prazo em dias úteis.'}, status=400)
+        data = parse_date(dados.get('data') or '') if dados.get('data') else None
+        quantidade = len(triagem.criar_tarefas(
+            ids, advogado=advogado, data=data, prioridade=prioridade, dias_uteis=dias_uteis,
+        ))
+        if dias_uteis and quantidade < len(ids):
+            return JsonResponse({
+                'success': True,
+                'quantidade': quantidade,
+                'message': f'{quantidade} tarefa(s) de prazo criada(s); {len(ids) - quantidade} publicação(ões) '
+                           f'fora do calendário forense.',
+            })
+
+    return JsonResponse({
+        'success': True,
+        'quantidade': quantidade,
+        'message': f'{triagem.ACOES[acao]}: {quantidade} publicação(ões).',
+    })
+
+
+@login_required
+def publicacao_alerta_create(request):
+    """Salva um alerta de termos; só as publicações recebidas depois dele geram avisos"""
+    if request.method != 'POST':
+        return redirect('dashboard:publicacao_list')
+    form = AlertaPublicacaoForm(request.POST)
+    if form.is_valid():
+        alerta = form.save(commit=False)
+        alerta.advogado = request.user
+        alerta.ultima_publicacao = Publicacao.objects.aggregate(ultima=Max('id'))['ultima'] or 0
+        alerta.save()
+        messages.success(request, 'Alerta salvo com sucesso!')
+    else:
+        for erros in form.errors.values():
+            for erro in erros:
+                messages.error(request, erro)
+    return redirect('dashboard:publicacao_list')
+
+
+@login_required
+def publicacao_alerta_delete(request, pk):
+    alerta = get_object_or_404(AlertaPublicacao, pk=pk, advogado=request.user)
+    if request.method == 'POST':
+        alerta.delete()
+        messages.success(request, 'Alerta excluído com sucesso!')
+    return redirect('dashboard:publicacao_list')
+
+
+# Views para Prazos
+
+@login_required
+def prazos_calcular(request):
+    """
+    Cálculo de prazos em lote (JSON). Recebe {"itens": [{"data": "aaaa-mm-dd",
+    "dias": 15, "processo": id}, ...]} (ou "calendario" no lugar de "processo")
+    e devolve a data final de cada item, na mesma ordem.
+    """
+    if request.method != 'POST':
+        return JsonResponse({'success': False, 'message': 'Método não permitido.'}, status=405)
+    try:
+        itens = json.loads(request.body or b'{}').get('itens') or []
+    except (ValueError, AttributeError):
+        return JsonResponse({'success': False, 'message': 'JSON inválido.'}, status=400)
+
+    processos = Processo.objects.only('cnj_segmento', 'cnj_tribunal', 'cnj_origem').in_bulk(
+        {inteiro_ou_none(item.get('processo')) for item in itens if isinstance(item, dict)} - {None}
+    )
+    disponiveis = prazos.codigos_disponiveis()
+    entradas = []
+    for posicao, item in enumerate(itens):
+        inicio = parse_date(str(item.get('data') or '')) if isinstance(item, dict) else None
+        dias = inteiro_ou_none(item.get('dias')) if isinstance(item, dict) else None
+        if inicio is None or dias is None or dias < 0:
+            return JsonResponse({'success': False, 'message': f'Item {posicao + 1}: informe data e dias.'}, status=400)
+        processo = processos.get(inteiro_ou_none(item.get('processo')))
+        if processo is not None:
+            codigo = prazos.codigo_do_processo(processo, disponiveis)
+        else:
+            codigo = str(item.get('calendario') or prazos.NACIONAL)
+            codigo = codigo if codigo in disponiveis else prazos.NACIONAL
+        entradas.append((inicio, dias, codigo))
+
+    finais = prazos.calcular_prazos(entradas)
+    return JsonResponse({
+        'success': True,
+        'prazos': [
+            {'data': inicio, 'dias': dias, 'calendario': codigo or 'nacional', 'final': final}
+            for (inicio, dias, codigo), final in zip(entradas, finais)
+        ],
+    })
+
+
+# Views para Jobs
+
+@login_required
+def jobs_status(request):
+    """Situação da fila de jobs em segundo plano (JSON)"""
+    return JsonResponse(fila.situacao())
+
+
+@login_required
+def job_status(request, pk):
+    """Situação de um job, para acompanhar um trabalho enfileirado pela interface"""
+    job = get_object_or_404(tenancy.scoped(Job.objects.all()), pk=pk)
+    return JsonResponse({
+        'id': job.pk,
+        'nome': job.nome,
+        'status': job.status,
+        'tentativas': job.tentativas,
+        'max_tentativas': job.max_tentativas,
+        'executar_em': job.executar_em,
+        'iniciado_em': job.iniciado_em,
+        'concluido_em': job.concluido_em,
+        'resultado': job.resultado,
+        'progresso': {'processados': job.progresso, 'total': job.progresso_total},
+        'erro': job.ultimo_erro.strip().splitlines()[-1] if job.ultimo_erro else None,
+    })
+
+
+
+# Views para Documentos
+
+def resposta_documento(gerado, baixar=False):
+    """Arquivo do documento, aberto no navegador (pronto para imprimir) ou como download"""
+    local = documentos.armazenamento()
+    if not local.exists(gerado.arquivo):
+        raise Http404('Arquivo do documento não encontrado.')
+    return FileResponse(
+        local.open(gerado.arquivo, 'rb'), content_type='text/html; charset=utf-8',
+        filename=gerado.arquivo.rsplit('/', 1)[-1], as_attachment=baixar,
+    )
+
+
+@login_required
+def receita_recibo(request, pk):
+    """Recibo da receita (gerado na hora ou reaproveitado, se os dados não mudaram)"""
+    receita = get_object_or_404(Receita, pk=pk)
+    if not receita.pago and not receita.valor_recebido:
+        messages.error(request, 'O recibo só pode ser emitido para receitas com valor recebido.')
+        return redirect('dashboard:receita_detail', pk=pk)
+    return resposta_documento(documentos.gerar('recibo', receita.pk, request.user))
+
+
+@login_required
+def processo_contrato(request, pk):
+    """Contrato de honorários do processo, com as parcelas cadastradas"""
+    processo = get_object_or_404(Processo, pk=pk)
+    return resposta_documento(documentos.gerar('contrato_honorarios', processo.pk, request.user))
+
+
+@login_required
+def documento_download(request, pk):
+    return resposta_documento(get_object_or_404(DocumentoGerado, pk=pk), baixar=True)
+
+
+@login_required
+def documentos_lote(request):
+    """
+    Agenda a geração em lote (AJAX): `modelo` e `mes` (aaaa-mm) ou `ids`.
+    Retorna o job, acompanhado em jobs/<id>/ (campo progresso).
+    """
+    if request.method != 'POST':
+        return JsonResponse({'success': False, 'message': 'Método não permitido.'}, status=405)
+    modelo = request.POST.get('modelo')
+    mes = request.POST.get('mes') or None
+    try:
+        ids = [int(pk) for pk in request.POST.getlist('ids')]
+        if mes:
+            datetime.strptime(mes, '%Y-%m')
+    except ValueError:
+        return JsonResponse({'success': False, 'message': 'Mês ou lista de ids inválidos.'}, status=400)
+    if modelo not in documentos.DOCUMENTOS or not (mes or ids):
+        return JsonResponse({'success': False, 'message': 'Informe o documento e o mês ou os ids.'}, status=400)
+
+    job = fila.enfileirar(
+        'documentos.gerar_lote', modelo, mes=mes, ids=ids, usuario_id=request.user.pk,
+        chave=f'documentos.gerar_lote:{modelo}:{mes or ",".join(map(str, ids))}',
+    )
+    return JsonResponse({
+        'success': True,
+        'job': job.pk,
+        'status_url': reverse('dashboard:job_status', args=[job.pk]),
+    })
+
+
+# Views para ações em lote
+
+def validar_lote(request, acoes, nome):
+    """
+    Valida a ação em lote enviada (AJAX). Retorna (acao, ids, dados, erro),
+    com erro sendo a resposta a devolver quando a requisição é inválida.
+    """
+    def erro(mensagem, status=400):
+        return None, None, None, JsonResponse({'success': False, 'message': mensagem}, status=status)
+
+    if request.method != 'POST':
+        return erro('Método não permitido.', 405)
+    dados, ids = dados_lote(request)
+    if dados is None:
+        return erro('JSON inválido.')
+    if ids is None:
+        return erro(f'Lista de {nome} inválida.')
+    acao = dados.get('acao')
+    if acao not in acoes or not ids:
+        return erro(f'Informe uma ação válida e ao menos um item em {nome}.')
+    return acao, ids, dados, None
+
+
+@login_required
+def receita_lote(request):
+    """Quita as receitas selecionadas (valor integral) com uma única operação"""
+    acao, ids, dados, erro = validar_lote(request, lote.ACOES_RECEITAS, 'receitas')
+    if erro:
+        return erro
+    data_recebimento = None
+    if dados.get('data_recebimento'):
+        data_recebimento = parse_date(dados['data_recebimento'])
+        if data_recebimento is None:
+            return JsonResponse({'success': False, 'message': 'Data de recebimento inválida.'}, status=400)
+    forma_pagamento = banco = None
+    if dados.get('forma_pagamento'):
+        forma_pagamento = FormaPagamento.objects.filter(pk=inteiro_ou_none(str(dados['forma_pagamento']))).first()
+    if dados.get('banco'):
+        banco = Banco.objects.filter(pk=inteiro_ou_none(str(dados['banco']))).first()
+
+    quantidade, valor = lote.quitar_receitas(
+        ids, request.user, data_recebimento=data_recebimento, forma_pagamento=forma_pagamento, banco=banco,
+    )
+    return JsonResponse({
+        'success': True,
+        'quantidade': quantidade,
+        'message': f'{quantidade} receita(s) quitada(s), total de R$ {valor:,.2f}.',
+    })
+
+
+@login_required
+def processo_lote(request):
+    """Altera o status dos processos selecionados"""
+    acao, ids, dados, erro = validar_lote(request, lote.ACOES_PROCESSOS, 'processos')
+    if erro:
+        return erro
+    quantidade = lote.alterar_status_processos(ids, acao, request.user)
+    return JsonResponse({
+        'success': True,
+        'quantidade': quantidade,
+        'message': f'{lote.ACOES_PROCESSOS[acao]}: {quantidade} processo(s).',
+    })
+
+
+@login_required
+def task_lote(request):
+    """Altera o status das tarefas selecionadas"""
+    acao, ids, dados, erro = validar_lote(request, lote.ACOES_TAREFAS, 'tarefas')
+    if erro:
+        return erro
+    quantidade = lote.alterar_status_tarefas(ids, acao, request.user)
+    return JsonResponse({
+        'success': True,
+        'quantidade': quantidade,
+        'message': f'{lote.ACOES_TAREFAS[acao]}: {quantidade} tarefa(s).',
+    })
+
+
+@login_required
+def cliente_lote(request):
+    """Desativa os clientes selecionados"""
+    acao, ids, dados, erro = validar_lote(request, lote.ACOES_CLIENTES, 'clientes')
+    if erro:
+        return erro
+    quantidade = lote.desativar_clientes(ids, request.user)
+    return JsonResponse({
+        'success': True,
+        'quantidade': quantidade,
+        'message': f'{quantidade} cliente(s) desativado(s).',
+    })
+
+
+# Histórico de alterações
+
+@login_required
+def historico_objeto(request, modelo, pk):
+    """Alterações de um cliente, processo ou receita, da mais recente para a mais antiga"""
+    if modelo not in historico.MODELOS:
+        raise Http404('Modelo sem histórico.')
+    classe = historico.MODELOS[modelo]
+    page_obj = Paginator(historico.consulta(classe, pk), 50).get_page(request.GET.get('page'))
+    return render(request, 'dashboard/historico.html', {
+        # None se o objeto foi excluído: o histórico continua disponível
+        'objeto': classe._default_manager.filter(pk=pk).first(),
+        'modelo': classe._meta.verbose_name,
+        'objeto_id': pk,
+        'page_obj': page_obj,
+        'alteracoes': list(historico.entradas(classe, page_obj)),
+    })
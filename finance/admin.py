@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Category, Transaction, Client, FinancialCase, Payment
+from .models import Category, Transaction, MonthlyTransactionSummary, Client, FinancialCase, Payment
 
 @admin.register(Category)
 class CategoryAdmin(admin.ModelAdmin):
@@ -11,6 +11,18 @@ class TransactionAdmin(admin.ModelAdmin):
     list_filter = ('lawyer', 'type', 'category', 'date')
     search_fields = ('title', 'description')
 
+@admin.register(MonthlyTransactionSummary)
+class MonthlyTransactionSummaryAdmin(admin.ModelAdmin):
+    list_display = ('month', 'lawyer', 'category', 'income', 'expense', 'transaction_count')
+    list_filter = ('lawyer', 'category')
+    date_hierarchy = 'month'
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
 @admin.register(Client)
 class ClientAdmin(admin.ModelAdmin):
     list_display = ('name', 'email', 'phone')
@@ -21,13 +33,41 @@ class PaymentInline(admin.TabularInline):
     extra = 1
     readonly_fields = ('payment_date',)
 
+class BalanceDueFilter(admin.SimpleListFilter):
+    title = 'saldo'
+    parameter_name = 'balance'
+
+    def lookups(self, request, model_admin):
+        return (
+            ('due', 'Com saldo a receber'),
+            ('settled', 'Quitado'),
+        )
+
+    def queryset(self, request, queryset):
+        if self.value() == 'due':
+            return queryset.filter(balance_due__gt=0)
+        if self.value() == 'settled':
+            return queryset.filter(balance_due__lte=0)
+        return queryset
+
 @admin.register(FinancialCase)
 class FinancialCaseAdmin(admin.ModelAdmin):
     list_display = ('case_name', 'client', 'total_amount', 'amount_paid', 'remaining_balance', 'status', 'creation_date')
-    list_filter = ('status', 'client')
+    list_filter = ('status', BalanceDueFilter, 'client')
+    list_select_related = ('client',)
     search_fields = ('case_name', 'client__name')
+    readonly_fields = ('amount_paid',)
     inlines = [PaymentInline]
 
+    @admin.display(description='Saldo Restante', ordering='balance_due')
+    def remaining_balance(self, obj):
+        return obj.balance_due
+
+    def save_related(self, request, form, formsets, change):
+        super().save_related(request, form, formsets, change)
+        # total_amount may have changed without any payment being touched
+        FinancialCase.objects.filter(pk=form.instance.pk).reconcile()
+
 @admin.register(Payment)
 class PaymentAdmin(admin.ModelAdmin):
     list_display = ('case', 'amount', 'payment_date', 'payment_method')
@@ -0,0 +1,15 @@
+"""Background jobs of the finance app, run by the runworker command"""
+from datetime import timedelta
+from io import StringIO
+
+from django.core.management import call_command
+
+from dashboard.fila import job
+
+
+@job('finance.reconcile_cases', intervalo=timedelta(days=1))
+def reconcile_financial_cases():
+    """Repairs amount_paid/status drift in batches, like the management command"""
+    output = StringIO()
+    call_command('reconcile_financial_cases', stdout=output)
+    return output.getvalue().strip()
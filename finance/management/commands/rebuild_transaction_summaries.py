@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from finance.reports import rebuild_monthly_summaries
+
+
+class Command(BaseCommand):
+    help = 'Reconstrói o resumo mensal de transações por advogado e categoria'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--lawyer', type=int, action='append', dest='lawyers',
+                            help='Reconstrói apenas o advogado informado (pode ser repetido)')
+
+    def handle(self, *args, **options):
+        total = rebuild_monthly_summaries(options['lawyers'])
+        self.stdout.write(self.style.SUCCESS(f'{total} linhas de resumo mensal geradas.'))
@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from finance.models import FinancialCase, paid_total
+
+
+class Command(BaseCommand):
+    help = 'Recalcula amount_paid e status dos casos financeiros a partir dos pagamentos'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000, help='Casos por transação')
+        parser.add_argument('--dry-run', action='store_true', help='Apenas informa os casos divergentes')
+
+    def handle(self, *args, **options):
+        drifted = FinancialCase.objects.annotate(paid=paid_total()).exclude(amount_paid=paid_total())
+        self.stdout.write(f'{drifted.count()} casos com amount_paid divergente.')
+        if options['dry_run']:
+            return
+
+        batch_size = options['batch_size']
+        cases = FinancialCase.objects.order_by('pk').values_list('pk', flat=True)
+        total = 0
+        last_pk = 0
+        while True:
+            ids = list(cases.filter(pk__gt=last_pk)[:batch_size])
+            if not ids:
+                break
+            with transaction.atomic():
+                total += FinancialCase.objects.filter(pk__in=ids).reconcile()
+            last_pk = ids[-1]
+
+        self.stdout.write(self.style.SUCCESS(f'{total} casos reconciliados.'))
@@ -0,0 +1,24 @@
+# Generated by Django 5.2.5 on 2026-10-19 12:01
+
+import django.db.models.expressions
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('finance', '0006_financialcase_lawyer'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='financialcase',
+            index=models.Index(models.ExpressionWrapper(django.db.models.expressions.CombinedExpression(models.F('total_amount'), '-', models.F('amount_paid')), output_field=models.DecimalField(decimal_places=2, max_digits=10)), name='financialcase_balance_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='financialcase',
+            index=models.Index(fields=['status', 'creation_date'], name='financialcase_status_idx'),
+        ),
+    ]
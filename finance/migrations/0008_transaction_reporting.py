@@ -0,0 +1,48 @@
+# Generated by Django 5.2.5 on 2026-10-19 12:02
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('finance', '0007_financialcase_balance'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MonthlyTransactionSummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('month', models.DateField()),
+                ('income', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('expense', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('transaction_count', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'verbose_name': 'Resumo Mensal de Transações',
+                'verbose_name_plural': 'Resumos Mensais de Transações',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='transaction',
+            index=models.Index(fields=['lawyer', 'date'], name='transaction_lawyer_date_idx'),
+        ),
+        migrations.AddField(
+            model_name='monthlytransactionsummary',
+            name='category',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to='finance.category'),
+        ),
+        migrations.AddField(
+            model_name='monthlytransactionsummary',
+            name='lawyer',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='monthly_transaction_summaries', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddIndex(
+            model_name='monthlytransactionsummary',
+            index=models.Index(fields=['lawyer', 'month'], name='monthly_summary_lawyer_idx'),
+        ),
+    ]
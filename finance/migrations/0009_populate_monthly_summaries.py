@@ -0,0 +1,50 @@
+from decimal import Decimal
+
+from django.db import migrations
+from django.db.models import Count, DecimalField, Q, Sum, Value
+from django.db.models.functions import Coalesce, TruncMonth
+
+AMOUNT = DecimalField(max_digits=14, decimal_places=2)
+ZERO = Decimal('0.00')
+
+
+def populate_monthly_summaries(apps, schema_editor):
+    """Builds the monthly summary from the existing transactions, one lawyer at a time"""
+    Transaction = apps.get_model('finance', 'Transaction')
+    MonthlyTransactionSummary = apps.get_model('finance', 'MonthlyTransactionSummary')
+
+    lawyer_ids = Transaction.objects.order_by().values_list('lawyer_id', flat=True).distinct()
+    for lawyer_id in list(lawyer_ids):
+        rows = Transaction.objects.filter(lawyer_id=lawyer_id).annotate(
+            month=TruncMonth('date')
+        ).values('month', 'category').annotate(
+            income=Coalesce(Sum('amount', filter=Q(type='INCOME')), Value(ZERO), output_field=AMOUNT),
+            expense=Coalesce(Sum('amount', filter=Q(type='EXPENSE')), Value(ZERO), output_field=AMOUNT),
+            transactions=Count('id'),
+        ).order_by()
+        MonthlyTransactionSummary.objects.bulk_create([
+            MonthlyTransactionSummary(
+                lawyer_id=lawyer_id,
+                month=row['month'],
+                category_id=row['category'],
+                income=row['income'],
+                expense=row['expense'],
+                transaction_count=row['transactions'],
+            )
+            for row in rows
+        ], batch_size=1000)
+
+
+def clear_monthly_summaries(apps, schema_editor):
+    apps.get_model('finance', 'MonthlyTransactionSummary').objects.all().delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('finance', '0008_transaction_reporting'),
+    ]
+
+    operations = [
+        migrations.RunPython(populate_monthly_summaries, clear_monthly_summaries),
+    ]
@@ -0,0 +1,88 @@
+# Generated by Django 5.2.5 on 2026-10-19 13:37
+
+import django.db.models.deletion
+import django.db.models.expressions
+from django.conf import settings
+from django.db import migrations, models
+
+
+# default=1: the escritorio created in users.0004, owner of all existing rows
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('finance', '0009_populate_monthly_summaries'),
+        ('users', '0004_escritorio'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='financialcase',
+            name='financialcase_balance_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='financialcase',
+            name='financialcase_status_idx',
+        ),
+        migrations.AddField(
+            model_name='category',
+            name='escritorio',
+            field=models.ForeignKey(db_index=False, default=1, editable=False, on_delete=django.db.models.deletion.PROTECT, related_name='+', to='users.escritorio', verbose_name='Escritório'),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='client',
+            name='escritorio',
+            field=models.ForeignKey(db_index=False, default=1, editable=False, on_delete=django.db.models.deletion.PROTECT, related_name='+', to='users.escritorio', verbose_name='Escritório'),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='financialcase',
+            name='escritorio',
+            field=models.ForeignKey(db_index=False, default=1, editable=False, on_delete=django.db.models.deletion.PROTECT, related_name='+', to='users.escritorio', verbose_name='Escritório'),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='monthlytransactionsummary',
+            name='escritorio',
+            field=models.ForeignKey(db_index=False, default=1, editable=False, on_delete=django.db.models.deletion.PROTECT, related_name='+', to='users.escritorio', verbose_name='Escritório'),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='payment',
+            name='escritorio',
+            field=models.ForeignKey(db_index=False, default=1, editable=False, on_delete=django.db.models.deletion.PROTECT, related_name='+', to='users.escritorio', verbose_name='Escritório'),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='transaction',
+            name='escritorio',
+            field=models.ForeignKey(db_index=False, default=1, editable=False, on_delete=django.db.models.deletion.PROTECT, related_name='+', to='users.escritorio', verbose_name='Escritório'),
+            preserve_default=False,
+        ),
+        migrations.AlterField(
+            model_name='client',
+            name='cpf',
+            field=models.CharField(blank=True, max_length=14, null=True, verbose_name='CPF'),
+        ),
+        migrations.AddIndex(
+            model_name='financialcase',
+            index=models.Index(models.F('escritorio'), models.ExpressionWrapper(django.db.models.expressions.CombinedExpression(models.F('total_amount'), '-', models.F('amount_paid')), output_field=models.DecimalField(decimal_places=2, max_digits=10)), name='financialcase_balance_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='financialcase',
+            index=models.Index(fields=['escritorio', 'status', 'creation_date'], name='financialcase_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='monthlytransactionsummary',
+            index=models.Index(fields=['escritorio', 'month'], name='monthly_summary_escritorio_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='transaction',
+            index=models.Index(fields=['escritorio', 'date'], name='transaction_escritorio_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='client',
+            constraint=models.UniqueConstraint(fields=('escritorio', 'cpf'), name='client_escritorio_cpf_unique'),
+        ),
+    ]
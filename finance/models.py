@@ -1,14 +1,20 @@
-from django.db import models
+from decimal import Decimal
+
+from django.db import models, transaction
+from django.db.models import Case, DecimalField, ExpressionWrapper, F, Sum, Value, When
+from django.db.models.functions import Coalesce
 from django.conf import settings
 from django.utils import timezone
 
-class Category(models.Model):
+from users.tenancy import EscritorioManager, EscritorioModel, EscritorioQuerySet
+
+class Category(EscritorioModel):
     name = models.CharField(max_length=100)
 
     def __str__(self):
         return self.name
 
-class Transaction(models.Model):
+class Transaction(EscritorioModel):
     TRANSACTION_TYPE_CHOICES = (
         ("INCOME", "Income"),
         ("EXPENSE", "Expense"),
@@ -26,15 +32,52 @@ class Transaction(models.Model):
     date = models.DateField()
     description = models.TextField(blank=True, null=True)
 
+    ESCRITORIO_FROM = ('lawyer',)
+
     def __str__(self):
         return f"{self.type} - {self.title} - {self.amount}"
 
-class Client(models.Model):
+    def save(self, *args, **kwargs):
+        # The monthly summary (finance.signals) is refreshed in the same transaction
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['lawyer', 'date'], name='transaction_lawyer_date_idx'),
+            # Reports over every lawyer of the escritorio
+            models.Index(fields=['escritorio', 'date'], name='transaction_escritorio_idx'),
+        ]
+
+
+class MonthlyTransactionSummary(EscritorioModel):
+    """Income/expense totals per lawyer, month and category, refreshed by finance.signals"""
+    lawyer = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='monthly_transaction_summaries')
+    month = models.DateField()
+    category = models.ForeignKey(Category, on_delete=models.SET_NULL, null=True, blank=True)
+    income = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    expense = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    transaction_count = models.PositiveIntegerField(default=0)
+
+    ESCRITORIO_FROM = ('lawyer',)
+
+    class Meta:
+        verbose_name = "Resumo Mensal de Transações"
+        verbose_name_plural = "Resumos Mensais de Transações"
+        indexes = [
+            models.Index(fields=['lawyer', 'month'], name='monthly_summary_lawyer_idx'),
+            models.Index(fields=['escritorio', 'month'], name='monthly_summary_escritorio_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.lawyer} - {self.month:%m/%Y} - {self.category or 'Sem categoria'}"
+
+class Client(EscritorioModel):
     name = models.CharField(max_length=255, verbose_name="Nome")
     email = models.EmailField(max_length=255, blank=True, null=True, verbose_name="Email")
     phone = models.CharField(max_length=20, blank=True, null=True, verbose_name="Telefone")
     address = models.TextField(blank=True, null=True, verbose_name="Endereço")
-    cpf = models.CharField(max_length=14, unique=True, blank=True, null=True, verbose_name="CPF")
+    cpf = models.CharField(max_length=14, blank=True, null=True, verbose_name="CPF")
     mother_name = models.CharField(max_length=255, blank=True, null=True, verbose_name="Nome da Mãe")
     city = models.CharField(max_length=100, blank=True, null=True, verbose_name="Cidade")
     state = models.CharField(max_length=100, blank=True, null=True, verbose_name="Estado")
@@ -46,8 +89,66 @@ class Client(models.Model):
     class Meta:
         verbose_name = "Cliente"
         verbose_name_plural = "Clientes"
+        constraints = [
+            models.UniqueConstraint(fields=['escritorio', 'cpf'], name='client_escritorio_cpf_unique'),
+        ]
+
+BALANCE_DUE = ExpressionWrapper(
+    F('total_amount') - F('amount_paid'),
+    output_field=DecimalField(max_digits=10, decimal_places=2),
+)
+
+
+def status_after_payment(amount_paid):
+    """Status expression for an UPDATE that sets amount_paid to the given expression.
 
-class FinancialCase(models.Model):
+    Fully paid cases are closed, closed cases with a balance are reopened and
+    anything else (e.g. PENDING) is kept.
+    """
+    return Case(
+        When(total_amount__lte=amount_paid, then=Value('CLOSED')),
+        When(status='CLOSED', then=Value('OPEN')),
+        default=F('status'),
+        output_field=models.CharField(),
+    )
+
+
+def paid_total():
+    """Correlated subquery with the sum of the PAID payments of the outer case"""
+    return Coalesce(
+        models.Subquery(
+            Payment.objects.filter(case=models.OuterRef('pk'), status='PAID').values('case').annotate(
+                total=Sum('amount')
+            ).values('total')
+        ),
+        Value(Decimal('0.00')),
+        output_field=DecimalField(max_digits=10, decimal_places=2),
+    )
+
+
+class FinancialCaseQuerySet(EscritorioQuerySet):
+    def with_balance(self):
+        return self.annotate(balance_due=BALANCE_DUE)
+
+    def apply_payment(self, amount):
+        """Adds amount (negative to revert) to amount_paid and updates status in one UPDATE"""
+        new_amount_paid = F('amount_paid') + amount
+        return self.update(amount_paid=new_amount_paid, status=status_after_payment(new_amount_paid))
+
+    def reconcile(self):
+        """Recomputes amount_paid and status from the PAID payments of each case"""
+        paid = paid_total()
+        return self.update(amount_paid=paid, status=status_after_payment(paid))
+
+
+class FinancialCaseManager(EscritorioManager.from_queryset(FinancialCaseQuerySet)):
+    """Default manager: cases of the active escritorio, annotated with balance_due computed in SQL"""
+
+    def get_queryset(self):
+        return super().get_queryset().with_balance()
+
+
+class FinancialCase(EscritorioModel):
     STATUS_CHOICES = (
         ('OPEN', 'Aberto'),
         ('CLOSED', 'Fechado'),
@@ -61,6 +162,11 @@ class FinancialCase(models.Model):
     status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='OPEN', verbose_name="Status")
     creation_date = models.DateField(default=timezone.now, verbose_name="Data de Criação")
 
+    ESCRITORIO_FROM = ('client',)
+
+    # amount_paid and status are maintained by finance.signals on Payment writes
+    objects = FinancialCaseManager()
+
     def __str__(self):
         return f"{self.case_name} - {self.client.name}"
 
@@ -71,8 +177,12 @@ class FinancialCase(models.Model):
     class Meta:
         verbose_name = "Caso Financeiro"
         verbose_name_plural = "Casos Financeiros"
+        indexes = [
+            models.Index(F('escritorio'), BALANCE_DUE, name='financialcase_balance_idx'),
+            models.Index(fields=['escritorio', 'status', 'creation_date'], name='financialcase_status_idx'),
+        ]
 
-class Payment(models.Model):
+class Payment(EscritorioModel):
     PAYMENT_METHOD_CHOICES = (
         ('CASH', 'Dinheiro'),
         ('PIX', 'PIX'),
@@ -90,9 +200,16 @@ class Payment(models.Model):
     status = models.CharField(max_length=10, choices=PAYMENT_STATUS_CHOICES, default='PENDING', verbose_name="Status")
     description = models.TextField(blank=True, null=True, verbose_name="Descrição")
 
+    ESCRITORIO_FROM = ('case',)
+
     def __str__(self):
         return f"Pagamento de {self.amount} para {self.case.case_name} em {self.payment_date}"
 
+    def save(self, *args, **kwargs):
+        # The case totals (finance.signals) are updated in the same transaction
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+
     class Meta:
         verbose_name = "Pagamento"
         verbose_name_plural = "Pagamentos"
\ No newline at end of file
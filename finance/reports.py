@@ -0,0 +1,199 @@
+"""
+Transaction reports per lawyer, category and period.
+
+Totals are grouped in SQL and the running balance is a window function over the
+grouped rows (SUM(SUM(...)) OVER (PARTITION BY ... ORDER BY period)), so a
+report is a single query served by the (lawyer, date) index. Month, quarter and
+year reports can also be read from MonthlyTransactionSummary, which keeps one
+row per lawyer/month/category and makes multi-year comparisons independent of
+the size of the lawyer's history.
+"""
+from datetime import date
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Count, DecimalField, F, Func, Q, Sum, Value, Window
+from django.db.models.functions import Coalesce, TruncMonth, TruncQuarter, TruncYear
+
+from .models import MonthlyTransactionSummary, Transaction
+
+AMOUNT = DecimalField(max_digits=14, decimal_places=2)
+ZERO = Decimal('0.00')
+
+PERIODS = {
+    'month': TruncMonth,
+    'quarter': TruncQuarter,
+    'year': TruncYear,
+}
+
+
+class WindowSum(Func):
+    """SUM that may wrap an aggregate inside a window: SUM(SUM(x)) OVER (...)"""
+    function = 'SUM'
+    window_compatible = True
+    contains_aggregate = False
+    output_field = AMOUNT
+
+
+def _totals(source, date_field, lawyer=None, start=None, end=None, period='month', by_category=False):
+    """Groups a Transaction or MonthlyTransactionSummary queryset into report rows"""
+    if source.model is Transaction:
+        income = Coalesce(Sum('amount', filter=Q(type='INCOME')), Value(ZERO), output_field=AMOUNT)
+        expense = Coalesce(Sum('amount', filter=Q(type='EXPENSE')), Value(ZERO), output_field=AMOUNT)
+        count = Count('id')
+    else:
+        income = Coalesce(Sum('income'), Value(ZERO), output_field=AMOUNT)
+        expense = Coalesce(Sum('expense'), Value(ZERO), output_field=AMOUNT)
+        count = Coalesce(Sum('transaction_count'), Value(0))
+
+    if lawyer is not None:
+        source = source.filter(lawyer=lawyer)
+    if start:
+        source = source.filter(**{f'{date_field}__gte': start})
+    if end:
+        source = source.filter(**{f'{date_field}__lte': end})
+
+    groups = ['lawyer']
+    if by_category:
+        groups += ['category', 'category__name']
+    partition = [F(field) for field in groups if not field.endswith('__name')]
+
+    rows = source.annotate(period=PERIODS[period](date_field)).values(*groups, 'period').annotate(
+        income_total=income,
+        expense_total=expense,
+        transactions=count,
+    ).annotate(
+        # Separate annotate(): added after the GROUP BY is set, so the window is not grouped on
+        running_balance=Window(
+            WindowSum(income - expense),
+            partition_by=partition,
+            order_by=F('period').asc(),
+        ),
+    ).order_by(*groups, 'period')
+
+    use_summary = source.model is MonthlyTransactionSummary
+    opening = opening_balances(lawyer, start, by_category, use_summary) if start else {}
+    result = []
+    for row in rows:
+        key = (row['lawyer'], row.get('category'))
+        result.append({
+            'lawyer_id': row['lawyer'],
+            'category_id': row.get('category'),
+            'category': row.get('category__name'),
+            'period': row['period'],
+            'income': row['income_total'],
+            'expense': row['expense_total'],
+            'net': row['income_total'] - row['expense_total'],
+            'transactions': row['transactions'],
+            'running_balance': row['running_balance'] + opening.get(key, ZERO),
+        })
+    return result
+
+
+def opening_balances(lawyer, before, by_category=False, use_summary=False):
+    """Balance accumulated before a date, keyed by (lawyer_id, category_id)"""
+    if use_summary:
+        source = MonthlyTransactionSummary.objects.filter(month__lt=before)
+        balance = Coalesce(Sum(F('income') - F('expense')), Value(ZERO), output_field=AMOUNT)
+    else:
+        source = Transaction.objects.filter(date__lt=before)
+        balance = (
+            Coalesce(Sum('amount', filter=Q(type='INCOME')), Value(ZERO), output_field=AMOUNT)
+            - Coalesce(Sum('amount', filter=Q(type='EXPENSE')), Value(ZERO), output_field=AMOUNT)
+        )
+    if lawyer is not None:
+        source = source.filter(lawyer=lawyer)
+    groups = ['lawyer', 'category'] if by_category else ['lawyer']
+    rows = source.values(*groups).annotate(balance=balance).order_by()
+    return {(row['lawyer'], row.get('category')): row['balance'] for row in rows}
+
+
+def period_totals(lawyer=None, start=None, end=None, period='month', by_category=False, use_summary=False):
+    """
+    Income, expense, net and running balance per lawyer (optionally per category) and period.
+
+    With use_summary the month-level summary table is read instead of the
+    transactions; start/end are then rounded to whole months.
+    """
+    if use_summary:
+        return _totals(
+            MonthlyTransactionSummary.objects.all(), 'month', lawyer,
+            start.replace(day=1) if start else None, end, period, by_category,
+        )
+    return _totals(Transaction.objects.all(), 'date', lawyer, start, end, period, by_category)
+
+
+def year_over_year(lawyer, years, use_summary=True):
+    """Monthly income/expense of a lawyer for each year, as {year: {month: row}}"""
+    years = sorted(years)
+    rows = period_totals(
+        lawyer,
+        start=date(years[0], 1, 1),
+        end=date(years[-1], 12, 31),
+        period='month',
+        use_summary=use_summary,
+    )
+    comparison = {year: {} for year in years}
+    for row in rows:
+        if row['period'].year in comparison:
+            comparison[row['period'].year][row['period'].month] = row
+    return comparison
+
+
+def refresh_monthly_summary(lawyer_id, month):
+    """Rebuilds the summary rows of one lawyer and month from its transactions"""
+    month = month.replace(day=1)
+    next_month = date(month.year + month.month // 12, month.month % 12 + 1, 1)
+    rows = Transaction.objects.filter(
+        lawyer_id=lawyer_id, date__gte=month, date__lt=next_month
+    ).values('category').annotate(
+        income=Coalesce(Sum('amount', filter=Q(type='INCOME')), Value(ZERO), output_field=AMOUNT),
+        expense=Coalesce(Sum('amount', filter=Q(type='EXPENSE')), Value(ZERO), output_field=AMOUNT),
+        transactions=Count('id'),
+    ).order_by()
+
+    with transaction.atomic():
+        MonthlyTransactionSummary.objects.filter(lawyer_id=lawyer_id, month=month).delete()
+        MonthlyTransactionSummary.objects.bulk_create([
+            MonthlyTransactionSummary(
+                lawyer_id=lawyer_id,
+                month=month,
+                category_id=row['category'],
+                income=row['income'],
+                expense=row['expense'],
+                transaction_count=row['transactions'],
+            )
+            for row in rows
+        ])
+
+
+def rebuild_monthly_summaries(lawyer_ids=None):
+    """Rebuilds the whole summary table (or the given lawyers) with one grouped query per lawyer"""
+    if lawyer_ids is None:
+        lawyer_ids = list(Transaction.objects.order_by().values_list('lawyer_id', flat=True).distinct())
+        MonthlyTransactionSummary.objects.exclude(lawyer_id__in=lawyer_ids).delete()
+
+    total = 0
+    for lawyer_id in lawyer_ids:
+        rows = Transaction.objects.filter(lawyer_id=lawyer_id).annotate(
+            month=TruncMonth('date')
+        ).values('month', 'category').annotate(
+            income=Coalesce(Sum('amount', filter=Q(type='INCOME')), Value(ZERO), output_field=AMOUNT),
+            expense=Coalesce(Sum('amount', filter=Q(type='EXPENSE')), Value(ZERO), output_field=AMOUNT),
+            transactions=Count('id'),
+        ).order_by()
+        with transaction.atomic():
+            MonthlyTransactionSummary.objects.filter(lawyer_id=lawyer_id).delete()
+            created = MonthlyTransactionSummary.objects.bulk_create([
+                MonthlyTransactionSummary(
+                    lawyer_id=lawyer_id,
+                    month=row['month'],
+                    category_id=row['category'],
+                    income=row['income'],
+                    expense=row['expense'],
+                    transaction_count=row['transactions'],
+                )
+                for row in rows
+            ], batch_size=1000)
+        total += len(created)
+    return total
@@ -0,0 +1,76 @@
+from decimal import Decimal
+
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from .models import FinancialCase, Payment, Transaction
+from .reports import refresh_monthly_summary
+
+
+def paid_amount(amount, status):
+    """How much a payment adds to FinancialCase.amount_paid"""
+    if status != 'PAID' or amount in (None, ''):
+        return Decimal('0.00')
+    return Decimal(str(amount))
+
+
+def apply_payment(case_id, amount):
+    if amount:
+        FinancialCase.objects.filter(pk=case_id).apply_payment(amount)
+
+
+@receiver(pre_save, sender=Payment)
+def remember_previous_payment(sender, instance, raw=False, **kwargs):
+    instance._previous_payment = None
+    if instance.pk and not raw:
+        instance._previous_payment = Payment.objects.filter(pk=instance.pk).values_list(
+            'case_id', 'amount', 'status'
+        ).first()
+
+
+@receiver(post_save, sender=Payment)
+def update_case_on_payment_save(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    current = paid_amount(instance.amount, instance.status)
+    previous = getattr(instance, '_previous_payment', None)
+    if previous is None:
+        apply_payment(instance.case_id, current)
+        return
+
+    previous_case_id, *values = previous
+    if previous_case_id == instance.case_id:
+        apply_payment(instance.case_id, current - paid_amount(*values))
+    else:
+        apply_payment(previous_case_id, -paid_amount(*values))
+        apply_payment(instance.case_id, current)
+
+
+@receiver(post_delete, sender=Payment)
+def update_case_on_payment_delete(sender, instance, **kwargs):
+    apply_payment(instance.case_id, -paid_amount(instance.amount, instance.status))
+
+
+@receiver(pre_save, sender=Transaction)
+def remember_previous_transaction(sender, instance, raw=False, **kwargs):
+    instance._previous_month = None
+    if instance.pk and not raw:
+        instance._previous_month = Transaction.objects.filter(pk=instance.pk).values_list(
+            'lawyer_id', 'date'
+        ).first()
+
+
+@receiver(post_save, sender=Transaction)
+def refresh_summary_on_transaction_save(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    month = (instance.lawyer_id, instance.date.replace(day=1))
+    refresh_monthly_summary(*month)
+    previous = getattr(instance, '_previous_month', None)
+    if previous and (previous[0], previous[1].replace(day=1)) != month:
+        refresh_monthly_summary(*previous)
+
+
+@receiver(post_delete, sender=Transaction)
+def refresh_summary_on_transaction_delete(sender, instance, **kwargs):
+    refresh_monthly_summary(instance.lawyer_id, instance.date)
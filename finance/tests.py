@@ -1,3 +1,86 @@
+from decimal import Decimal
+from io import StringIO
+
+from django.core.management import call_command
 from django.test import TestCase
 
-# Create your tests here.
+from users import tenancy
+from users.models import Escritorio
+
+from .models import Client, FinancialCase, Payment
+
+
+class PaymentReconciliationTests(TestCase):
+    """FinancialCase.amount_paid and status follow the PAID payments of the case"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.escritorio = Escritorio.objects.create(nome='Escritório financeiro')
+        with tenancy.activate(cls.escritorio.pk):
+            cls.client_record = Client.objects.create(name='Client')
+
+    def setUp(self):
+        self.enterContext(tenancy.activate(self.escritorio.pk))
+        self.case = self.new_case()
+
+    def new_case(self, total='100.00', status='OPEN'):
+        return FinancialCase.objects.create(
+            client=self.client_record, case_name='Case', total_amount=Decimal(total), status=status,
+        )
+
+    def reload(self, case):
+        return FinancialCase.objects.get(pk=case.pk)
+
+    def test_paid_payments_add_up_and_close_the_case(self):
+        Payment.objects.create(case=self.case, amount=Decimal('40.00'), status='PAID')
+        case = self.reload(self.case)
+        self.assertEqual(case.amount_paid, Decimal('40.00'))
+        self.assertEqual(case.balance_due, Decimal('60.00'))
+        self.assertEqual(case.status, 'OPEN')
+
+        Payment.objects.create(case=self.case, amount=Decimal('60.00'), status='PAID')
+        self.assertEqual(self.reload(self.case).status, 'CLOSED')
+
+    def test_pending_payments_count_once_paid(self):
+        payment = Payment.objects.create(case=self.case, amount=Decimal('100.00'), status='PENDING')
+        self.assertEqual(self.reload(self.case).amount_paid, Decimal('0.00'))
+
+        payment.status = 'PAID'
+        payment.save()
+        case = self.reload(self.case)
+        self.assertEqual(case.amount_paid, Decimal('100.00'))
+        self.assertEqual(case.status, 'CLOSED')
+
+    def test_deleting_a_payment_reopens_the_case(self):
+        payment = Payment.objects.create(case=self.case, amount=Decimal('100.00'), status='PAID')
+        payment.delete()
+        case = self.reload(self.case)
+        self.assertEqual(case.amount_paid, Decimal('0.00'))
+        self.assertEqual(case.status, 'OPEN')
+
+    def test_moving_a_payment_moves_its_amount(self):
+        other = self.new_case()
+        payment = Payment.objects.create(case=self.case, amount=Decimal('30.00'), status='PAID')
+        payment.case = other
+        payment.save()
+        self.assertEqual(self.reload(self.case).amount_paid, Decimal('0.00'))
+        self.assertEqual(self.reload(other).amount_paid, Decimal('30.00'))
+
+    def test_partial_payment_keeps_a_pending_status(self):
+        case = self.new_case(status='PENDING')
+        Payment.objects.create(case=case, amount=Decimal('10.00'), status='PAID')
+        self.assertEqual(self.reload(case).status, 'PENDING')
+
+    def test_reconcile_fixes_drifted_cases(self):
+        Payment.objects.create(case=self.case, amount=Decimal('100.00'), status='PAID')
+        FinancialCase.objects.filter(pk=self.case.pk).update(amount_paid=Decimal('5.00'), status='OPEN')
+
+        output = StringIO()
+        call_command('reconcile_financial_cases', '--dry-run', stdout=output)
+        self.assertIn('1 casos', output.getvalue())
+        self.assertEqual(self.reload(self.case).amount_paid, Decimal('5.00'))
+
+        call_command('reconcile_financial_cases', stdout=StringIO())
+        case = self.reload(self.case)
+        self.assertEqual(case.amount_paid, Decimal('100.00'))
+        self.assertEqual(case.status, 'CLOSED')
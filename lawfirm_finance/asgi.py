@@ -14,3 +14,8 @@ from django.core.asgi import get_asgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'lawfirm_finance.settings')
 
 application = get_asgi_application()
+
+from lawfirm_finance.estaticos import ServidorEstaticosASGI, servir_estaticos  # noqa: E402 (depende do setup)
+
+if servir_estaticos():
+    application = ServidorEstaticosASGI(application)
@@ -0,0 +1,304 @@
+"""
+Arquivos estáticos comprimidos e servidos sem passar pelas views do Django.
+
+ArmazenamentoComprimido estende o ManifestStaticFilesStorage: além de gravar
+os arquivos com o hash do conteúdo no nome, o collectstatic grava ao lado de
+cada arquivo de texto as variantes .gz e, se o pacote brotli estiver
+instalado, .br (só quando a compressão economiza ao menos 5%).
+
+ServidorEstaticos (WSGI) e ServidorEstaticosASGI envolvem a aplicação e
+respondem às requisições de STATIC_URL direto do STATIC_ROOT:
+
+- o índice dos arquivos é montado uma vez, na inicialização, sem stat() por
+  requisição;
+- a variante é escolhida pelo Accept-Encoding (br, depois gzip), com
+  Vary: Accept-Encoding;
+- arquivos com hash no nome recebem Cache-Control immutable de um ano; os
+  demais, no-cache com ETag (If-None-Match responde 304);
+- Range (um único intervalo, com If-Range) responde 206 sobre o arquivo
+  original, sem compressão.
+
+Caminhos fora do índice seguem para a aplicação.
+"""
+import gzip
+import mimetypes
+import os
+import re
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+from django.utils.http import http_date
+
+try:
+    import brotli
+except ImportError:  # opcional: sem ele só a variante gzip é gravada
+    brotli = None
+
+EXTENSOES_TEXTO = {
+    '.css', '.js', '.mjs', '.map', '.json', '.svg', '.txt', '.html', '.xml', '.ico', '.eot', '.ttf', '.otf',
+}
+ECONOMIA_MINIMA = 0.95
+TAMANHO_MINIMO = 256
+TAMANHO_BLOCO = 64 * 1024
+UM_ANO = 365 * 24 * 3600
+HASH_NO_NOME = re.compile(r'\.[0-9a-f]{12}\.')
+INTERVALO = re.compile(r'^bytes=(\d*)-(\d*)$')
+CODIFICACOES = (('br', '.br'), ('gzip', '.gz'))
+
+
+def comprimir(caminho):
+    """Grava as variantes .gz e .br de um arquivo; retorna as extensões gravadas"""
+    caminho = Path(caminho)
+    if caminho.suffix.lower() not in EXTENSOES_TEXTO:
+        return []
+    conteudo = caminho.read_bytes()
+    if len(conteudo) < TAMANHO_MINIMO:
+        return []
+    variantes = {'.gz': lambda: gzip.compress(conteudo, compresslevel=9, mtime=0)}
+    if brotli is not None:
+        variantes['.br'] = lambda: brotli.compress(conteudo, quality=11)
+
+    gravadas = []
+    for extensao, compressor in variantes.items():
+        destino = caminho.with_name(caminho.name + extensao)
+        if destino.exists() and destino.stat().st_mtime >= caminho.stat().st_mtime:
+            gravadas.append(extensao)
+            continue
+        comprimido = compressor()
+        if len(comprimido) <= len(conteudo) * ECONOMIA_MINIMA:
+            destino.write_bytes(comprimido)
+            gravadas.append(extensao)
+        elif destino.exists():
+            destino.unlink()
+    return gravadas
+
+
+class ArmazenamentoComprimido(ManifestStaticFilesStorage):
+    """Manifest storage que também grava as variantes comprimidas no collectstatic"""
+
+    def post_process(self, paths, dry_run=False, **options):
+        processados = set()
+        for nome, nome_hash, processado in super().post_process(paths, dry_run=dry_run, **options):
+            if not isinstance(processado, Exception) and not dry_run:
+                processados.update(filter(None, (nome, nome_hash)))
+            yield nome, nome_hash, processado
+        if dry_run:
+            return
+        # O manifesto (staticfiles.json) também é servido e se beneficia da compressão
+        for nome in sorted(processados | {self.manifest_name}):
+            if self.exists(nome):
+                comprimir(self.path(nome))
+
+
+class Arquivo:
+    __slots__ = ('caminho', 'tamanho', 'etag', 'modificado')
+
+    def __init__(self, caminho):
+        info = os.stat(caminho)
+        self.caminho = caminho
+        self.tamanho = info.st_size
+        self.etag = f'"{int(info.st_mtime):x}-{info.st_size:x}"'
+        self.modificado = http_date(info.st_mtime)
+
+
+class Estatico:
+    """Um arquivo do STATIC_ROOT com suas variantes comprimidas"""
+
+    def __init__(self, caminho):
+        self.original = Arquivo(caminho)
+        self.variantes = {
+            codificacao: Arquivo(caminho + extensao)
+            for codificacao, extensao in CODIFICACOES
+            if os.path.isfile(caminho + extensao)
+        }
+        tipo, codificacao = mimetypes.guess_type(caminho)
+        self.tipo = tipo or 'application/octet-stream'
+        if tipo and (tipo.startswith('text/') or tipo in ('application/javascript', 'application/json')):
+            self.tipo += '; charset=utf-8'
+        self.imutavel = bool(HASH_NO_NOME.search(os.path.basename(caminho)))
+
+
+def indexar(raiz, prefixo):
+    """{url: Estatico} de todos os arquivos (exceto as variantes) sob a raiz"""
+    indice = {}
+    raiz = str(raiz)
+    if not os.path.isdir(raiz):
+        return indice
+    extensoes = tuple(extensao for _, extensao in CODIFICACOES)
+    for pasta, _, arquivos in os.walk(raiz):
+        for nome in arquivos:
+            caminho = os.path.join(pasta, nome)
+            if nome.endswith(extensoes) and os.path.isfile(caminho[:-3]):
+                continue
+            relativo = os.path.relpath(caminho, raiz).replace(os.sep, '/')
+            indice[prefixo + relativo] = Estatico(caminho)
+    return indice
+
+
+def aceitas(accept_encoding):
+    """Codificações aceitas pelo cliente (q=0 exclui)"""
+    resultado = set()
+    for parte in (accept_encoding or '').split(','):
+        nome, _, parametros = parte.strip().partition(';')
+        qualidade = parametros.strip().replace(' ', '')
+        if qualidade.startswith('q=') and qualidade[2:] in ('0', '0.0', '0.00', '0.000'):
+            continue
+        resultado.add(nome.strip().lower())
+    return resultado
+
+
+def intervalo(cabecalho, tamanho):
+    """(início, fim) inclusivos de um Range de um único intervalo, None se ausente/múltiplo, ou 'invalido'"""
+    if not cabecalho:
+        return None
+    encontrado = INTERVALO.match(cabecalho.strip())
+    if not encontrado or encontrado.groups() == ('', ''):
+        return None
+    inicio, fim = encontrado.groups()
+    if inicio == '':
+        # bytes=-N: os últimos N bytes
+        quantidade = int(fim)
+        if quantidade == 0:
+            return 'invalido'
+        return max(tamanho - quantidade, 0), tamanho - 1
+    inicio = int(inicio)
+    fim = min(int(fim), tamanho - 1) if fim else tamanho - 1
+    if inicio >= tamanho or inicio > fim:
+        return 'invalido'
+    return inicio, fim
+
+
+class Resposta:
+    __slots__ = ('status', 'cabecalhos', 'caminho', 'inicio', 'tamanho')
+
+    def __init__(self, status, cabecalhos, caminho=None, inicio=0, tamanho=0):
+        self.status = status
+        self.cabecalhos = cabecalhos
+        self.caminho = caminho
+        self.inicio = inicio
+        self.tamanho = tamanho
+
+    def blocos(self):
+        """Lê o trecho do arquivo em blocos"""
+        with open(self.caminho, 'rb') as arquivo:
+            arquivo.seek(self.inicio)
+            restante = self.tamanho
+            while restante > 0:
+                bloco = arquivo.read(min(TAMANHO_BLOCO, restante))
+                if not bloco:
+                    break
+                restante -= len(bloco)
+                yield bloco
+
+
+STATUS = {200: '200 OK', 206: '206 Partial Content', 304: '304 Not Modified', 405: '405 Method Not Allowed',
+          416: '416 Range Not Satisfiable'}
+
+
+class Estaticos:
+    """Escolha da variante e dos cabeçalhos, comum às camadas WSGI e ASGI"""
+
+    def __init__(self, raiz=None, prefixo=None):
+        prefixo = prefixo if prefixo is not None else settings.STATIC_URL
+        self.prefixo = '/' + prefixo.strip('/') + '/'
+        self.indice = indexar(raiz if raiz is not None else settings.STATIC_ROOT, self.prefixo)
+
+    def encontrar(self, caminho):
+        return self.indice.get(caminho) if caminho.startswith(self.prefixo) else None
+
+    def responder(self, estatico, metodo, cabecalhos):
+        """Resposta para um arquivo do índice; `cabecalhos` usa nomes em minúsculas"""
+        comuns = [
+            ('Vary', 'Accept-Encoding'),
+            ('Cache-Control', f'public, max-age={UM_ANO}, immutable' if estatico.imutavel else 'public, no-cache'),
+            ('Accept-Ranges', 'bytes'),
+        ]
+        if metodo not in ('GET', 'HEAD'):
+            return Resposta(405, [('Allow', 'GET, HEAD'), ('Content-Length', '0')])
+
+        faixa = intervalo(cabecalhos.get('range'), estatico.original.tamanho)
+        if faixa is not None and cabecalhos.get('if-range') not in (None, estatico.original.etag):
+            faixa = None
+        if faixa is not None:
+            # Intervalos são sempre sobre o arquivo original, sem compressão
+            arquivo, codificacao = estatico.original, None
+        else:
+            codificacoes = aceitas(cabecalhos.get('accept-encoding'))
+            arquivo, codificacao = estatico.original, None
+            for nome, _ in CODIFICACOES:
+                if nome in codificacoes and nome in estatico.variantes:
+                    arquivo, codificacao = estatico.variantes[nome], nome
+                    break
+
+        cabecalhos_resposta = comuns + [('ETag', arquivo.etag), ('Last-Modified', arquivo.modificado)]
+        etags = cabecalhos.get('if-none-match')
+        if etags and (etags.strip() == '*' or arquivo.etag in (etag.strip().removeprefix('W/') for etag in etags.split(','))):
+            return Resposta(304, cabecalhos_resposta)
+
+        cabecalhos_resposta.append(('Content-Type', estatico.tipo))
+        if codificacao:
+            cabecalhos_resposta.append(('Content-Encoding', codificacao))
+        if faixa == 'invalido':
+            return Resposta(416, comuns + [('Content-Range', f'bytes */{arquivo.tamanho}'), ('Content-Length', '0')])
+        if faixa is not None:
+            inicio, fim = faixa
+            tamanho = fim - inicio + 1
+            cabecalhos_resposta += [
+                ('Content-Range', f'bytes {inicio}-{fim}/{arquivo.tamanho}'), ('Content-Length', str(tamanho)),
+            ]
+            return Resposta(206, cabecalhos_resposta, arquivo.caminho if metodo == 'GET' else None, inicio, tamanho)
+        cabecalhos_resposta.append(('Content-Length', str(arquivo.tamanho)))
+        return Resposta(200, cabecalhos_resposta, arquivo.caminho if metodo == 'GET' else None, 0, arquivo.tamanho)
+
+
+def servir_estaticos():
+    return getattr(settings, 'ESTATICOS_SERVIR', not settings.DEBUG)
+
+
+class ServidorEstaticos(Estaticos):
+    """Camada WSGI: serve STATIC_URL do STATIC_ROOT e repassa o resto à aplicação"""
+
+    def __init__(self, aplicacao, raiz=None, prefixo=None):
+        super().__init__(raiz, prefixo)
+        self.aplicacao = aplicacao
+
+    def __call__(self, environ, start_response):
+        estatico = self.encontrar(environ.get('PATH_INFO', ''))
+        if estatico is None:
+            return self.aplicacao(environ, start_response)
+        cabecalhos = {
+            chave[5:].replace('_', '-').lower(): valor for chave, valor in environ.items() if chave.startswith('HTTP_')
+        }
+        resposta = self.responder(estatico, environ['REQUEST_METHOD'], cabecalhos)
+        start_response(STATUS[resposta.status], resposta.cabecalhos)
+        if resposta.caminho is None:
+            return []
+        if resposta.status == 200 and 'wsgi.file_wrapper' in environ:
+            return environ['wsgi.file_wrapper'](open(resposta.caminho, 'rb'), TAMANHO_BLOCO)
+        return resposta.blocos()
+
+
+class ServidorEstaticosASGI(Estaticos):
+    """Camada ASGI equivalente a ServidorEstaticos"""
+
+    def __init__(self, aplicacao, raiz=None, prefixo=None):
+        super().__init__(raiz, prefixo)
+        self.aplicacao = aplicacao
+
+    async def __call__(self, scope, receive, send):
+        estatico = self.encontrar(scope.get('path', '')) if scope['type'] == 'http' else None
+        if estatico is None:
+            return await self.aplicacao(scope, receive, send)
+        cabecalhos = {nome.decode('latin-1').lower(): valor.decode('latin-1') for nome, valor in scope['headers']}
+        resposta = self.responder(estatico, scope['method'], cabecalhos)
+        await send({
+            'type': 'http.response.start',
+            'status': resposta.status,
+            'headers': [(nome.lower().encode('latin-1'), valor.encode('latin-1')) for nome, valor in resposta.cabecalhos],
+        })
+        if resposta.caminho is not None:
+            # Leituras pequenas e locais: feitas em linha, sem thread auxiliar
+            for bloco in resposta.blocos():
+                await send({'type': 'http.response.body', 'body': bloco, 'more_body': True})
+        await send({'type': 'http.response.body', 'body': b''})
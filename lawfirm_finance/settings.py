@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -53,23 +54,31 @@ MIDDLEWARE = [
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'users.middleware.EscritorioMiddleware',
+    'dashboard.middleware.HistoricoMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
 ROOT_URLCONF = 'lawfirm_finance.urls'
 
+TEMPLATE_LOADERS = [
+    'django.template.loaders.filesystem.Loader',
+    'django.template.loaders.app_directories.Loader',
+]
+
 TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
         'DIRS': [BASE_DIR / 'templates', BASE_DIR / 'frontend' / 'build'],
-        'APP_DIRS': True,
         'OPTIONS': {
             'context_processors': [
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
             ],
+            # Em produção os templates compilados ficam em memória (cached.Loader)
+            'loaders': TEMPLATE_LOADERS if DEBUG else [('django.template.loaders.cached.Loader', TEMPLATE_LOADERS)],
         },
     },
 ]
@@ -84,6 +93,8 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        # O worker de jobs (runworker) grava em paralelo às requisições
+        'OPTIONS': {'timeout': 20},
     }
 }
 
@@ -127,6 +138,40 @@ STATIC_ROOT = BASE_DIR / 'staticfiles' # Added STATIC_ROOT
 
 STATICFILES_DIRS = []
 
+# Em produção o collectstatic grava os arquivos com o hash do conteúdo no nome
+# (dashboard.3f2a9c.js) e as variantes .gz/.br (lawfirm_finance.estaticos)
+STORAGES = {
+    'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'},
+    'staticfiles': {
+        'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage' if DEBUG
+        else 'lawfirm_finance.estaticos.ArmazenamentoComprimido',
+    },
+}
+
+# As aplicações WSGI/ASGI servem STATIC_URL direto do STATIC_ROOT, antes do
+# Django (variantes comprimidas, cache immutable e Range)
+ESTATICOS_SERVIR = not DEBUG
+
+
+# Cache (widgets do dashboard) e sessões
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'lawfirm_finance',
+    },
+    # Compartilhado entre os processos do servidor, para que o logout feito
+    # em um deles valha em todos; em mais de uma máquina, usar Memcached/Redis
+    'sessoes': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': BASE_DIR / 'cache' / 'sessoes',
+    },
+}
+
+# Sessões lidas do cache e gravadas também no banco (sobrevivem à limpeza do cache)
+SESSION_ENGINE = 'django.contrib.sessions.backends.cached_db'
+SESSION_CACHE_ALIAS = 'sessoes'
+
 # CORS settings for development
 CORS_ALLOW_ALL_ORIGINS = True
 
@@ -138,6 +183,48 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 AUTH_USER_MODEL = 'users.Lawyer'
 
+# Guarda o usuário autenticado em memória por AUTH_USER_CACHE_TTL segundos (users.backends)
+AUTHENTICATION_BACKENDS = ['users.backends.LawyerBackend']
+AUTH_USER_CACHE_TTL = 30
+
 LOGIN_URL = 'login'
 LOGIN_REDIRECT_URL = 'dashboard:home'
 LOGOUT_REDIRECT_URL = '/'
+
+# Pasta observada pelo comando importar_publicacoes (arquivos de diário oficial)
+PUBLICACOES_DIR = BASE_DIR / 'publicacoes'
+
+# Fila de jobs em segundo plano (dashboard.fila / manage.py runworker)
+JOBS_TENTATIVAS = 3
+JOBS_ESPERA_BASE = 30  # segundos antes da 2ª tentativa; dobra a cada falha
+JOBS_ESPERA_MAXIMA = 3600
+JOBS_TEMPO_LIMITE = 3600  # jobs em execução há mais tempo voltam para a fila
+JOBS_RETENCAO_DIAS = 30
+
+# Atualizações do dashboard em tempo real (dashboard.eventos)
+EVENTOS_HEARTBEAT = 15  # segundos entre comentários de heartbeat no stream
+EVENTOS_DURACAO_MAXIMA = 300  # a conexão é encerrada e o navegador reconecta
+EVENTOS_HISTORICO = 500  # eventos guardados para reenvio após reconexão
+
+# Documentos gerados (dashboard.documentos)
+DOCUMENTOS_ROOT = BASE_DIR / 'documentos'
+DOCUMENTOS_PROCESSOS = os.cpu_count() or 1  # processos usados nos lotes
+DOCUMENTOS_TAMANHO_BLOCO = 200  # documentos por tarefa do pool (e por aviso de andamento)
+ESCRITORIO = {
+    'nome': 'Louzada & Laurindo',
+    'descricao': 'Escritório de Advocacia',
+}
+
+# Exclusão em blocos (dashboard.expurgo)
+EXPURGO_ROOT = BASE_DIR / 'expurgo'  # arquivo JSON Lines das linhas apagadas com arquivar
+EXPURGO_LOTE = 2000  # linhas por transação
+
+# Arquivo frio dos processos encerrados (dashboard.arquivo)
+ARQUIVO_DIAS = 365  # dias depois da data de fim
+ARQUIVO_LOTE = 100  # processos por transação
+
+# Histórico de alterações (dashboard.historico)
+HISTORICO_DIAS = 5 * 365  # retenção das entradas
+
+# Arquivos CSV de feriados usados no calendário forense (dashboard.prazos)
+FERIADOS_DIR = BASE_DIR / 'feriados'
@@ -0,0 +1,125 @@
+import gzip
+import tempfile
+from pathlib import Path
+
+from django.test import SimpleTestCase
+
+from . import estaticos
+
+CSS = ('.painel { color: #123456; margin: 0 auto; }\n' * 40).encode()
+
+
+class EstaticosTests(SimpleTestCase):
+    """Variantes comprimidas, cache e intervalos dos arquivos estáticos (lawfirm_finance.estaticos)"""
+
+    def setUp(self):
+        pasta = tempfile.TemporaryDirectory()
+        self.addCleanup(pasta.cleanup)
+        self.raiz = Path(pasta.name)
+        (self.raiz / 'css').mkdir()
+        self.css = self.raiz / 'css' / 'painel.0123456789ab.css'
+        self.css.write_bytes(CSS)
+        (self.raiz / 'leiame.txt').write_bytes(b'curto')
+        (self.raiz / 'logo.png').write_bytes(b'\x89PNG' + b'\x00' * 400)
+        self.assertEqual(estaticos.comprimir(self.css), ['.gz'] + (['.br'] if estaticos.brotli else []))
+        # Variante br fictícia, para a escolha não depender do pacote brotli
+        self.css.with_name(self.css.name + '.br').write_bytes(b'br')
+        self.chamadas = []
+        self.servidor = estaticos.ServidorEstaticos(self.aplicacao, raiz=self.raiz, prefixo='/static/')
+
+    def aplicacao(self, environ, start_response):
+        self.chamadas.append(environ['PATH_INFO'])
+        start_response('404 Not Found', [])
+        return [b'app']
+
+    def get(self, caminho='/static/css/painel.0123456789ab.css', metodo='GET', **cabecalhos):
+        environ = {'PATH_INFO': caminho, 'REQUEST_METHOD': metodo}
+        environ.update({f"HTTP_{nome.upper()}": valor for nome, valor in cabecalhos.items()})
+        inicio = {}
+
+        def start_response(status, cabecalhos_resposta):
+            inicio['status'], inicio['cabecalhos'] = status, dict(cabecalhos_resposta)
+
+        corpo = b''.join(self.servidor(environ, start_response))
+        return inicio['status'], inicio['cabecalhos'], corpo
+
+    def test_compressao_so_de_texto_que_economiza(self):
+        self.assertEqual(estaticos.comprimir(self.raiz / 'leiame.txt'), [])
+        self.assertEqual(estaticos.comprimir(self.raiz / 'logo.png'), [])
+        self.assertEqual(gzip.decompress(self.css.with_name(self.css.name + '.gz').read_bytes()), CSS)
+        # As variantes não entram no índice como arquivos próprios
+        self.assertNotIn('/static/css/painel.0123456789ab.css.gz', self.servidor.indice)
+
+    def test_variante_pelo_accept_encoding(self):
+        casos = {
+            'gzip, deflate, br': ('br', b'br'),
+            'gzip': ('gzip', gzip.compress(CSS, compresslevel=9, mtime=0)),
+            'br;q=0, gzip': ('gzip', gzip.compress(CSS, compresslevel=9, mtime=0)),
+            'gzip;q=0': (None, CSS),
+            '': (None, CSS),
+        }
+        for accept_encoding, (codificacao, corpo) in casos.items():
+            with self.subTest(accept_encoding=accept_encoding):
+                status, cabecalhos, recebido = self.get(accept_encoding=accept_encoding)
+                self.assertEqual(status, '200 OK')
+                self.assertEqual(cabecalhos.get('Content-Encoding'), codificacao)
+                self.assertEqual(cabecalhos['Vary'], 'Accept-Encoding')
+                self.assertEqual(cabecalhos['Content-Type'], 'text/css; charset=utf-8')
+                self.assertEqual(recebido, corpo)
+                self.assertEqual(cabecalhos['Content-Length'], str(len(corpo)))
+
+    def test_cache_imutavel_so_com_hash_no_nome(self):
+        self.assertEqual(self.get()[1]['Cache-Control'], f'public, max-age={estaticos.UM_ANO}, immutable')
+        self.assertEqual(self.get('/static/leiame.txt')[1]['Cache-Control'], 'public, no-cache')
+
+    def test_304_com_if_none_match(self):
+        etag = self.get('/static/leiame.txt')[1]['ETag']
+        for if_none_match in (etag, f'W/{etag}', f'"outro", {etag}', '*'):
+            with self.subTest(if_none_match=if_none_match):
+                status, cabecalhos, corpo = self.get('/static/leiame.txt', if_none_match=if_none_match)
+                self.assertEqual((status, corpo), ('304 Not Modified', b''))
+                self.assertEqual(cabecalhos['ETag'], etag)
+        self.assertEqual(self.get('/static/leiame.txt', if_none_match='"outro"')[0], '200 OK')
+        # Cada variante tem o próprio ETag
+        self.assertEqual(self.get(accept_encoding='gzip', if_none_match=self.get()[1]['ETag'])[0], '200 OK')
+
+    def test_intervalos(self):
+        status, cabecalhos, corpo = self.get(range='bytes=0-9', accept_encoding='gzip')
+        self.assertEqual((status, corpo), ('206 Partial Content', CSS[:10]))
+        self.assertEqual(cabecalhos['Content-Range'], f'bytes 0-9/{len(CSS)}')
+        self.assertNotIn('Content-Encoding', cabecalhos)
+
+        self.assertEqual(self.get(range='bytes=-5')[2], CSS[-5:])
+        self.assertEqual(self.get(range=f'bytes={len(CSS) - 3}-')[2], CSS[-3:])
+        self.assertEqual(self.get(range=f'bytes={len(CSS)}-')[0], '416 Range Not Satisfiable')
+        # Vários intervalos ou If-Range desatualizado: arquivo inteiro
+        self.assertEqual(self.get(range='bytes=0-1,4-5')[0], '200 OK')
+        self.assertEqual(self.get(range='bytes=0-9', if_range='"antigo"')[0], '200 OK')
+        etag = self.get()[1]['ETag']
+        self.assertEqual(self.get(range='bytes=0-9', if_range=etag)[0], '206 Partial Content')
+
+    def test_fora_do_indice_segue_para_a_aplicacao(self):
+        self.assertEqual(self.get('/static/nao-existe.css')[2], b'app')
+        self.assertEqual(self.get('/clientes/')[2], b'app')
+        self.assertEqual(self.chamadas, ['/static/nao-existe.css', '/clientes/'])
+        self.assertEqual(self.get(metodo='POST')[0], '405 Method Not Allowed')
+        status, _, corpo = self.get(metodo='HEAD')
+        self.assertEqual((status, corpo), ('200 OK', b''))
+
+    async def test_asgi(self):
+        async def aplicacao(scope, receive, send):
+            raise AssertionError('o arquivo não deveria chegar à aplicação')
+
+        servidor = estaticos.ServidorEstaticosASGI(aplicacao, raiz=self.raiz, prefixo='/static/')
+        mensagens = []
+
+        async def send(mensagem):
+            mensagens.append(mensagem)
+
+        scope = {
+            'type': 'http', 'method': 'GET', 'path': '/static/css/painel.0123456789ab.css',
+            'headers': [(b'accept-encoding', b'gzip'), (b'range', b'bytes=10-19')],
+        }
+        await servidor(scope, None, send)
+        self.assertEqual(mensagens[0]['status'], 206)
+        self.assertEqual(b''.join(mensagem.get('body', b'') for mensagem in mensagens[1:]), CSS[10:20])
@@ -14,3 +14,8 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'lawfirm_finance.settings')
 
 application = get_wsgi_application()
+
+from lawfirm_finance.estaticos import ServidorEstaticos, servir_estaticos  # noqa: E402 (depende do setup)
+
+if servir_estaticos():
+    application = ServidorEstaticos(application)
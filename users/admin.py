@@ -1,5 +1,18 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin
-from .models import Lawyer
+from .models import Escritorio, Lawyer
 
-admin.site.register(Lawyer, UserAdmin)
\ No newline at end of file
+
+@admin.register(Escritorio)
+class EscritorioAdmin(admin.ModelAdmin):
+    list_display = ('nome', 'ativo', 'data_cadastro')
+    search_fields = ('nome',)
+
+
+@admin.register(Lawyer)
+class LawyerAdmin(UserAdmin):
+    # Regular lawyers need an escritorio to log in (see users.middleware)
+    fieldsets = UserAdmin.fieldsets + (('Escritório', {'fields': ('escritorio',)}),)
+    add_fieldsets = UserAdmin.add_fieldsets + (('Escritório', {'fields': ('escritorio',)}),)
+    list_display = UserAdmin.list_display + ('escritorio',)
+    list_filter = UserAdmin.list_filter + ('escritorio',)
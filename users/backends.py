@@ -0,0 +1,68 @@
+import copy
+import threading
+import time
+
+from django.conf import settings
+from django.contrib.auth.backends import ModelBackend
+
+USER_CACHE_TTL = getattr(settings, 'AUTH_USER_CACHE_TTL', 30)
+
+
+class UserCache:
+    """
+    Authenticated users kept in memory for a few seconds, per process.
+
+    Entries are dropped when the lawyer is saved or deleted in this process
+    (see users.signals); changes made by other processes or by queryset
+    updates are picked up when the entry expires.
+    """
+
+    def __init__(self, ttl=USER_CACHE_TTL):
+        self.ttl = ttl
+        self.entries = {}
+        self.lock = threading.Lock()
+
+    def get(self, user_id):
+        with self.lock:
+            entry = self.entries.get(user_id)
+        if entry is None or entry[0] < time.monotonic():
+            return None
+        # Each request gets its own copy, so per-request state never leaks
+        return copy.copy(entry[1])
+
+    def set(self, user):
+        with self.lock:
+            self.entries[user.pk] = (time.monotonic() + self.ttl, copy.copy(user))
+
+    def invalidate(self, user_id):
+        with self.lock:
+            self.entries.pop(user_id, None)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+
+user_cache = UserCache()
+
+
+class LawyerBackend(ModelBackend):
+    """
+    ModelBackend that resolves the session user from the per-process cache,
+    avoiding the user query on every authenticated request.
+    """
+
+    def user_can_authenticate(self, user):
+        return super().user_can_authenticate(user) and not user.needs_escritorio
+
+    def get_user(self, user_id):
+        try:
+            user_id = int(user_id)
+        except (TypeError, ValueError):
+            return None
+        user = user_cache.get(user_id)
+        if user is None:
+            user = super().get_user(user_id)
+            if user is not None:
+                user_cache.set(user)
+        return user
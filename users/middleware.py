@@ -0,0 +1,24 @@
+from django.contrib.auth import logout
+from django.contrib.auth.views import redirect_to_login
+
+from . import tenancy
+
+
+class EscritorioMiddleware:
+    """
+    Scopes the request to the authenticated lawyer's escritorio (see
+    users.tenancy). Only staff may have none, and they see every firm; the
+    session of any other lawyer without one is closed, since isolation would
+    otherwise fail open.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        user = request.user
+        if user.is_authenticated and user.needs_escritorio:
+            logout(request)
+            return redirect_to_login(request.get_full_path())
+        with tenancy.activate(user.escritorio_id if user.is_authenticated else None):
+            return self.get_response(request)
@@ -0,0 +1,57 @@
+# Generated by Django 5.2.5 on 2026-10-19 13:37
+
+import django.db.models.deletion
+import users.models
+from django.conf import settings
+from django.db import migrations, models
+
+# The existing data belongs to this firm; the dashboard and finance
+# migrations use its id as the default of their escritorio columns
+ESCRITORIO_PRINCIPAL = 1
+
+
+def create_main_escritorio(apps, schema_editor):
+    """The deployment's firm (settings.ESCRITORIO), owner of every existing lawyer"""
+    Escritorio = apps.get_model('users', 'Escritorio')
+    dados = getattr(settings, 'ESCRITORIO', {})
+    Escritorio.objects.create(
+        pk=ESCRITORIO_PRINCIPAL, nome=dados.get('nome') or 'Escritório', descricao=dados.get('descricao', ''),
+    )
+    apps.get_model('users', 'Lawyer').objects.update(escritorio=ESCRITORIO_PRINCIPAL)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0003_alter_lawyer_enable_login'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Escritorio',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('nome', models.CharField(max_length=200, verbose_name='Nome')),
+                ('descricao', models.CharField(blank=True, default='', max_length=200, verbose_name='Descrição')),
+                ('ativo', models.BooleanField(default=True, verbose_name='Ativo')),
+                ('data_cadastro', models.DateTimeField(auto_now_add=True, verbose_name='Data de Cadastro')),
+            ],
+            options={
+                'verbose_name': 'Escritório',
+                'verbose_name_plural': 'Escritórios',
+                'ordering': ['nome'],
+            },
+        ),
+        migrations.AlterModelManagers(
+            name='lawyer',
+            managers=[
+                ('objects', users.models.LawyerManager()),
+            ],
+        ),
+        migrations.AddField(
+            model_name='lawyer',
+            name='escritorio',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='advogados', to='users.escritorio', verbose_name='Escritório'),
+        ),
+        migrations.RunPython(create_main_escritorio, migrations.RunPython.noop),
+    ]
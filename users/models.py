@@ -1,8 +1,38 @@
-from django.contrib.auth.models import AbstractUser
+from django.contrib.auth.models import AbstractUser, UserManager
 from django.db import models
 from django.utils import timezone
 
+from . import tenancy
+
+
+class Escritorio(models.Model):
+    """Law firm hosted on the deployment; owns the domain rows (see users.tenancy)"""
+    nome = models.CharField(max_length=200, verbose_name="Nome")
+    descricao = models.CharField(max_length=200, blank=True, default='', verbose_name="Descrição")
+    ativo = models.BooleanField(default=True, verbose_name="Ativo")
+    data_cadastro = models.DateTimeField(auto_now_add=True, verbose_name="Data de Cadastro")
+
+    class Meta:
+        verbose_name = "Escritório"
+        verbose_name_plural = "Escritórios"
+        ordering = ['nome']
+
+    def __str__(self):
+        return self.nome
+
+
+class LawyerManager(UserManager):
+    """Lawyers of the active escritorio (see users.tenancy)"""
+
+    def get_queryset(self):
+        return tenancy.scoped(super().get_queryset())
+
+
 class Lawyer(AbstractUser):
+    # Required for regular lawyers (see EscritorioMiddleware); only staff may go without one and see every firm
+    escritorio = models.ForeignKey(
+        Escritorio, on_delete=models.PROTECT, blank=True, null=True, related_name='advogados', verbose_name="Escritório",
+    )
     cpf = models.CharField(max_length=14, unique=True, blank=True, null=True, verbose_name="CPF")
     oab_number = models.CharField(max_length=20, blank=True, null=True, verbose_name="Número OAB")
 
@@ -41,5 +71,19 @@ class Lawyer(AbstractUser):
         related_query_name="lawyer",
     )
 
+    objects = LawyerManager()
+
     def __str__(self):
         return self.username
+
+    @property
+    def needs_escritorio(self):
+        """Regular lawyer without a firm: cannot log in, since nothing would be filtered for them"""
+        return self.escritorio_id is None and not (self.is_staff or self.is_superuser)
+
+    def save(self, *args, **kwargs):
+        if self.escritorio_id is None and not self.pk:
+            self.escritorio_id = tenancy.current_id()
+            if self.needs_escritorio:
+                self.escritorio_id = tenancy.single_escritorio_id()
+        super().save(*args, **kwargs)
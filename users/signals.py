@@ -0,0 +1,21 @@
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from .backends import user_cache
+from .models import Lawyer
+
+
+@receiver(post_save, sender=Lawyer)
+@receiver(post_delete, sender=Lawyer)
+def invalidate_cached_user(sender, instance, **kwargs):
+    # Covers password changes, enable_login and is_active, which are all saved on the model
+    user_cache.invalidate(instance.pk)
+
+
+@receiver(m2m_changed, sender=Lawyer.groups.through)
+@receiver(m2m_changed, sender=Lawyer.user_permissions.through)
+def invalidate_cached_user_permissions(sender, instance, reverse, **kwargs):
+    if reverse:
+        user_cache.clear()
+    else:
+        user_cache.invalidate(instance.pk)
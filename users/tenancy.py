@@ -0,0 +1,145 @@
+"""
+Per-firm (Escritorio) scoping of the domain models.
+
+EscritorioMiddleware activates the escritorio of the authenticated lawyer for
+the request, and dashboard.fila runs each job with the escritorio that was
+active when it was queued. While one is active:
+
+- the default manager of every EscritorioModel (and of Lawyer) only returns
+  its rows, so views, forms and reports need no filter of their own;
+- rows created with save(), create() or bulk_create() are assigned to it.
+
+With none active (migrations, management commands, periodic jobs, lawyers
+without a firm) querysets are not filtered. New rows then take the escritorio
+of the row they belong to (ESCRITORIO_FROM) or, while there is a single firm,
+that one. Work that must not mix firms goes through each_escritorio().
+
+_base_manager, used for related objects and by the deletion collector, is
+never filtered: it only follows references from rows already in scope.
+"""
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.apps import apps
+from django.db import models
+
+current = ContextVar('escritorio', default=None)
+
+
+def current_id():
+    return current.get()
+
+
+@contextmanager
+def activate(escritorio_id):
+    """Scopes the block to the escritorio (None lifts the scope)"""
+    token = current.set(escritorio_id)
+    try:
+        yield escritorio_id
+    finally:
+        current.reset(token)
+
+
+def each_escritorio():
+    """Activates each escritorio in turn and yields its id; only the active one, if there is one"""
+    escritorio_id = current.get()
+    if escritorio_id is not None:
+        yield escritorio_id
+        return
+    for escritorio_id in apps.get_model('users', 'Escritorio').objects.order_by('pk').values_list('pk', flat=True):
+        with activate(escritorio_id):
+            yield escritorio_id
+
+
+def scoped(queryset):
+    escritorio_id = current.get()
+    return queryset if escritorio_id is None else queryset.filter(escritorio_id=escritorio_id)
+
+
+def single_escritorio_id():
+    """Id of the only escritorio, or None when there are several"""
+    ids = list(apps.get_model('users', 'Escritorio').objects.values_list('pk', flat=True)[:2])
+    return ids[0] if len(ids) == 1 else None
+
+
+def assign(objs):
+    """Fills the escritorio of new rows: the active one, the one of ESCRITORIO_FROM or the only firm"""
+    pending = [obj for obj in objs if obj.escritorio_id is None]
+    if not pending:
+        return
+    escritorio_id = current.get()
+    if escritorio_id is None:
+        model = type(pending[0])
+        # One query per relation for the whole batch
+        for name in getattr(model, 'ESCRITORIO_FROM', ()):
+            field = model._meta.get_field(name)
+            ids = {getattr(obj, field.attname) for obj in pending} - {None}
+            if ids:
+                owners = dict(field.related_model._base_manager.filter(pk__in=ids).values_list('pk', 'escritorio_id'))
+                for obj in pending:
+                    obj.escritorio_id = owners.get(getattr(obj, field.attname))
+                pending = [obj for obj in pending if obj.escritorio_id is None]
+                if not pending:
+                    return
+        escritorio_id = single_escritorio_id()
+    for obj in pending:
+        obj.escritorio_id = escritorio_id
+
+
+class EscritorioQuerySet(models.QuerySet):
+    def bulk_create(self, objs, *args, **kwargs):
+        objs = list(objs)
+        assign(objs)
+        return super().bulk_create(objs, *args, **kwargs)
+
+
+class EscritorioManager(models.Manager.from_queryset(EscritorioQuerySet)):
+    """Default manager of the firm's rows: filtered by the active escritorio"""
+
+    def get_queryset(self):
+        return scoped(super().get_queryset())
+
+
+class EscritorioModel(models.Model):
+    """
+    Row owned by a firm. The composite indexes of each model lead with
+    escritorio, so the FK itself is not indexed.
+    """
+    escritorio = models.ForeignKey(
+        'users.Escritorio', on_delete=models.PROTECT, editable=False, db_index=False, related_name='+',
+        verbose_name='Escritório',
+    )
+
+    # Foreign keys, in order, whose escritorio new rows take when none is active
+    ESCRITORIO_FROM = ()
+
+    objects = EscritorioManager()
+
+    class Meta:
+        abstract = True
+
+    def save(self, *args, **kwargs):
+        assign([self])
+        super().save(*args, **kwargs)
+
+    def validate_constraints(self, exclude=None):
+        # escritorio is never a form field, but the per-firm unique constraints include it
+        assign([self])
+        super().validate_constraints(exclude=set(exclude or ()) - {'escritorio'})
+
+
+class EscritorioFormMixin:
+    """
+    Narrows the choices of model fields to the active escritorio. Querysets
+    declared on the form class are built at import time, outside any request.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        escritorio_id = current.get()
+        if escritorio_id is None:
+            return
+        for field in self.fields.values():
+            queryset = getattr(field, 'queryset', None)
+            if queryset is not None and any(f.name == 'escritorio' for f in queryset.model._meta.concrete_fields):
+                field.queryset = queryset.filter(escritorio_id=escritorio_id)
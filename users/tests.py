@@ -1,3 +1,117 @@
+import time
+from unittest import mock
+
+from django.contrib import admin
 from django.test import TestCase
+from django.urls import reverse
+
+from . import tenancy
+from .backends import USER_CACHE_TTL, user_cache
+from .models import Escritorio, Lawyer
+
+
+class EscritorioRequiredTests(TestCase):
+    """Regular lawyers must belong to a firm; only staff see every firm"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.escritorio_a = Escritorio.objects.create(nome='Escritório A')
+        cls.escritorio_b = Escritorio.objects.create(nome='Escritório B')
+        cls.lawyer = Lawyer.objects.create_user('lawyer', password='secret', escritorio=cls.escritorio_a)
+        cls.other = Lawyer.objects.create_user('other', password='secret', escritorio=cls.escritorio_b)
+        cls.unassigned = Lawyer.objects.create_user('unassigned', password='secret')
+        cls.staff = Lawyer.objects.create_user('staff', password='secret', is_staff=True)
+
+    def test_lawyer_without_firm_cannot_log_in(self):
+        self.assertIsNone(self.unassigned.escritorio_id)
+        self.assertFalse(self.client.login(username='unassigned', password='secret'))
+        self.assertTrue(self.client.login(username='lawyer', password='secret'))
+
+    def test_staff_without_firm_can_log_in(self):
+        self.assertTrue(self.client.login(username='staff', password='secret'))
+
+    def test_session_of_lawyer_without_firm_is_not_authenticated(self):
+        self.client.force_login(self.unassigned)
+        response = self.client.get(reverse('dashboard:clients'))
+        self.assertRedirects(response, f"{reverse('login')}?next={reverse('dashboard:clients')}", fetch_redirect_response=False)
+        self.assertFalse(response.wsgi_request.user.is_authenticated)
+
+    def test_new_lawyer_takes_the_active_firm(self):
+        with tenancy.activate(self.escritorio_b.pk):
+            lawyer = Lawyer.objects.create_user('new')
+        self.assertEqual(lawyer.escritorio_id, self.escritorio_b.pk)
+
+    def test_manager_is_scoped_to_the_active_firm(self):
+        with tenancy.activate(self.escritorio_a.pk):
+            self.assertEqual(list(Lawyer.objects.values_list('username', flat=True)), ['lawyer'])
+        self.assertEqual(Lawyer.objects.count(), 4)
+
+    def test_admin_edits_the_firm(self):
+        model_admin = admin.site._registry[Lawyer]
+        fields = [field for _, options in model_admin.fieldsets for field in options['fields']]
+        add_fields = [field for _, options in model_admin.add_fieldsets for field in options['fields']]
+        self.assertIn('escritorio', fields)
+        self.assertIn('escritorio', add_fields)
+
+
+class UserCacheTests(TestCase):
+    """LawyerBackend serves the session user from UserCache; saving the lawyer drops the entry"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.escritorio = Escritorio.objects.create(nome='Escritório cache')
+        cls.lawyer = Lawyer.objects.create_user('cached', password='secret', first_name='Old', escritorio=cls.escritorio)
+
+    def setUp(self):
+        user_cache.clear()
+        self.addCleanup(user_cache.clear)
+        self.client.force_login(self.lawyer)
+
+    def request_user(self):
+        return self.client.get(reverse('dashboard:clients')).wsgi_request.user
+
+    def reload(self):
+        return Lawyer.objects.get(pk=self.lawyer.pk)
+
+    def test_user_is_cached_between_requests(self):
+        self.request_user()
+        with self.assertNumQueries(0):
+            user = user_cache.get(self.lawyer.pk)
+        self.assertEqual(user.first_name, 'Old')
+        # Each request gets its own copy
+        user.first_name = 'Changed in a request'
+        self.assertEqual(user_cache.get(self.lawyer.pk).first_name, 'Old')
+
+    def test_edit_is_seen_on_the_next_request(self):
+        self.request_user()
+        lawyer = self.reload()
+        lawyer.first_name = 'New'
+        lawyer.save()
+        self.assertEqual(self.request_user().first_name, 'New')
+
+    def test_deactivation_logs_out_on_the_next_request(self):
+        self.assertTrue(self.request_user().is_authenticated)
+        lawyer = self.reload()
+        lawyer.is_active = False
+        lawyer.save()
+        self.assertFalse(self.request_user().is_authenticated)
+
+    def test_password_change_ends_the_session(self):
+        self.request_user()
+        lawyer = self.reload()
+        lawyer.set_password('other')
+        lawyer.save()
+        self.assertFalse(self.request_user().is_authenticated)
+
+    def test_deleted_lawyer_is_logged_out(self):
+        self.request_user()
+        self.reload().delete()
+        self.assertFalse(self.request_user().is_authenticated)
 
-# Create your tests here.
+    def test_queryset_update_is_seen_after_the_ttl(self):
+        self.request_user()
+        Lawyer.objects.filter(pk=self.lawyer.pk).update(is_active=False)
+        self.assertTrue(self.request_user().is_authenticated)
+        later = time.monotonic() + USER_CACHE_TTL + 1
+        with mock.patch('users.backends.time.monotonic', return_value=later):
+            self.assertFalse(self.request_user().is_authenticated)